@@ -0,0 +1,625 @@
+"""
+API 부하 테스트 / 벤치마크
+
+test_api.py가 엔드포인트를 한 번씩 순차 확인하는 스모크 테스트라면,
+이 스크립트는 합성 프롬프트 라이브러리(기본 100, 10k, 100k개)를 만들어 두고
+엔드포인트별/혼합 워크로드를 지정한 동시성으로 실행하여
+처리량, p50/p95/p99 지연 시간, 서버 최대 RSS를 측정합니다.
+
+실행 방식:
+- spawn (기본값): 임시 데이터 디렉토리로 `python run.py prod`를 실행 ([READY] 신호 대기)
+- inprocess: 같은 프로세스에서 uvicorn을 스레드로 실행 (클라이언트와 GIL 공유)
+- url: 이미 실행 중인 서버에 연결 (--url, 데이터는 건드리지 않고 읽기 워크로드만 실행)
+
+결과는 --json으로 저장하고, --compare로 이전 결과(다른 커밋)와 비교할 수 있습니다.
+
+사용 예:
+    python -m backend.benchmarks.bench_api --sizes 100,10000 --duration 3 --json before.json
+    python -m backend.benchmarks.bench_api --sizes 100,10000 --duration 3 --compare before.json
+    python -m backend.benchmarks.bench_api --mode url --url http://127.0.0.1:8000 --workloads list_prompts,get_prompt
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+FOLDER_COUNT = 20
+AUTOTEXT_RATIO = 0.3
+TAG_COUNT = 50
+DUPLICATE_RATIO = 0.05
+OK_STATUSES = {200, 201, 204, 304}
+
+
+# ============== 합성 라이브러리 ==============
+
+def generate_library(count: int, rng: random.Random) -> Tuple[List[Dict], List[Dict]]:
+    """
+    합성 프롬프트/폴더 데이터 생성 (storage와 같은 JSON 형식)
+
+    Args:
+        count: 프롬프트 개수
+        rng: 난수 생성기
+
+    Returns:
+        Tuple[List[Dict], List[Dict]]: (프롬프트 목록, 폴더 목록)
+    """
+    now = datetime.now().isoformat()
+    folders = [
+        {'id': i, 'name': f"폴더 {i}", 'created_at': now, 'updated_at': now}
+        for i in range(1, FOLDER_COUNT + 1)
+    ]
+    words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(2000)]
+
+    prompts = []
+    for i in range(count):
+        prompt = {
+            'id': str(1_700_000_000_000_000 + i),
+            'title': ' '.join(rng.choices(words, k=rng.randint(2, 6))),
+            'text': ' '.join(rng.choices(words, k=rng.randint(10, 80))),
+            'folder_id': rng.randint(1, FOLDER_COUNT) if rng.random() < 0.8 else None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        if prompts and rng.random() < DUPLICATE_RATIO:
+            # 앞의 프롬프트 본문을 조금 고친 사본 (유사 프롬프트 탐지용)
+            prompt['text'] = f"{rng.choice(prompts)['text']} {rng.choice(words)}"
+        if rng.random() < AUTOTEXT_RATIO:
+            prompt['autotext'] = f"@{i:x}{rng.choice(words)}"
+        # 앞쪽 태그일수록 자주 쓰이는 분포 (0~3개)
+        tags = {f"tag{int(rng.paretovariate(1.2)) % TAG_COUNT}" for _ in range(rng.randint(0, 3))}
+        if tags:
+            prompt['tags'] = sorted(tags)
+        prompts.append(prompt)
+    return prompts, folders
+
+
+def write_library(data_dir: str, prompts: List[Dict], folders: List[Dict]):
+    """합성 라이브러리를 데이터 디렉토리에 기록"""
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'prompts.json'), 'w', encoding='utf-8') as f:
+        json.dump(prompts, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(data_dir, 'folders.json'), 'w', encoding='utf-8') as f:
+        json.dump(folders, f, ensure_ascii=False, indent=2)
+
+
+# ============== 서버 실행 ==============
+
+class SpawnedServer:
+    """run.py를 하위 프로세스로 실행하고 [READY] 신호를 기다림"""
+
+    def __init__(self, data_dir: str, timeout: float = 60.0):
+        env = {
+            **os.environ,
+            'ENV': 'production',
+            'BACKEND_PORT': str(_free_port()),
+            'PPOP_DATA_DIR': data_dir,
+            'PYTHONUNBUFFERED': '1',
+            'AUTOTEXT_DEBUG': 'false',
+        }
+        self.process = subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / 'run.py'), 'prod'], cwd=str(PROJECT_ROOT), env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding='utf-8', errors='replace'
+        )
+        self.pid = self.process.pid
+        self.base_url = None
+
+        deadline = time.monotonic() + timeout
+        for line in self.process.stdout:
+            if line.startswith('[READY]'):
+                port = json.loads(line.split(' ', 1)[1])['port']
+                self.base_url = f"http://127.0.0.1:{port}"
+                break
+            if time.monotonic() > deadline:
+                break
+        if self.base_url is None:
+            self.stop()
+            raise RuntimeError("서버가 준비 완료 신호를 보내지 않았습니다.")
+        # 출력 파이프가 가득 차서 서버가 멈추지 않도록 계속 비움
+        threading.Thread(target=lambda: [None for _ in self.process.stdout], daemon=True).start()
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class InProcessServer:
+    """같은 프로세스의 스레드에서 uvicorn 실행 (PPOP_DATA_DIR은 import 전에 지정되어 있어야 함)"""
+
+    def __init__(self):
+        import uvicorn
+
+        # run.py와 같이 IPPROTO_TCP로 만들어야 수락한 연결에 TCP_NODELAY가 설정됨
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        os.environ['BACKEND_PORT'] = str(port)
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.pid = os.getpid()
+        from backend.main import app
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={'sockets': [sock]}, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class RssSampler:
+    """
+    서버 프로세스 RSS를 주기적으로 측정하여 구간별 최댓값 기록
+
+    Linux는 /proc, 그 외에는 psutil이 설치된 경우에만 측정합니다.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._stop_event = threading.Event()
+        self._read = self._reader()
+        if self._read is not None:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _reader(self) -> Optional[Callable[[], int]]:
+        status_path = f"/proc/{self.pid}/status"
+        if os.path.exists(status_path):
+            def read_proc() -> int:
+                with open(status_path) as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            return int(line.split()[1]) * 1024
+                return 0
+            return read_proc
+        try:
+            import psutil
+        except ImportError:
+            return None
+        process = psutil.Process(self.pid)
+        return lambda: process.memory_info().rss
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                rss = self._read()
+            except Exception:
+                return
+            if self.peak is None or rss > self.peak:
+                self.peak = rss
+
+    def take_peak(self) -> Optional[float]:
+        """직전 호출 이후 최대 RSS (MB)를 반환하고 초기화"""
+        peak, self.peak = self.peak, None
+        return round(peak / (1024 * 1024), 1) if peak is not None else None
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# ============== 워크로드 ==============
+
+class Context:
+    """워커 스레드가 공유하는 요청 대상 정보"""
+
+    def __init__(self, prompt_ids: List[str]):
+        self.prompt_ids = prompt_ids
+        self.created_ids: List[str] = []
+        self.lock = threading.Lock()
+        self.etags: Dict[str, str] = {}
+        self.sequence = 0
+
+    def next_sequence(self) -> int:
+        with self.lock:
+            self.sequence += 1
+            return self.sequence
+
+
+def _op_list_prompts(ctx, rng):
+    return 'GET', '/api/prompts/', None, None
+
+
+def _op_list_prompts_304(ctx, rng):
+    # 프론트엔드의 재검증 요청 (캐시된 ETag로 조건부 GET)
+    etag = ctx.etags.get('/api/prompts/')
+    return 'GET', '/api/prompts/', None, {'If-None-Match': etag} if etag else None
+
+
+def _op_list_folder_prompts(ctx, rng):
+    return 'GET', f"/api/prompts/?folder_id={rng.randint(1, FOLDER_COUNT)}", None, None
+
+
+def _op_list_sorted_page(ctx, rng):
+    # 정렬된 목록의 한 페이지 (offset을 바꿔 응답 캐시가 아닌 정렬 인덱스를 측정)
+    sort = rng.choice(('updated_at', 'created_at', 'title'))
+    return 'GET', f"/api/prompts/?sort={sort}&limit=50&offset={rng.randrange(0, 5000, 50)}", None, None
+
+
+def _op_list_tagged(ctx, rng):
+    # 태그 AND/NOT 조건의 한 페이지 (태그 비트맵)
+    first, second, excluded = rng.sample(range(1, 9), 3)
+    return 'GET', (f"/api/prompts/?tag=tag{first}&tag=tag{second}&exclude_tag=tag{excluded}"
+                   f"&limit=50&offset={rng.randrange(0, 500, 50)}"), None, None
+
+
+def _op_tag_counts(ctx, rng):
+    return 'GET', '/api/prompts/tags', None, None
+
+
+def _op_similar_prompts(ctx, rng):
+    return 'GET', f"/api/prompts/{rng.choice(ctx.prompt_ids)}/similar", None, None
+
+
+def _op_duplicates_report(ctx, rng):
+    # 임계값을 바꿔 응답 캐시가 아닌 LSH 후보 비교를 측정
+    return 'GET', f"/api/prompts/duplicates?threshold={rng.randrange(70, 96) / 100}", None, None
+
+
+def _op_related_prompts(ctx, rng):
+    return 'GET', f"/api/prompts/{rng.choice(ctx.prompt_ids)}/related?limit=5", None, None
+
+
+def _op_related_text(ctx, rng):
+    # 편집 중인 내용으로 조회 (응답 캐시 없이 TF-IDF 조회만 측정)
+    body = {'title': f"draft {ctx.next_sequence()}", 'text': 'benchmark prompt ' * rng.randint(1, 20), 'limit': 5}
+    return 'POST', '/api/prompts/related', body, None
+
+
+def _op_suggest(ctx, rng):
+    # 검색창 입력 중 요청 (임의 글자라 대부분 캐시 미스, 4자 이상이면 오타 검색 포함)
+    q = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 6)))
+    return 'GET', f"/api/prompts/suggest?q={q}&limit=10", None, None
+
+
+def _op_get_prompt(ctx, rng):
+    return 'GET', f"/api/prompts/{rng.choice(ctx.prompt_ids)}", None, None
+
+
+def _op_list_folders(ctx, rng):
+    return 'GET', '/api/folders/', None, None
+
+
+def _op_list_folders_stats(ctx, rng):
+    return 'GET', '/api/folders/?with_stats=true', None, None
+
+
+def _op_autotext_triggers(ctx, rng):
+    return 'GET', '/api/autotexts/triggers', None, None
+
+
+def _op_autotext_conflicts(ctx, rng):
+    return 'GET', '/api/autotexts/conflicts', None, None
+
+
+def _op_create_prompt(ctx, rng):
+    sequence = ctx.next_sequence()
+    body = {'title': f"bench {sequence}", 'text': 'benchmark prompt ' * rng.randint(1, 20),
+            'folder_id': rng.randint(1, FOLDER_COUNT)}
+    return 'POST', '/api/prompts/', body, None
+
+
+def _op_update_prompt(ctx, rng):
+    body = {'title': f"updated {ctx.next_sequence()}"}
+    return 'PUT', f"/api/prompts/{rng.choice(ctx.prompt_ids)}", body, None
+
+
+def _op_delete_prompt(ctx, rng):
+    # 이번 실행에서 만든 프롬프트만 삭제 (없으면 생성으로 대체)
+    with ctx.lock:
+        prompt_id = ctx.created_ids.pop() if ctx.created_ids else None
+    if prompt_id is None:
+        return _op_create_prompt(ctx, rng)
+    return 'DELETE', f"/api/prompts/{prompt_id}", None, None
+
+
+OPERATIONS: Dict[str, Callable] = {
+    'list_prompts': _op_list_prompts,
+    'list_prompts_304': _op_list_prompts_304,
+    'list_folder_prompts': _op_list_folder_prompts,
+    'list_sorted_page': _op_list_sorted_page,
+    'list_tagged': _op_list_tagged,
+    'tag_counts': _op_tag_counts,
+    'similar_prompts': _op_similar_prompts,
+    'duplicates_report': _op_duplicates_report,
+    'related_prompts': _op_related_prompts,
+    'related_text': _op_related_text,
+    'suggest': _op_suggest,
+    'get_prompt': _op_get_prompt,
+    'list_folders': _op_list_folders,
+    'list_folders_stats': _op_list_folders_stats,
+    'autotext_triggers': _op_autotext_triggers,
+    'autotext_conflicts': _op_autotext_conflicts,
+    'create_prompt': _op_create_prompt,
+    'update_prompt': _op_update_prompt,
+    'delete_prompt': _op_delete_prompt,
+}
+WRITE_OPERATIONS = {'create_prompt', 'update_prompt', 'delete_prompt'}
+
+# 혼합 워크로드 가중치 (프론트엔드 사용 패턴: 목록/상세 조회 위주, 가끔 수정)
+MIXED_READ_WEIGHTS = {
+    'list_prompts_304': 30, 'list_folder_prompts': 15, 'get_prompt': 35,
+    'list_folders': 10, 'autotext_triggers': 10,
+}
+MIXED_WRITE_WEIGHTS = {'create_prompt': 40, 'update_prompt': 40, 'delete_prompt': 20}
+
+DEFAULT_WORKLOADS = ('list_prompts', 'list_prompts_304', 'list_folder_prompts', 'list_sorted_page', 'list_tagged',
+                     'get_prompt', 'similar_prompts', 'duplicates_report', 'related_prompts', 'related_text',
+                     'suggest', 'list_folders', 'list_folders_stats', 'autotext_triggers', 'autotext_conflicts',
+                     'create_prompt', 'update_prompt', 'mixed')
+
+
+def _pick_mixed(rng: random.Random, write_ratio: float) -> str:
+    weights = MIXED_WRITE_WEIGHTS if rng.random() < write_ratio else MIXED_READ_WEIGHTS
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def run_workload(base_url: str, ctx: Context, workload: str, concurrency: int,
+                 duration: float, write_ratio: float, seed: int) -> Dict:
+    """
+    워크로드를 duration초 동안 concurrency개 스레드로 실행
+
+    Args:
+        base_url: 서버 URL
+        ctx: 요청 대상 정보
+        workload: OPERATIONS의 이름 또는 'mixed'
+        concurrency: 동시 요청 스레드 수
+        duration: 실행 시간 (초)
+        write_ratio: mixed 워크로드의 쓰기 요청 비율
+        seed: 난수 시드
+
+    Returns:
+        Dict: 요청 수, 오류 수, 처리량, 지연 시간 백분위수
+    """
+    latencies = array('q')
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index: int):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        local = array('q')
+        local_errors = 0
+        # 시간이 짧아도 최소 한 번은 요청
+        while not local or time.perf_counter() < deadline:
+            name = _pick_mixed(rng, write_ratio) if workload == 'mixed' else workload
+            method, path, body, headers = OPERATIONS[name](ctx, rng)
+            started = time.perf_counter_ns()
+            try:
+                response = session.request(method, base_url + path, json=body, headers=headers, timeout=120)
+                elapsed = time.perf_counter_ns() - started
+                if response.status_code not in OK_STATUSES:
+                    local_errors += 1
+                elif name == 'create_prompt':
+                    with ctx.lock:
+                        ctx.created_ids.append(response.json()['id'])
+            except requests.RequestException:
+                elapsed = time.perf_counter_ns() - started
+                local_errors += 1
+            local.append(elapsed)
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / wall, 2),
+        **_percentiles_ms(latencies),
+    }
+
+
+def _percentiles_ms(samples: array) -> Dict[str, float]:
+    """나노초 샘플의 백분위수를 밀리초로 반환"""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+
+    def pick(pct: float) -> float:
+        return round(ordered[min(last, int(round(pct / 100 * last)))] / 1e6, 3)
+
+    return {'p50_ms': pick(50), 'p95_ms': pick(95), 'p99_ms': pick(99), 'max_ms': round(ordered[-1] / 1e6, 3)}
+
+
+def _prime_etag(base_url: str, ctx: Context):
+    """조건부 GET 워크로드에 사용할 현재 ETag 조회"""
+    response = requests.get(base_url + '/api/prompts/', timeout=120)
+    if response.headers.get('ETag'):
+        ctx.etags['/api/prompts/'] = response.headers['ETag']
+
+
+def bench_size(base_url: str, pid: Optional[int], size: int, prompt_ids: List[str],
+               workloads: List[str], args) -> List[Dict]:
+    """한 라이브러리 크기에 대해 모든 워크로드 실행"""
+    ctx = Context(prompt_ids)
+    rss = RssSampler(pid) if pid else None
+    results = []
+    try:
+        for workload in workloads:
+            if workload in ('list_prompts_304', 'mixed'):
+                _prime_etag(base_url, ctx)
+            if rss:
+                rss.take_peak()
+            stats = run_workload(base_url, ctx, workload, args.concurrency, args.duration,
+                                 args.write_ratio, args.seed)
+            result = {'size': size, 'endpoint': workload, 'concurrency': args.concurrency, **stats,
+                      'peak_rss_mb': rss.take_peak() if rss else None}
+            results.append(result)
+            _print_row(result)
+    finally:
+        if rss:
+            rss.stop()
+    return results
+
+
+# ============== 출력/비교 ==============
+
+HEADER = (f"{'size':>7} {'endpoint':<20} {'reqs':>7} {'err':>5} {'rps':>9} "
+          f"{'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'rssMB':>7}")
+
+
+def _print_row(r: Dict):
+    rss = f"{r['peak_rss_mb']:>7.1f}" if r['peak_rss_mb'] is not None else f"{'-':>7}"
+    print(f"{r['size']:>7} {r['endpoint']:<20} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>9.1f} "
+          f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {rss}")
+
+
+def compare(results: List[Dict], baseline_path: str, max_regression: float) -> bool:
+    """
+    이전 결과와 비교하여 변화율 출력
+
+    Args:
+        results: 이번 결과
+        baseline_path: 이전 결과 JSON 경로
+        max_regression: 허용 회귀 비율 (예: 0.2 = p95 20% 증가 또는 처리량 20% 감소)
+
+    Returns:
+        bool: 허용 범위를 넘는 회귀가 없으면 True
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(r['size'], r['endpoint']): r for r in baseline['results']}
+    print()
+    print(f"비교 기준: {baseline_path} (commit {baseline['meta'].get('commit') or '-'})")
+    print(f"{'size':>7} {'endpoint':<20} {'rps':>16} {'p50':>16} {'p95':>16}")
+
+    ok = True
+    for r in results:
+        old = before.get((r['size'], r['endpoint']))
+        if not old:
+            continue
+
+        def change(key: str) -> float:
+            return (r[key] - old[key]) / old[key] if old[key] else 0.0
+
+        rps, p50, p95 = change('throughput_rps'), change('p50_ms'), change('p95_ms')
+        regressed = p95 > max_regression or rps < -max_regression
+        ok = ok and not regressed
+        print(f"{r['size']:>7} {r['endpoint']:<20} {rps:>+15.1%} {p50:>+15.1%} {p95:>+15.1%}"
+              f"{'  ❌' if regressed else ''}")
+    return ok
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(PROJECT_ROOT),
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ============== 진입점 ==============
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="API 부하 테스트 / 벤치마크")
+    parser.add_argument('--mode', choices=('spawn', 'inprocess', 'url'), default='spawn', help="서버 실행 방식")
+    parser.add_argument('--url', help="url 모드에서 사용할 서버 주소 (예: http://127.0.0.1:8000)")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="합성 라이브러리 크기 (쉼표 구분)")
+    parser.add_argument('--workloads', default=','.join(DEFAULT_WORKLOADS),
+                        help=f"실행할 워크로드 (쉼표 구분, 선택: {', '.join(list(OPERATIONS) + ['mixed'])})")
+    parser.add_argument('--concurrency', type=int, default=8, help="동시 요청 스레드 수")
+    parser.add_argument('--duration', type=float, default=5.0, help="워크로드별 실행 시간 (초)")
+    parser.add_argument('--write-ratio', type=float, default=0.1, help="mixed 워크로드의 쓰기 요청 비율")
+    parser.add_argument('--seed', type=int, default=42, help="난수 시드")
+    parser.add_argument('--json', dest='json_path', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON 파일 경로")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="--compare 시 허용 회귀 비율 (초과 시 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    workloads = [w.strip() for w in args.workloads.split(',') if w.strip()]
+    unknown = [w for w in workloads if w != 'mixed' and w not in OPERATIONS]
+    if unknown:
+        parser.error(f"알 수 없는 워크로드: {', '.join(unknown)}")
+
+    results: List[Dict] = []
+    print(HEADER)
+    print('-' * len(HEADER))
+
+    if args.mode == 'url':
+        if not args.url:
+            parser.error("url 모드에는 --url이 필요합니다.")
+        # 실제 데이터를 바꾸지 않도록 읽기 워크로드만 실행
+        workloads = [w for w in workloads if w not in WRITE_OPERATIONS and w != 'mixed']
+        prompts = requests.get(args.url + '/api/prompts/', timeout=120).json()
+        results += bench_size(args.url, None, len(prompts), [p['id'] for p in prompts] or ['0'], workloads, args)
+    else:
+        data_dir = tempfile.mkdtemp(prefix='ppop_bench_api_')
+        os.environ['PPOP_DATA_DIR'] = data_dir
+        rng = random.Random(args.seed)
+        in_process = None
+        for size in (int(s) for s in args.sizes.split(',')):
+            prompts, folders = generate_library(size, rng)
+            write_library(data_dir, prompts, folders)
+            prompt_ids = [p['id'] for p in prompts]
+            del prompts
+
+            if args.mode == 'spawn':
+                server = SpawnedServer(data_dir)
+                try:
+                    results += bench_size(server.base_url, server.pid, size, prompt_ids, workloads, args)
+                finally:
+                    server.stop()
+            else:
+                # 저장소는 요청마다 파일을 읽으므로 같은 서버에서 파일만 교체
+                in_process = in_process or InProcessServer()
+                results += bench_size(in_process.base_url, in_process.pid, size, prompt_ids, workloads, args)
+        if in_process:
+            in_process.stop()
+
+    if args.json_path:
+        meta = {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'mode': args.mode,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'write_ratio': args.write_ratio,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, ensure_ascii=False, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+저장소 레코드 메모리 벤치마크
+
+합성 프롬프트 라이브러리(기본 100k개)를 메모리에 올렸을 때
+JSON을 그대로 읽은 dict 목록과 레코드 객체(backend.records) 목록의
+메모리 사용량, 로드 시간, JSON 형식 변환(to_dict) 시간을 비교합니다.
+
+메모리는 tracemalloc으로 목록을 만드는 동안 할당되어 남아 있는 크기입니다.
+파일 내용 문자열은 측정에서 제외합니다.
+
+사용 예:
+    python -m backend.benchmarks.bench_records
+    python -m backend.benchmarks.bench_records --count 100000 --json records.json
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.benchmarks.bench_api import generate_library  # noqa: E402
+from backend.records import FolderRecord, PromptRecord  # noqa: E402
+
+
+def _measure(build: Callable[[], list]) -> Tuple[list, int, float]:
+    """
+    목록 생성 시 남아 있는 할당 크기와 소요 시간 측정
+
+    Returns:
+        Tuple[list, int, float]: (생성된 목록, 바이트, 초)
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def run_benchmark(count: int, seed: int = 42) -> List[Dict]:
+    """
+    표현 방식별 측정
+
+    Args:
+        count: 프롬프트 개수
+        seed: 난수 시드
+
+    Returns:
+        List[Dict]: 결과 목록
+    """
+    prompts, folders = generate_library(count, random.Random(seed))
+    folders_json = json.dumps(folders, ensure_ascii=False, indent=2)
+    # 현재 스키마(v2)처럼 autotexts 목록까지 저장된 파일 기준
+    for prompt in prompts:
+        autotext = prompt.get('autotext')
+        prompt['autotexts'] = [{'trigger_text': autotext}] if autotext else []
+    prompts_json = json.dumps(prompts, ensure_ascii=False, indent=2)
+    del prompts, folders
+
+    results = []
+
+    dicts, dict_bytes, dict_seconds = _measure(lambda: json.loads(prompts_json))
+    results.append({'representation': 'list[dict]', 'bytes': dict_bytes, 'load_s': dict_seconds})
+
+    def load_records():
+        # 파싱 중 생긴 dict는 레코드 변환 후 해제되므로 남은 크기에는 포함되지 않음
+        return [PromptRecord.from_dict(item) for item in json.loads(prompts_json)]
+
+    records, record_bytes, record_seconds = _measure(load_records)
+    results.append({'representation': 'PromptRecord', 'bytes': record_bytes, 'load_s': record_seconds})
+
+    started = time.perf_counter()
+    round_trip = [record.to_dict() for record in records]
+    to_dict_seconds = time.perf_counter() - started
+    if round_trip != dicts:
+        raise AssertionError("레코드를 JSON 형식으로 되돌린 결과가 원본과 다릅니다.")
+    results[-1]['to_dict_s'] = to_dict_seconds
+
+    folder_records = [FolderRecord.from_dict(item) for item in json.loads(folders_json)]
+    if [folder.to_dict() for folder in folder_records] != json.loads(folders_json):
+        raise AssertionError("폴더 레코드를 JSON 형식으로 되돌린 결과가 원본과 다릅니다.")
+
+    for result in results:
+        result['count'] = count
+        result['bytes_per_record'] = round(result['bytes'] / count, 1)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="저장소 레코드 메모리 벤치마크")
+    parser.add_argument('--count', type=int, default=100_000, help="프롬프트 개수")
+    parser.add_argument('--seed', type=int, default=42, help="난수 시드")
+    parser.add_argument('--json', dest='json_path', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.count, args.seed)
+
+    print(f"{'representation':<16} {'count':>8} {'MB':>9} {'B/rec':>9} {'load_s':>8} {'to_dict_s':>10}")
+    print('-' * 64)
+    for r in results:
+        to_dict = f"{r['to_dict_s']:.3f}" if 'to_dict_s' in r else '-'
+        print(f"{r['representation']:<16} {r['count']:>8} {r['bytes'] / (1024 * 1024):>9.1f} "
+              f"{r['bytes_per_record']:>9.1f} {r['load_s']:>8.3f} {to_dict:>10}")
+
+    baseline, compact = results
+    print()
+    print(f"메모리 절감: {(1 - compact['bytes'] / baseline['bytes']) * 100:.1f}%")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'results': results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+백엔드 시작 시간 벤치마크
+
+run.py(또는 PyInstaller로 빌드된 실행 파일)를 새 프로세스로 실행하여
+첫 번째 정상 /health 응답까지 걸린 시간을 측정하고, 예산을 넘으면 실패합니다.
+서버가 출력하는 단계별 시작 시간([STARTUP] 줄)과 import 시간 상위 모듈도 함께 보고합니다.
+
+사용 예:
+    python -m backend.benchmarks.bench_startup
+    python -m backend.benchmarks.bench_startup --runs 5 --budget-ms 2500
+    python -m backend.benchmarks.bench_startup --exe resources/ppop_promt_backend.exe
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    """사용 가능한 로컬 포트 조회"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _is_healthy(port: int) -> bool:
+    """/health가 200을 반환하는지 확인"""
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=0.5)
+        conn.request('GET', '/health')
+        healthy = conn.getresponse().status == 200
+        conn.close()
+        return healthy
+    except OSError:
+        return False
+
+
+def measure_once(command: List[str], timeout: float) -> Dict:
+    """
+    서버를 한 번 실행하여 첫 정상 응답까지의 시간 측정
+
+    Args:
+        command: 실행할 명령
+        timeout: 최대 대기 시간 (초)
+
+    Returns:
+        Dict: {'healthy_ms': 첫 정상 응답까지 시간, 'ready_ms': [READY] 신호까지 시간,
+               'phases': 서버 보고 단계별 시간 문자열}
+    """
+    port = _free_port()
+    data_dir = tempfile.mkdtemp(prefix='ppop_bench_')
+    env = {
+        **os.environ,
+        'ENV': 'production',
+        'BACKEND_PORT': str(port),
+        'PPOP_DATA_DIR': data_dir,
+        'STARTUP_TIMING': 'true',
+        'PYTHONUNBUFFERED': '1',
+    }
+
+    output: List[str] = []
+    ready_at: List[float] = []
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=str(PROJECT_ROOT), env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, encoding='utf-8', errors='replace')
+
+    def read_output():
+        for line in process.stdout:
+            if line.startswith('[READY]') and not ready_at:
+                ready_at.append(time.perf_counter())
+            output.append(line)
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+
+    healthy_ms = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                break
+            if _is_healthy(port):
+                healthy_ms = (time.perf_counter() - started) * 1000
+                break
+            time.sleep(0.005)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        reader.join(timeout=1)
+
+    phases = next((line.strip() for line in output if line.startswith('[STARTUP]')), '')
+    if healthy_ms is None:
+        tail = ''.join(output[-20:])
+        raise RuntimeError(f"서버가 {timeout}초 안에 응답하지 않았습니다.\n{tail}")
+    ready_ms = (ready_at[0] - started) * 1000 if ready_at else None
+    return {'healthy_ms': healthy_ms, 'ready_ms': ready_ms, 'phases': phases}
+
+
+def import_time_breakdown(limit: int = 15) -> List[Dict]:
+    """
+    python -X importtime으로 backend.main import 시간 상위 모듈 조회
+
+    Args:
+        limit: 반환할 모듈 수
+
+    Returns:
+        List[Dict]: [{'module': 이름, 'self_ms': 자체 시간, 'cumulative_ms': 누적 시간}]
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import backend.main'],
+        cwd=str(PROJECT_ROOT), capture_output=True, text=True,
+        env={**os.environ, 'PPOP_DATA_DIR': tempfile.mkdtemp(prefix='ppop_bench_')}
+    )
+    pattern = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+    rows = []
+    for line in result.stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': len(match.group(3)) // 2,
+            })
+    # 최상위 import 위주로 누적 시간 순 정렬
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="백엔드 시작 시간 벤치마크")
+    parser.add_argument('--runs', type=int, default=3, help="측정 횟수")
+    parser.add_argument('--budget-ms', type=float, default=3000.0,
+                        help="첫 정상 응답까지 허용 시간 중앙값 (밀리초, 초과 시 종료 코드 1)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="실행당 최대 대기 시간 (초)")
+    parser.add_argument('--exe', help="PyInstaller로 빌드된 백엔드 실행 파일 (기본값: python run.py)")
+    parser.add_argument('--no-importtime', action='store_true', help="import 시간 분석 생략")
+    parser.add_argument('--json', dest='json_path', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    command = [args.exe, 'prod'] if args.exe else [sys.executable, str(PROJECT_ROOT / 'run.py'), 'prod']
+
+    runs = []
+    for i in range(args.runs):
+        run = measure_once(command, args.timeout)
+        runs.append(run)
+        ready = f"{run['ready_ms']:.1f}ms" if run['ready_ms'] is not None else '-'
+        print(f"[BENCH] run {i + 1}: health={run['healthy_ms']:.1f}ms ready={ready}  {run['phases']}")
+
+    timings = [run['healthy_ms'] for run in runs]
+    median = statistics.median(timings)
+    print()
+    print(f"첫 정상 /health 응답까지: median={median:.1f}ms min={min(timings):.1f}ms "
+          f"max={max(timings):.1f}ms (budget {args.budget_ms:.0f}ms)")
+
+    imports = []
+    if not args.no_importtime and not args.exe:
+        imports = import_time_breakdown()
+        print()
+        print(f"{'module':<40} {'self ms':>9} {'cum ms':>9}")
+        for row in imports:
+            print(f"{'  ' * row['depth'] + row['module']:<40} {row['self_ms']:>9.1f} {row['cumulative_ms']:>9.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs, 'median_ms': median, 'budget_ms': args.budget_ms,
+                       'imports': imports}, f, ensure_ascii=False, indent=2)
+
+    if median > args.budget_ms:
+        print(f"❌ 시작 시간 {median:.1f}ms > 예산 {args.budget_ms:.0f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
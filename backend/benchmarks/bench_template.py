@@ -0,0 +1,142 @@
+"""
+자동변환 템플릿 렌더링 벤치마크
+
+컴파일된 템플릿 렌더링이 붙여넣기 경로(AutoTextWatcher._expand)에
+추가하는 지연 시간을 정적 본문과 비교하여 측정합니다.
+매 확장마다 다시 파싱하는 방식과도 비교합니다.
+
+사용 예:
+    python -m backend.benchmarks.bench_template
+    python -m backend.benchmarks.bench_template --iterations 200000 --max-overhead-us 20
+"""
+import argparse
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.benchmarks.fakes import install_fake_backends
+
+fake_keyboard, fake_clipboard = install_fake_backends()
+
+from backend.services.autotext_watcher import AutoTextWatcher  # noqa: E402
+from backend.services.template import compile_template  # noqa: E402
+
+STATIC_TEXT = (
+    "다음 코드를 리뷰해주세요. 버그, 성능 문제, 가독성 문제를 찾아 "
+    "우선순위대로 정리하고 각 항목마다 수정 예시를 포함해주세요.\n" * 8
+)
+TEMPLATE_TEXT = (
+    "작성일: {date} {time}\n"
+    + "다음 코드를 리뷰해주세요:\n{clipboard}\n\n"
+    + "버그, 성능 문제, 가독성 문제를 우선순위대로 정리하고 각 항목마다 수정 예시를 포함해주세요.\n" * 6
+    + "요약: {cursor}\n"
+)
+
+
+def _percentiles(samples: array) -> Dict[str, float]:
+    """나노초 샘플의 백분위수를 마이크로초로 반환"""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+
+    def pick(pct: float) -> float:
+        return round(ordered[min(last, int(round(pct / 100 * last)))] / 1000, 3)
+
+    return {'p50_us': pick(50), 'p95_us': pick(95), 'p99_us': pick(99)}
+
+
+def _time_calls(func: Callable[[], object], iterations: int) -> array:
+    """함수를 반복 호출하며 호출별 소요 시간(ns)을 기록"""
+    samples = array('q')
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(iterations):
+        t0 = perf_counter_ns()
+        func()
+        samples.append(perf_counter_ns() - t0)
+    return samples
+
+
+def run_benchmark(iterations: int) -> List[Dict]:
+    """
+    렌더링 및 붙여넣기 경로 측정
+
+    Args:
+        iterations: 케이스별 반복 횟수
+
+    Returns:
+        List[Dict]: 케이스별 측정 결과
+    """
+    clipboard_sample = "def add(a, b):\n    return a + b\n"
+    fake_clipboard.value = clipboard_sample
+    clipboard = fake_clipboard.paste
+
+    static_template = compile_template(STATIC_TEXT)
+    dynamic_template = compile_template(TEMPLATE_TEXT)
+
+    watcher = AutoTextWatcher(api_url="http://bench.invalid")
+    watcher.paste_delay = 0
+
+    def expand(template):
+        # 붙여넣기 경로가 클립보드를 덮어쓰므로 매번 원래 내용으로 되돌림
+        fake_clipboard.value = clipboard_sample
+        watcher._expand('@review', template)
+
+    cases = [
+        ('render:static', lambda: static_template.render(clipboard=clipboard)),
+        ('render:compiled', lambda: dynamic_template.render(clipboard=clipboard)),
+        ('render:reparse-each-time', lambda: compile_template(TEMPLATE_TEXT).render(clipboard=clipboard)),
+        ('expand:static', lambda: expand(static_template)),
+        ('expand:compiled', lambda: expand(dynamic_template)),
+    ]
+
+    results = []
+    for name, func in cases:
+        # 워밍업
+        for _ in range(min(1000, iterations)):
+            func()
+        stats = _percentiles(_time_calls(func, iterations))
+        results.append({'case': name, 'iterations': iterations, **stats})
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="자동변환 템플릿 렌더링 벤치마크")
+    parser.add_argument('--iterations', type=int, default=100000, help="케이스별 반복 횟수")
+    parser.add_argument('--json', dest='json_path', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--max-overhead-us', type=float, default=50.0,
+                        help="정적 본문 대비 허용 p50 추가 지연 (마이크로초, 초과 시 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.iterations)
+    by_case = {r['case']: r for r in results}
+
+    print(f"{'case':<28} {'p50us':>9} {'p95us':>9} {'p99us':>9}")
+    print('-' * 58)
+    for r in results:
+        print(f"{r['case']:<28} {r['p50_us']:>9.3f} {r['p95_us']:>9.3f} {r['p99_us']:>9.3f}")
+
+    # 붙여넣기 경로의 p99는 스케줄링 지터가 크므로 중앙값 차이로 추가 지연을 판단
+    overhead = by_case['expand:compiled']['p50_us'] - by_case['expand:static']['p50_us']
+    # 실제 붙여넣기 경로에는 클립보드 대기 시간(기본 0.1초)이 포함됨
+    paste_delay_us = AutoTextWatcher().paste_delay * 1_000_000
+    print()
+    print(f"템플릿 렌더링 추가 지연 (p50): {overhead:.3f}us "
+          f"(클립보드 대기 {paste_delay_us:.0f}us 대비 {overhead / paste_delay_us * 100:.4f}%)")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'overhead_p50_us': overhead}, f, ensure_ascii=False, indent=2)
+
+    if overhead > args.max_overhead_us:
+        print(f"❌ 렌더링 추가 지연 {overhead:.3f}us > {args.max_overhead_us}us")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
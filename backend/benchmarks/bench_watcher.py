@@ -0,0 +1,301 @@
+"""
+AutoTextWatcher 키 입력 재생 벤치마크
+
+가짜 keyboard/pyperclip 백엔드로 AutoTextWatcher.on_key를 직접 구동하여
+이벤트당 매칭 지연 시간 백분위수, 초당 확장 횟수, 메모리 사용량을 측정합니다.
+실제 키보드 후크가 필요 없으므로 헤드리스 Linux에서도 실행됩니다.
+
+사용 예:
+    python -m backend.benchmarks.bench_watcher
+    python -m backend.benchmarks.bench_watcher --sizes 10,1000,100000 --keys 1000000
+    python -m backend.benchmarks.bench_watcher --events recorded.jsonl --max-p99-us 50
+"""
+import argparse
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.benchmarks.fakes import FakeKeyEvent, install_fake_backends
+
+fake_keyboard, fake_clipboard = install_fake_backends()
+
+from backend.services.autotext_watcher import AutoTextWatcher  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_KEYS = 1_000_000
+
+
+def generate_triggers(count: int, rng: random.Random) -> List[str]:
+    """
+    중복 없는 트리거 목록 생성
+
+    Args:
+        count: 트리거 개수
+        rng: 난수 생성기
+
+    Returns:
+        List[str]: '@'로 시작하는 트리거 목록
+    """
+    triggers = set()
+    while len(triggers) < count:
+        length = rng.randint(3, 12)
+        triggers.add('@' + ''.join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(triggers)
+
+
+def build_watcher(triggers: List[str], rng: random.Random,
+                  cache_max_bytes: int = 1024 * 1024) -> AutoTextWatcher:
+    """
+    가짜 본문 로더를 사용하는 AutoTextWatcher 생성
+
+    Args:
+        triggers: 트리거 목록
+        rng: 난수 생성기
+        cache_max_bytes: 본문 캐시 크기
+
+    Returns:
+        AutoTextWatcher: 실행 상태로 설정된 watcher (키보드 후크는 등록하지 않음)
+    """
+    bodies = [''.join(rng.choices(string.ascii_letters + ' ', k=rng.randint(200, 2000)))
+              for _ in range(64)]
+
+    watcher = AutoTextWatcher(api_url="http://bench.invalid", cache_max_bytes=cache_max_bytes,
+                              text_loader=lambda prompt_id: bodies[hash(prompt_id) % len(bodies)])
+    watcher.paste_delay = 0
+    watcher.running = True
+    watcher.set_triggers({trigger: (f"p{i}", "v1") for i, trigger in enumerate(triggers)})
+    return watcher
+
+
+def synthetic_events(triggers: List[str], keys: int, rng: random.Random,
+                     trigger_rate: float = 0.005) -> Iterable[FakeKeyEvent]:
+    """
+    합성 키 입력 스트림 생성
+
+    일반 단어 입력 사이에 일정 비율로 트리거, 백스페이스, 엔터가 섞입니다.
+
+    Args:
+        triggers: 삽입할 트리거 목록
+        keys: 생성할 키 이벤트 수
+        rng: 난수 생성기
+        trigger_rate: 단어 대신 트리거를 입력할 확률
+
+    Yields:
+        FakeKeyEvent: 키 이벤트
+    """
+    letters = string.ascii_lowercase
+    produced = 0
+    while produced < keys:
+        roll = rng.random()
+        if roll < trigger_rate and triggers:
+            word = rng.choice(triggers)
+        else:
+            word = ''.join(rng.choices(letters, k=rng.randint(1, 10)))
+
+        for char in word:
+            yield FakeKeyEvent(char)
+            produced += 1
+
+        roll = rng.random()
+        if roll < 0.02:
+            yield FakeKeyEvent('backspace')
+        elif roll < 0.05:
+            yield FakeKeyEvent('enter')
+        else:
+            yield FakeKeyEvent('space')
+        produced += 1
+
+
+def recorded_events(path: str) -> List[FakeKeyEvent]:
+    """
+    기록된 키 입력 스트림 로드
+
+    JSONL 형식으로 한 줄에 {"name": "a", "event_type": "down"} 이벤트 하나씩 기록된 파일을 읽습니다.
+
+    Args:
+        path: JSONL 파일 경로
+
+    Returns:
+        List[FakeKeyEvent]: 키 이벤트 목록
+    """
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            events.append(FakeKeyEvent(data['name'], data.get('event_type', 'down')))
+    return events
+
+
+def percentile(sorted_values: array, pct: float) -> float:
+    """정렬된 값에서 백분위수 조회"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return float(sorted_values[index])
+
+
+def replay(watcher: AutoTextWatcher, events: Iterable[FakeKeyEvent]) -> Tuple[array, array, float]:
+    """
+    키 이벤트를 watcher에 재생하고 이벤트별 처리 시간을 측정합니다.
+
+    Args:
+        watcher: 대상 watcher
+        events: 키 이벤트 스트림
+
+    Returns:
+        Tuple[array, array, float]: (이벤트별 처리 시간(ns), 확장이 일어난 이벤트의 처리 시간(ns), 전체 소요 시간(초))
+    """
+    latencies = array('q')
+    expansion_latencies = array('q')
+    on_key = watcher.on_key
+    perf_counter_ns = time.perf_counter_ns
+
+    started = time.perf_counter()
+    for event in events:
+        copies_before = fake_clipboard.copy_count
+        t0 = perf_counter_ns()
+        on_key(event)
+        elapsed_ns = perf_counter_ns() - t0
+        latencies.append(elapsed_ns)
+        if fake_clipboard.copy_count != copies_before:
+            expansion_latencies.append(elapsed_ns)
+    elapsed = time.perf_counter() - started
+
+    return latencies, expansion_latencies, elapsed
+
+
+def measure_dict_memory(triggers: List[str], rng: random.Random) -> int:
+    """트리거 매핑 구성에 사용된 메모리(바이트) 측정"""
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    watcher = build_watcher(triggers, rng)
+    current = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in current.compare_to(baseline, 'filename'))
+    del watcher
+    return size
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 최대 RSS(바이트) 조회 (지원되지 않으면 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_benchmark(size: int, keys: int, seed: int,
+                  events_path: Optional[str] = None) -> Dict:
+    """
+    트리거 개수 하나에 대한 벤치마크 실행
+
+    Args:
+        size: 트리거 개수
+        keys: 합성 스트림 키 이벤트 수 (events_path 지정 시 무시)
+        seed: 난수 시드
+        events_path: 기록된 키 입력 파일 경로 (선택사항)
+
+    Returns:
+        Dict: 측정 결과
+    """
+    rng = random.Random(seed)
+    triggers = generate_triggers(size, rng)
+    dict_memory = measure_dict_memory(triggers, random.Random(seed))
+    watcher = build_watcher(triggers, rng)
+
+    if events_path:
+        events = recorded_events(events_path)
+    else:
+        events = synthetic_events(triggers, keys, rng)
+
+    latencies, expansion_latencies, elapsed = replay(watcher, events)
+    sorted_latencies = array('q', sorted(latencies))
+    sorted_expansions = array('q', sorted(expansion_latencies))
+    expansions = len(expansion_latencies)
+
+    return {
+        'triggers': size,
+        'events': len(latencies),
+        'expansions': expansions,
+        'elapsed_s': round(elapsed, 3),
+        'events_per_s': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'expansions_per_s': round(expansions / elapsed, 1) if elapsed else 0.0,
+        'p50_us': round(percentile(sorted_latencies, 50) / 1000, 2),
+        'p95_us': round(percentile(sorted_latencies, 95) / 1000, 2),
+        'p99_us': round(percentile(sorted_latencies, 99) / 1000, 2),
+        'max_us': round(sorted_latencies[-1] / 1000, 2) if sorted_latencies else 0.0,
+        'expand_p50_us': round(percentile(sorted_expansions, 50) / 1000, 2),
+        'expand_p99_us': round(percentile(sorted_expansions, 99) / 1000, 2),
+        'dict_memory_bytes': dict_memory,
+        'cache_bytes': watcher.text_cache.current_bytes,
+        'peak_rss_bytes': peak_rss_bytes(),
+    }
+
+
+def print_results(results: List[Dict]):
+    """측정 결과를 표 형식으로 출력"""
+    header = (f"{'triggers':>9} {'events':>9} {'expand':>7} {'ev/s':>11} {'exp/s':>9} "
+              f"{'p50us':>7} {'p95us':>7} {'p99us':>7} {'maxus':>9} {'xp50us':>7} {'xp99us':>7} "
+              f"{'dictKB':>9} {'rssMB':>7}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        rss = f"{r['peak_rss_bytes'] / 1024 / 1024:.1f}" if r['peak_rss_bytes'] else '-'
+        print(f"{r['triggers']:>9} {r['events']:>9} {r['expansions']:>7} {r['events_per_s']:>11.0f} "
+              f"{r['expansions_per_s']:>9.0f} {r['p50_us']:>7.2f} {r['p95_us']:>7.2f} {r['p99_us']:>7.2f} "
+              f"{r['max_us']:>9.1f} {r['expand_p50_us']:>7.2f} {r['expand_p99_us']:>7.2f} "
+              f"{r['dict_memory_bytes'] / 1024:>9.1f} {rss:>7}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AutoTextWatcher 키 입력 재생 벤치마크")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="쉼표로 구분한 트리거 개수 목록")
+    parser.add_argument('--keys', type=int, default=DEFAULT_KEYS, help="합성 스트림 키 이벤트 수")
+    parser.add_argument('--events', help="기록된 키 입력 JSONL 파일 (합성 스트림 대신 사용)")
+    parser.add_argument('--seed', type=int, default=42, help="난수 시드")
+    parser.add_argument('--json', dest='json_path', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--max-p99-us', type=float,
+                        help="p99 지연 시간 상한 (마이크로초, 초과 시 종료 코드 1)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = []
+    for size in sizes:
+        print(f"[BENCH] 트리거 {size}개 측정 중...")
+        results.append(run_benchmark(size, args.keys, args.seed, args.events))
+
+    print()
+    print_results(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.max_p99_us is not None:
+        slow = [r for r in results if r['p99_us'] > args.max_p99_us]
+        if slow:
+            for r in slow:
+                print(f"❌ p99 {r['p99_us']}us > {args.max_p99_us}us (트리거 {r['triggers']}개)")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+벤치마크용 가짜 입력/클립보드 백엔드
+
+실제 키보드 후크와 클립보드 없이(헤드리스 Linux 포함) AutoTextWatcher를
+구동할 수 있도록 keyboard, pyperclip 모듈을 대체합니다.
+"""
+import os
+import sys
+import tempfile
+import types
+from typing import List
+
+
+class FakeKeyEvent:
+    """keyboard 이벤트 대체 객체"""
+    __slots__ = ('event_type', 'name')
+
+    def __init__(self, name: str, event_type: str = 'down'):
+        self.name = name
+        self.event_type = event_type
+
+
+class FakeKeyboard(types.ModuleType):
+    """keyboard 모듈 대체 (전송된 키를 세기만 함)"""
+
+    def __init__(self):
+        super().__init__('keyboard')
+        self.sent: List[str] = []
+        self.sent_count = 0
+        self.record = False
+
+    def send(self, hotkey: str):
+        self.sent_count += 1
+        if self.record:
+            self.sent.append(hotkey)
+
+    def hook(self, callback):
+        self.callback = callback
+
+    def wait(self):
+        return None
+
+
+class FakeClipboard(types.ModuleType):
+    """pyperclip 모듈 대체 (메모리에만 보관)"""
+
+    def __init__(self):
+        super().__init__('pyperclip')
+        self.value = ""
+        self.copy_count = 0
+
+    def copy(self, text: str):
+        self.copy_count += 1
+        self.value = text
+
+    def paste(self) -> str:
+        return self.value
+
+
+def install_fake_backends():
+    """
+    keyboard, pyperclip 모듈을 가짜 구현으로 교체합니다.
+
+    AutoTextWatcher 모듈을 import하기 전에 호출해야 하며,
+    이미 import된 경우 모듈 속성도 함께 교체합니다.
+    PPOP_DATA_DIR이 지정되지 않았으면 임시 디렉토리로 지정하여
+    벤치마크 중 기록되는 사용 통계와 trace가 실제 데이터 디렉토리에 섞이지 않도록 합니다.
+
+    Returns:
+        tuple: (FakeKeyboard, FakeClipboard)
+    """
+    os.environ.setdefault('PPOP_DATA_DIR', tempfile.mkdtemp(prefix='ppop_bench_'))
+
+    fake_keyboard = FakeKeyboard()
+    fake_clipboard = FakeClipboard()
+    sys.modules['keyboard'] = fake_keyboard
+    sys.modules['pyperclip'] = fake_clipboard
+
+    watcher_module = sys.modules.get('backend.services.autotext_watcher')
+    if watcher_module is not None:
+        watcher_module.keyboard = fake_keyboard
+        watcher_module.pyperclip = fake_clipboard
+
+    return fake_keyboard, fake_clipboard
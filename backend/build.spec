@@ -26,11 +26,35 @@ a = Analysis(
         'uvicorn.protocols.websockets.auto',
         'uvicorn.lifespan',
         'uvicorn.lifespan.on',
+        'uvicorn.supervisors.multiprocess',
         'backend.routers.prompts',
         'backend.routers.folders',
         'backend.routers.autotext',
+        'backend.routers.changes',
+        'backend.routers.metrics',
+        'backend.routers.debug',
         'backend.storage',
+        'backend.migrations',
+        'backend.records',
+        'backend.indexes',
+        'backend.minhash',
+        'backend.tfidf',
+        'backend.suggest',
+        'backend.triggers',
+        'backend.markdown_source',
+        'backend.changelog',
         'backend.services.autotext_watcher',
+        'backend.services.metrics',
+        'backend.services.startup_timing',
+        'backend.services.readiness',
+        'backend.services.response_cache',
+        'backend.services.profiler',
+        'backend.services.tracing',
+        'backend.services.template',
+        'backend.services.usage_stats',
+        'backend.services.text_cache',
+        'backend.services.file_lock',
+        'backend.services.watcher_ipc',
     ],
     hookspath=[],
     hooksconfig={},
@@ -42,6 +66,7 @@ a = Analysis(
         'tzdata',         # 타임존 데이터 (SQLite 기본 포함)
         'PyQt6',          # PyQt6 (사용 안 함)
         'sqlalchemy',     # SQLAlchemy (사용 안 함)
+        'tkinter',        # GUI 툴킷 (사용 안 함, 압축 해제 크기 감소)
     ],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
@@ -62,7 +87,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,  # UPX 압축은 실행할 때마다 압축 해제 비용이 들어 시작 시간이 늘어남
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,  # 콘솔 윈도우 표시 (디버깅용, False로 변경 가능)
@@ -0,0 +1,265 @@
+"""
+변경 로그 모듈
+
+저장소의 모든 수정(프롬프트/폴더 생성·수정·삭제)에 전역 순번(seq)을 붙여 기록합니다.
+클라이언트는 마지막으로 받은 seq 이후의 변경만 받아(GET /api/changes?since=<seq>)
+로컬 복제본을 갱신할 수 있습니다.
+
+- 항목: {'seq', 'kind': 'prompt'|'folder', 'id', 'op': 'upsert'|'delete'}
+- 보관 개수는 CHANGES_MAX_ENTRIES로 제한하며, 밀려난 구간을 요청하면 전체 재동기화가 필요합니다.
+- 일괄 교체(마이그레이션)나 외부 수정처럼 개별 변경을 알 수 없는 경우 'reset' 항목을 기록하여
+  그 이전 seq를 가진 클라이언트가 모두 재동기화하도록 합니다.
+- 재시작 후에도 seq가 이어지도록 DATA_DIR/changes.jsonl에 추가 기록하고,
+  파일이 보관 개수의 두 배를 넘으면 보관 중인 항목만 남기고 다시 씁니다.
+- 여러 워커 프로세스가 같은 파일을 공유합니다. 기록은 storage의 프로세스 간 잠금 안에서만 하며,
+  다른 프로세스가 추가한 줄은 파일 크기가 바뀌었을 때 이어서 읽습니다.
+- 각 항목에는 그 수정으로 기록된 데이터 파일의 서명(수정 시각, 크기)을 함께 남겨,
+  storage가 파일 변경이 다른 워커의 수정인지 외부 수정인지 구분할 수 있게 합니다.
+"""
+import json
+import os
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+from backend.config import config
+
+FileSignature = Optional[Tuple[int, int]]
+
+CHANGE_SEQ_HEADER = "X-Change-Seq"
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+RESET = 'reset'
+
+# (seq, kind, id, op)
+Entry = Tuple[int, Optional[str], object, str]
+
+
+class ChangeLog:
+    """
+    전역 순번 변경 로그
+
+    기록은 storage의 쓰기 잠금(프로세스 간) 안에서 호출되므로 seq 순서가 파일 쓰기 순서와 같습니다.
+    """
+
+    def __init__(self, file_path_getter: Callable[[], str], max_entries: int = 10000):
+        """
+        ChangeLog 초기화
+
+        Args:
+            file_path_getter: 로그 파일 경로를 반환하는 함수 (테스트/벤치마크에서 경로가 바뀔 수 있음)
+            max_entries: 보관할 최대 항목 수
+        """
+        self._file_path = file_path_getter
+        self.max_entries = max_entries
+        self._entries: Deque[Entry] = deque()
+        self._seq = 0
+        self._reset_seq = 0
+        self._file_lines = 0
+        self._loaded_path: Optional[str] = None
+        self._file_id: Optional[Tuple[int, int]] = None  # (st_dev, st_ino) - 다시 쓰면 바뀜
+        self._offset = 0  # 읽은 바이트 수
+        self._file_signatures: Dict[str, FileSignature] = {}  # {데이터 파일: 마지막으로 기록된 서명}
+        self._pending_files: Dict[str, FileSignature] = {}  # 다음 항목에 붙일 데이터 파일 서명
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        """다른 프로세스가 추가한 항목까지 읽기 (처음이거나 파일이 다시 쓰였으면 전체를 다시 읽음)"""
+        file_path = self._file_path()
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            stat = None
+
+        if file_path != self._loaded_path or stat is None or (stat.st_dev, stat.st_ino) != self._file_id \
+                or stat.st_size < self._offset:
+            self._entries = deque()
+            self._seq = self._reset_seq = self._file_lines = self._offset = 0
+            self._file_signatures = {}
+            self._loaded_path = file_path
+            self._file_id = (stat.st_dev, stat.st_ino) if stat else None
+        if stat is None or stat.st_size == self._offset:
+            return
+
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            return
+        # 다른 프로세스가 쓰는 중인 마지막 줄은 완성된 뒤에 읽음
+        complete = data[:data.rfind(b'\n') + 1]
+        self._offset += len(complete)
+        for line in complete.splitlines():
+            self._file_lines += 1
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue  # 기록 중 중단된 줄 등은 건너뜀
+            if not isinstance(item, dict):
+                continue
+            self._apply_files(item.get('files'))
+            if 'seq' in item:
+                self._add_entry((int(item['seq']), item.get('kind'), item.get('id'), item.get('op')))
+
+    def _apply_files(self, files: Optional[Dict]):
+        if files:
+            for name, signature in files.items():
+                self._file_signatures[name] = tuple(signature) if signature else None
+
+    def _add_entry(self, entry: Entry):
+        self._entries.append(entry)
+        self._seq = max(self._seq, entry[0])
+        if entry[3] == RESET:
+            self._reset_seq = entry[0]
+        while len(self._entries) > self.max_entries:
+            self._entries.popleft()
+
+    def _data_file_name(self, file_path: str) -> str:
+        """데이터 파일 이름 (DATA_DIR 기준 상대 경로)"""
+        return os.path.relpath(file_path, os.path.dirname(self._file_path())).replace(os.sep, '/')
+
+    def note_write(self, file_path: str, signature: FileSignature):
+        """
+        이번 수정에서 기록한 데이터 파일 서명 등록 (다음 record/reset 항목에 함께 기록)
+
+        Args:
+            file_path: 데이터 파일 경로
+            signature: 기록 후 파일 서명 (삭제했으면 None)
+        """
+        with self._lock:
+            self._pending_files[self._data_file_name(file_path)] = signature
+
+    def is_logged_signature(self, file_path: str, signature: FileSignature) -> bool:
+        """
+        파일의 현재 서명이 변경 로그에 기록된 마지막 서명과 같은지 여부
+
+        같으면 이 앱의 (다른 워커를 포함한) 수정이고, 다르면 외부에서 수정된 것입니다.
+
+        Args:
+            file_path: 데이터 파일 경로
+            signature: 현재 파일 서명
+
+        Returns:
+            bool: 기록된 서명과 같으면 True
+        """
+        with self._lock:
+            self._ensure_loaded()
+            name = self._data_file_name(file_path)
+            return name in self._file_signatures and self._file_signatures[name] == signature
+
+    def current_seq(self) -> int:
+        """
+        마지막으로 부여한 seq
+
+        Returns:
+            int: 현재 seq (기록이 없으면 0)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return self._seq
+
+    def record(self, kind: str, record_id, op: str) -> int:
+        """
+        변경 기록
+
+        Args:
+            kind: 'prompt' 또는 'folder'
+            record_id: 프롬프트/폴더 ID
+            op: UPSERT 또는 DELETE
+
+        Returns:
+            int: 부여한 seq
+        """
+        return self._append(kind, record_id, op)
+
+    def reset(self) -> int:
+        """
+        이전 seq를 가진 클라이언트가 모두 재동기화하도록 표시
+
+        Returns:
+            int: 부여한 seq
+        """
+        return self._append(None, None, RESET)
+
+    def _append(self, kind: Optional[str], record_id, op: str) -> int:
+        with self._lock:
+            # 다른 워커가 부여한 seq 다음 번호를 쓰도록 먼저 따라잡음
+            self._ensure_loaded()
+            files, self._pending_files = self._pending_files, {}
+            self._apply_files(files)
+            entry = (self._seq + 1, kind, record_id, op)
+            self._add_entry(entry)
+            self._persist(entry, files)
+            return self._seq
+
+    def _persist(self, entry: Entry, files: Dict[str, FileSignature]):
+        """파일에 한 줄 추가 (파일이 너무 커지면 보관 중인 항목만 남김)"""
+        file_path = self._loaded_path
+        try:
+            if self._file_lines >= self.max_entries * 2:
+                # 밀려나는 항목의 파일 서명을 잃지 않도록 첫 줄에 전체 서명을 기록
+                content = json.dumps({'files': self._file_signatures}, ensure_ascii=False,
+                                     separators=(',', ':')) + '\n'
+                content += ''.join(self._format(item) for item in self._entries)
+                temp_path = f"{file_path}.tmp"
+                with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(content)
+                os.replace(temp_path, file_path)
+                stat = os.stat(file_path)
+                self._file_id = (stat.st_dev, stat.st_ino)
+                self._file_lines = len(self._entries) + 1
+                self._offset = stat.st_size
+            else:
+                line = self._format(entry, files).encode('utf-8')
+                with open(file_path, 'ab') as f:
+                    f.write(line)
+                if self._file_id is None:
+                    stat = os.stat(file_path)
+                    self._file_id = (stat.st_dev, stat.st_ino)
+                self._file_lines += 1
+                self._offset += len(line)
+        except Exception as e:
+            print(f"Error writing {file_path}: {e}")
+
+    @staticmethod
+    def _format(entry: Entry, files: Optional[Dict[str, FileSignature]] = None) -> str:
+        seq, kind, record_id, op = entry
+        item = {'seq': seq, 'kind': kind, 'id': record_id, 'op': op}
+        if files:
+            item['files'] = files
+        return json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def changes_since(self, since: int) -> Tuple[int, Optional[Dict[Tuple[str, object], str]]]:
+        """
+        since 이후 변경 조회
+
+        같은 레코드가 여러 번 바뀌었으면 마지막 변경만 반환합니다.
+
+        Args:
+            since: 클라이언트가 마지막으로 받은 seq
+
+        Returns:
+            Tuple[int, Optional[Dict]]: (현재 seq, {(kind, id): op}),
+                since가 보관 범위보다 오래되었거나 재설정 이전이면 변경 대신 None (재동기화 필요)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            # 이 seq 이후의 변경은 모두 보관 중
+            complete_after = self._entries[0][0] - 1 if self._entries else self._seq
+            if since < max(complete_after, self._reset_seq) or since > self._seq:
+                return self._seq, None
+
+            changes: Dict[Tuple[str, object], str] = {}
+            # 최근 변경부터 거슬러 올라가며 레코드별 첫 항목(= 마지막 변경)만 사용
+            for seq, kind, record_id, op in reversed(self._entries):
+                if seq <= since:
+                    break
+                if op != RESET:
+                    changes.setdefault((kind, record_id), op)
+            return self._seq, changes
+
+
+# 전역 변경 로그 인스턴스
+changelog = ChangeLog(lambda: config.CHANGES_FILE, max_entries=config.CHANGES_MAX_ENTRIES)
@@ -11,18 +11,37 @@ def get_data_dir():
     """
     APPDATA 폴더 경로 반환
     
+    PPOP_DATA_DIR 환경 변수가 있으면 해당 경로를 사용합니다. (테스트/벤치마크용)
+    경로 계산만 하며 디렉토리는 생성하지 않습니다. (ensure_data_dir 참고)
+    
     Returns:
         str: APPDATA/ppop_promt 경로
     """
+    override = os.getenv('PPOP_DATA_DIR')
+    if override:
+        return override
+    
     if os.name == 'nt':  # Windows
         appdata_dir = os.path.join(os.environ.get('APPDATA', ''), 'ppop_promt')
     else:  # macOS, Linux
         appdata_dir = os.path.join(os.path.expanduser('~'), '.ppop_promt')
     
-    os.makedirs(appdata_dir, exist_ok=True)
     return appdata_dir
 
 
+def ensure_data_dir() -> str:
+    """
+    데이터 디렉토리 생성
+    
+    config import 시점이 아니라 서버 시작 시 호출됩니다.
+    
+    Returns:
+        str: 데이터 디렉토리 경로
+    """
+    os.makedirs(config.DATA_DIR, exist_ok=True)
+    return config.DATA_DIR
+
+
 class BaseConfig:
     """기본 설정 클래스"""
     
@@ -33,8 +52,51 @@ class BaseConfig:
     
     # 데이터 파일 경로
     DATA_DIR: str = get_data_dir()
-    PROMPTS_FILE: str = os.path.join(DATA_DIR, 'prompts.json')
+    PROMPTS_FILE: str = os.path.join(DATA_DIR, 'prompts.json')  # 샤드 도입 전 형식 (마이그레이션 원본)
+    PROMPTS_DIR: str = os.path.join(DATA_DIR, 'prompts')  # 폴더별 프롬프트 샤드
+    PROMPTS_MANIFEST_FILE: str = os.path.join(PROMPTS_DIR, 'manifest.json')
     FOLDERS_FILE: str = os.path.join(DATA_DIR, 'folders.json')
+    SCHEMA_FILE: str = os.path.join(DATA_DIR, 'schema.json')  # 데이터 스키마 버전
+    COUNTERS_FILE: str = os.path.join(DATA_DIR, 'counters.json')  # ID 카운터 (삭제된 ID 재사용 방지)
+    USAGE_STATS_FILE: str = os.path.join(DATA_DIR, 'usage_stats.json')
+    TRACES_FILE: str = os.path.join(DATA_DIR, 'traces.jsonl')
+    CHANGES_FILE: str = os.path.join(DATA_DIR, 'changes.jsonl')  # 변경 로그 (델타 동기화)
+    MINHASH_CACHE_FILE: str = os.path.join(DATA_DIR, 'minhash.npz')  # 유사 프롬프트 서명 캐시
+    METRICS_DIR: str = os.path.join(DATA_DIR, 'metrics')  # 워커별 메트릭 스냅샷
+    PROFILES_DIR: str = os.path.join(DATA_DIR, 'profiles')  # 요청 프로파일 (워커 간 공유)
+    MARKDOWN_STATE_FILE: str = os.path.join(DATA_DIR, 'markdown_state.json')  # 변경 로그에 기록한 Markdown 프롬프트 지문
+    
+    # Markdown 프롬프트 디렉토리 (front-matter의 title/autotext/folder를 읽는 읽기 전용 소스, 비어 있으면 사용 안 함)
+    MARKDOWN_PROMPTS_DIR: str = os.getenv("MARKDOWN_PROMPTS_DIR", "")
+    MARKDOWN_RESCAN_INTERVAL: float = float(os.getenv("MARKDOWN_RESCAN_INTERVAL", "2"))  # 디렉토리 재확인 주기 (초)
+    MARKDOWN_PARSE_WORKERS: int = int(os.getenv("MARKDOWN_PARSE_WORKERS", "0"))  # 병렬 파싱 프로세스 수 (0이면 CPU 수)
+    
+    # uvicorn 워커 프로세스 수 (run.py --workers로도 지정, reload 모드에서는 1)
+    WORKERS: int = int(os.getenv("BACKEND_WORKERS", "1"))
+    
+    # 변경 로그 보관 항목 수 (이보다 오래된 seq로 요청하면 재동기화 필요)
+    CHANGES_MAX_ENTRIES: int = int(os.getenv("CHANGES_MAX_ENTRIES", "10000"))
+    
+    # 사용 통계 기록 주기 (초)
+    USAGE_STATS_FLUSH_INTERVAL: float = float(os.getenv("USAGE_STATS_FLUSH_INTERVAL", "30"))
+    
+    # 자동변환 텍스트 감지 서비스 설정
+    AUTOTEXT_CACHE_MAX_BYTES: int = int(os.getenv("AUTOTEXT_CACHE_MAX_BYTES", str(1024 * 1024)))
+    AUTOTEXT_PREFETCH_COUNT: int = int(os.getenv("AUTOTEXT_PREFETCH_COUNT", "20"))
+    
+    # 워커별 메트릭 스냅샷 기록 주기 (초, /api/metrics에는 다른 워커의 값이 이만큼 늦게 반영됨)
+    METRICS_SHARE_INTERVAL: float = float(os.getenv("METRICS_SHARE_INTERVAL", "10"))
+    
+    # 요청 프로파일러 설정 (PROFILING=true일 때만 활성화)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))  # 무작위 프로파일링 비율
+    PROFILING_INTERVAL: float = float(os.getenv("PROFILING_INTERVAL", "0.001"))  # 스택 샘플링 주기 (초)
+    PROFILING_MAX_PROFILES: int = int(os.getenv("PROFILING_MAX_PROFILES", "50"))  # 보관할 최대 프로파일 수
+    
+    # 추적 설정 (span을 DATA_DIR/traces.jsonl에 기록, TRACING=false로 끌 수 있음)
+    TRACING_ENABLED: bool = os.getenv("TRACING", "true").lower() == "true"
+    TRACING_MAX_BYTES: int = int(os.getenv("TRACING_MAX_BYTES", str(5 * 1024 * 1024)))  # 파일 최대 크기
+    TRACING_BACKUP_COUNT: int = int(os.getenv("TRACING_BACKUP_COUNT", "3"))  # 보관할 이전 파일 수
     
     # CORS 설정
     CORS_ORIGINS: List[str] = [
@@ -0,0 +1,744 @@
+"""
+프롬프트 정렬 인덱스 / 폴더 트리 인덱스 모듈
+
+저장소가 프롬프트 레코드와 함께 유지하는 보조 인덱스입니다.
+정렬 기준(created_at, updated_at, title)마다 (키, ID) 정렬 목록을 두고,
+수정 시에는 바뀐 레코드의 항목만 bisect로 빼고 넣습니다.
+정렬된 목록의 첫 페이지는 인덱스 앞(또는 뒤)부터 필요한 만큼만 읽으므로
+전체를 정렬하지 않고 페이지 크기에 비례하는 비용으로 만들 수 있습니다.
+
+- ID 인덱스: {ID: 레코드} (ID 조회를 샤드 순회 없이 처리)
+- 샤드별 ID 집합: 외부 수정으로 샤드를 다시 읽었을 때의 비교용
+- 폴더별 ID 집합: 폴더 필터용 (샤드가 아닌 읽기 전용 소스의 레코드도 레코드의 folder_id로 포함)
+- 자동변환 텍스트가 있는 ID 집합: has_autotext 필터용
+- 태그 비트맵: 태그별 비트맵(Python 정수)으로 태그 AND/OR/NOT 조건을 집합 연산으로 계산, 태그별 개수 유지
+- 폴더별 집계: 프롬프트 수, 자동변환 텍스트 수, 본문 바이트 합계 (레코드를 넣고 뺄 때 더하고 빼서 유지)
+- 확장 인덱스: register()로 등록한 RecordIndex (예: backend.minhash)도 같은 시점에 갱신
+
+인덱스는 저장소 수정 시 apply()로 갱신하고, 다른 워커나 외부 수정으로 샤드 목록이 바뀐 경우에는
+조회 전에 sync()가 바뀐 샤드만 ID 기준으로 비교해 맞춥니다.
+Markdown 디렉토리(backend.markdown_source) 같은 읽기 전용 소스는 폴더 ID와 겹치지 않는 문자열 키의
+샤드로 sync()에 함께 넘깁니다.
+
+폴더 트리는 materialized path(최상위부터 자기 자신까지의 ID 튜플)를 정렬해 두므로
+하위 트리 전체가 연속된 구간이 되어, 재귀 탐색 없이 bisect 두 번으로 찾고 셀 수 있습니다.
+"""
+import bisect
+import math
+import threading
+from itertools import chain
+from typing import Callable, Collection, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from backend.records import FolderRecord, PromptRecord, timestamp_sort_key
+
+# 샤드 키: 폴더 ID(None은 폴더 없음) 또는 읽기 전용 소스의 문자열 키
+PartKey = Union[int, str, None]
+
+# (정렬 키, ID) - 키가 같으면 ID(생성 시각 기반) 순서
+Entry = Tuple[object, str]
+
+# 제목 접두사 범위의 상한 (접두사로 시작하는 모든 문자열보다 큼)
+_PREFIX_END = '\U0010ffff'
+
+
+class SortedIndex:
+    """
+    (키, ID) 정렬 목록
+
+    삽입/삭제는 bisect로 위치를 찾아 목록을 제자리에서 수정합니다.
+    """
+
+    def __init__(self, key: Callable[[PromptRecord], object]):
+        """
+        SortedIndex 초기화
+
+        Args:
+            key: 레코드의 정렬 키 함수
+        """
+        self.key = key
+        self._entries: List[Entry] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        """전체 항목을 한 번에 정렬해서 다시 만듦 (대량 변경 시 하나씩 넣는 것보다 빠름)"""
+        self._entries = sorted(self.entry(record) for record in records)
+
+    def entry(self, record: PromptRecord) -> Entry:
+        return self.key(record), record.id
+
+    def insert(self, entry: Entry):
+        bisect.insort(self._entries, entry)
+
+    def remove(self, entry: Entry):
+        index = bisect.bisect_left(self._entries, entry)
+        if index < len(self._entries) and self._entries[index] == entry:
+            del self._entries[index]
+
+    def bounds(self, low=None, high=None) -> Tuple[int, int]:
+        """
+        키 범위 [low, high)의 위치
+
+        Args:
+            low: 최소 키 (포함, None이면 처음부터)
+            high: 최대 키 (제외, None이면 끝까지)
+
+        Returns:
+            Tuple[int, int]: (시작 위치, 끝 위치)
+        """
+        # (key,)는 같은 키의 모든 (key, id)보다 작으므로 키 경계로 사용할 수 있음
+        start = 0 if low is None else bisect.bisect_left(self._entries, (low,))
+        stop = len(self._entries) if high is None else bisect.bisect_left(self._entries, (high,))
+        return start, max(start, stop)
+
+    def ids(self, start: int, stop: int, descending: bool = False) -> Iterator[str]:
+        """범위 안의 ID를 순서대로 (descending이면 역순으로) 반환"""
+        entries = self._entries
+        positions = range(stop - 1, start - 1, -1) if descending else range(start, stop)
+        for position in positions:
+            yield entries[position][1]
+
+
+def _title_key(record: PromptRecord) -> str:
+    return (record.title or '').casefold()
+
+
+def _text_bytes(record: PromptRecord) -> int:
+    return len((record.text or '').encode('utf-8'))
+
+
+# 폴더별 집계 항목 순서 (FolderStats 목록의 위치)
+STAT_FIELDS = ('prompt_count', 'autotext_count', 'text_bytes')
+
+
+if hasattr(int, 'bit_count'):
+    def _popcount(bitmap: int) -> int:
+        return bitmap.bit_count()
+else:  # Python 3.9 이하
+    def _popcount(bitmap: int) -> int:
+        return bin(bitmap).count('1')
+
+
+def _set_bits(bitmap: int) -> Iterator[int]:
+    """켜진 비트 위치를 작은 것부터 반환 (문자열 검색은 C에서 처리되므로 비트 수만큼만 반복)"""
+    digits = bin(bitmap)[:1:-1]  # '0b' 제외, 최하위 비트부터
+    position = digits.find('1')
+    while position >= 0:
+        yield position
+        position = digits.find('1', position + 1)
+
+
+class TagBitmaps:
+    """
+    태그별 비트맵 인덱스
+
+    프롬프트마다 정수 슬롯을 배정하고, 태그마다 해당 프롬프트의 슬롯 비트를 켠 Python 정수를 둡니다.
+    "A AND B AND NOT C" 같은 조건은 정수의 &, |, & ~ 연산(워드 단위로 C에서 처리)으로 계산하므로
+    레코드를 순회하지 않습니다. 삭제된 프롬프트의 슬롯은 재사용해 비트맵 길이를 프롬프트 수로 유지합니다.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._bitmaps: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._all = 0  # 모든 프롬프트의 슬롯 (NOT 조건의 전체 집합)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        """전체를 다시 만듦 (태그마다 바이트 배열에 비트를 모은 뒤 한 번에 정수로 변환)"""
+        records = list(records)
+        size = (len(records) + 7) // 8
+        buffers: Dict[str, bytearray] = {}
+        for slot, record in enumerate(records):
+            for tag in record.tags:
+                buffer = buffers.get(tag)
+                if buffer is None:
+                    buffer = buffers[tag] = bytearray(size)
+                buffer[slot >> 3] |= 1 << (slot & 7)
+
+        self._ids = [record.id for record in records]
+        self._slots = {prompt_id: slot for slot, prompt_id in enumerate(self._ids)}
+        self._free = []
+        self._bitmaps = {tag: int.from_bytes(buffer, 'little') for tag, buffer in buffers.items()}
+        self._counts = {tag: _popcount(bitmap) for tag, bitmap in self._bitmaps.items()}
+        self._all = (1 << len(records)) - 1
+
+    def update(self, prompt_id: str, tags: Iterable[str], previous: Iterable[str] = ()):
+        """
+        프롬프트의 태그 반영 (추가/변경, 바뀐 태그의 비트맵만 수정)
+
+        Args:
+            prompt_id: 프롬프트 ID
+            tags: 새 태그
+            previous: 이전 태그 (새 프롬프트면 비어 있음)
+        """
+        slot = self._slots.get(prompt_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self._ids)
+            if slot == len(self._ids):
+                self._ids.append(prompt_id)
+            else:
+                self._ids[slot] = prompt_id
+            self._slots[prompt_id] = slot
+            self._all |= 1 << slot
+
+        bit = 1 << slot
+        old, new = set(previous), set(tags)
+        for tag in old - new:
+            self._clear(tag, bit)
+        for tag in new - old:
+            self._bitmaps[tag] = self._bitmaps.get(tag, 0) | bit
+            self._counts[tag] = self._counts.get(tag, 0) + 1
+
+    def remove(self, prompt_id: str, tags: Iterable[str]):
+        """프롬프트 제거 (슬롯은 다음 추가 때 재사용)"""
+        slot = self._slots.pop(prompt_id, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        for tag in set(tags):
+            self._clear(tag, bit)
+        self._all &= ~bit
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def _clear(self, tag: str, bit: int):
+        bitmap = self._bitmaps.get(tag, 0)
+        if not bitmap & bit:
+            return
+        bitmap &= ~bit
+        if bitmap:
+            self._bitmaps[tag] = bitmap
+            self._counts[tag] -= 1
+        else:
+            del self._bitmaps[tag]
+            del self._counts[tag]
+
+    def match(self, all_of: Collection[str] = (), any_of: Collection[str] = (),
+              none_of: Collection[str] = ()) -> int:
+        """
+        태그 조건에 맞는 프롬프트의 비트맵
+
+        Args:
+            all_of: 모두 있어야 하는 태그
+            any_of: 하나 이상 있어야 하는 태그 (비어 있으면 조건 없음)
+            none_of: 없어야 하는 태그
+
+        Returns:
+            int: 슬롯 비트맵
+        """
+        result = self._all
+        for tag in all_of:
+            result &= self._bitmaps.get(tag, 0)
+        if any_of:
+            union = 0
+            for tag in any_of:
+                union |= self._bitmaps.get(tag, 0)
+            result &= union
+        for tag in none_of:
+            result &= ~self._bitmaps.get(tag, 0)
+        return result
+
+    def ids(self, bitmap: int) -> Iterator[str]:
+        """비트맵의 프롬프트 ID"""
+        ids = self._ids
+        for slot in _set_bits(bitmap):
+            yield ids[slot]
+
+    def counts(self) -> Dict[str, int]:
+        """태그별 프롬프트 수 (갱신 시 함께 유지하므로 복사만 함)"""
+        return dict(self._counts)
+
+
+class RecordIndex:
+    """
+    PromptIndexes에 등록해 함께 갱신되는 확장 인덱스의 기본 클래스
+
+    메서드는 PromptIndexes의 잠금 안에서 호출되므로 오래 걸리는 작업은 조회 시점으로 미룹니다
+    (예: rebuild()에서는 레코드만 보관하고 첫 조회 때 만듦).
+    """
+
+    def put(self, record: PromptRecord, previous: Optional[PromptRecord]):
+        """레코드 추가/교체 (previous는 이전 레코드, 새 레코드면 None)"""
+
+    def discard(self, record: PromptRecord):
+        """레코드 제거"""
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        """전체를 다시 만듦 (대량 변경 시)"""
+
+
+class PromptIndexes:
+    """
+    프롬프트 레코드 인덱스 모음
+
+    조회와 갱신은 내부 잠금으로 직렬화하며, 조회는 결과 페이지 크기만큼만 잠금을 잡습니다.
+    """
+
+    SORT_KEYS: Dict[str, Callable[[PromptRecord], object]] = {
+        'created_at': lambda record: timestamp_sort_key(record.created),
+        'updated_at': lambda record: timestamp_sort_key(record.updated),
+        'title': _title_key,
+    }
+
+    def __init__(self):
+        self._by_id: Dict[str, PromptRecord] = {}
+        self._shard_ids: Dict[PartKey, Set[str]] = {}
+        self._folder_members: Dict[Optional[int], Set[str]] = {}
+        self._with_autotext: Set[str] = set()
+        self._tags = TagBitmaps()
+        # {폴더 ID: [프롬프트 수, 자동변환 텍스트 수, 본문 바이트]}
+        self._folder_stats: Dict[Optional[int], List[int]] = {}
+        self._extensions: List[RecordIndex] = []
+        self._sorted: Dict[str, SortedIndex] = {name: SortedIndex(key) for name, key in self.SORT_KEYS.items()}
+        # 인덱스에 반영된 샤드 목록 (저장소의 목록과 같은 객체면 다시 비교하지 않음)
+        self._parts: Dict[PartKey, List[PromptRecord]] = {}
+        self._lock = threading.RLock()
+
+    # ============== 갱신 ==============
+
+    def _put(self, folder_id: PartKey, record: PromptRecord, incremental: bool = True):
+        """레코드 추가/교체 (정렬 키나 태그가 바뀐 인덱스만 수정, incremental이 아니면 나중에 다시 만듦)"""
+        previous = self._by_id.get(record.id)
+        if incremental:
+            self._tags.update(record.id, record.tags, previous.tags if previous is not None else ())
+            for extension in self._extensions:
+                extension.put(record, previous)
+        for index in self._sorted.values() if incremental else ():
+            entry = index.entry(record)
+            if previous is not None:
+                old_entry = index.entry(previous)
+                if old_entry == entry:
+                    continue
+                index.remove(old_entry)
+            index.insert(entry)
+
+        if record.autotext:
+            self._with_autotext.add(record.id)
+        else:
+            self._with_autotext.discard(record.id)
+
+        if previous is not None:
+            self._count(previous, -1)
+        self._count(record, 1)
+
+        if previous is not None and previous.folder_id != folder_id:
+            self._shard_ids.get(previous.folder_id, set()).discard(record.id)
+        self._shard_ids.setdefault(folder_id, set()).add(record.id)
+        if previous is not None and previous.folder_id != record.folder_id:
+            self._leave_folder(previous)
+        self._folder_members.setdefault(record.folder_id, set()).add(record.id)
+        self._by_id[record.id] = record
+
+    def _discard(self, prompt_id: str, incremental: bool = True):
+        """레코드 제거"""
+        previous = self._by_id.pop(prompt_id, None)
+        if previous is None:
+            return
+        self._count(previous, -1)
+        if incremental:
+            self._tags.remove(prompt_id, previous.tags)
+            for extension in self._extensions:
+                extension.discard(previous)
+        for index in self._sorted.values() if incremental else ():
+            index.remove(index.entry(previous))
+        self._with_autotext.discard(prompt_id)
+        self._leave_folder(previous)
+        for ids in self._shard_ids.values():
+            ids.discard(prompt_id)
+
+    def _leave_folder(self, record: PromptRecord):
+        members = self._folder_members.get(record.folder_id)
+        if members is not None:
+            members.discard(record.id)
+            if not members:
+                del self._folder_members[record.folder_id]
+
+    def _count(self, record: PromptRecord, sign: int):
+        """레코드를 폴더 집계에 더하거나(sign=1) 뺌(sign=-1)"""
+        stats = self._folder_stats.get(record.folder_id)
+        if stats is None:
+            stats = self._folder_stats[record.folder_id] = [0, 0, 0]
+        stats[0] += sign
+        stats[1] += sign if record.autotext else 0
+        stats[2] += sign * _text_bytes(record)
+        if stats[0] <= 0:
+            del self._folder_stats[record.folder_id]
+
+    def register(self, extension: RecordIndex):
+        """
+        확장 인덱스 등록 (현재 레코드로 만든 뒤 이후 수정을 함께 반영)
+
+        Args:
+            extension: 확장 인덱스
+        """
+        with self._lock:
+            extension.rebuild(self._by_id.values())
+            self._extensions.append(extension)
+
+    def apply(self, folder_id: PartKey, records: List[PromptRecord],
+              upserted: Iterable[PromptRecord] = (), deleted: Iterable[str] = ()):
+        """
+        저장소 수정 반영 (바뀐 레코드만 갱신)
+
+        Args:
+            folder_id: 기록한 샤드의 폴더 ID
+            records: 기록한 샤드의 새 레코드 목록
+            upserted: 이 샤드에 추가되거나 수정된 레코드
+            deleted: 삭제된 프롬프트 ID
+        """
+        with self._lock:
+            for prompt_id in deleted:
+                self._discard(prompt_id)
+            for record in upserted:
+                self._put(folder_id, record)
+            self._parts[folder_id] = records
+
+    def sync(self, parts: Dict[PartKey, List[PromptRecord]]):
+        """
+        저장소의 샤드 목록과 인덱스 맞추기
+
+        apply()로 반영되지 않은 샤드(다른 워커나 외부 수정으로 다시 읽은 샤드)만 ID 기준으로 비교합니다.
+        다시 읽은 레코드는 새 객체이지만 정렬 키가 같으면 인덱스 항목은 그대로 둡니다.
+
+        Args:
+            parts: {폴더 ID(또는 읽기 전용 소스 키): 샤드 레코드 목록} (모든 샤드)
+        """
+        with self._lock:
+            stale = [folder_id for folder_id in self._parts if folder_id not in parts]
+            changed = [folder_id for folder_id, records in parts.items() if self._parts.get(folder_id) is not records]
+            if not stale and not changed:
+                return
+
+            # 처음 만들 때처럼 바뀔 레코드가 많으면 정렬/태그 인덱스는 마지막에 한 번에 다시 만듦
+            changed_count = sum(len(parts[folder_id]) for folder_id in changed)
+            bulk = changed_count > max(64, len(self._by_id) // 8)
+
+            candidates: Set[str] = set()
+            for folder_id in stale:
+                candidates |= self._shard_ids.pop(folder_id, set())
+                del self._parts[folder_id]
+            for folder_id in changed:
+                records = parts[folder_id]
+                candidates |= self._shard_ids.get(folder_id, set())
+                for record in records:
+                    if self._by_id.get(record.id) is not record:
+                        self._put(folder_id, record, incremental=not bulk)
+                self._shard_ids[folder_id] = {record.id for record in records}
+                self._parts[folder_id] = records
+
+            # 어느 샤드에도 남아 있지 않은 ID 제거 (다른 샤드로 옮겨진 레코드는 유지)
+            for prompt_id in candidates:
+                if not any(prompt_id in ids for ids in self._shard_ids.values()):
+                    self._discard(prompt_id, incremental=not bulk)
+
+            if bulk:
+                for index in self._sorted.values():
+                    index.rebuild(self._by_id.values())
+                self._tags.rebuild(self._by_id.values())
+                for extension in self._extensions:
+                    extension.rebuild(self._by_id.values())
+
+    # ============== 조회 ==============
+
+    def get(self, prompt_id: str) -> Optional[PromptRecord]:
+        with self._lock:
+            return self._by_id.get(prompt_id)
+
+    def tagged(self, tags_all: Collection[str] = (), tags_any: Collection[str] = (),
+               tags_none: Collection[str] = ()) -> List[PromptRecord]:
+        """
+        태그 조건에 맞는 레코드 (비트맵 연산, 순서 없음)
+
+        Args:
+            tags_all: 모두 있어야 하는 태그
+            tags_any: 하나 이상 있어야 하는 태그
+            tags_none: 없어야 하는 태그
+
+        Returns:
+            List[PromptRecord]: 레코드 목록
+        """
+        with self._lock:
+            bitmap = self._tags.match(tags_all, tags_any, tags_none)
+            return [self._by_id[prompt_id] for prompt_id in self._tags.ids(bitmap)]
+
+    def tag_counts(self) -> Dict[str, int]:
+        """태그별 프롬프트 수"""
+        with self._lock:
+            return self._tags.counts()
+
+    def folder_stats(self) -> Dict[Optional[int], Dict[str, int]]:
+        """
+        폴더별 집계 (프롬프트가 없는 폴더는 포함하지 않음)
+
+        Returns:
+            Dict[Optional[int], Dict[str, int]]: {폴더 ID(None은 폴더 없음): {STAT_FIELDS 항목: 값}}
+        """
+        with self._lock:
+            return {folder_id: dict(zip(STAT_FIELDS, stats)) for folder_id, stats in self._folder_stats.items()}
+
+    def query(self, sort: str, descending: bool = False,
+              folder_ids: Optional[Collection[Optional[int]]] = None,
+              has_autotext: Optional[bool] = None, updated_since: Optional[int] = None,
+              title_prefix: Optional[str] = None, offset: int = 0,
+              limit: Optional[int] = None, tags_all: Collection[str] = (),
+              tags_any: Collection[str] = (), tags_none: Collection[str] = ()) -> List[PromptRecord]:
+        """
+        정렬/필터 조회
+
+        정렬 인덱스를 순서대로 읽으면서 필터를 적용하고 offset + limit개를 채우면 멈춥니다.
+        다른 필터의 후보가 훨씬 적으면(예: 작은 폴더, 좁은 시각 범위) 후보만 모아 정렬합니다.
+
+        Args:
+            sort: 정렬 기준 ('created_at', 'updated_at', 'title')
+            descending: 내림차순 여부
+            folder_ids: 폴더 ID 집합 (None이면 전체)
+            has_autotext: 자동변환 텍스트 유무 (None이면 필터 없음)
+            updated_since: 이 시각(정수) 이후 수정된 것만
+            title_prefix: 제목 접두사 (대소문자 무시)
+            offset: 건너뛸 개수
+            limit: 최대 개수 (None이면 전부)
+            tags_all: 모두 있어야 하는 태그
+            tags_any: 하나 이상 있어야 하는 태그
+            tags_none: 없어야 하는 태그
+
+        Returns:
+            List[PromptRecord]: 결과 레코드 목록
+        """
+        tag_filter = (tags_all, tags_any, tags_none) if tags_all or tags_any or tags_none else None
+        prefix = title_prefix.casefold() if title_prefix else None
+        ranges = {
+            'updated_at': (updated_since, None),
+            'title': (prefix, prefix + _PREFIX_END) if prefix else (None, None),
+        }
+
+        def matches(record: PromptRecord) -> bool:
+            if folder_ids is not None and record.folder_id not in folder_ids:
+                return False
+            if has_autotext is not None and bool(record.autotext) != has_autotext:
+                return False
+            if updated_since is not None and timestamp_sort_key(record.updated) < updated_since:
+                return False
+            if prefix and not _title_key(record).startswith(prefix):
+                return False
+            if tag_filter is not None:
+                tags = record.tags
+                if not all(tag in tags for tag in tags_all) or any(tag in tags for tag in tags_none):
+                    return False
+                if tags_any and not any(tag in tags for tag in tags_any):
+                    return False
+            return True
+
+        with self._lock:
+            index = self._sorted[sort]
+            start, stop = index.bounds(*ranges.get(sort, (None, None)))
+            needed = None if limit is None else offset + limit
+            candidates = self._smallest_candidates(sort, stop - start, needed, folder_ids, has_autotext,
+                                                   ranges, tag_filter)
+
+            if candidates is None:
+                # 정렬 인덱스를 순서대로 읽으며 필요한 개수만 채움
+                result = []
+                for prompt_id in index.ids(start, stop, descending):
+                    record = self._by_id[prompt_id]
+                    if matches(record):
+                        result.append(record)
+                        if needed is not None and len(result) >= needed:
+                            break
+                return result[offset:]
+
+            records = [self._by_id[prompt_id] for prompt_id in candidates if prompt_id in self._by_id]
+            records = [record for record in records if matches(record)]
+            records.sort(key=index.entry, reverse=descending)
+            return records[offset:needed]
+
+    def _smallest_candidates(self, sort: str, walk_size: int, needed: Optional[int],
+                             folder_ids: Optional[Collection[Optional[int]]], has_autotext: Optional[bool],
+                             ranges: Dict[str, Tuple], tag_filter: Optional[Tuple] = None) -> Optional[Iterable[str]]:
+        """
+        정렬 인덱스를 읽는 대신 모아서 정렬할 후보 ID (정렬 인덱스를 읽는 편이 싸면 None)
+
+        필터가 고르게 분포한다고 보고, 인덱스를 읽는 비용(needed / 선택 비율)과
+        후보를 정렬하는 비용(k log k)을 비교합니다.
+        """
+        sources: List[Tuple[int, Callable[[], Iterable[str]]]] = []
+        if folder_ids is not None:
+            shards = [self._folder_members.get(folder_id, set()) for folder_id in folder_ids]
+            sources.append((sum(len(ids) for ids in shards), lambda: chain.from_iterable(shards)))
+        if has_autotext:
+            sources.append((len(self._with_autotext), lambda: self._with_autotext))
+        if tag_filter is not None:
+            bitmap = self._tags.match(*tag_filter)
+            sources.append((_popcount(bitmap), lambda: self._tags.ids(bitmap)))
+        for name, (low, high) in ranges.items():
+            if name != sort and (low is not None or high is not None):
+                other = self._sorted[name]
+                other_start, other_stop = other.bounds(low, high)
+                sources.append((other_stop - other_start,
+                                lambda other=other, a=other_start, b=other_stop: list(other.ids(a, b))))
+        if not sources:
+            return None
+
+        size, collect = min(sources, key=lambda source: source[0])
+        if needed is None:
+            walk_cost = walk_size
+        else:
+            walk_cost = min(walk_size, needed * walk_size / max(size, 1))
+        sort_cost = size * max(1.0, math.log2(size or 1))
+        return collect() if sort_cost < walk_cost else None
+
+
+# 하위 경로 구간의 상한 (같은 접두사의 모든 경로보다 큼)
+_PATH_END = math.inf
+
+# 폴더 경로: 최상위 폴더부터 자기 자신까지의 ID
+Path = Tuple[int, ...]
+
+
+class FolderTree:
+    """
+    폴더 트리의 materialized path 인덱스
+
+    폴더마다 경로를 두고, 모든 경로를 정렬한 목록을 유지합니다.
+    경로가 P인 폴더의 하위 트리는 정렬 목록에서 [P, P + (inf,)) 구간이므로
+    하위 폴더 조회는 O(log n + 하위 폴더 수), 개수는 O(log n)입니다.
+    하위 트리 이동은 구간을 잘라 접두사만 바꿔 새 위치에 다시 넣습니다.
+    """
+
+    def __init__(self):
+        self._paths: Dict[int, Path] = {}
+        self._ordered: List[Path] = []
+        self._source: Optional[List[FolderRecord]] = None
+        self.max_id = 0
+        self._lock = threading.RLock()
+
+    # ============== 갱신 ==============
+
+    def sync(self, folders: List[FolderRecord]):
+        """
+        저장소의 폴더 목록과 인덱스 맞추기 (apply()로 반영한 목록과 다른 객체면 다시 만듦)
+
+        Args:
+            folders: 폴더 레코드 목록
+        """
+        with self._lock:
+            if folders is not self._source:
+                self._rebuild(folders)
+
+    def _rebuild(self, folders: List[FolderRecord]):
+        parents = {folder.id: folder.parent_id for folder in folders if folder.id is not None}
+        paths: Dict[int, Path] = {}
+        for folder_id in parents:
+            # 경로를 아는 조상까지 올라간 뒤 내려오면서 경로 기록 (재귀 없음)
+            chain_ids = []
+            seen = set()
+            node = folder_id
+            while node is not None and node not in paths and node in parents and node not in seen:
+                seen.add(node)
+                chain_ids.append(node)
+                node = parents[node]
+            # 없는 부모나 순환(외부에서 잘못 수정한 경우)은 그 지점을 최상위로 취급
+            base = paths.get(node, ()) if node is not None else ()
+            for node in reversed(chain_ids):
+                base = base + (node,)
+                paths[node] = base
+
+        self._paths = paths
+        self._ordered = sorted(paths.values())
+        self.max_id = max(parents, default=0)
+        self._source = folders
+
+    def apply(self, folders: List[FolderRecord], upserted: Iterable[FolderRecord] = (),
+              deleted: Iterable[int] = ()):
+        """
+        저장소 수정 반영 (추가/이동/삭제된 폴더만 갱신)
+
+        삭제할 폴더의 하위 폴더는 같은 수정에서 다른 부모로 옮겨 upserted에 포함해야 합니다.
+
+        Args:
+            folders: 기록한 새 폴더 목록
+            upserted: 추가되거나 수정된 폴더
+            deleted: 삭제된 폴더 ID
+        """
+        with self._lock:
+            for folder in upserted:
+                parent_path = self._paths.get(folder.parent_id, ()) if folder.parent_id is not None else ()
+                new_path = parent_path + (folder.id,)
+                old_path = self._paths.get(folder.id)
+                if old_path is None:
+                    bisect.insort(self._ordered, new_path)
+                    self._paths[folder.id] = new_path
+                elif old_path != new_path:
+                    self._move(old_path, new_path)
+                self.max_id = max(self.max_id, folder.id)
+            for folder_id in deleted:
+                path = self._paths.pop(folder_id, None)
+                if path is not None:
+                    index = bisect.bisect_left(self._ordered, path)
+                    if index < len(self._ordered) and self._ordered[index] == path:
+                        del self._ordered[index]
+            self._source = folders
+
+    def _move(self, old_path: Path, new_path: Path):
+        """하위 트리 구간의 접두사를 바꿔 새 위치로 옮김"""
+        start, stop = self._bounds(old_path)
+        depth = len(old_path)
+        moved = [new_path + path[depth:] for path in self._ordered[start:stop]]
+        del self._ordered[start:stop]
+        # 하위 트리 안의 상대 순서는 그대로이므로 한 번에 끼워 넣음
+        position = bisect.bisect_left(self._ordered, new_path)
+        self._ordered[position:position] = moved
+        for path in moved:
+            self._paths[path[-1]] = path
+
+    # ============== 조회 ==============
+
+    def _bounds(self, path: Path) -> Tuple[int, int]:
+        return (bisect.bisect_left(self._ordered, path),
+                bisect.bisect_left(self._ordered, path + (_PATH_END,)))
+
+    def path(self, folder_id: int) -> Optional[Path]:
+        """
+        폴더 경로
+
+        Args:
+            folder_id: 폴더 ID
+
+        Returns:
+            Optional[Path]: 최상위부터 자기 자신까지의 ID 튜플 (없는 폴더면 None)
+        """
+        with self._lock:
+            return self._paths.get(folder_id)
+
+    def subtree_ids(self, folder_id: int) -> List[int]:
+        """
+        하위 트리의 폴더 ID (자기 자신 포함, 경로 순서)
+
+        Args:
+            folder_id: 폴더 ID
+
+        Returns:
+            List[int]: 폴더 ID 목록 (없는 폴더면 빈 목록)
+        """
+        with self._lock:
+            path = self._paths.get(folder_id)
+            if path is None:
+                return []
+            start, stop = self._bounds(path)
+            return [entry[-1] for entry in self._ordered[start:stop]]
+
+    def subtree_size(self, folder_id: int) -> int:
+        """하위 트리의 폴더 수 (자기 자신 포함, 없는 폴더면 0)"""
+        with self._lock:
+            path = self._paths.get(folder_id)
+            if path is None:
+                return 0
+            start, stop = self._bounds(path)
+            return stop - start
+
+    def is_within(self, folder_id: int, ancestor_id: int) -> bool:
+        """folder_id가 ancestor_id 자신이거나 그 하위 폴더인지 (O(깊이))"""
+        with self._lock:
+            path = self._paths.get(folder_id)
+            return path is not None and ancestor_id in path
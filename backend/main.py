@@ -5,17 +5,30 @@ FastAPI 애플리케이션 진입점
 JSON 파일 기반으로 동작하며, ppop_promt의 자동변환 텍스트 로직을 통합합니다.
 """
 import os
-import asyncio
-import requests
-from fastapi import FastAPI
+import threading
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from backend.config import config
-from backend.routers import prompts, folders, autotext
-from backend.services.autotext_watcher import start_autotext_watcher
+from backend import migrations, storage
+from backend.config import config, ensure_data_dir
+from backend.routers import prompts, folders, autotext, changes
+from backend.routers import metrics as metrics_router
+from backend.services import metrics, readiness, startup_timing, tracing, watcher_ipc
+from backend.services.usage_stats import usage_stats
 
-# 전역 watcher 인스턴스 (다른 모듈에서 접근 가능하도록)
+# requests, keyboard, pyperclip은 watcher를 시작할 때 import (/health 응답 전 로딩 시간 단축)
+
+# 전역 watcher 인스턴스 (다른 모듈에서 접근 가능하도록, 선출되지 않은 워커에서는 None)
 watcher = None
 
+# 여러 워커 중 watcher를 실행할 프로세스 선출 (잠금을 가진 워커가 종료되면 다른 워커가 이어받음)
+WATCHER_ELECTION_INTERVAL = 5.0
+# watcher 프로세스의 Markdown 디렉토리 재확인 최소 간격 (초, MARKDOWN_RESCAN_INTERVAL이 더 짧아도 이 간격)
+MARKDOWN_POLL_MIN_INTERVAL = 0.5
+_watcher_lock = watcher_ipc.watcher_lock()
+_update_listener = None
+_shutting_down = threading.Event()
+
 def get_watcher():
     """전역 watcher 인스턴스를 반환합니다."""
     return watcher
@@ -38,10 +51,50 @@ app.add_middleware(
     allow_headers=config.CORS_HEADERS,
 )
 
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """라우트별 요청 처리 시간 기록 및 요청 span 생성"""
+    started = time.perf_counter()
+    status = 500
+    # watcher 등 호출 측이 보낸 traceparent를 부모로 이어받음
+    parent = tracing.extract(request.headers.get(tracing.TRACEPARENT_HEADER))
+    with tracing.span('http.server', parent=parent, method=request.method) as span:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # 경로 파라미터가 아닌 라우트 템플릿으로 집계 (예: /api/prompts/{prompt_id})
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=route_path,
+                status=str(status)
+            )
+            if span:
+                span.set_attribute('route', route_path)
+                span.set_attribute('status', status)
+
+
 # 라우터 등록
 app.include_router(prompts.router)
 app.include_router(folders.router)
 app.include_router(autotext.router)
+app.include_router(changes.router)
+app.include_router(metrics_router.router)
+
+# 요청 프로파일러 (PROFILING=true일 때만 등록, 기본적으로 요청 경로에 비용 없음)
+if config.PROFILING_ENABLED:
+    from backend.routers import debug
+    from backend.services.profiler import request_profiler
+    app.middleware("http")(request_profiler)
+    app.include_router(debug.router)
+
+startup_timing.mark("app_import")
 
 
 @app.on_event("startup")
@@ -49,16 +102,19 @@ async def startup_event():
     """애플리케이션 시작 시 데이터 파일 확인 및 자동변환 텍스트 감지 서비스 시작"""
     global watcher
     
-    # JSON 파일 초기화 (없으면 빈 배열로 생성)
-    if not os.path.exists(config.PROMPTS_FILE):
-        import json
-        with open(config.PROMPTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+    # 데이터 디렉토리 생성 (config import 시점에는 파일시스템을 건드리지 않음)
+    ensure_data_dir()
     
-    if not os.path.exists(config.FOLDERS_FILE):
-        import json
-        with open(config.FOLDERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+    # JSON 파일 초기화 (없으면 빈 배열로 생성) 및 스키마 마이그레이션 (필요한 경우 한 번만)
+    migrations.init_data_files()
+    migrations.run_migrations()
+    startup_timing.mark("migrations")
+    
+    # 사용 통계 로드 및 주기적 기록 시작
+    usage_stats.start()
+    
+    # 워커 간 메트릭 공유 시작
+    metrics.publisher.start()
     
     # 환경 변수에서 포트 정보 가져오기 (동적 포트 지원)
     backend_port = os.getenv("BACKEND_PORT", str(config.PORT))
@@ -68,30 +124,58 @@ async def startup_event():
     debug_mode = os.getenv("AUTOTEXT_DEBUG", "false").lower() == "true"
     
     def start_watcher_delayed():
-        """서버 준비를 기다린 후 watcher를 시작하는 함수"""
-        import time
-        global watcher
+        """서버 준비 완료 신호를 기다린 후 watcher를 시작하는 함수"""
+        from backend.services.autotext_watcher import start_autotext_watcher
+        global watcher, _update_listener
         
-        # 서버가 준비될 때까지 대기 (최대 5초)
-        for i in range(5):
-            try:
-                response = requests.get(f"{api_url}/health", timeout=1)
-                if response.status_code == 200:
-                    break
-            except:
-                pass
-            time.sleep(1)
+        # 준비 완료 신호 대기 (폴링 없이 이벤트로 대기, 최대 5초)
+        readiness.wait_until_ready(timeout=5)
         
-        # watcher 시작
+        # 선출될 때까지 대기 (워커 하나만 키보드를 후킹)
+        while not _watcher_lock.acquire(blocking=False):
+            if _shutting_down.wait(WATCHER_ELECTION_INTERVAL):
+                return
+        
+        # watcher 시작이 늦어져도 Markdown 변경은 바로 기록되도록 별도 스레드에서 재확인
+        if config.MARKDOWN_PROMPTS_DIR:
+            threading.Thread(target=poll_markdown, daemon=True).start()
+        
+        # watcher 시작 및 다른 워커의 갱신 알림 수신
         try:
-            watcher = start_autotext_watcher(api_url=api_url, debug=debug_mode)
+            watcher = start_autotext_watcher(
+                api_url=api_url,
+                debug=debug_mode,
+                cache_max_bytes=config.AUTOTEXT_CACHE_MAX_BYTES,
+                prefetch_count=config.AUTOTEXT_PREFETCH_COUNT,
+                text_loader=storage.get_prompt_text  # 같은 프로세스이므로 HTTP 없이 저장소에서 읽음
+            )
+            _update_listener = watcher_ipc.UpdateListener(watcher.trigger_update)
+            _update_listener.start()
         except:
             pass
     
+    def poll_markdown():
+        """
+        Markdown 디렉토리 주기적 재확인 (watcher로 선출된 프로세스에서만)
+        
+        요청이 없어도 파일 변경이 변경 로그와 자동변환 딕셔너리에 반영되도록 합니다.
+        변경을 기록하면 storage가 watcher에 갱신을 알립니다.
+        """
+        interval = max(config.MARKDOWN_RESCAN_INTERVAL, MARKDOWN_POLL_MIN_INTERVAL)
+        while not _shutting_down.wait(interval):
+            try:
+                storage.refresh_markdown()
+            except Exception as e:
+                print(f"Markdown 디렉토리 재확인 실패: {e}")
+    
     # 별도 스레드에서 watcher 시작
-    import threading
     watcher_thread = threading.Thread(target=start_watcher_delayed, daemon=True)
     watcher_thread.start()
+    
+    startup_timing.mark("startup_event")
+    
+    # 리스닝 소켓은 이미 열려 있으므로 startup 이후 바로 요청을 처리할 수 있음
+    readiness.publish_ready(int(backend_port))
 
 
 @app.get("/")
@@ -103,6 +187,11 @@ def root():
 @app.get("/health")
 def health_check():
     """헬스 체크 엔드포인트"""
+    # 첫 번째 정상 응답 시점 기록
+    if startup_timing.mark_once("first_health"):
+        for item in startup_timing.phases():
+            metrics.STARTUP_PHASE_SECONDS.set(item['seconds'], phase=item['phase'])
+        startup_timing.report_once()
     return {"status": "healthy"}
 
 
@@ -110,6 +199,21 @@ def health_check():
 async def shutdown_event():
     """애플리케이션 종료 시 정리 작업"""
     global watcher
+    _shutting_down.set()
+    if _update_listener:
+        _update_listener.stop()
     if watcher:
         watcher.stop()
         print("자동변환 텍스트 감지 서비스 종료 완료")
+    _watcher_lock.release()
+    
+    # 남은 사용 통계 기록
+    usage_stats.stop()
+    
+    # 이 워커의 메트릭 스냅샷 삭제
+    metrics.publisher.stop()
+    
+    # 남은 span 기록
+    tracing.exporter.stop()
+    
+    readiness.clear_ready()
@@ -0,0 +1,344 @@
+"""
+Markdown 디렉토리 프롬프트 소스 모듈
+
+설정한 디렉토리(하위 디렉토리 포함, 숨김 디렉토리 제외)의 .md 파일을 읽기 전용 프롬프트로 제공합니다.
+파일 앞의 front-matter(--- 줄 사이의 `키: 값`)에서 title, autotext, folder를 읽고 나머지를 본문으로 사용합니다.
+
+    ---
+    title: 회의록 요약
+    autotext: "@meeting"
+    folder: 업무/회의
+    ---
+    다음 회의록을 요약해줘.
+
+- title이 없으면 파일 이름, folder는 폴더 ID, 이름 또는 '상위/하위' 경로 (없는 폴더면 폴더 없음)
+- 프롬프트 ID는 디렉토리 기준 상대 경로의 해시 (파일 내용을 고쳐도 같은 ID, ID_PREFIX로 시작)
+- 처음 읽을 때 파일이 많으면 프로세스 풀에서 병렬로 읽고 파싱
+- 이후에는 rescan_interval마다 디렉토리를 훑어 수정 시각/크기가 바뀐 파일만 다시 읽고,
+  내용 해시까지 같으면 파싱하지 않음
+- 바뀐 것이 없으면 이전과 같은 레코드 목록 객체를 반환 (storage 인덱스가 목록 객체로 변경 여부를 판단)
+- 프롬프트별 지문(내용 해시, 폴더 ID, 수정 시각)을 제공하여 storage가 변경 로그에 이미 기록한 상태와
+  비교할 수 있음 (재시작 사이의 변경 감지, 여러 워커가 같은 변경을 중복 기록하지 않도록)
+
+파일 읽기/파싱 함수(read_document)는 프로세스 풀에서 실행되므로 storage를 import하지 않습니다.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from backend.records import FolderRecord, PromptRecord, file_timestamp
+
+# storage 인덱스에 넘길 때의 샤드 키 (폴더 ID와 겹치지 않는 문자열)
+MARKDOWN_PART = 'markdown'
+ID_PREFIX = 'md-'
+
+# 다시 읽을 파일이 이보다 많으면 프로세스 풀 사용
+_PARALLEL_MIN_FILES = 64
+# Windows ProcessPoolExecutor의 최대 작업자 수
+_MAX_WORKERS = 61
+
+FileSignature = Tuple[int, int]
+
+# (내용 해시, 폴더 ID, 파일 수정 시각 ns)
+Fingerprint = Tuple[str, Optional[int], int]
+
+
+class MarkdownDocument(NamedTuple):
+    """파싱한 Markdown 파일 (front-matter 값은 없으면 None)"""
+    title: Optional[str]
+    autotext: Optional[str]
+    folder: Optional[str]
+    body: str
+
+
+class MarkdownScan(NamedTuple):
+    """MarkdownSource.load() 결과"""
+    records: List[PromptRecord]  # 전체 레코드 목록
+    upserted: List[PromptRecord]  # 이번에 추가/수정된 레코드 (full이면 전체)
+    deleted: List[str]  # 삭제된 프롬프트 ID
+    full: bool  # 디렉토리를 처음 읽음 (이전에 알던 ID 중 records에 없는 것은 삭제된 것)
+
+
+def parse_front_matter(content: str) -> Tuple[Dict[str, str], str]:
+    """
+    front-matter와 본문 분리
+
+    첫 줄이 ---이고 닫는 줄(--- 또는 ...)이 있을 때만 front-matter로 봅니다.
+    값은 한 줄짜리 `키: 값`만 지원하며, 따옴표로 감싼 값은 따옴표를 벗기고
+    감싸지 않은 값은 ' #' 뒤를 주석으로 버립니다.
+
+    Args:
+        content: 파일 내용
+
+    Returns:
+        Tuple[Dict[str, str], str]: ({소문자 키: 값}, 앞뒤 공백을 뺀 본문)
+    """
+    content = content.lstrip('﻿')
+    lines = content.splitlines(keepends=True)
+    if not lines or lines[0].strip() != '---':
+        return {}, content.strip()
+
+    fields: Dict[str, str] = {}
+    for i in range(1, len(lines)):
+        line = lines[i].strip()
+        if line in ('---', '...'):
+            return fields, ''.join(lines[i + 1:]).strip()
+        if not line or line.startswith('#') or ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        elif ' #' in value:
+            value = value.split(' #', 1)[0].rstrip()
+        fields[key.strip().lower()] = value
+    return {}, content.strip()
+
+
+def read_document(path: str, known_digest: Optional[str] = None) -> Tuple[Optional[str], Optional[MarkdownDocument]]:
+    """
+    파일을 읽어 내용 해시 계산 후 파싱 (프로세스 풀 작업 함수)
+
+    Args:
+        path: 파일 경로
+        known_digest: 이전에 읽은 내용 해시 (같으면 파싱하지 않음)
+
+    Returns:
+        Tuple[Optional[str], Optional[MarkdownDocument]]: (내용 해시, 문서)
+            내용이 같으면 문서가 None, 읽을 수 없으면 둘 다 None
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None, None
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == known_digest:
+        return digest, None
+    fields, body = parse_front_matter(data.decode('utf-8', errors='replace'))
+    return digest, MarkdownDocument(fields.get('title') or None, fields.get('autotext') or None,
+                                    fields.get('folder') or None, body)
+
+
+def prompt_id_for(relative_path: str) -> str:
+    """상대 경로('/' 구분)의 프롬프트 ID"""
+    return ID_PREFIX + hashlib.blake2b(relative_path.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def is_markdown_id(prompt_id: str) -> bool:
+    """Markdown 소스의 프롬프트 ID인지 확인"""
+    return prompt_id.startswith(ID_PREFIX)
+
+
+def _list_files(directory: str) -> Dict[str, Tuple[str, FileSignature]]:
+    """디렉토리의 .md 파일 {상대 경로: (경로, 서명)} (숨김 디렉토리 제외)"""
+    files = {}
+    stack = [directory]
+    while stack:
+        try:
+            entries = list(os.scandir(stack.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.'):
+                        stack.append(entry.path)
+                elif entry.name.lower().endswith('.md') and entry.is_file():
+                    stat = entry.stat()
+                    relative_path = os.path.relpath(entry.path, directory).replace(os.sep, '/')
+                    files[relative_path] = (entry.path, (stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                continue
+    return files
+
+
+def _folder_lookup(folders: List[FolderRecord]) -> Dict[str, int]:
+    """front-matter folder 값 → 폴더 ID (ID 문자열, 이름, '상위/하위' 경로, 이름이 같으면 ID가 작은 폴더)"""
+    by_id = {folder.id: folder for folder in folders if folder.id is not None}
+    lookup: Dict[str, int] = {}
+    for folder_id in sorted(by_id):
+        names = []
+        node: Optional[FolderRecord] = by_id[folder_id]
+        seen = set()
+        while node is not None and node.id not in seen:
+            seen.add(node.id)
+            names.append(node.name)
+            node = by_id.get(node.parent_id)
+        lookup.setdefault(names[0], folder_id)
+        lookup.setdefault('/'.join(reversed(names)), folder_id)
+    for folder_id in by_id:
+        lookup[str(folder_id)] = folder_id
+    return lookup
+
+
+class _FileState:
+    """파일별로 마지막으로 읽은 상태"""
+    __slots__ = ('signature', 'digest', 'document', 'record')
+
+    def __init__(self):
+        self.signature: Optional[FileSignature] = None
+        self.digest: Optional[str] = None
+        self.document: Optional[MarkdownDocument] = None
+        self.record: Optional[PromptRecord] = None
+
+
+class MarkdownSource:
+    """
+    Markdown 디렉토리의 읽기 전용 프롬프트
+
+    load()는 rescan_interval 안에서는 디렉토리를 다시 훑지 않고 이전 목록을 반환합니다.
+    """
+
+    def __init__(self, directory_getter: Callable[[], str], rescan_interval: float = 2.0, workers: int = 0):
+        # config 경로는 테스트/벤치마크에서 바뀔 수 있으므로 호출 시점에 조회
+        self._directory = directory_getter
+        self._rescan_interval = rescan_interval
+        self._workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._loaded_directory: Optional[str] = None
+        self._scanned_at = 0.0
+        self._files: Dict[str, _FileState] = {}
+        self._paths: Dict[str, str] = {}  # {프롬프트 ID: 상대 경로}
+        self._folders: Optional[List[FolderRecord]] = None
+        self._folder_lookup: Dict[str, int] = {}
+        self._records: List[PromptRecord] = []
+        # 레코드 목록이 바뀔 때마다 증가 (storage 세대 계산용)
+        self.version = 0
+
+    def load(self, folders: List[FolderRecord], force: bool = False) -> MarkdownScan:
+        """
+        레코드 목록 조회 (주기가 지났으면 바뀐 파일만 다시 읽음)
+
+        디렉토리를 처음 읽으면 전체 레코드를 추가된 것으로 보고합니다 (full).
+
+        Args:
+            folders: 폴더 레코드 목록 (front-matter folder 값 해석용, 이전과 다른 목록이면 다시 해석)
+            force: 재확인 주기와 관계없이 디렉토리를 다시 훑음
+
+        Returns:
+            MarkdownScan: 전체 레코드 목록과 이번 변경
+        """
+        with self._lock:
+            directory = self._directory()
+            now = time.monotonic()
+            first = directory != self._loaded_directory
+            scan = first or force or now - self._scanned_at >= self._rescan_interval
+            if not scan and folders is self._folders:
+                return MarkdownScan(self._records, [], [], False)
+
+            deleted: List[str] = []
+            changed: List[str] = []
+            if first:
+                deleted = [state.record.id for state in self._files.values() if state.record is not None]
+                self._files = {}
+                self._paths = {}
+                self._loaded_directory = directory
+            if scan:
+                self._scanned_at = now
+                deleted += self._rescan(directory, changed)
+            if folders is not self._folders:
+                self._folders = folders
+                self._folder_lookup = _folder_lookup(folders)
+
+            upserted = []
+            for relative_path in changed:
+                state = self._files[relative_path]
+                state.record = self._record(relative_path, state)
+                upserted.append(state.record)
+            for relative_path, state in self._files.items():
+                folder_id = self._resolve_folder(state.document.folder)
+                if state.record.folder_id != folder_id:
+                    state.record = self._record(relative_path, state)
+                    upserted.append(state.record)
+
+            if upserted or deleted:
+                self._records = [self._files[relative_path].record for relative_path in sorted(self._files)]
+                self.version += 1
+            if first:
+                return MarkdownScan(self._records, list(self._records), deleted, True)
+            return MarkdownScan(self._records, upserted, deleted, False)
+
+    def fingerprints(self, prompt_ids: Optional[Iterable[str]] = None) -> Dict[str, Fingerprint]:
+        """
+        프롬프트별 지문 (내용이나 폴더가 바뀌면 달라지고, 수정 시각은 워커 간 최신 여부 비교용)
+
+        Args:
+            prompt_ids: 조회할 프롬프트 ID (None이면 전체, 없는 ID는 제외)
+
+        Returns:
+            Dict[str, Fingerprint]: {프롬프트 ID: (내용 해시, 폴더 ID, 수정 시각 ns)}
+        """
+        with self._lock:
+            if prompt_ids is None:
+                paths = self._paths
+            else:
+                paths = {prompt_id: self._paths[prompt_id] for prompt_id in prompt_ids if prompt_id in self._paths}
+            result = {}
+            for prompt_id, relative_path in paths.items():
+                state = self._files[relative_path]
+                result[prompt_id] = (state.digest, state.record.folder_id, state.signature[0])
+            return result
+
+    def _rescan(self, directory: str, changed: List[str]) -> List[str]:
+        """디렉토리를 훑어 서명이 바뀐 파일을 다시 읽음 (내용이 바뀐 파일은 changed에 추가, 삭제된 ID 반환)"""
+        found = _list_files(directory) if directory else {}
+        deleted = []
+        for relative_path in [path for path in self._files if path not in found]:
+            deleted.append(self._forget(relative_path))
+
+        stale = [(relative_path, path, signature) for relative_path, (path, signature) in found.items()
+                 if relative_path not in self._files or self._files[relative_path].signature != signature]
+        known = [self._files[relative_path].digest if relative_path in self._files else None
+                 for relative_path, _, _ in stale]
+        results = self._read_documents([path for _, path, _ in stale], known)
+
+        for (relative_path, _, signature), (digest, document) in zip(stale, results):
+            state = self._files.get(relative_path)
+            if digest is None:
+                # 훑은 뒤 읽기 전에 삭제된 파일
+                if state is not None:
+                    deleted.append(self._forget(relative_path))
+                continue
+            if state is None:
+                state = self._files[relative_path] = _FileState()
+            state.signature = signature
+            if document is not None:
+                state.digest, state.document = digest, document
+                changed.append(relative_path)
+        return deleted
+
+    def _forget(self, relative_path: str) -> str:
+        """삭제된 파일의 상태 제거 (프롬프트 ID 반환)"""
+        prompt_id = self._files.pop(relative_path).record.id
+        self._paths.pop(prompt_id, None)
+        return prompt_id
+
+    def _read_documents(self, paths: List[str], known: List[Optional[str]]) -> List[Tuple]:
+        """파일 여러 개 읽기 (많으면 프로세스 풀에서 병렬로)"""
+        workers = min(self._workers, _MAX_WORKERS)
+        if len(paths) >= _PARALLEL_MIN_FILES and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    chunksize = max(1, len(paths) // (workers * 4))
+                    return list(executor.map(read_document, paths, known, chunksize=chunksize))
+            except (OSError, RuntimeError) as e:
+                # 프로세스를 만들 수 없는 환경이면 순차 처리
+                print(f"Markdown 병렬 파싱 실패, 순차 처리: {e}")
+        return [read_document(path, digest) for path, digest in zip(paths, known)]
+
+    def _resolve_folder(self, folder: Optional[str]) -> Optional[int]:
+        if not folder:
+            return None
+        return self._folder_lookup.get(folder.strip().strip('/'))
+
+    def _record(self, relative_path: str, state: _FileState) -> PromptRecord:
+        document = state.document
+        title = document.title or os.path.splitext(os.path.basename(relative_path))[0]
+        timestamp = file_timestamp(state.signature[0])
+        prompt_id = prompt_id_for(relative_path)
+        self._paths[prompt_id] = relative_path
+        return PromptRecord(prompt_id, title, document.body,
+                            self._resolve_folder(document.folder), document.autotext, timestamp, timestamp)
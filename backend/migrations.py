@@ -0,0 +1,159 @@
+"""
+데이터 스키마 마이그레이션 모듈
+
+저장 파일(프롬프트, folders.json)의 스키마 버전을 DATA_DIR/schema.json에 기록하고,
+서버 시작 시 현재 버전보다 낮으면 필요한 마이그레이션을 한 번만 순서대로 적용합니다.
+이후 읽기 경로는 저장된 레코드를 그대로 반환하며 요청마다 보정하지 않습니다.
+
+새 마이그레이션은 MIGRATIONS 끝에 (버전, 설명, 함수)로 추가합니다.
+함수는 프롬프트/폴더 목록(JSON 형식)을 받아 제자리에서 수정합니다.
+파일 형식(단일 prompts.json 또는 폴더별 샤드)은 러너가 버전에 맞게 읽고, 항상 최신 형식으로 기록합니다.
+여러 워커가 동시에 시작해도 저장소 잠금 안에서 버전을 다시 확인하므로 한 워커만 적용합니다.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+from backend import storage
+from backend.config import config
+from backend.records import FolderRecord
+
+Migration = Tuple[int, str, Callable[[List[Dict], List[Dict]], None]]
+
+
+# ============== 마이그레이션 ==============
+
+def _drop_prompt_type(prompts: List[Dict], folders: List[Dict]):
+    """v1: 이전 버전의 type 필드 제거"""
+    for prompt in prompts:
+        prompt.pop('type', None)
+
+
+def _store_autotexts(prompts: List[Dict], folders: List[Dict]):
+    """v2: 응답 형식의 autotexts 목록을 레코드에 저장 (autotext 필드에서 생성)"""
+    for prompt in prompts:
+        autotext = prompt.get('autotext')
+        prompt['autotexts'] = [{'trigger_text': autotext}] if autotext else []
+
+
+def _split_into_shards(prompts: List[Dict], folders: List[Dict]):
+    """v3: prompts.json을 폴더별 샤드로 분할 (레코드 변경 없음, 러너가 샤드 형식으로 기록)"""
+
+
+MIGRATIONS: List[Migration] = [
+    (1, "프롬프트 type 필드 제거", _drop_prompt_type),
+    (2, "autotexts 목록 저장", _store_autotexts),
+    (3, "폴더별 샤드 파일로 분할", _split_into_shards),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# 이 버전부터 프롬프트를 샤드 형식으로 저장
+SHARDED_VERSION = 3
+
+
+# ============== 버전 관리 ==============
+
+def get_schema_version() -> int:
+    """
+    저장된 스키마 버전 조회
+
+    Returns:
+        int: 스키마 버전 (schema.json이 없으면 0)
+    """
+    try:
+        with open(config.SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            return int(json.load(f).get('version', 0))
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        print(f"Error reading {config.SCHEMA_FILE}: {e}")
+        return 0
+
+
+def _set_schema_version(version: int):
+    """스키마 버전 기록"""
+    temp_path = f"{config.SCHEMA_FILE}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'migrated_at': datetime.now().isoformat()}, f, indent=2)
+    os.replace(temp_path, config.SCHEMA_FILE)
+
+
+def _backup(path: str, version: int):
+    """마이그레이션 전 원본 파일/디렉토리 보관 (예: prompts.json.v0.bak)"""
+    backup_path = f"{path}.v{version}.bak"
+    if os.path.isdir(path):
+        shutil.rmtree(backup_path, ignore_errors=True)
+        shutil.copytree(path, backup_path)
+    elif os.path.exists(path):
+        shutil.copy2(path, backup_path)
+
+
+def run_migrations() -> int:
+    """
+    필요한 마이그레이션 적용
+
+    서버 시작 시 한 번 호출합니다. 파일이 이미 최신 버전이면 아무것도 하지 않습니다.
+    저장 파일보다 앱의 스키마 버전이 낮으면(이전 버전 앱으로 실행) 파일을 건드리지 않습니다.
+
+    Returns:
+        int: 적용한 마이그레이션 수
+    """
+    if get_schema_version() == SCHEMA_VERSION:
+        return 0
+
+    with storage._locked():
+        # 다른 워커가 먼저 적용했을 수 있으므로 잠금 안에서 다시 확인
+        current = get_schema_version()
+        if current > SCHEMA_VERSION:
+            print(f"[WARN] 데이터 스키마 버전({current})이 앱이 지원하는 버전({SCHEMA_VERSION})보다 높습니다.")
+            return 0
+
+        pending = [migration for migration in MIGRATIONS if migration[0] > current]
+        if not pending:
+            return 0
+
+        legacy = current < SHARDED_VERSION
+        if legacy:
+            prompts = storage._read_json_file(config.PROMPTS_FILE)
+        else:
+            prompts = [prompt.to_dict() for prompt in storage.get_prompts()]
+        folders = storage._read_json_file(config.FOLDERS_FILE)
+
+        for version, description, migrate in pending:
+            print(f"[INFO] 데이터 마이그레이션 v{version}: {description}")
+            migrate(prompts, folders)
+
+        _backup(config.PROMPTS_FILE if legacy else config.PROMPTS_DIR, current)
+        _backup(config.FOLDERS_FILE, current)
+        if not (storage._folders.save([FolderRecord.from_dict(folder) for folder in folders])
+                and storage.replace_all_prompts(prompts)):
+            # 버전을 올리지 않으면 다음 시작 시 다시 시도 (마이그레이션은 여러 번 적용해도 결과가 같음)
+            print("[WARN] 마이그레이션 결과를 저장하지 못했습니다.")
+            return 0
+        _set_schema_version(SCHEMA_VERSION)
+
+        # 이전 형식 파일은 백업만 남기고 제거 (외부에서 수정해도 반영되지 않는 파일을 남기지 않음)
+        if legacy and os.path.exists(config.PROMPTS_FILE):
+            os.remove(config.PROMPTS_FILE)
+
+    return len(pending)
+
+
+def init_data_files():
+    """
+    새 데이터 디렉토리 초기화
+
+    folders.json이 없으면 빈 배열로 만들고, 프롬프트 파일이 하나도 없으면(새 설치)
+    빈 샤드를 만든 뒤 마이그레이션할 데이터가 없으므로 바로 최신 스키마 버전을 기록합니다.
+    """
+    with storage._locked():
+        if not os.path.exists(config.FOLDERS_FILE):
+            with open(config.FOLDERS_FILE, 'w', encoding='utf-8') as f:
+                json.dump([], f)
+
+        fresh = not os.path.exists(config.PROMPTS_FILE) and not os.path.exists(config.PROMPTS_MANIFEST_FILE)
+        if fresh and get_schema_version() == 0:
+            storage.replace_all_prompts([])
+            _set_schema_version(SCHEMA_VERSION)
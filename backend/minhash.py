@@ -0,0 +1,485 @@
+"""
+MinHash/LSH 유사 프롬프트 인덱스 모듈
+
+프롬프트 본문을 문자 n-gram(shingle) 집합으로 보고, 집합 사이의 Jaccard 유사도를
+MinHash 서명(NUM_PERM개 값)이 같은 위치의 비율로 추정합니다.
+서명을 BANDS개 밴드(밴드당 ROWS개 값)로 나눠 밴드 값이 같은 프롬프트끼리만 후보로 비교하므로(LSH)
+유사 프롬프트 조회는 전체를 비교하지 않습니다.
+
+- 서명 계산: shingle마다 해시를 한 번만 계산하고 상위 비트로 NUM_PERM개 구간에 나눠 구간별 최솟값을 사용
+  (one permutation hashing, 빈 구간은 오른쪽의 가장 가까운 구간 값으로 채움).
+  여러 프롬프트의 본문을 이어 붙여 NumPy 배열 연산으로 한 번에 계산
+- 밴드 조회: 밴드별 (키, 행) 정렬 배열을 searchsorted로 조회하고,
+  정렬 이후 바뀐 행은 작은 delta 목록에 두었다가 일정 크기가 되면 다시 정렬
+- 서명 캐시: 계산한 서명을 본문 체크섬과 함께 DATA_DIR/minhash.npz에 저장해 다음 실행에서 재사용
+
+인덱스는 PromptIndexes에 등록되어 프롬프트 수정 시 바뀐 프롬프트의 서명만 다시 계산합니다.
+처음 만들 때(시작, 외부 수정으로 대량 변경)는 레코드만 보관하고 첫 조회 때 계산합니다.
+"""
+import functools
+import os
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from backend.indexes import RecordIndex
+from backend.records import PromptRecord
+
+# 서명 길이 = BANDS * ROWS (유사도 s인 쌍이 후보가 될 확률: 1 - (1 - s^ROWS)^BANDS, s=0.5에서 약 0.65)
+NUM_PERM = 64
+BANDS = 16
+ROWS = 4
+# shingle 길이 (문자 수, 한국어처럼 띄어쓰기가 불규칙한 본문도 비교할 수 있도록 문자 단위)
+SHINGLE = 5
+SEED = 1
+
+# 한 번에 해시를 계산할 본문 문자 수 (문자 수 크기의 임시 배열 여러 개를 만듦)
+_BATCH_CHARS = 1 << 20
+# delta 행이 이만큼 쌓이면 밴드 정렬 배열을 다시 만듦
+_MERGE_THRESHOLD = 1024
+# 같은 밴드 키를 가진 행이 이보다 많으면 보고서에서 첫 행과의 쌍만 비교 (동일 본문이 많은 경우)
+_MAX_BUCKET_PAIRS = 64
+
+_EMPTY = np.iinfo(np.uint32).max
+# 구간 번호는 해시 상위 비트, 값은 하위 31비트 (빈 구간을 채운 값도 _EMPTY가 되지 않음)
+_BIN_SHIFT = np.uint64(64 - int(NUM_PERM).bit_length() + 1)
+_VALUE_MASK = np.uint64(0x7FFFFFFF)
+# 빈 구간을 채울 때 거리마다 더하는 값 (채운 값이 원래 값과 겹치지 않도록)
+_FILL_STEP = 0x3C6EF372
+
+
+def _hash_parameters() -> Tuple[np.uint64, np.ndarray]:
+    rng = np.random.default_rng(SEED)
+    salt = rng.integers(0, 1 << 63, dtype=np.uint64)
+    band_multipliers = rng.integers(1, 1 << 63, size=ROWS, dtype=np.uint64) | np.uint64(1)
+    return salt, band_multipliers
+
+
+_SALT, _BAND_MULTIPLIERS = _hash_parameters()
+
+
+@functools.lru_cache(maxsize=None)
+def _powers(size: int) -> np.ndarray:
+    """shingle 다항식 해시의 문자별 곱 (uint64 오버플로 범위로 줄임)"""
+    return np.array([1000003 ** (size - 1 - i) % (1 << 64) for i in range(size)], dtype=np.uint64)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """64비트 해시 섞기 (splitmix64 마무리 단계, uint64 오버플로는 의도된 동작)"""
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xFF51AFD7ED558CCD)
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xC4CEB9FE1A85EC53)
+    return values ^ (values >> np.uint64(33))
+
+
+def normalize_text(text: str) -> str:
+    """대소문자와 공백 차이 제거"""
+    return ' '.join((text or '').casefold().split())
+
+
+def iter_shingle_hashes(texts: List[str], size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    여러 본문의 shingle 해시를 묶음 단위로 계산
+
+    본문을 이어 붙인 문자 코드 배열에서 시작 위치별 다항식 해시를 한 번에 구하고,
+    본문 경계를 넘는 shingle은 제외합니다. size보다 짧은 본문은 채워서 shingle 하나로 취급합니다.
+
+    Args:
+        texts: normalize_text()로 정리한 본문 목록
+        size: shingle 길이 (문자 수)
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: (shingle별 본문 번호, uint64 해시), 본문 번호 순
+    """
+    texts = [text.ljust(size, '\0') if text else '' for text in texts]
+    powers = _powers(size)
+    start = 0
+    while start < len(texts):
+        # 문자 수가 _BATCH_CHARS를 넘지 않도록 본문을 묶음 (한 본문이 더 크면 단독)
+        stop, total = start, 0
+        while stop < len(texts) and (stop == start or total + len(texts[stop]) <= _BATCH_CHARS):
+            total += len(texts[stop])
+            stop += 1
+        if total >= size:
+            lengths = np.array([len(text) for text in texts[start:stop]])
+            owners = np.repeat(np.arange(start, stop), lengths)
+            codes = np.frombuffer(''.join(texts[start:stop]).encode('utf-32-le'), dtype=np.uint32)
+            codes = codes.astype(np.uint64)
+            count = len(codes) - size + 1
+            valid = owners[:count] == owners[size - 1:]
+            # 문자마다 밀린 배열을 더해 모든 시작 위치의 해시를 계산
+            hashes = np.zeros(count, dtype=np.uint64)
+            with np.errstate(over='ignore'):
+                for offset, power in enumerate(powers):
+                    hashes += codes[offset:offset + count] * power
+                yield owners[:count][valid], _mix(hashes[valid] ^ _SALT)
+        start = stop
+
+
+def _fill_empty_bins(signatures: np.ndarray):
+    """shingle이 하나도 들어가지 않은 구간을 오른쪽(순환)의 가장 가까운 구간 값 + 거리 * _FILL_STEP으로 채움"""
+    rows = np.flatnonzero((signatures == _EMPTY).any(axis=1) & (signatures != _EMPTY).any(axis=1))
+    if len(rows) == 0:
+        return
+    block = signatures[rows]
+    positions = np.arange(2 * NUM_PERM)
+    filled = np.tile(block != _EMPTY, 2)
+    # 각 위치에서 오른쪽으로 가장 가까운 채워진 위치 (뒤에서부터 누적 최솟값)
+    nearest = np.where(filled, positions, 2 * NUM_PERM)[:, ::-1]
+    nearest = np.minimum.accumulate(nearest, axis=1)[:, ::-1][:, :NUM_PERM]
+    distance = (nearest - positions[:NUM_PERM]).astype(np.uint64)
+    source = np.take_along_axis(block, nearest % NUM_PERM, axis=1).astype(np.uint64)
+    signatures[rows] = ((source + distance * np.uint64(_FILL_STEP)) & _VALUE_MASK).astype(np.uint32)
+
+
+def compute_signatures(texts: List[str]) -> np.ndarray:
+    """
+    여러 본문의 MinHash 서명을 묶어서 계산
+
+    shingle 해시를 묶음 단위로 구하고(iter_shingle_hashes) (프롬프트, 구간)별 최솟값을 np.minimum.at으로 모읍니다.
+
+    Args:
+        texts: 본문 목록
+
+    Returns:
+        np.ndarray: (len(texts), NUM_PERM) uint32 서명 (빈 본문의 행은 모두 _EMPTY)
+    """
+    signatures = np.full((len(texts), NUM_PERM), _EMPTY, dtype=np.uint32)
+    for owners, hashes in iter_shingle_hashes([normalize_text(text) for text in texts], SHINGLE):
+        slots = owners * NUM_PERM + (hashes >> _BIN_SHIFT).astype(np.int64)
+        np.minimum.at(signatures.reshape(-1), slots, (hashes & _VALUE_MASK).astype(np.uint32))
+    _fill_empty_bins(signatures)
+    return signatures
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """
+    서명의 밴드별 키
+
+    Args:
+        signatures: (n, NUM_PERM) 서명
+
+    Returns:
+        np.ndarray: (n, BANDS) uint64 키
+    """
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        return _mix((bands * _BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64))
+
+
+def _checksum(text: str) -> int:
+    """서명 캐시 검증용 본문 체크섬"""
+    return zlib.crc32((text or '').encode('utf-8'))
+
+
+class MinHashIndex(RecordIndex):
+    """
+    프롬프트 MinHash 서명과 LSH 밴드 인덱스
+
+    행 번호로 서명/밴드 키 배열을 두고, 삭제된 행은 다음 추가 때 재사용합니다.
+    조회와 갱신은 내부 잠금으로 직렬화합니다.
+    """
+
+    def __init__(self, cache_path: Optional[Callable[[], str]] = None):
+        """
+        MinHashIndex 초기화
+
+        Args:
+            cache_path: 서명 캐시 파일 경로 함수 (None이면 캐시 사용 안 함)
+        """
+        self._cache_path = cache_path
+        self._lock = threading.RLock()
+        # 첫 조회 전까지 보관하는 레코드 (None이면 인덱스가 만들어진 상태)
+        self._pending: Optional[Dict[str, PromptRecord]] = {}
+        self._reset(0)
+
+    def _reset(self, capacity: int):
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._signatures = np.full((capacity, NUM_PERM), _EMPTY, dtype=np.uint32)
+        self._keys = np.zeros((capacity, BANDS), dtype=np.uint64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._checksums = np.zeros(capacity, dtype=np.uint32)
+        self._sorted_keys: List[np.ndarray] = [np.zeros(0, dtype=np.uint64)] * BANDS
+        self._sorted_rows: List[np.ndarray] = [np.zeros(0, dtype=np.int64)] * BANDS
+        self._delta: Dict[int, None] = {}  # 정렬 이후 추가/변경된 행 (순서 유지 집합)
+
+    # ============== RecordIndex ==============
+
+    def put(self, record: PromptRecord, previous: Optional[PromptRecord]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[record.id] = record
+                return
+            if previous is not None and previous.text == record.text and record.id in self._rows:
+                return
+            self._store([record.id], [record.text], compute_signatures([record.text]))
+
+    def discard(self, record: PromptRecord):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.pop(record.id, None)
+                return
+            row = self._rows.pop(record.id, None)
+            if row is None:
+                return
+            self._alive[row] = False
+            self._ids[row] = None
+            self._free.append(row)
+            self._delta.pop(row, None)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        with self._lock:
+            self._pending = {record.id: record for record in records}
+
+    # ============== 만들기/갱신 ==============
+
+    def _ensure(self):
+        """보관 중인 레코드로 인덱스 만들기 (캐시에 본문이 같은 서명이 있으면 재사용)"""
+        if self._pending is None:
+            return
+        records = list(self._pending.values())
+        self._pending = None
+        self._reset(max(16, len(records)))
+
+        ids = [record.id for record in records]
+        texts = [record.text for record in records]
+        checksums = np.array([_checksum(text) for text in texts], dtype=np.uint32)
+        signatures = np.empty((len(records), NUM_PERM), dtype=np.uint32)
+
+        cached = self._load_cache()
+        missing = list(range(len(records)))
+        if cached:
+            cached_rows = {prompt_id: i for i, prompt_id in enumerate(cached['ids'].tolist())}
+            missing = []
+            for i, prompt_id in enumerate(ids):
+                j = cached_rows.get(prompt_id)
+                if j is not None and cached['checksums'][j] == checksums[i]:
+                    signatures[i] = cached['signatures'][j]
+                else:
+                    missing.append(i)
+        if missing:
+            signatures[missing] = compute_signatures([texts[i] for i in missing])
+
+        count = len(records)
+        self._ids[:count] = ids
+        self._rows = {prompt_id: row for row, prompt_id in enumerate(ids)}
+        self._signatures[:count] = signatures
+        self._keys[:count] = band_keys(signatures)
+        self._alive[:count] = True
+        self._checksums[:count] = checksums
+        self._free = list(range(len(self._ids) - 1, count - 1, -1))
+        self._merge()
+
+        if missing:
+            self._save_cache()
+
+    def _store(self, ids: List[str], texts: List[str], signatures: np.ndarray):
+        """행에 서명 기록 (새 ID면 빈 행 배정), 밴드 정렬 배열에는 delta로 추가"""
+        keys = band_keys(signatures)
+        for prompt_id, text, signature, key in zip(ids, texts, signatures, keys):
+            row = self._rows.get(prompt_id)
+            if row is None:
+                if not self._free:
+                    self._grow()
+                row = self._free.pop()
+                self._rows[prompt_id] = row
+                self._ids[row] = prompt_id
+            self._signatures[row] = signature
+            self._keys[row] = key
+            self._alive[row] = True
+            self._checksums[row] = _checksum(text)
+            self._delta[row] = None
+        if len(self._delta) >= _MERGE_THRESHOLD:
+            self._merge()
+
+    def _grow(self):
+        old = len(self._ids)
+        capacity = max(16, old * 2)
+        self._ids.extend([None] * (capacity - old))
+        self._signatures = np.concatenate(
+            [self._signatures, np.full((capacity - old, NUM_PERM), _EMPTY, dtype=np.uint32)])
+        self._keys = np.concatenate([self._keys, np.zeros((capacity - old, BANDS), dtype=np.uint64)])
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - old, dtype=bool)])
+        self._checksums = np.concatenate([self._checksums, np.zeros(capacity - old, dtype=np.uint32)])
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+    def _searchable_rows(self) -> np.ndarray:
+        """서명이 있는(빈 본문이 아닌) 살아 있는 행"""
+        return np.flatnonzero(self._alive & (self._signatures[:, 0] != _EMPTY))
+
+    def _merge(self):
+        """밴드별 (키, 행) 정렬 배열을 다시 만들고 delta 비우기"""
+        rows = self._searchable_rows()
+        for band in range(BANDS):
+            keys = self._keys[rows, band]
+            order = np.argsort(keys, kind='stable')
+            self._sorted_keys[band] = keys[order]
+            self._sorted_rows[band] = rows[order]
+        self._delta = {}
+
+    # ============== 서명 캐시 ==============
+
+    def _load_cache(self) -> Optional[Dict[str, np.ndarray]]:
+        if self._cache_path is None:
+            return None
+        try:
+            with np.load(self._cache_path(), allow_pickle=False) as data:
+                if data['params'].tolist() != [NUM_PERM, BANDS, ROWS, SHINGLE, SEED]:
+                    return None
+                return {name: data[name] for name in ('ids', 'checksums', 'signatures')}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save_cache(self):
+        if self._cache_path is None:
+            return
+        cache_path = self._cache_path()
+        rows = np.flatnonzero(self._alive)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp_path, params=np.array([NUM_PERM, BANDS, ROWS, SHINGLE, SEED]),
+                     ids=np.array([self._ids[row] for row in rows], dtype=str),
+                     checksums=self._checksums[rows], signatures=self._signatures[rows])
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Error writing {cache_path}: {e}")
+
+    # ============== 조회 ==============
+
+    def _candidates(self, row: int) -> np.ndarray:
+        """밴드 키가 하나라도 같은 행 (자기 자신 제외)"""
+        keys = self._keys[row]
+        found = []
+        for band in range(BANDS):
+            sorted_keys = self._sorted_keys[band]
+            start = np.searchsorted(sorted_keys, keys[band], side='left')
+            stop = np.searchsorted(sorted_keys, keys[band], side='right')
+            if stop > start:
+                found.append(self._sorted_rows[band][start:stop])
+        if self._delta:
+            delta = np.fromiter(self._delta, dtype=np.int64, count=len(self._delta))
+            found.append(delta[(self._keys[delta] == keys).any(axis=1)])
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(found))
+        # 정렬 이후 삭제/변경된 행은 현재 키로 다시 확인
+        valid = self._alive[rows] & (self._keys[rows] == keys).any(axis=1) & (rows != row)
+        return rows[valid]
+
+    def similarity(self, rows: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """행 쌍의 추정 Jaccard 유사도 (서명이 같은 위치의 비율)"""
+        return (self._signatures[rows] == self._signatures[others]).mean(axis=1)
+
+    def similar(self, prompt_id: str, threshold: float = 0.5,
+                limit: Optional[int] = None) -> Optional[List[Tuple[str, float]]]:
+        """
+        비슷한 프롬프트 조회
+
+        Args:
+            prompt_id: 기준 프롬프트 ID
+            threshold: 최소 추정 유사도 (0~1)
+            limit: 최대 개수 (None이면 전부)
+
+        Returns:
+            Optional[List[Tuple[str, float]]]: 유사도 높은 순 (ID, 유사도), 프롬프트가 없으면 None
+        """
+        with self._lock:
+            self._ensure()
+            row = self._rows.get(prompt_id)
+            if row is None:
+                return None
+            if self._signatures[row, 0] == _EMPTY:
+                return []
+            candidates = self._candidates(row)
+            scores = self.similarity(np.full(len(candidates), row), candidates)
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+            order = np.lexsort((candidates, -scores))[:limit]
+            return [(self._ids[candidates[i]], float(scores[i])) for i in order]
+
+    def duplicate_groups(self, threshold: float = 0.8) -> List[Tuple[List[str], float]]:
+        """
+        전체 라이브러리의 유사 프롬프트 묶음
+
+        밴드별 정렬 배열에서 키가 같은 구간의 행 쌍을 후보로 모아 한 번에 유사도를 계산하고,
+        threshold 이상인 쌍을 연결한 묶음을 반환합니다.
+
+        Args:
+            threshold: 최소 추정 유사도 (0~1)
+
+        Returns:
+            List[Tuple[List[str], float]]: (묶음의 프롬프트 ID, 묶음 안 연결 쌍의 최저 유사도), 큰 묶음 먼저
+        """
+        with self._lock:
+            self._ensure()
+            self._merge()
+
+            firsts, seconds = [], []
+            for band in range(BANDS):
+                keys, rows = self._sorted_keys[band], self._sorted_rows[band]
+                if len(keys) < 2:
+                    continue
+                # 위치별 같은 키 구간의 시작 위치와 길이
+                is_start = np.concatenate([[True], keys[1:] != keys[:-1]])
+                starts = np.flatnonzero(is_start)
+                lengths = np.diff(np.append(starts, len(keys)))
+                run_start = starts[np.cumsum(is_start) - 1]
+                run_length = np.repeat(lengths, lengths)
+                # 큰 구간은 첫 행과의 쌍만
+                large = (run_length > _MAX_BUCKET_PAIRS) & ~is_start
+                firsts.append(rows[run_start[large]])
+                seconds.append(rows[large])
+                # 작은 구간은 모든 쌍 (거리 d만큼 떨어진 같은 구간의 위치끼리)
+                small = (run_length > 1) & (run_length <= _MAX_BUCKET_PAIRS)
+                if not small.any():
+                    continue
+                for distance in range(1, int(run_length[small].max())):
+                    same = small[distance:] & (run_start[distance:] == run_start[:-distance])
+                    firsts.append(rows[:-distance][same])
+                    seconds.append(rows[distance:][same])
+            if not firsts:
+                return []
+
+            # 중복 쌍 제거 (작은 행 번호를 앞에 두고 하나의 정수 키로)
+            first, second = np.concatenate(firsts), np.concatenate(seconds)
+            low, high = np.minimum(first, second), np.maximum(first, second)
+            pair_keys = np.unique(low.astype(np.int64) * len(self._ids) + high)
+            pairs = np.stack([pair_keys // len(self._ids), pair_keys % len(self._ids)], axis=1)
+            if len(pairs) == 0:
+                return []
+            scores = self.similarity(pairs[:, 0], pairs[:, 1])
+            keep = scores >= threshold
+            pairs, scores = pairs[keep], scores[keep]
+
+            # 연결 요소 (union-find)
+            parent: Dict[int, int] = {}
+
+            def find(row: int) -> int:
+                parent.setdefault(row, row)
+                while parent[row] != row:
+                    parent[row] = parent[parent[row]]
+                    row = parent[row]
+                return row
+
+            for a, b in pairs.tolist():
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+            groups: Dict[int, List[int]] = {}
+            lowest: Dict[int, float] = {}
+            for row in parent:
+                groups.setdefault(find(row), []).append(row)
+            for (a, _), score in zip(pairs.tolist(), scores.tolist()):
+                root = find(a)
+                lowest[root] = min(lowest.get(root, 1.0), score)
+
+            result = [
+                (sorted(self._ids[row] for row in members), lowest[root])
+                for root, members in groups.items()
+            ]
+            result.sort(key=lambda group: (-len(group[0]), -group[1], group[0][0]))
+            return result
@@ -0,0 +1,305 @@
+"""
+프롬프트/폴더 레코드 모듈
+
+저장소가 메모리에 유지하는 레코드 타입입니다.
+dict 대신 __slots__ 객체를 사용하여 레코드마다 키 문자열과 해시 테이블을 두지 않고,
+생성/수정 시각은 ISO 문자열 대신 정수(마이크로초)로 보관합니다.
+
+JSON 형식(dict)으로는 파일에 기록할 때(to_dict)와 API 응답을 직렬화할 때만 변환합니다.
+응답 스키마는 from_attributes로 created_at/updated_at/autotexts 속성을 읽습니다.
+"""
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# 시각 저장 기준 (시간대 없는 로컬 시각 그대로 저장하므로 시간대 변환 없음)
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# 정수 또는 해석할 수 없어 원본 그대로 둔 문자열
+Timestamp = Union[int, str]
+
+
+def encode_timestamp(value: Optional[str]) -> Timestamp:
+    """
+    ISO 시각 문자열을 정수(1970-01-01부터의 마이크로초)로 변환
+
+    다시 isoformat()으로 되돌렸을 때 원본과 같은 경우에만 변환하고,
+    그렇지 않으면(시간대 포함, 다른 형식 등) 원본 문자열을 그대로 반환합니다.
+
+    Args:
+        value: ISO 시각 문자열
+
+    Returns:
+        Timestamp: 정수 시각 또는 원본 문자열
+    """
+    if not value:
+        return ''
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return value
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def decode_timestamp(value: Timestamp) -> str:
+    """
+    정수 시각을 ISO 문자열로 변환 (문자열이면 그대로 반환)
+
+    Args:
+        value: encode_timestamp()의 결과
+
+    Returns:
+        str: ISO 시각 문자열
+    """
+    if isinstance(value, int):
+        return (_EPOCH + timedelta(microseconds=value)).isoformat()
+    return value
+
+
+def now_timestamp() -> int:
+    """현재 시각 (정수)"""
+    return (datetime.now() - _EPOCH) // _MICROSECOND
+
+
+def file_timestamp(mtime_ns: int) -> int:
+    """파일 수정 시각(os.stat의 st_mtime_ns)을 정수 시각으로 변환 (로컬 시각 기준)"""
+    return (datetime.fromtimestamp(mtime_ns / 1e9) - _EPOCH) // _MICROSECOND
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    ISO 시각 문자열을 정수 시각으로 변환 (쿼리 파라미터, 정렬 키용)
+
+    시간대가 있으면 로컬 시각으로 바꾼 뒤 변환합니다 (저장 시각은 시간대 없는 로컬 시각).
+
+    Args:
+        value: ISO 시각 문자열 (끝의 'Z' 허용)
+
+    Returns:
+        int: 1970-01-01부터의 마이크로초
+
+    Raises:
+        ValueError: 시각 형식이 아닌 경우
+    """
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+# 해석할 수 없는 시각의 정렬 키 (가장 오래된 것으로 취급)
+_UNKNOWN_TIMESTAMP_KEY = -(1 << 62)
+
+
+def timestamp_sort_key(value: Timestamp) -> int:
+    """
+    정렬/범위 비교용 정수 시각
+
+    Args:
+        value: 레코드의 created/updated 값
+
+    Returns:
+        int: 정수 시각 (문자열로 남은 시각은 해석해서, 해석할 수 없으면 가장 작은 값)
+    """
+    if isinstance(value, int):
+        return value
+    try:
+        return parse_timestamp(value)
+    except (TypeError, ValueError):
+        return _UNKNOWN_TIMESTAMP_KEY
+
+
+def normalize_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    """
+    태그 정리 (앞뒤 공백 제거, 빈 태그/중복 제거, 순서 유지)
+
+    Args:
+        tags: 태그 목록
+
+    Returns:
+        Tuple[str, ...]: intern된 태그 튜플
+    """
+    if isinstance(tags, str):
+        tags = (tags,)
+    result = []
+    for tag in tags or ():
+        tag = tag.strip() if isinstance(tag, str) else ''
+        if tag and tag not in result:
+            result.append(sys.intern(tag))
+    return tuple(result)
+
+
+def _extra_fields(data: Dict, known: frozenset) -> Optional[Dict]:
+    """알 수 없는 필드 (이후 버전에서 추가된 필드를 잃지 않도록 보관)"""
+    if len(data) <= len(known) and known.issuperset(data):
+        return None
+    return {key: value for key, value in data.items() if key not in known} or None
+
+
+class PromptRecord:
+    """
+    프롬프트 레코드
+
+    autotexts는 저장하지 않고 autotext에서 만들어 반환합니다.
+    tags는 중복 없는 태그 튜플이며, 태그가 없으면 파일에 기록하지 않습니다.
+    """
+    __slots__ = ('id', 'title', 'text', 'folder_id', 'autotext', 'tags', 'created', 'updated', 'extra')
+
+    _FIELDS = frozenset(('id', 'title', 'text', 'folder_id', 'autotext', 'autotexts', 'tags',
+                         'created_at', 'updated_at'))
+
+    def __init__(self, id: str, title: str, text: str, folder_id: Optional[int] = None,
+                 autotext: Optional[str] = None, created: Timestamp = '', updated: Timestamp = '',
+                 extra: Optional[Dict] = None, tags: Iterable[str] = ()):
+        self.id = id
+        self.title = title
+        self.text = text
+        self.folder_id = folder_id
+        # 트리거는 딕셔너리 키/비교에 자주 쓰이므로 intern
+        self.autotext = sys.intern(autotext) if autotext else None
+        # 태그는 많은 프롬프트가 같은 문자열을 공유하므로 intern
+        self.tags = normalize_tags(tags)
+        self.created = created
+        self.updated = updated
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PromptRecord":
+        """
+        JSON 데이터에서 레코드 생성
+
+        Args:
+            data: prompts.json의 프롬프트 항목
+
+        Returns:
+            PromptRecord: 레코드
+        """
+        return cls(
+            data.get('id'),
+            data.get('title', ''),
+            data.get('text', ''),
+            data.get('folder_id'),
+            data.get('autotext'),
+            encode_timestamp(data.get('created_at')),
+            encode_timestamp(data.get('updated_at')),
+            _extra_fields(data, cls._FIELDS),
+            data.get('tags') or (),
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        JSON 형식으로 변환 (파일 기록용)
+
+        Returns:
+            Dict: prompts.json 항목 형식의 딕셔너리
+        """
+        data = {
+            'id': self.id,
+            'title': self.title,
+            'text': self.text,
+            'folder_id': self.folder_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+        if self.autotext:
+            data['autotext'] = self.autotext
+        data['autotexts'] = self.autotexts
+        if self.tags:
+            data['tags'] = list(self.tags)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self) -> "PromptRecord":
+        """수정용 복사본 (읽는 쪽이 보고 있는 레코드는 제자리에서 바꾸지 않음)"""
+        return PromptRecord(self.id, self.title, self.text, self.folder_id, self.autotext,
+                            self.created, self.updated, dict(self.extra) if self.extra else None, self.tags)
+
+    @property
+    def created_at(self) -> str:
+        return decode_timestamp(self.created)
+
+    @property
+    def updated_at(self) -> str:
+        return decode_timestamp(self.updated)
+
+    @property
+    def autotexts(self) -> List[Dict[str, str]]:
+        """응답 형식의 자동변환 텍스트 목록"""
+        return [{'trigger_text': self.autotext}] if self.autotext else []
+
+
+class FolderRecord:
+    """
+    폴더 레코드
+
+    parent_id가 None이면 최상위 폴더입니다.
+    """
+    __slots__ = ('id', 'name', 'parent_id', 'created', 'updated', 'extra')
+
+    _FIELDS = frozenset(('id', 'name', 'parent_id', 'created_at', 'updated_at'))
+
+    def __init__(self, id: int, name: str, created: Timestamp = '', updated: Timestamp = '',
+                 extra: Optional[Dict] = None, parent_id: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+        self.created = created
+        self.updated = updated
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FolderRecord":
+        """
+        JSON 데이터에서 레코드 생성
+
+        Args:
+            data: folders.json의 폴더 항목
+
+        Returns:
+            FolderRecord: 레코드
+        """
+        return cls(
+            data.get('id'),
+            data.get('name', ''),
+            encode_timestamp(data.get('created_at')),
+            encode_timestamp(data.get('updated_at')),
+            _extra_fields(data, cls._FIELDS),
+            data.get('parent_id'),
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        JSON 형식으로 변환 (파일 기록용)
+
+        Returns:
+            Dict: folders.json 항목 형식의 딕셔너리
+        """
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'parent_id': self.parent_id,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self) -> "FolderRecord":
+        """수정용 복사본"""
+        return FolderRecord(self.id, self.name, self.created, self.updated,
+                            dict(self.extra) if self.extra else None, self.parent_id)
+
+    @property
+    def created_at(self) -> str:
+        return decode_timestamp(self.created)
+
+    @property
+    def updated_at(self) -> str:
+        return decode_timestamp(self.updated)
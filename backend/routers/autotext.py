@@ -4,23 +4,106 @@
 자동변환 텍스트의 조회 및 관리를 처리합니다.
 JSON 파일 기반으로 동작합니다.
 """
-from fastapi import APIRouter
-from typing import Dict
+from fastapi import APIRouter, Request
+from typing import Dict, List, Literal
+from pydantic import BaseModel, TypeAdapter
 from backend import storage
+from backend.changelog import CHANGE_SEQ_HEADER, changelog
+from backend.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api/autotexts", tags=["autotexts"])
 
 
+# ============== Pydantic 스키마 ==============
+
+class AutoTextTrigger(BaseModel):
+    """자동변환 트리거 정보 (본문 제외)"""
+    prompt_id: str
+    updated_at: str
+
+
+class AutoTextConflict(BaseModel):
+    """
+    자동변환 트리거 충돌 (trigger가 container 안에 들어 있음)
+    
+    - shadow: container를 입력하는 도중 trigger가 먼저 확장되어 container는 확장되지 않음
+    - suffix: container가 trigger로 끝남, 입력이 container로 끝나면 trigger 대신 container가 확장됨
+    - duplicate: 두 프롬프트가 같은 트리거를 사용
+    """
+    kind: Literal['shadow', 'suffix', 'duplicate']
+    trigger: str
+    prompt_id: str
+    container: str
+    container_prompt_id: str
+
+
+# 캐시 미스 시 response_model과 같은 방식으로 직렬화하기 위한 어댑터
+_DICT_ADAPTER = TypeAdapter(Dict[str, str])
+_TRIGGERS_ADAPTER = TypeAdapter(Dict[str, AutoTextTrigger])
+_CONFLICTS_ADAPTER = TypeAdapter(List[AutoTextConflict])
+
+
+# ============== API 엔드포인트 ==============
+
+
 @router.get("/dict", response_model=Dict[str, str])
-def get_autotext_dict():
+def get_autotext_dict(request: Request):
     """
     자동변환 텍스트 딕셔너리 조회
     
     자동변환 감지 서비스에서 사용하기 위한 형식으로 반환합니다.
     {trigger_text: prompt_text} 형식
     
+    Args:
+        request: 요청 객체 (ETag 확인용)
+    
     Returns:
         Dict[str, str]: 트리거 텍스트와 프롬프트 텍스트의 매핑
     """
-    return storage.get_autotext_dict()
+    return cached_json_response(request, "autotext_dict", storage.get_generation(),
+                                storage.get_autotext_dict, _DICT_ADAPTER)
+
+
+
+@router.get("/triggers", response_model=Dict[str, AutoTextTrigger])
+def get_autotext_triggers(request: Request):
+    """
+    자동변환 트리거 목록 조회
+    
+    본문 없이 트리거와 프롬프트 ID만 반환합니다.
+    자동변환 감지 서비스는 이 목록만 메모리에 유지하고,
+    본문은 확장 시점에 /api/prompts/{prompt_id}로 가져옵니다.
+    X-Change-Seq 헤더 이후의 변경은 /api/changes로 받을 수 있습니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+    
+    Returns:
+        Dict[str, AutoTextTrigger]: 트리거 텍스트와 프롬프트 ID/버전의 매핑
+    """
+    seq = changelog.current_seq()
+    response = cached_json_response(request, "autotext_triggers", storage.get_generation(),
+                                    storage.get_autotext_triggers, _TRIGGERS_ADAPTER)
+    response.headers[CHANGE_SEQ_HEADER] = str(seq)
+    return response
+
 
+@router.get("/conflicts", response_model=List[AutoTextConflict])
+def get_autotext_conflicts(request: Request):
+    """
+    자동변환 트리거 충돌 보고서
+    
+    감지 서비스는 입력 버퍼 끝과 맞는 가장 긴 트리거를 바로 확장하므로,
+    다른 트리거 안에 들어 있는 트리거는 확장 결과를 바꿉니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+    
+    Returns:
+        List[AutoTextConflict]: duplicate → shadow → suffix 순
+    """
+    def build():
+        return [conflict._asdict() for conflict in storage.find_trigger_conflicts()]
+    
+    return cached_json_response(request, "autotext_conflicts", storage.get_generation(), build,
+                                _CONFLICTS_ADAPTER)
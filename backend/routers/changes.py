@@ -0,0 +1,90 @@
+"""
+변경 사항(델타 동기화) API 라우터
+
+클라이언트가 마지막으로 받은 seq 이후에 바뀐 프롬프트/폴더만 반환합니다.
+삭제된 레코드는 ID(tombstone)로 알려줍니다.
+
+동기화 절차:
+1. 전체 목록(GET /api/prompts/, /api/folders/)을 받으면서 X-Change-Seq 헤더 값을 보관
+2. 이후 GET /api/changes?since=<seq>로 변경분만 받아 적용하고 응답의 seq를 보관
+3. resync_required가 true이면 1부터 다시 수행
+
+변경분의 레코드는 조회 시점의 최신 상태이므로 같은 변경을 여러 번 적용해도 결과가 같습니다.
+"""
+from fastapi import APIRouter, Query
+from typing import List
+from pydantic import BaseModel
+from backend import storage
+from backend.changelog import DELETE, changelog
+from backend.markdown_source import is_markdown_id
+from backend.routers.folders import FolderResponse
+from backend.routers.prompts import PromptResponse
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+
+# ============== Pydantic 스키마 ==============
+
+class ChangesResponse(BaseModel):
+    """변경 사항 응답 스키마"""
+    seq: int
+    resync_required: bool = False
+    prompts: List[PromptResponse] = []
+    folders: List[FolderResponse] = []
+    deleted_prompts: List[str] = []
+    deleted_folders: List[int] = []
+
+
+# ============== API 엔드포인트 ==============
+
+@router.get("", response_model=ChangesResponse)
+@router.get("/", response_model=ChangesResponse, include_in_schema=False)
+def get_changes(since: int = Query(..., ge=0, description="마지막으로 받은 seq")):
+    """
+    seq 이후 변경 사항 조회
+
+    since가 보관 범위보다 오래되었거나 일괄 교체 이전이면
+    변경 목록 없이 resync_required=true와 현재 seq만 반환합니다.
+
+    Args:
+        since: 클라이언트가 마지막으로 받은 seq
+
+    Returns:
+        ChangesResponse: 변경된 레코드와 삭제된 ID
+    """
+    # 요청이 없던 동안 바뀐 Markdown 파일을 먼저 변경 로그에 기록
+    storage.refresh_markdown()
+    seq, changes = changelog.changes_since(since)
+    if changes is None:
+        return ChangesResponse(seq=seq, resync_required=True)
+
+    response = ChangesResponse(seq=seq)
+    upserted_prompts = []
+    for (kind, record_id), op in changes.items():
+        if kind == 'prompt':
+            if op == DELETE:
+                response.deleted_prompts.append(record_id)
+            else:
+                upserted_prompts.append(record_id)
+        elif kind == 'folder':
+            if op == DELETE:
+                response.deleted_folders.append(record_id)
+            else:
+                folder = storage.get_folder_by_id(record_id)
+                if folder:
+                    response.folders.append(FolderResponse.model_validate(folder))
+                else:
+                    response.deleted_folders.append(record_id)
+
+    if any(is_markdown_id(prompt_id) for prompt_id in upserted_prompts):
+        # 다른 워커가 기록한 Markdown 변경이면 이 워커는 아직 재확인 주기 전일 수 있음
+        storage.refresh_markdown(force=True)
+    prompts = storage.get_prompts_by_ids(upserted_prompts)
+    for prompt_id in upserted_prompts:
+        prompt = prompts.get(prompt_id)
+        if prompt:
+            response.prompts.append(PromptResponse.model_validate(prompt))
+        else:
+            response.deleted_prompts.append(prompt_id)
+
+    return response
@@ -0,0 +1,78 @@
+"""
+디버그 API 라우터
+
+요청 프로파일러가 수집한 프로파일을 조회하고 내려받습니다.
+PROFILING=true일 때만 등록됩니다. 프로파일은 DATA_DIR에 기록되므로 어느 워커에서든 조회할 수 있습니다.
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from typing import List, Literal
+from pydantic import BaseModel
+from backend.services import profiler
+from backend.services.profiler import request_profiler
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+
+# ============== Pydantic 스키마 ==============
+
+class ProfileSummary(BaseModel):
+    """프로파일 요약 스키마"""
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    reason: str
+    started_at: str
+    duration_ms: float
+    samples: int
+
+
+# ============== API 엔드포인트 ==============
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+def get_profiles():
+    """
+    보관 중인 프로파일 목록 조회 (최신순)
+
+    Returns:
+        List[ProfileSummary]: 프로파일 요약 목록
+    """
+    return request_profiler.list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: Literal["collapsed", "pstats"] = Query("collapsed", description="내려받을 형식")
+):
+    """
+    프로파일 내려받기
+
+    - collapsed: flamegraph.pl, speedscope에서 열 수 있는 텍스트
+    - pstats: python -m pstats, snakeviz에서 열 수 있는 바이너리
+
+    Args:
+        profile_id: 프로파일 ID (<pid>-<시작 시각>-<번호>)
+        format: 내려받을 형식
+
+    Returns:
+        Response: 프로파일 파일
+    """
+    profile = request_profiler.get_profile(profile_id)
+
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"프로파일 ID {profile_id}를 찾을 수 없습니다.")
+
+    if format == "pstats":
+        return Response(
+            profiler.to_pstats(profile),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.pstats"'}
+        )
+
+    return PlainTextResponse(
+        profiler.to_collapsed(profile),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed.txt"'}
+    )
@@ -2,12 +2,15 @@
 폴더 CRUD API 라우터
 
 폴더의 생성, 조회, 수정, 삭제를 처리합니다.
+폴더는 parent_id로 중첩할 수 있으며, 하위 트리 조회/이동을 제공합니다.
 JSON 파일 기반으로 동작합니다.
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from backend import storage
+from backend.changelog import CHANGE_SEQ_HEADER, changelog
+from backend.services.response_cache import cached_json_response
 
 router = APIRouter(prefix="/api/folders", tags=["folders"])
 
@@ -17,6 +20,7 @@ router = APIRouter(prefix="/api/folders", tags=["folders"])
 class FolderCreate(BaseModel):
     """폴더 생성 스키마"""
     name: str = Field(..., min_length=1, description="폴더 이름")
+    parent_id: Optional[int] = Field(None, description="상위 폴더 ID (없으면 최상위)")
 
 
 class FolderUpdate(BaseModel):
@@ -24,26 +28,80 @@ class FolderUpdate(BaseModel):
     name: str = Field(..., min_length=1, description="폴더 이름")
 
 
+class FolderMove(BaseModel):
+    """폴더 이동 스키마"""
+    parent_id: Optional[int] = Field(None, description="새 상위 폴더 ID (없으면 최상위)")
+
+
 class FolderResponse(BaseModel):
-    """폴더 응답 스키마"""
+    """폴더 응답 스키마 (저장소 레코드의 속성에서 직렬화)"""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     name: str
+    parent_id: Optional[int] = None
     created_at: str
     updated_at: str
 
 
+class FolderWithStatsResponse(FolderResponse):
+    """집계를 포함한 폴더 응답 스키마"""
+    prompt_count: int = Field(0, description="폴더의 프롬프트 수")
+    autotext_count: int = Field(0, description="자동변환 텍스트가 있는 프롬프트 수")
+    text_bytes: int = Field(0, description="프롬프트 본문 크기 합계 (UTF-8 바이트)")
+
+
+class FolderSubtreeResponse(BaseModel):
+    """하위 트리 응답 스키마"""
+    id: int
+    path: List[int] = Field(..., description="최상위 폴더부터 이 폴더까지의 ID")
+    folder_ids: List[int] = Field(..., description="하위 트리의 폴더 ID (자기 자신 포함)")
+    prompt_count: int = Field(..., description="하위 트리 전체의 프롬프트 수")
+
+
+# 캐시 미스 시 response_model과 같은 방식으로 직렬화하기 위한 어댑터
+_FOLDER_LIST_ADAPTER = TypeAdapter(List[FolderResponse])
+_FOLDER_STATS_LIST_ADAPTER = TypeAdapter(List[FolderWithStatsResponse])
+
+
 # ============== API 엔드포인트 ==============
 
-@router.get("/", response_model=List[FolderResponse])
-def get_folders():
+@router.get("/", response_model=List[Union[FolderWithStatsResponse, FolderResponse]])
+def get_folders(
+    request: Request,
+    with_stats: bool = Query(False, description="폴더별 프롬프트 수, 자동변환 텍스트 수, 본문 바이트 포함")
+):
     """
     폴더 목록 조회
     
+    저장소 세대가 바뀌지 않았으면 캐시된 응답(또는 304)을 반환합니다.
+    X-Change-Seq 헤더는 이 목록에 반영된 변경 로그 seq입니다 (/api/changes 기준점).
+    
+    with_stats 집계는 저장소 인덱스가 프롬프트 수정 시 함께 유지하므로 프롬프트를 순회하지 않습니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+        with_stats: 집계 포함 여부
+    
     Returns:
-        List[FolderResponse]: 폴더 목록
+        List[FolderResponse]: 폴더 목록 (with_stats면 List[FolderWithStatsResponse])
     """
-    folders = storage.get_folders()
-    return folders
+    seq = changelog.current_seq()
+    generation = storage.get_folders_generation(with_stats)
+    
+    if with_stats:
+        def build():
+            stats = storage.get_folder_stats()
+            return [
+                FolderWithStatsResponse(**FolderResponse.model_validate(folder).model_dump(), **stats.get(folder.id, {}))
+                for folder in storage.get_folders()
+            ]
+        
+        response = cached_json_response(request, "folders", generation, build, _FOLDER_STATS_LIST_ADAPTER)
+    else:
+        response = cached_json_response(request, "folders", generation, storage.get_folders, _FOLDER_LIST_ADAPTER)
+    response.headers[CHANGE_SEQ_HEADER] = str(seq)
+    return response
 
 
 @router.get("/{folder_id}", response_model=FolderResponse)
@@ -65,6 +123,30 @@ def get_folder(folder_id: int):
     return folder
 
 
+@router.get("/{folder_id}/subtree", response_model=FolderSubtreeResponse)
+def get_folder_subtree(folder_id: int):
+    """
+    폴더 하위 트리 조회 (경로, 하위 폴더 ID, 프롬프트 수)
+    
+    Args:
+        folder_id: 폴더 ID
+    
+    Returns:
+        FolderSubtreeResponse: 하위 트리 정보
+    """
+    folder_ids = storage.get_subfolder_ids(folder_id)
+    
+    if not folder_ids:
+        raise HTTPException(status_code=404, detail=f"폴더 ID {folder_id}를 찾을 수 없습니다.")
+    
+    return FolderSubtreeResponse(
+        id=folder_id,
+        path=storage.get_folder_path(folder_id),
+        folder_ids=folder_ids,
+        prompt_count=storage.count_subtree_prompts(folder_id),
+    )
+
+
 @router.post("/", response_model=FolderResponse, status_code=201)
 def create_folder(folder_data: FolderCreate):
     """
@@ -76,8 +158,10 @@ def create_folder(folder_data: FolderCreate):
     Returns:
         FolderResponse: 생성된 폴더 정보
     """
-    folder = storage.create_folder(name=folder_data.name)
-    return folder
+    try:
+        return storage.create_folder(name=folder_data.name, parent_id=folder_data.parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.put("/{folder_id}", response_model=FolderResponse)
@@ -100,10 +184,33 @@ def update_folder(folder_id: int, folder_data: FolderUpdate):
     return folder
 
 
+@router.post("/{folder_id}/move", response_model=FolderResponse)
+def move_folder(folder_id: int, move_data: FolderMove):
+    """
+    폴더를 하위 트리째 다른 폴더 아래로 이동
+    
+    Args:
+        folder_id: 폴더 ID
+        move_data: 새 상위 폴더
+    
+    Returns:
+        FolderResponse: 이동된 폴더 정보
+    """
+    try:
+        folder = storage.move_folder(folder_id=folder_id, parent_id=move_data.parent_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not folder:
+        raise HTTPException(status_code=404, detail=f"폴더 ID {folder_id}를 찾을 수 없습니다.")
+    
+    return folder
+
+
 @router.delete("/{folder_id}", status_code=204)
 def delete_folder(folder_id: int):
     """
-    폴더 삭제
+    폴더 삭제 (하위 폴더는 상위 폴더로, 프롬프트는 폴더 없음으로 이동)
     
     Args:
         folder_id: 폴더 ID
@@ -0,0 +1,26 @@
+"""
+메트릭 API 라우터
+
+자동변환 확장 시간, 트리거 사용 횟수, API/저장소 지연 시간을
+Prometheus 텍스트 형식으로 노출합니다.
+여러 워커로 실행하면 모든 워커의 값을 합쳐 반환합니다 (backend.services.metrics.MetricsPublisher).
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from backend.services import metrics
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    메트릭 조회 (모든 워커 합계, 게이지는 워커별 pid 라벨)
+    
+    Returns:
+        PlainTextResponse: Prometheus 텍스트 노출 형식 (version 0.0.4)
+    """
+    return PlainTextResponse(
+        metrics.publisher.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -4,10 +4,16 @@
 프롬프트의 생성, 조회, 수정, 삭제를 처리합니다.
 JSON 파일 기반으로 동작합니다.
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from backend import storage
+from backend.changelog import CHANGE_SEQ_HEADER, changelog
+from backend.records import parse_timestamp
+from backend.routers.autotext import AutoTextConflict
+from backend.services import watcher_ipc
+from backend.services.response_cache import cached_json_response
+from backend.services.usage_stats import usage_stats
 
 router = APIRouter(prefix="/api/prompts", tags=["prompts"])
 
@@ -20,6 +26,7 @@ class PromptCreate(BaseModel):
     text: str = Field(..., min_length=1, description="프롬프트 내용")
     autotext: Optional[str] = Field(None, min_length=2, description="자동변환 텍스트 (예: @front)")
     folder_id: Optional[int] = Field(None, description="폴더 ID")
+    tags: List[str] = Field(default_factory=list, description="태그 목록")
 
 
 class PromptUpdate(BaseModel):
@@ -29,6 +36,7 @@ class PromptUpdate(BaseModel):
     autotext: Optional[str] = Field(None, min_length=2)
     folder_id: Optional[int] = None
     remove_autotext: bool = False
+    tags: Optional[List[str]] = Field(None, description="새 태그 목록 (빈 목록이면 모두 제거)")
 
 
 class AutoTextInfo(BaseModel):
@@ -37,7 +45,9 @@ class AutoTextInfo(BaseModel):
 
 
 class PromptResponse(BaseModel):
-    """프롬프트 응답 스키마"""
+    """프롬프트 응답 스키마 (저장소 레코드의 속성에서 직렬화)"""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     title: str
     text: str
@@ -45,61 +55,322 @@ class PromptResponse(BaseModel):
     created_at: str
     updated_at: str
     autotexts: List[AutoTextInfo] = []
+    tags: List[str] = []
+
+
+class PromptWriteResponse(PromptResponse):
+    """프롬프트 생성/수정 응답 (warnings: 이 프롬프트의 자동변환 텍스트가 관련된 트리거 충돌)"""
+    warnings: List[AutoTextConflict] = []
+
+
+class TagCount(BaseModel):
+    """태그별 프롬프트 수"""
+    tag: str
+    count: int
+
+
+class PromptSummary(BaseModel):
+    """유사 프롬프트 목록의 프롬프트 요약"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: str
+    title: str
+    folder_id: Optional[int]
+
+
+class SimilarPrompt(PromptSummary):
+    """비슷한 프롬프트 (similarity: 본문 shingle 집합의 추정 Jaccard 유사도)"""
+    similarity: float
+
+
+class RelatedPrompt(PromptSummary):
+    """관련 프롬프트 (score: 제목/본문 TF-IDF 벡터의 코사인 유사도)"""
+    score: float
+
+
+class RelatedQuery(BaseModel):
+    """편집 중인 내용으로 관련 프롬프트를 찾는 요청 스키마"""
+    title: str = ""
+    text: str
+    exclude_id: Optional[str] = None
+    limit: int = Field(10, ge=1, le=50)
+
+
+class PromptSuggestion(PromptSummary):
+    """입력 중 검색 결과 (distance: 검색어와의 편집 거리 합, match: 찾은 토큰 종류)"""
+    autotext: Optional[str]
+    distance: int
+    match: Literal['title', 'autotext']
+
+
+class DuplicateGroup(BaseModel):
+    """중복에 가까운 프롬프트 묶음 (similarity: 묶음 안에서 연결된 쌍의 최저 유사도)"""
+    prompts: List[PromptSummary]
+    similarity: float
+
+
+# 캐시 미스 시 response_model과 같은 방식으로 직렬화하기 위한 어댑터
+_PROMPT_LIST_ADAPTER = TypeAdapter(List[PromptResponse])
+_PROMPT_ADAPTER = TypeAdapter(PromptResponse)
+_TAG_COUNT_LIST_ADAPTER = TypeAdapter(List[TagCount])
+_SIMILAR_LIST_ADAPTER = TypeAdapter(List[SimilarPrompt])
+_DUPLICATE_GROUP_LIST_ADAPTER = TypeAdapter(List[DuplicateGroup])
+_RELATED_LIST_ADAPTER = TypeAdapter(List[RelatedPrompt])
+_SUGGESTION_LIST_ADAPTER = TypeAdapter(List[PromptSuggestion])
 
 
 # ============== API 엔드포인트 ==============
 
 @router.get("/", response_model=List[PromptResponse])
 def get_prompts(
-    folder_id: Optional[int] = Query(None, description="폴더 ID로 필터링")
+    request: Request,
+    folder_id: Optional[int] = Query(None, description="폴더 ID로 필터링"),
+    include_subfolders: bool = Query(False, description="folder_id의 하위 폴더 프롬프트도 포함"),
+    sort: Optional[Literal["usage", "created_at", "updated_at", "title"]] = Query(
+        None, description="정렬 기준 (usage: 사용 횟수 많은 순, 기본값은 저장 순서)"),
+    order: Optional[Literal["asc", "desc"]] = Query(
+        None, description="정렬 방향 (기본값: title은 asc, created_at/updated_at은 desc)"),
+    has_autotext: Optional[bool] = Query(None, description="자동변환 텍스트 유무로 필터링"),
+    updated_since: Optional[str] = Query(None, description="이 시각(ISO 8601) 이후 수정된 프롬프트만"),
+    title_prefix: Optional[str] = Query(None, min_length=1, description="제목 접두사 (대소문자 무시)"),
+    tag: Optional[List[str]] = Query(None, description="모두 있어야 하는 태그 (여러 번 지정 가능)"),
+    any_tag: Optional[List[str]] = Query(None, description="하나 이상 있어야 하는 태그"),
+    exclude_tag: Optional[List[str]] = Query(None, description="없어야 하는 태그"),
+    offset: int = Query(0, ge=0, description="건너뛸 개수"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="최대 개수 (기본값: 전부)")
 ):
     """
     프롬프트 목록 조회
     
+    저장소 세대가 바뀌지 않았으면 캐시된 응답을 그대로 반환하고,
+    If-None-Match가 현재 ETag와 같으면 304를 반환합니다.
+    X-Change-Seq 헤더는 이 목록에 반영된 변경 로그 seq입니다 (/api/changes 기준점).
+    
+    created_at/updated_at/title 정렬은 저장소의 정렬 인덱스에서 offset + limit개만 읽습니다.
+    태그 조건(예: tag=A&tag=B&exclude_tag=C)은 태그 비트맵 연산으로 처리합니다.
+    
     Args:
+        request: 요청 객체 (ETag 확인용)
         folder_id: 폴더 ID (선택사항)
+        include_subfolders: 하위 폴더 포함 여부
+        sort: 정렬 기준 (선택사항, 기본값은 저장 순서)
+        order: 정렬 방향 (선택사항)
+        has_autotext: 자동변환 텍스트 유무 (선택사항)
+        updated_since: 수정 시각 하한 (선택사항)
+        title_prefix: 제목 접두사 (선택사항)
+        tag: 모두 있어야 하는 태그 (선택사항)
+        any_tag: 하나 이상 있어야 하는 태그 (선택사항)
+        exclude_tag: 없어야 하는 태그 (선택사항)
+        offset: 건너뛸 개수
+        limit: 최대 개수 (선택사항)
     
     Returns:
         List[PromptResponse]: 프롬프트 목록
     """
-    prompts = storage.get_prompts(folder_id=folder_id)
+    if updated_since:
+        try:
+            parse_timestamp(updated_since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"updated_since는 ISO 8601 시각이어야 합니다: {updated_since}")
     
-    # autotexts 형식 변환
-    for prompt in prompts:
-        if 'autotext' in prompt:
-            prompt['autotexts'] = [{'trigger_text': prompt['autotext']}]
-        else:
-            prompt['autotexts'] = []
+    seq = changelog.current_seq()  # 목록보다 먼저 읽어야 이후 변경이 /api/changes에서 빠지지 않음
+    generation = storage.get_prompts_generation(folder_id, include_subfolders)
+    if sort == "usage":
+        generation = f"{generation}|usage:{usage_stats.generation}"
+    
+    filters = dict(folder_id=folder_id, include_subfolders=include_subfolders, has_autotext=has_autotext,
+                   updated_since=updated_since, title_prefix=title_prefix,
+                   tags_all=tag or (), tags_any=any_tag or (), tags_none=exclude_tag or ())
+    
+    def build():
+        if sort == "usage":
+            # 사용 기록이 있는 프롬프트를 순위대로, 나머지는 저장 순서대로
+            by_id = {prompt.id: prompt for prompt in storage.query_prompts(**filters)}
+            ranked = [by_id.pop(prompt_id) for prompt_id in usage_stats.ranking() if prompt_id in by_id]
+            prompts = ranked + list(by_id.values())
+            return prompts[offset:None if limit is None else offset + limit]
+        
+        descending = (order or ("asc" if sort == "title" else "desc")) == "desc"
+        return storage.query_prompts(sort, descending, offset=offset, limit=limit, **filters)
     
-    return prompts
+    response = cached_json_response(request, "prompts", generation, build, _PROMPT_LIST_ADAPTER)
+    response.headers[CHANGE_SEQ_HEADER] = str(seq)
+    return response
+
+
+@router.get("/tags", response_model=List[TagCount])
+def get_tag_counts(request: Request):
+    """
+    태그 목록과 태그별 프롬프트 수 조회 (사이드바용, 많은 순)
+    
+    개수는 저장소 인덱스가 수정 시 함께 유지하며, 저장소 세대가 같으면 캐시된 응답을 반환합니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+    
+    Returns:
+        List[TagCount]: 태그별 프롬프트 수
+    """
+    def build():
+        counts = storage.get_tag_counts()
+        return [{'tag': tag, 'count': count}
+                for tag, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+    
+    return cached_json_response(request, "prompt-tags", storage.get_generation(), build, _TAG_COUNT_LIST_ADAPTER)
+
+
+def _summary(prompt) -> dict:
+    return {'id': prompt.id, 'title': prompt.title, 'folder_id': prompt.folder_id}
+
+
+@router.get("/suggest", response_model=List[PromptSuggestion])
+def suggest_prompts(request: Request, q: str = Query(..., max_length=200), limit: int = Query(10, ge=1, le=50)):
+    """
+    입력 중인 검색어로 프롬프트 제안 (검색창 자동완성)
+    
+    제목 단어와 자동변환 텍스트의 앞부분을 비교하며, 단어마다 편집 거리 1
+    (8자 이상이면 2)까지의 오타를 허용합니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+        q: 검색어 (공백으로 나눈 모든 단어가 맞아야 함)
+        limit: 최대 개수
+    
+    Returns:
+        List[PromptSuggestion]: 오타가 적은 순, 같으면 자동변환 텍스트로 찾은 것 먼저
+    """
+    def build():
+        return [dict(_summary(prompt), autotext=prompt.autotext, distance=distance,
+                     match='autotext' if by_trigger else 'title')
+                for prompt, distance, by_trigger in storage.suggest_prompts(q, limit)]
+    
+    return cached_json_response(request, "prompt-suggest", storage.get_generation(), build,
+                                _SUGGESTION_LIST_ADAPTER)
+
+
+@router.get("/duplicates", response_model=List[DuplicateGroup])
+def get_duplicate_prompts(request: Request, threshold: float = Query(0.8, ge=0.0, le=1.0)):
+    """
+    본문이 거의 같은 프롬프트 묶음 조회 (라이브러리 정리 보고서)
+    
+    MinHash 서명의 LSH 밴드가 겹치는 쌍만 비교하므로 전체 쌍을 비교하지 않습니다.
+    
+    Args:
+        request: 요청 객체 (ETag 확인용)
+        threshold: 같은 묶음으로 연결할 최소 유사도 (0~1)
+    
+    Returns:
+        List[DuplicateGroup]: 큰 묶음 먼저
+    """
+    def build():
+        return [{'prompts': [_summary(prompt) for prompt in prompts], 'similarity': similarity}
+                for prompts, similarity in storage.find_duplicate_groups(threshold)]
+    
+    return cached_json_response(request, "prompt-duplicates", storage.get_generation(), build,
+                                _DUPLICATE_GROUP_LIST_ADAPTER)
+
+
+@router.get("/{prompt_id}/similar", response_model=List[SimilarPrompt])
+def get_similar_prompts(prompt_id: str, request: Request,
+                        threshold: float = Query(0.5, ge=0.0, le=1.0),
+                        limit: int = Query(10, ge=1, le=100)):
+    """
+    본문이 비슷한 프롬프트 조회 (유사도 높은 순)
+    
+    Args:
+        prompt_id: 기준 프롬프트 ID
+        request: 요청 객체 (ETag 확인용)
+        threshold: 최소 유사도 (0~1)
+        limit: 최대 개수
+    
+    Returns:
+        List[SimilarPrompt]: 비슷한 프롬프트 목록
+    """
+    def build():
+        similar = storage.find_similar_prompts(prompt_id, threshold, limit)
+        if similar is None:
+            return None
+        return [dict(_summary(prompt), similarity=similarity) for prompt, similarity in similar]
+    
+    response = cached_json_response(request, "prompt-similar", storage.get_generation(), build,
+                                    _SIMILAR_LIST_ADAPTER)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
+    
+    return response
+
+
+@router.post("/related", response_model=List[RelatedPrompt])
+def find_related_prompts(query: RelatedQuery):
+    """
+    편집 중인 제목/본문과 관련된 프롬프트 조회 (저장 전 내용도 가능)
+    
+    Args:
+        query: 제목, 본문, 제외할 프롬프트 ID, 최대 개수
+    
+    Returns:
+        List[RelatedPrompt]: 유사도 높은 순
+    """
+    related = storage.find_related_prompts(query.title, query.text, query.exclude_id, query.limit)
+    return [dict(_summary(prompt), score=score) for prompt, score in related]
+
+
+@router.get("/{prompt_id}/related", response_model=List[RelatedPrompt])
+def get_related_prompts(prompt_id: str, request: Request, limit: int = Query(10, ge=1, le=50)):
+    """
+    저장된 프롬프트와 관련된 프롬프트 조회 (유사도 높은 순)
+    
+    Args:
+        prompt_id: 기준 프롬프트 ID
+        request: 요청 객체 (ETag 확인용)
+        limit: 최대 개수
+    
+    Returns:
+        List[RelatedPrompt]: 관련 프롬프트 목록
+    """
+    def build():
+        related = storage.find_related_to_prompt(prompt_id, limit)
+        if related is None:
+            return None
+        return [dict(_summary(prompt), score=score) for prompt, score in related]
+    
+    response = cached_json_response(request, "prompt-related", storage.get_generation(), build,
+                                    _RELATED_LIST_ADAPTER)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
+    
+    return response
 
 
 @router.get("/{prompt_id}", response_model=PromptResponse)
-def get_prompt(prompt_id: str):
+def get_prompt(prompt_id: str, request: Request):
     """
     특정 프롬프트 조회
     
     Args:
         prompt_id: 프롬프트 ID
+        request: 요청 객체 (ETag 확인용)
     
     Returns:
         PromptResponse: 프롬프트 정보
     """
-    prompt = storage.get_prompt_by_id(prompt_id)
-    
-    if not prompt:
+    response = cached_json_response(request, "prompt", storage.get_generation(),
+                                    lambda: storage.get_prompt_by_id(prompt_id), _PROMPT_ADAPTER)
+    if response is None:
         raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
     
-    # autotexts 형식 변환
-    if 'autotext' in prompt:
-        prompt['autotexts'] = [{'trigger_text': prompt['autotext']}]
-    else:
-        prompt['autotexts'] = []
-    
-    return prompt
+    return response
+
+
+def _write_response(prompt) -> PromptWriteResponse:
+    response = PromptWriteResponse.model_validate(prompt)
+    if prompt.autotext:
+        response.warnings = [AutoTextConflict(**conflict._asdict())
+                             for conflict in storage.find_trigger_conflicts(prompt.autotext)]
+    return response
 
 
-@router.post("/", response_model=PromptResponse, status_code=201)
+@router.post("/", response_model=PromptWriteResponse, status_code=201)
 def create_prompt(prompt_data: PromptCreate):
     """
     새 프롬프트 생성
@@ -108,38 +379,27 @@ def create_prompt(prompt_data: PromptCreate):
         prompt_data: 프롬프트 생성 데이터
     
     Returns:
-        PromptResponse: 생성된 프롬프트 정보
+        PromptWriteResponse: 생성된 프롬프트 정보 (자동변환 텍스트가 다른 트리거와 겹치면 warnings 포함)
     """
     try:
         prompt = storage.create_prompt(
             title=prompt_data.title,
             text=prompt_data.text,
             autotext=prompt_data.autotext,
-            folder_id=prompt_data.folder_id
+            folder_id=prompt_data.folder_id,
+            tags=prompt_data.tags
         )
         
-        # autotexts 형식 변환
-        if 'autotext' in prompt:
-            prompt['autotexts'] = [{'trigger_text': prompt['autotext']}]
-        else:
-            prompt['autotexts'] = []
-        
-        # 자동변환 텍스트 딕셔너리 업데이트 트리거
-        try:
-            from backend.main import get_watcher
-            watcher = get_watcher()
-            if watcher:
-                watcher.trigger_update()
-        except Exception:
-            pass  # watcher가 없거나 아직 초기화되지 않은 경우 무시
+        # 자동변환 텍스트 딕셔너리 업데이트 트리거 (watcher가 다른 워커 프로세스에 있어도 전달)
+        watcher_ipc.notify_update()
         
-        return prompt
+        return _write_response(prompt)
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.put("/{prompt_id}", response_model=PromptResponse)
+@router.put("/{prompt_id}", response_model=PromptWriteResponse)
 def update_prompt(prompt_id: str, prompt_data: PromptUpdate):
     """
     프롬프트 수정
@@ -149,7 +409,7 @@ def update_prompt(prompt_id: str, prompt_data: PromptUpdate):
         prompt_data: 프롬프트 수정 데이터
     
     Returns:
-        PromptResponse: 수정된 프롬프트 정보
+        PromptWriteResponse: 수정된 프롬프트 정보 (자동변환 텍스트가 다른 트리거와 겹치면 warnings 포함)
     """
     try:
         prompt = storage.update_prompt(
@@ -158,28 +418,17 @@ def update_prompt(prompt_id: str, prompt_data: PromptUpdate):
             text=prompt_data.text,
             autotext=prompt_data.autotext,
             folder_id=prompt_data.folder_id,
-            remove_autotext=prompt_data.remove_autotext
+            remove_autotext=prompt_data.remove_autotext,
+            tags=prompt_data.tags
         )
         
         if not prompt:
             raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
         
-        # autotexts 형식 변환
-        if 'autotext' in prompt:
-            prompt['autotexts'] = [{'trigger_text': prompt['autotext']}]
-        else:
-            prompt['autotexts'] = []
+        # 자동변환 텍스트 딕셔너리 업데이트 트리거 (watcher가 다른 워커 프로세스에 있어도 전달)
+        watcher_ipc.notify_update()
         
-        # 자동변환 텍스트 딕셔너리 업데이트 트리거
-        try:
-            from backend.main import get_watcher
-            watcher = get_watcher()
-            if watcher:
-                watcher.trigger_update()
-        except Exception:
-            pass  # watcher가 없거나 아직 초기화되지 않은 경우 무시
-        
-        return prompt
+        return _write_response(prompt)
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -193,19 +442,36 @@ def delete_prompt(prompt_id: str):
     Args:
         prompt_id: 프롬프트 ID
     """
-    success = storage.delete_prompt(prompt_id)
+    try:
+        success = storage.delete_prompt(prompt_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not success:
         raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
     
-    # 자동변환 텍스트 딕셔너리 업데이트 트리거
-    try:
-        from backend.main import get_watcher
-        watcher = get_watcher()
-        if watcher:
-            watcher.trigger_update()
-    except Exception:
-        pass  # watcher가 없거나 아직 초기화되지 않은 경우 무시
+    usage_stats.remove(prompt_id)
+    
+    # 자동변환 텍스트 딕셔너리 업데이트 트리거 (watcher가 다른 워커 프로세스에 있어도 전달)
+    watcher_ipc.notify_update()
     
     return None
 
+
+
+@router.post("/{prompt_id}/copy", status_code=204)
+def record_prompt_copy(prompt_id: str):
+    """
+    프롬프트 복사 기록
+    
+    프론트엔드에서 프롬프트를 클립보드에 복사할 때 호출합니다.
+    사용 횟수는 메모리에 집계되었다가 주기적으로 통계 파일에 기록됩니다.
+    
+    Args:
+        prompt_id: 프롬프트 ID
+    """
+    if not storage.get_prompt_by_id(prompt_id):
+        raise HTTPException(status_code=404, detail=f"프롬프트 ID {prompt_id}를 찾을 수 없습니다.")
+    
+    usage_stats.record(prompt_id, 'copy')
+    return None
@@ -6,10 +6,21 @@ ppop_promt의 GlobalAutoTextWatcher 로직을 기반으로 합니다.
 """
 import keyboard
 import pyperclip
+import sys
 import threading
 import time
 import requests
-from typing import Dict
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.services import metrics, tracing, watcher_ipc
+from backend.services.template import CompiledTemplate, compile_template
+from backend.services.text_cache import ReplacementTextCache
+from backend.services.usage_stats import usage_stats
+
+# 입력 버퍼 최대 길이 (초과 시 앞부분을 잘라 메모리 사용량을 일정하게 유지)
+TYPED_BUFFER_SIZE = 256
+
+# API에서 프롬프트 본문을 가져올 때의 타임아웃 (초, 같은 기기의 서버이므로 짧게)
+TEXT_FETCH_TIMEOUT = 0.5
 
 
 class AutoTextWatcher:
@@ -18,24 +29,51 @@ class AutoTextWatcher:
     
     키보드 입력을 모니터링하여 트리거 텍스트를 감지하고
     해당하는 프롬프트 텍스트로 자동 변환합니다.
+    
+    메모리에는 트리거 → (프롬프트 ID, 버전) 매핑만 유지하며,
+    프롬프트 본문은 트리거 목록을 받은 뒤 캐시 크기 한도까지 미리 로드하고,
+    캐시에 없으면 확장 시점에 가져와 크기 제한 LRU 캐시에 보관합니다.
+    
+    API 서버 안에서 실행되면(text_loader 지정) 저장소에서 바로 읽으므로 키보드 후크 스레드에서 로드하고,
+    독립 실행 시에는 후크 스레드를 막지 않도록 별도 스레드에서 API로 가져온 뒤 붙여넣습니다.
+    
+    트리거 목록 갱신은 update_lock으로 직렬화하고, 변경 알림은 업데이트 스레드 하나가
+    dirty 플래그로 모아 처리하므로 갱신 요청끼리 trigger_map/changes_seq를 덮어쓰지 않습니다.
     """
     
-    def __init__(self, api_url: str = "http://127.0.0.1:8000", debug: bool = False):
+    def __init__(self, api_url: str = "http://127.0.0.1:8000", debug: bool = False,
+                 cache_max_bytes: int = 1024 * 1024, prefetch_count: int = 20,
+                 text_loader: Optional[Callable[[str], Optional[str]]] = None):
         """
         AutoTextWatcher 초기화
         
         Args:
             api_url: FastAPI 서버 URL
             debug: 디버그 모드 활성화 여부
+            cache_max_bytes: 본문 캐시의 최대 바이트 크기
+            prefetch_count: 본문을 미리 로드할 때 가장 먼저 로드할 자주 쓰는 트리거 개수 (0이면 미리 로드하지 않음)
+            text_loader: 같은 프로세스의 저장소에서 본문을 읽는 함수 (None이면 API에서 가져옴)
         """
         self.api_url = api_url
-        self.autotext_dict: Dict[str, str] = {}
-        self.previous_dict: Dict[str, str] = {}  # 이전 딕셔너리 저장 (변경 감지용)
+        self.trigger_map: Dict[str, Tuple[str, str]] = {}  # {trigger: (prompt_id, updated_at)}
+        self.trigger_lengths: List[int] = []  # 트리거 길이 목록 (내림차순, 가장 긴 매칭 우선)
+        # 본문은 캐시에 들어갈 때 한 번만 템플릿으로 컴파일됨
+        self.text_cache = ReplacementTextCache(
+            text_loader or self._fetch_prompt_text, max_bytes=cache_max_bytes, transform=compile_template)
+        self.loads_inline = text_loader is not None  # 캐시에 없는 본문을 후크 스레드에서 바로 로드할지 여부
+        self.prefetch_count = prefetch_count
         self.typed = ""
         self.running = False
         self.lock = threading.Lock()
         self.thread: threading.Thread = None
         self.debug = debug  # 디버그 모드
+        self.paste_delay = 0.1  # 클립보드 복사 후 붙여넣기까지 대기 시간 (초)
+        self.triggers_etag: Optional[str] = None  # 마지막으로 받은 트리거 목록의 ETag
+        self.changes_seq: Optional[int] = None  # 트리거 매핑에 반영된 변경 로그 seq (/api/changes 기준점)
+        self.update_lock = threading.Lock()  # 트리거 목록 갱신 직렬화 (update_dict_from_api)
+        self._update_state = threading.Lock()  # _update_pending/_update_thread 보호
+        self._update_pending = False  # 처리하지 않은 변경 알림 여부 (dirty 플래그)
+        self._update_thread: Optional[threading.Thread] = None
     
     def start(self):
         """자동변환 감지 서비스 시작"""
@@ -59,7 +97,7 @@ class AutoTextWatcher:
         if self.thread:
             self.thread.join(timeout=1)
     
-    def _compare_dicts(self, old_dict: Dict[str, str], new_dict: Dict[str, str]) -> dict:
+    def _compare_dicts(self, old_dict: Dict[str, Tuple[str, str]], new_dict: Dict[str, Tuple[str, str]]) -> dict:
         """
         두 딕셔너리를 비교하여 변경사항을 반환합니다.
         
@@ -89,56 +127,224 @@ class AutoTextWatcher:
             'total_new': len(new_dict)
         }
     
+    def _fetch_prompt_text(self, prompt_id: str) -> Optional[str]:
+        """
+        API에서 프롬프트 본문을 가져옵니다. (본문 캐시의 loader)
+        
+        Args:
+            prompt_id: 프롬프트 ID
+        
+        Returns:
+            Optional[str]: 프롬프트 본문 또는 None
+        """
+        try:
+            with tracing.span('http.client', route='/api/prompts/{prompt_id}'):
+                response = requests.get(f"{self.api_url}/api/prompts/{prompt_id}",
+                                        headers=tracing.inject(), timeout=TEXT_FETCH_TIMEOUT)
+            if response.status_code == 200:
+                return response.json().get('text', '')
+            if self.debug:
+                print(f"[ERROR] 프롬프트 본문 조회 실패: HTTP {response.status_code} ({prompt_id})")
+        except Exception as e:
+            if self.debug:
+                print(f"[ERROR] 프롬프트 본문 조회 실패: {e}")
+        return None
+    
+    def set_triggers(self, new_map: Dict[str, Tuple[str, str]]) -> dict:
+        """
+        트리거 매핑을 교체하고 변경된 프롬프트의 캐시를 무효화합니다.
+        
+        Args:
+            new_map: {trigger: (prompt_id, updated_at)} 형식의 새 매핑
+        
+        Returns:
+            dict: 변경사항 정보 (_compare_dicts 결과)
+        """
+        with self.lock:
+            old_map = self.trigger_map
+            changes = self._compare_dicts(old_map, new_map)
+            self.trigger_map = new_map
+            self.trigger_lengths = sorted({len(trigger) for trigger in new_map}, reverse=True)
+        
+        # 삭제되었거나 수정된 프롬프트의 본문은 캐시에서 제거
+        self.text_cache.retain(prompt_id for prompt_id, _ in new_map.values())
+        self.text_cache.invalidate(old_map[trigger][0] for trigger in changes['modified'])
+        return changes
+    
+    def prefetch_texts(self):
+        """
+        트리거 본문을 캐시 크기 한도까지 미리 로드합니다.
+        
+        이번 실행에서 자주 쓴 트리거 → 저장된 사용 통계 순위 → 나머지 트리거 순서로 로드하므로,
+        캐시에 모두 들어가면 확장할 때 본문을 기다리지 않습니다.
+        """
+        if self.prefetch_count <= 0:
+            return
+        
+        with self.lock:
+            versions = {prompt_id: version for prompt_id, version in self.trigger_map.values()}
+        
+        ordered = self.text_cache.hot_ids(self.prefetch_count) + usage_stats.ranking() + list(versions)
+        items = []
+        seen = set()
+        for prompt_id in ordered:
+            if prompt_id in versions and prompt_id not in seen:
+                seen.add(prompt_id)
+                items.append((prompt_id, versions[prompt_id]))
+        self.text_cache.prefetch(items)
+    
+    def _match_trigger(self, typed: str) -> Optional[str]:
+        """
+        입력 버퍼 끝에서 일치하는 트리거를 찾습니다. (가장 긴 매칭 우선)
+        
+        트리거 길이별로 버퍼 끝부분을 잘라 딕셔너리에서 조회하므로
+        트리거 개수가 아니라 서로 다른 트리거 길이 수에 비례하는 비용이 듭니다.
+        
+        Args:
+            typed: 현재까지 입력된 문자열
+        
+        Returns:
+            Optional[str]: 일치한 트리거 또는 None
+        """
+        for length in self.trigger_lengths:
+            if length > len(typed):
+                continue
+            candidate = typed[-length:]
+            if candidate in self.trigger_map:
+                return candidate
+        return None
+    
+    def update_from_changes(self) -> bool:
+        """
+        마지막 seq 이후 변경분만 받아 트리거 매핑에 적용합니다.
+        
+        Returns:
+            bool: 적용 여부 (기준 seq가 없거나 재동기화가 필요하거나 요청이 실패하면 False)
+        """
+        since = self.changes_seq
+        if since is None:
+            return False
+        
+        try:
+            with tracing.span('autotext.update_changes', since=since) as span:
+                response = requests.get(f"{self.api_url}/api/changes", params={'since': since},
+                                        headers=tracing.inject(), timeout=3)
+                if span:
+                    span.set_attribute('status', response.status_code)
+            if response.status_code != 200:
+                return False
+            data = response.json()
+        except Exception as e:
+            if self.debug:
+                print(f"[ERROR] 변경 사항 조회 실패: {e}")
+            return False
+        
+        if data.get('resync_required'):
+            if self.debug:
+                print("[DEBUG] 변경 로그 범위를 벗어나 전체 트리거 목록을 다시 받습니다.")
+            return False
+        
+        # 이미 반영한 seq 이하의 응답은 새 변경이 없으므로 무시
+        if data['seq'] <= since:
+            return True
+        
+        prompts = data.get('prompts', [])
+        changed_ids = {prompt['id'] for prompt in prompts} | set(data.get('deleted_prompts', []))
+        if changed_ids:
+            # 바뀐 프롬프트의 기존 트리거를 지우고 최신 트리거를 다시 추가
+            with self.lock:
+                new_map = {trigger: value for trigger, value in self.trigger_map.items()
+                           if value[0] not in changed_ids}
+            for prompt in prompts:
+                for autotext in prompt.get('autotexts', []):
+                    new_map[autotext['trigger_text']] = (prompt['id'], prompt.get('updated_at', ''))
+            changes = self.set_triggers(new_map)
+            if self.debug:
+                print(f"✅ 변경분 적용: 프롬프트 {len(changed_ids)}개, "
+                      f"트리거 +{len(changes['added'])} -{len(changes['removed'])} ~{len(changes['modified'])}")
+        
+        self.changes_seq = data['seq']
+        
+        # 바뀐 프롬프트의 본문 다시 로드
+        if changed_ids:
+            self.prefetch_texts()
+        return True
+    
     def update_dict_from_api(self, is_initial: bool = False):
         """
-        API에서 자동변환 텍스트 딕셔너리 업데이트
+        API에서 자동변환 트리거 목록 업데이트
+        
+        기준 seq가 있으면 변경분만 받고, 없거나 재동기화가 필요하면 전체 목록을 받습니다.
+        update_lock을 잡고 실행하므로 동시에 호출되어도 한 번에 하나씩 적용됩니다.
         
         Args:
             is_initial: 초기 로드 여부 (항상 로그 출력)
         """
+        with self.update_lock:
+            self._update_dict_from_api(is_initial)
+    
+    def _update_dict_from_api(self, is_initial: bool):
+        if not is_initial and self.update_from_changes():
+            return
+        
         max_retries = 5
         retry_delay = 1
         
         if self.debug:
-            print(f"[DEBUG] 딕셔너리 업데이트 시작: {self.api_url}/api/autotexts/dict")
+            print(f"[DEBUG] 딕셔너리 업데이트 시작: {self.api_url}/api/autotexts/triggers")
         
         for attempt in range(max_retries):
             try:
                 start_time = time.time()
-                response = requests.get(f"{self.api_url}/api/autotexts/dict", timeout=3)
+                # 트리거 목록이 바뀌지 않았으면 서버가 본문 없이 304를 반환
+                headers = {'If-None-Match': self.triggers_etag} if self.triggers_etag else {}
+                with tracing.span('autotext.update_triggers', attempt=attempt) as span:
+                    response = requests.get(f"{self.api_url}/api/autotexts/triggers",
+                                            headers=tracing.inject(headers), timeout=3)
+                    if span:
+                        span.set_attribute('status', response.status_code)
                 elapsed_time = (time.time() - start_time) * 1000  # 밀리초
                 
+                if response.status_code in (200, 304):
+                    seq = response.headers.get('X-Change-Seq')
+                    self.changes_seq = int(seq) if seq and seq.isdigit() else None
+                
+                if response.status_code == 304:
+                    if self.debug:
+                        print(f"[DEBUG] 트리거 목록 변경 없음 (304, 응답 시간: {elapsed_time:.1f}ms)")
+                    return
+                
                 if response.status_code == 200:
-                    new_dict = response.json()
+                    self.triggers_etag = response.headers.get('ETag')
+                    new_dict = {
+                        trigger: (info['prompt_id'], info.get('updated_at', ''))
+                        for trigger, info in response.json().items()
+                    }
                     
-                    with self.lock:
-                        # 이전 딕셔너리와 비교
-                        changes = self._compare_dicts(self.previous_dict, new_dict)
-                        
-                        # 딕셔너리 업데이트
-                        self.previous_dict = self.autotext_dict.copy()
-                        self.autotext_dict = new_dict
+                    changes = self.set_triggers(new_dict)
+                    
+                    # 디버그 모드에서만 로그 출력
+                    if self.debug:
+                        has_changes = (len(changes['added']) > 0 or 
+                                     len(changes['removed']) > 0 or 
+                                     len(changes['modified']) > 0)
                         
-                        # 디버그 모드에서만 로그 출력
-                        if self.debug:
-                            has_changes = (len(changes['added']) > 0 or 
-                                         len(changes['removed']) > 0 or 
-                                         len(changes['modified']) > 0)
+                        if is_initial or has_changes:
+                            print(f"✅ 자동변환 텍스트 딕셔너리 업데이트 완료: {len(new_dict)}개 트리거 (응답 시간: {elapsed_time:.1f}ms)")
                             
-                            if is_initial or has_changes:
-                                print(f"✅ 자동변환 텍스트 딕셔너리 업데이트 완료: {len(new_dict)}개 트리거 (응답 시간: {elapsed_time:.1f}ms)")
-                                
-                                if has_changes and not is_initial:
-                                    if changes['added']:
-                                        print(f"   ➕ 추가됨: {list(changes['added'])}")
-                                    if changes['removed']:
-                                        print(f"   ➖ 제거됨: {list(changes['removed'])}")
-                                    if changes['modified']:
-                                        print(f"   🔄 수정됨: {list(changes['modified'])}")
-                                
-                                if len(new_dict) > 0:
-                                    print(f"   트리거 목록: {list(new_dict.keys())}")
-                    
+                            if has_changes and not is_initial:
+                                if changes['added']:
+                                    print(f"   ➕ 추가됨: {list(changes['added'])}")
+                                if changes['removed']:
+                                    print(f"   ➖ 제거됨: {list(changes['removed'])}")
+                                if changes['modified']:
+                                    print(f"   🔄 수정됨: {list(changes['modified'])}")
+                            
+                            if len(new_dict) > 0:
+                                print(f"   트리거 목록: {list(new_dict.keys())}")
+                
+                    # 트리거 본문 미리 로드 (캐시 크기 한도까지)
+                    self.prefetch_texts()
                     return
                 else:
                     if self.debug:
@@ -168,59 +374,176 @@ class AutoTextWatcher:
         print("[DEBUG] 딕셔너리 업데이트 트리거됨 (프롬프트 변경 감지)")
         
         # 별도 스레드에서 업데이트 실행 (블로킹 방지)
-        update_thread = threading.Thread(target=self.update_dict_from_api, args=(False,), daemon=True)
-        update_thread.start()
-    
-    def _watch(self):
-        """키보드 입력 감지 및 처리 (ppop_promt의 GlobalAutoTextWatcher 로직 기반)"""
-        def on_key(e):
-            if not self.running:
+        # 업데이트 중에 들어온 알림은 dirty 플래그만 세우고, 실행 중인 스레드가 끝난 뒤 한 번 더 갱신
+        with self._update_state:
+            self._update_pending = True
+            if self._update_thread is not None:
                 return
+            self._update_thread = threading.Thread(target=self._run_updates, daemon=True)
+            self._update_thread.start()
+    
+    def _run_updates(self):
+        """변경 알림이 남아 있는 동안 트리거 목록 갱신 (trigger_update의 업데이트 스레드)"""
+        while True:
+            with self._update_state:
+                if not self._update_pending or not self.running:
+                    self._update_thread = None
+                    return
+                self._update_pending = False
+            try:
+                self.update_dict_from_api(is_initial=False)
+            except Exception as ex:
+                print(f"트리거 목록 갱신 오류: {ex}")
+    
+    def _expand(self, trigger: str, template: CompiledTemplate):
+        """
+        입력된 트리거를 지우고 프롬프트 텍스트를 붙여넣습니다.
+        
+        Args:
+            trigger: 일치한 트리거 텍스트
+            template: 붙여넣을 프롬프트의 컴파일된 템플릿
+        """
+        # 템플릿 렌더링 (플레이스홀더가 없으면 원문 그대로)
+        phase_started = time.perf_counter()
+        replacement, chars_after_cursor = template.render(clipboard=pyperclip.paste)
+        now = time.perf_counter()
+        metrics.AUTOTEXT_EXPANSION_SECONDS.observe(now - phase_started, phase='render')
+        
+        # 트리거 텍스트 삭제
+        phase_started = now
+        for _ in range(len(trigger)):
+            keyboard.send('backspace')
+        now = time.perf_counter()
+        metrics.AUTOTEXT_EXPANSION_SECONDS.observe(now - phase_started, phase='backspace')
+        
+        # 프롬프트 텍스트를 클립보드에 복사 (복사 후 대기 시간 포함)
+        phase_started = now
+        pyperclip.copy(replacement)
+        time.sleep(self.paste_delay)  # 클립보드 복사 대기 시간
+        now = time.perf_counter()
+        metrics.AUTOTEXT_EXPANSION_SECONDS.observe(now - phase_started, phase='clipboard')
+        
+        # 프롬프트 텍스트 붙여넣기
+        phase_started = now
+        keyboard.send('ctrl+v')
+        # {cursor} 위치로 커서 이동
+        for _ in range(chars_after_cursor):
+            keyboard.send('left')
+        metrics.AUTOTEXT_EXPANSION_SECONDS.observe(time.perf_counter() - phase_started, phase='paste')
+    
+    def _expand_matched(self, e, trigger: str, match_started: float,
+                        template: Optional[CompiledTemplate] = None):
+        """
+        일치한 트리거의 본문을 불러와 확장합니다. (키 입력 → 본문 로드 → 붙여넣기 span 기록)
+        
+        self.lock을 잡은 상태로 호출됩니다. 본문을 API에서 가져와야 하면 후크 스레드를 막지 않도록
+        별도 스레드에서 가져온 뒤 _load_and_expand가 다시 호출합니다.
+        
+        Args:
+            e: 트리거를 완성한 keyboard 이벤트
+            trigger: 일치한 트리거 텍스트
+            match_started: 매칭 시작 시각 (perf_counter)
+            template: 이미 로드한 본문 (None이면 캐시에서 조회)
+        """
+        prompt_id, version = self.trigger_map[trigger]
+        with tracing.span('autotext.expand', prompt_id=prompt_id) as span:
+            event_time = getattr(e, 'time', None)
+            if span and event_time:
+                # 키 이벤트 발생부터 후크 콜백 처리까지의 지연
+                span.set_attribute('hook_delay_ms', round((span.start - event_time) * 1000, 3))
+            
+            if template is None:
+                with tracing.span('autotext.load_text', cached=prompt_id in self.text_cache):
+                    template = self.text_cache.get(prompt_id, version, load=self.loads_inline)
+                if template is None:
+                    if not self.loads_inline:
+                        threading.Thread(target=self._load_and_expand, daemon=True,
+                                         args=(e, trigger, prompt_id, version, match_started)).start()
+                    return
             
+            metrics.AUTOTEXT_EXPANSION_SECONDS.observe(
+                time.perf_counter() - match_started, phase='match')
+            with tracing.span('autotext.paste', length=len(template.text)):
+                self._expand(trigger, template)
+            self.typed = self.typed[:-len(trigger)]
+            metrics.AUTOTEXT_EXPANSION_SECONDS.observe(
+                time.perf_counter() - match_started, phase='total')
+            metrics.AUTOTEXT_TRIGGER_HITS.inc(trigger=trigger)
+            usage_stats.record(prompt_id, 'autotext')
+    
+    def _load_and_expand(self, e, trigger: str, prompt_id: str, version: str, match_started: float):
+        """
+        캐시에 없던 본문을 API에서 가져와 확장합니다. (후크 스레드 밖에서 실행)
+        
+        가져오는 동안 다른 키를 입력했거나 트리거가 바뀌었으면 붙여넣지 않습니다.
+        
+        Args:
+            e: 트리거를 완성한 keyboard 이벤트
+            trigger: 일치한 트리거 텍스트
+            prompt_id: 프롬프트 ID
+            version: 프롬프트 버전 (updated_at)
+            match_started: 매칭 시작 시각 (perf_counter)
+        """
+        with tracing.span('autotext.load_text', cached=False):
+            template = self.text_cache.load(prompt_id, version)
+        if template is None:
+            return
+        
+        with self.lock:
+            if (not self.running or not self.typed.endswith(trigger)
+                    or self.trigger_map.get(trigger) != (prompt_id, version)):
+                return
             try:
-                if e.event_type == 'down' and e.name is not None:
-                    with self.lock:
-                        if len(e.name) == 1 and e.name.isprintable():
-                            # 일반 문자 입력
-                            self.typed += e.name
-                            # 트리거 텍스트 확인 (가장 긴 매칭 우선)
-                            matched_trigger = None
-                            matched_replacement = None
-                            for trigger, replacement in self.autotext_dict.items():
-                                if self.typed.endswith(trigger):
-                                    if matched_trigger is None or len(trigger) > len(matched_trigger):
-                                        matched_trigger = trigger
-                                        matched_replacement = replacement
-                            
-                            if matched_trigger:
-                                # 트리거 텍스트 삭제
-                                for _ in range(len(matched_trigger)):
-                                    keyboard.send('backspace')
-                                # 프롬프트 텍스트 붙여넣기
-                                pyperclip.copy(matched_replacement)
-                                time.sleep(0.1)  # 클립보드 복사 대기 시간 증가
-                                keyboard.send('ctrl+v')
-                                self.typed = self.typed[:-len(matched_trigger)]
-                        elif e.name == 'space':
-                            self.typed += ' '
-                        elif e.name == 'backspace':
-                            self.typed = self.typed[:-1] if len(self.typed) > 0 else ""
-                        elif e.name == 'enter':
-                            self.typed = ""
-                        elif e.name in ['tab', 'shift', 'ctrl', 'alt', 'caps lock', 'esc']:
-                            # 특수 키는 무시
-                            pass
-                        else:
-                            # 기타 키 입력 시 typed 초기화 (트리거 매칭 실패)
-                            if len(self.typed) > 100:  # 너무 길어지면 초기화
-                                self.typed = ""
+                self._expand_matched(e, trigger, match_started, template)
             except Exception as ex:
-                print(f"키보드 이벤트 처리 오류: {ex}")
+                print(f"자동변환 텍스트 확장 오류: {ex}")
                 self.typed = ""
+    
+    def on_key(self, e):
+        """
+        키보드 이벤트 처리 (키보드 후크 콜백)
+        
+        Args:
+            e: keyboard 이벤트 (event_type, name 속성 사용)
+        """
+        if not self.running:
+            return
         
+        try:
+            if e.event_type == 'down' and e.name is not None:
+                with self.lock:
+                    if len(e.name) == 1 and e.name.isprintable():
+                        # 일반 문자 입력
+                        self.typed += e.name
+                        if len(self.typed) > TYPED_BUFFER_SIZE * 2:
+                            self.typed = self.typed[-TYPED_BUFFER_SIZE:]
+                        # 트리거 텍스트 확인 (가장 긴 매칭 우선)
+                        match_started = time.perf_counter()
+                        matched_trigger = self._match_trigger(self.typed)
+                        if matched_trigger:
+                            self._expand_matched(e, matched_trigger, match_started)
+                    elif e.name == 'space':
+                        self.typed += ' '
+                    elif e.name == 'backspace':
+                        self.typed = self.typed[:-1] if len(self.typed) > 0 else ""
+                    elif e.name == 'enter':
+                        self.typed = ""
+                    elif e.name in ['tab', 'shift', 'ctrl', 'alt', 'caps lock', 'esc']:
+                        # 특수 키는 무시
+                        pass
+                    else:
+                        # 기타 키 입력 시 typed 초기화 (트리거 매칭 실패)
+                        if len(self.typed) > 100:  # 너무 길어지면 초기화
+                            self.typed = ""
+        except Exception as ex:
+            print(f"키보드 이벤트 처리 오류: {ex}")
+            self.typed = ""
+    
+    def _watch(self):
+        """키보드 입력 감지 및 처리 (ppop_promt의 GlobalAutoTextWatcher 로직 기반)"""
         try:
             print("키보드 후크 등록 중...")
-            keyboard.hook(on_key)
+            keyboard.hook(self.on_key)
             print("✅ 키보드 후크 등록 완료. 키보드 입력 감지 시작.")
             print("💡 다른 애플리케이션에서 트리거 텍스트를 입력하면 자동으로 변환됩니다.")
             keyboard.wait()
@@ -234,32 +557,50 @@ class AutoTextWatcher:
             print("⚠️  참고: Windows에서 키보드 후크를 사용하려면 관리자 권한이 필요할 수 있습니다.")
 
 
-def start_autotext_watcher(api_url: str = "http://127.0.0.1:8000", debug: bool = False):
+def start_autotext_watcher(api_url: str = "http://127.0.0.1:8000", debug: bool = False,
+                           cache_max_bytes: int = 1024 * 1024, prefetch_count: int = 20,
+                           text_loader: Optional[Callable[[str], Optional[str]]] = None):
     """
     자동변환 텍스트 감지 서비스 시작 함수
     
     Args:
         api_url: FastAPI 서버 URL
         debug: 디버그 모드 활성화 여부
+        cache_max_bytes: 본문 캐시의 최대 바이트 크기
+        prefetch_count: 본문을 미리 로드할 때 가장 먼저 로드할 자주 쓰는 트리거 개수
+        text_loader: 같은 프로세스의 저장소에서 본문을 읽는 함수 (None이면 API에서 가져옴)
     
     Returns:
         AutoTextWatcher: 생성된 watcher 인스턴스
     """
-    watcher = AutoTextWatcher(api_url, debug=debug)
+    watcher = AutoTextWatcher(api_url, debug=debug, cache_max_bytes=cache_max_bytes,
+                              prefetch_count=prefetch_count, text_loader=text_loader)
     watcher.start()
     return watcher
 
 
 if __name__ == "__main__":
     # 독립 실행 시 테스트
+    # 서버 워커가 이미 watcher를 실행 중이면 중복 후킹하지 않음
+    election = watcher_ipc.watcher_lock()
+    if not election.acquire(blocking=False):
+        print("다른 프로세스에서 자동변환 텍스트 감지 서비스가 이미 실행 중입니다.")
+        sys.exit(1)
+    
     print("자동변환 텍스트 감지 서비스 시작...")
+    usage_stats.start()
     watcher = start_autotext_watcher()
+    listener = watcher_ipc.UpdateListener(watcher.trigger_update)
+    listener.start()
     
     try:
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         print("\n서비스 종료 중...")
+        listener.stop()
         watcher.stop()
+        usage_stats.stop()
+        tracing.exporter.stop()
         print("서비스 종료 완료")
 
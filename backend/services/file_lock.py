@@ -0,0 +1,125 @@
+"""
+프로세스 간 파일 잠금 모듈
+
+여러 uvicorn 워커(또는 독립 실행 watcher)가 같은 데이터 파일을 수정할 때
+읽기-수정-쓰기 구간을 직렬화하고, 키보드 후킹을 맡을 프로세스 하나를 선출하는 데 사용합니다.
+
+- Windows: msvcrt.locking (잠금 파일의 첫 바이트)
+- 그 외: fcntl.flock
+
+잠금은 파일 핸들에 묶여 있으므로 프로세스가 비정상 종료되어도 OS가 해제합니다.
+같은 객체를 여러 스레드에서 사용하면 내부 threading 잠금으로 먼저 직렬화합니다.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Callable, Optional, Union
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    배타적 파일 잠금
+
+    with 문으로 사용하면 잠금을 얻을 때까지 대기합니다.
+    재진입은 지원하지 않습니다 (같은 스레드에서 중첩 획득하면 교착).
+    """
+
+    def __init__(self, path: Union[str, Callable[[], str]], poll_interval: float = 0.005):
+        """
+        FileLock 초기화
+
+        Args:
+            path: 잠금 파일 경로 (또는 경로를 반환하는 함수, 호출 시점에 조회)
+            poll_interval: Windows에서 잠금 재시도 간격 (초)
+        """
+        self._path = path
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path() if callable(self._path) else self._path
+
+    @property
+    def locked(self) -> bool:
+        """이 객체가 잠금을 보유 중인지 여부"""
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        잠금 획득
+
+        Args:
+            blocking: False이면 바로 획득하지 못할 때 기다리지 않음
+            timeout: 최대 대기 시간 (초, None이면 무제한)
+
+        Returns:
+            bool: 획득 여부
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._thread_lock.acquire(blocking, -1 if timeout is None or not blocking else timeout):
+            return False
+
+        try:
+            path = self.path
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        try:
+            while True:
+                if self._try_lock(fd, blocking and sys.platform != 'win32' and timeout is None):
+                    self._fd = fd
+                    return True
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    os.close(fd)
+                    self._thread_lock.release()
+                    return False
+                time.sleep(self.poll_interval)
+        except BaseException:
+            os.close(fd)
+            self._thread_lock.release()
+            raise
+
+    @staticmethod
+    def _try_lock(fd: int, wait: bool) -> bool:
+        """잠금 시도 (wait=True이면 OS 수준에서 대기, POSIX 전용)"""
+        try:
+            if sys.platform == 'win32':
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def release(self):
+        """잠금 해제"""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if sys.platform == 'win32':
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,420 @@
+"""
+메모리 내 메트릭 수집 모듈
+
+자동변환 확장 단계별 소요 시간, 트리거별 사용 횟수, API 라우트별 지연 시간,
+저장소 읽기/쓰기 시간을 집계하고 Prometheus 텍스트 형식으로 출력합니다.
+외부 의존성 없이 프로세스 메모리에서 집계합니다.
+
+여러 uvicorn 워커로 실행하면 요청마다 다른 워커가 응답하고, 자동변환 확장은 watcher가 선출된
+워커에서만 기록됩니다. 그래서 각 프로세스는 주기적으로 DATA_DIR/metrics/<pid>.json에
+스냅샷을 기록하고(MetricsPublisher), 조회한 워커는 자신의 값과 다른 워커의 스냅샷을 합쳐 출력합니다.
+카운터/히스토그램은 워커 합계, 게이지(시작 단계 시간 등)는 워커별 값이므로 pid 라벨을 붙입니다.
+다른 워커의 값은 최대 기록 주기만큼 늦게 반영됩니다.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from backend.config import config
+
+# {라벨 값: 값} (히스토그램은 [구간별 개수..., 합계, 전체 개수])
+Values = Dict[Tuple[str, ...], object]
+
+# 기본 히스토그램 구간 (초)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _escape_label_value(value: str) -> str:
+    """Prometheus 라벨 값 이스케이프"""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    """라벨 목록을 {a="1",b="2"} 형식 문자열로 변환"""
+    parts = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    """Prometheus 숫자 형식 변환"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        """
+        카운터 증가
+
+        Args:
+            amount: 증가량
+            **labels: 라벨 값
+        """
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """현재 값 조회"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def snapshot(self) -> Values:
+        """현재 값 복사본"""
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(total: Values, values: Values):
+        """다른 워커의 값을 합계에 더함"""
+        for key, value in values.items():
+            total[key] = total.get(key, 0) + value
+
+    def collect(self, values: Optional[Values] = None) -> List[str]:
+        """Prometheus 텍스트 형식 줄 목록 반환 (values가 없으면 이 프로세스의 값)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        items = sorted((self.snapshot() if values is None else values).items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def reset(self):
+        """모든 값 초기화"""
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """누적 구간 히스토그램"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # {라벨 값: [구간별 개수..., 합계, 전체 개수]}
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """
+        관측값 기록
+
+        Args:
+            value: 관측값 (초)
+            **labels: 라벨 값
+        """
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._values[key] = series
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        """관측 횟수 조회"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            series = self._values.get(key)
+            return int(series[-1]) if series else 0
+
+    def snapshot(self) -> Values:
+        """현재 값 복사본"""
+        with self._lock:
+            return {key: list(series) for key, series in self._values.items()}
+
+    def merge(self, total: Values, values: Values):
+        """다른 워커의 값을 합계에 더함 (구간 수가 다른 스냅샷은 무시)"""
+        for key, series in values.items():
+            if len(series) != len(self.buckets) + 2:
+                continue
+            existing = total.get(key)
+            if existing is None:
+                total[key] = list(series)
+            else:
+                total[key] = [a + b for a, b in zip(existing, series)]
+
+    def collect(self, values: Optional[Values] = None) -> List[str]:
+        """Prometheus 텍스트 형식 줄 목록 반환 (values가 없으면 이 프로세스의 값)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        items = sorted((self.snapshot() if values is None else values).items())
+        for key, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {int(series[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {int(series[-1])}")
+        return lines
+
+    def reset(self):
+        """모든 값 초기화"""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """임의로 설정 가능한 값"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str):
+        """
+        값 설정
+
+        Args:
+            value: 설정할 값
+            **labels: 라벨 값
+        """
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def snapshot(self) -> Values:
+        """현재 값 복사본"""
+        with self._lock:
+            return dict(self._values)
+
+    def collect(self, values: Optional[Values] = None, labelnames: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Prometheus 텍스트 형식 줄 목록 반환
+
+        Args:
+            values: 출력할 값 (없으면 이 프로세스의 값)
+            labelnames: 라벨 이름 (워커별 값을 출력할 때 pid 라벨 추가용)
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        items = sorted((self.snapshot() if values is None else values).items())
+        names = self.labelnames if labelnames is None else labelnames
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(names, key)} {_format_value(value)}")
+        return lines
+
+    def reset(self):
+        """모든 값 초기화"""
+        with self._lock:
+            self._values.clear()
+
+
+# ============== 메트릭 정의 ==============
+
+AUTOTEXT_EXPANSION_SECONDS = Histogram(
+    "ppop_autotext_expansion_seconds",
+    "자동변환 확장 단계별 소요 시간 (match, render, backspace, clipboard, paste, total)",
+    labelnames=("phase",),
+)
+
+AUTOTEXT_TRIGGER_HITS = Counter(
+    "ppop_autotext_trigger_hits_total",
+    "트리거별 자동변환 확장 횟수",
+    labelnames=("trigger",),
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "ppop_http_request_duration_seconds",
+    "API 라우트별 요청 처리 시간",
+    labelnames=("method", "route", "status"),
+)
+
+STORAGE_OPERATION_SECONDS = Histogram(
+    "ppop_storage_operation_seconds",
+    "저장소 JSON 파일 읽기/쓰기 소요 시간",
+    labelnames=("operation", "file"),
+)
+
+STARTUP_PHASE_SECONDS = Gauge(
+    "ppop_startup_phase_seconds",
+    "서버 시작 단계별 소요 시간 (첫 /health 응답까지)",
+    labelnames=("phase",),
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "ppop_response_cache_requests_total",
+    "GET 응답 캐시 결과별 요청 수 (hit, miss, not_modified)",
+    labelnames=("endpoint", "result"),
+)
+
+REGISTRY = [
+    AUTOTEXT_EXPANSION_SECONDS,
+    AUTOTEXT_TRIGGER_HITS,
+    HTTP_REQUEST_SECONDS,
+    STORAGE_OPERATION_SECONDS,
+    STARTUP_PHASE_SECONDS,
+    RESPONSE_CACHE_REQUESTS,
+]
+
+
+def render_prometheus() -> str:
+    """
+    등록된 모든 메트릭을 Prometheus 텍스트 형식으로 출력 (이 프로세스의 값만)
+
+    Returns:
+        str: Prometheus 텍스트 노출 형식 문자열
+    """
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsPublisher:
+    """
+    워커 간 메트릭 공유
+
+    interval마다 이 프로세스의 스냅샷을 <directory>/<pid>.json에 기록하고,
+    render()는 이 프로세스의 현재 값과 다른 프로세스의 스냅샷을 합쳐 출력합니다.
+    stale_after보다 오래 갱신되지 않은 스냅샷은 종료된 프로세스의 것으로 보고 삭제합니다.
+    """
+
+    def __init__(self, directory: str, interval: float = 10.0):
+        """
+        MetricsPublisher 초기화
+
+        Args:
+            directory: 스냅샷 디렉토리
+            interval: 스냅샷 기록 주기 (초)
+        """
+        self.directory = directory
+        self.interval = interval
+        self.stale_after = max(60.0, interval * 6)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _own_path(self) -> str:
+        return os.path.join(self.directory, f"{os.getpid()}.json")
+
+    def publish(self) -> bool:
+        """
+        이 프로세스의 스냅샷 기록 (임시 파일에 쓴 뒤 교체)
+
+        Returns:
+            bool: 성공 여부
+        """
+        data = {
+            metric.name: [[list(key), value] for key, value in metric.snapshot().items()]
+            for metric in REGISTRY
+        }
+        file_path = self._own_path()
+        temp_path = f"{file_path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Error writing {file_path}: {e}")
+            return False
+
+    def _read_others(self) -> List[Tuple[str, Dict[str, Values]]]:
+        """다른 프로세스의 스냅샷 [(pid, {메트릭 이름: 값})] (오래된 스냅샷은 삭제)"""
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return []
+        own_name = os.path.basename(self._own_path())
+        now = time.time()
+        result = []
+        for entry in entries:
+            if not entry.name.endswith('.json') or entry.name == own_name:
+                continue
+            try:
+                if now - entry.stat().st_mtime > self.stale_after:
+                    os.remove(entry.path)
+                    continue
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshot = {
+                name: {tuple(key): value for key, value in items}
+                for name, items in data.items() if isinstance(items, list)
+            }
+            result.append((entry.name[:-len('.json')], snapshot))
+        return result
+
+    def render(self) -> str:
+        """
+        모든 프로세스의 메트릭을 합쳐 Prometheus 텍스트 형식으로 출력
+
+        Returns:
+            str: Prometheus 텍스트 노출 형식 문자열
+        """
+        others = self._read_others()
+        own_pid = str(os.getpid())
+        lines: List[str] = []
+        for metric in REGISTRY:
+            if isinstance(metric, Gauge):
+                values = {key + (own_pid,): value for key, value in metric.snapshot().items()}
+                for pid, snapshot in others:
+                    for key, value in snapshot.get(metric.name, {}).items():
+                        values[key + (pid,)] = value
+                lines.extend(metric.collect(values, metric.labelnames + ('pid',)))
+                continue
+            values = metric.snapshot()
+            for _, snapshot in others:
+                metric.merge(values, snapshot.get(metric.name, {}))
+            lines.extend(metric.collect(values))
+        return '\n'.join(lines) + '\n'
+
+    def start(self):
+        """주기적 스냅샷 기록 스레드 시작"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._publish_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """기록 스레드를 중지하고 스냅샷 삭제 (정상 종료한 프로세스의 값은 합계에서 빠짐)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+        try:
+            os.remove(self._own_path())
+        except OSError:
+            pass
+
+    def _publish_loop(self):
+        self.publish()
+        while not self._stop_event.wait(self.interval):
+            self.publish()
+
+
+# 전역 메트릭 공유 인스턴스 (main.py의 startup/shutdown에서 시작/중지)
+publisher = MetricsPublisher(config.METRICS_DIR, interval=config.METRICS_SHARE_INTERVAL)
@@ -0,0 +1,390 @@
+"""
+요청 프로파일러 모듈
+
+PROFILING=true일 때 일부 요청(무작위 비율 또는 X-Profile 헤더가 있는 요청)을
+통계적 스택 샘플링으로 프로파일링하고, 최근 결과를 고정 크기 링 버퍼에 보관합니다.
+여러 워커로 실행하면 X-Profile-Id를 받은 워커와 조회 요청을 받은 워커가 다를 수 있으므로,
+프로파일을 DATA_DIR/profiles/<pid>-<시작 시각>-<번호>.json에도 기록하고 조회 시 모든 워커의 프로파일을 읽습니다.
+
+동기 라우트 함수는 스레드 풀에서 실행되므로 미들웨어 스레드만 추적하는 결정적 프로파일러
+(cProfile)로는 storage/Pydantic/직렬화 시간을 볼 수 없습니다. 대신 샘플링 스레드가
+모든 스레드의 스택을 주기적으로 수집하고, 앱/프레임워크 코드를 지나는 스택만 남깁니다.
+한 번에 한 요청만 프로파일링하므로 동시에 처리 중인 다른 요청이 섞일 수 있습니다.
+
+결과는 collapsed stack(flamegraph.pl, speedscope)과 pstats(snakeviz, pstats.Stats) 형식으로 내보냅니다.
+"""
+import json
+import marshal
+import os
+import queue
+import random
+import re
+import selectors
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from fastapi import Request
+from backend.config import config
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# (파일 경로, 첫 줄 번호, 함수 이름) - pstats의 함수 키와 같은 형식
+FrameKey = Tuple[str, int, str]
+Stack = Tuple[FrameKey, ...]
+
+# 프로파일 ID 형식 (<pid>-<시작 시각>-<번호>, 파일 이름으로도 사용)
+# 재시작한 프로세스가 같은 pid를 받아도 이전 프로파일을 덮어쓰지 않도록 시작 시각을 포함
+PROFILE_ID_PATTERN = re.compile(r'^\d+-\d+-\d+$')
+
+
+def _package_dir(name: str) -> Optional[str]:
+    """패키지 디렉토리 경로 (설치되지 않았으면 None)"""
+    module = sys.modules.get(name)
+    if module is None:
+        try:
+            module = __import__(name)
+        except ImportError:
+            return None
+    file_path = getattr(module, '__file__', None)
+    return os.path.dirname(file_path) + os.sep if file_path else None
+
+
+# 이 디렉토리의 코드를 지나는 스택만 요청 처리 스택으로 간주 (유휴 스레드 제외)
+_TRACKED_DIRS = tuple(
+    path for path in (_package_dir(name) for name in ('backend', 'fastapi', 'starlette', 'pydantic'))
+    if path
+)
+
+# 리프 프레임이 이 파일에 있으면 대기 중인 스레드로 보고 제외
+# (usage_stats 기록 스레드, watcher 스레드처럼 backend 코드에서 Event.wait로 쉬는 스레드)
+_IDLE_FILES = frozenset(module.__file__ for module in (threading, queue, selectors))
+
+
+class StackSampler:
+    """
+    통계적 스택 샘플러
+
+    interval마다 sys._current_frames()로 모든 스레드의 스택을 수집하여
+    (루트→리프) 스택별 샘플 수를 집계합니다.
+    """
+
+    def __init__(self, interval: float = 0.001):
+        """
+        StackSampler 초기화
+
+        Args:
+            interval: 샘플링 주기 (초)
+        """
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0   # 수집한 스택 수
+        self.ticks = 0     # 샘플링 횟수
+        self.elapsed = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """샘플링 스레드 시작"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """샘플링 스레드 중지"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def actual_interval(self) -> float:
+        """실제 샘플 간격 (sleep 지연 포함, pstats 시간 환산용)"""
+        return self.elapsed / self.ticks if self.ticks else self.interval
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        started = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            self.ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = self._collect(frame)
+                if stack:
+                    self.stacks[stack] += 1
+                    self.samples += 1
+        self.elapsed = time.perf_counter() - started
+
+    @staticmethod
+    def _collect(frame) -> Optional[Stack]:
+        """프레임에서 루트까지 거슬러 올라가 스택 생성 (대기 중이거나 추적 대상 코드가 없으면 None)"""
+        if frame.f_code.co_filename in _IDLE_FILES:
+            return None
+        keys: List[FrameKey] = []
+        tracked = False
+        while frame is not None:
+            code = frame.f_code
+            filename = code.co_filename
+            if not tracked and filename.startswith(_TRACKED_DIRS):
+                tracked = True
+            keys.append((filename, code.co_firstlineno, getattr(code, 'co_qualname', code.co_name)))
+            frame = frame.f_back
+        if not tracked:
+            return None
+        keys.reverse()
+        return tuple(keys)
+
+
+class RequestProfiler:
+    """
+    요청 프로파일 수집기
+
+    최근 프로파일을 max_profiles개까지 보관하며, 오래된 것부터 버립니다.
+    directory가 있으면 모든 워커가 같은 디렉토리에 기록하고 그 디렉토리에서 조회하므로
+    다른 워커가 수집한 프로파일도 조회할 수 있습니다 (디렉토리 전체에서 최근 max_profiles개 유지).
+    """
+
+    def __init__(self, sample_rate: float = 0.01, interval: float = 0.001, max_profiles: int = 50,
+                 directory: Optional[str] = None):
+        """
+        RequestProfiler 초기화
+
+        Args:
+            sample_rate: 헤더 없이 프로파일링할 요청 비율 (0.0 ~ 1.0)
+            interval: 스택 샘플링 주기 (초)
+            max_profiles: 보관할 최대 프로파일 수
+            directory: 워커 간 공유 프로파일 디렉토리 (None이면 이 프로세스 메모리에만 보관)
+        """
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self.directory = directory
+        self.profiles: Deque[Dict] = deque(maxlen=max_profiles)
+        self._next_id = 1
+        self._started = int(time.time())
+        self._active = threading.Lock()  # 한 번에 한 요청만 프로파일링
+
+    def should_profile(self, request: Request) -> Optional[str]:
+        """
+        요청 프로파일링 여부
+
+        Args:
+            request: 요청 객체
+
+        Returns:
+            Optional[str]: 프로파일링 사유 ('header' 또는 'sampled'), 대상이 아니면 None
+        """
+        header = request.headers.get(PROFILE_HEADER)
+        if header and header.lower() not in ('0', 'false'):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    async def __call__(self, request: Request, call_next):
+        """프로파일링 미들웨어 (main.py에서 app.middleware("http")로 등록)"""
+        reason = self.should_profile(request)
+        # 프로파일 조회 요청 자체와 이미 다른 요청을 프로파일링 중인 경우는 제외
+        if reason is None or request.url.path.startswith('/api/debug/') or not self._active.acquire(blocking=False):
+            return await call_next(request)
+
+        sampler = StackSampler(self.interval)
+        started_at = datetime.now().isoformat()
+        started = time.perf_counter()
+        status = 500
+        sampler.start()
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - started
+            self._active.release()
+            route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+            profile = self._store(request, route, status, reason, started_at, duration, sampler)
+
+        response.headers[PROFILE_ID_HEADER] = profile['id']
+        return response
+
+    def _store(self, request: Request, route: str, status: int, reason: str,
+               started_at: str, duration: float, sampler: StackSampler) -> Dict:
+        """프로파일을 링 버퍼에 추가하고 공유 디렉토리에 기록"""
+        profile = {
+            'id': f"{os.getpid()}-{self._started}-{self._next_id}",
+            'method': request.method,
+            'path': request.url.path,
+            'route': route,
+            'status': status,
+            'reason': reason,
+            'started_at': started_at,
+            'duration_ms': round(duration * 1000, 3),
+            'samples': sampler.samples,
+            'interval': sampler.actual_interval,
+            'stacks': sampler.stacks,
+        }
+        self._next_id += 1
+        self.profiles.append(profile)
+        if self.directory:
+            self._write(profile)
+        return profile
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def _write(self, profile: Dict):
+        """프로파일을 공유 디렉토리에 기록하고 오래된 프로파일 정리"""
+        data = dict(profile)
+        data['stacks'] = [[[list(key) for key in stack], count] for stack, count in profile['stacks'].items()]
+        file_path = self._path(profile['id'])
+        temp_path = f"{file_path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, file_path)
+        except Exception as e:
+            print(f"Error writing {file_path}: {e}")
+            return
+        for old_path in self._shared_paths()[self.max_profiles:]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+    def _shared_paths(self) -> List[str]:
+        """공유 디렉토리의 프로파일 파일 경로 목록 (최신순)"""
+        try:
+            entries = [
+                entry for entry in os.scandir(self.directory)
+                if entry.name.endswith('.json') and PROFILE_ID_PATTERN.match(entry.name[:-len('.json')])
+            ]
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        except OSError:
+            return []
+        return [entry.path for entry in entries]
+
+    @staticmethod
+    def _read(file_path: str) -> Optional[Dict]:
+        """공유 디렉토리의 프로파일 파일 읽기 (다른 워커가 정리했으면 None)"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return None
+        profile['stacks'] = Counter({
+            tuple(tuple(key) for key in stack): count for stack, count in profile['stacks']
+        })
+        return profile
+
+    def list_profiles(self) -> List[Dict]:
+        """
+        보관 중인 프로파일 요약 목록 (최신순, 공유 디렉토리가 있으면 모든 워커의 프로파일)
+
+        Returns:
+            List[Dict]: 스택을 제외한 프로파일 정보 목록
+        """
+        if self.directory:
+            profiles = [profile for profile in map(self._read, self._shared_paths()) if profile]
+        else:
+            profiles = list(reversed(self.profiles))
+        return [
+            {key: value for key, value in profile.items() if key not in ('stacks', 'interval')}
+            for profile in profiles
+        ]
+
+    def get_profile(self, profile_id: str) -> Optional[Dict]:
+        """
+        ID로 프로파일 조회 (이 프로세스의 링 버퍼에 없으면 공유 디렉토리에서 조회)
+
+        Args:
+            profile_id: 프로파일 ID
+
+        Returns:
+            Optional[Dict]: 프로파일 또는 None (보관 개수를 넘어 정리된 경우 포함)
+        """
+        for profile in self.profiles:
+            if profile['id'] == profile_id:
+                return profile
+        if self.directory and PROFILE_ID_PATTERN.match(profile_id):
+            return self._read(self._path(profile_id))
+        return None
+
+
+def _frame_label(key: FrameKey) -> str:
+    filename, line, name = key
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(profile: Dict) -> str:
+    """
+    collapsed stack 형식으로 변환 (flamegraph.pl, speedscope 입력)
+
+    Args:
+        profile: 프로파일
+
+    Returns:
+        str: "루트;...;리프 샘플수" 줄 목록
+    """
+    lines = [
+        ';'.join(_frame_label(key) for key in stack) + f" {count}"
+        for stack, count in profile['stacks'].most_common()
+    ]
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def to_pstats(profile: Dict) -> bytes:
+    """
+    샘플로부터 pstats 파일 내용 생성 (pstats.Stats, snakeviz 입력)
+
+    호출 횟수는 알 수 없으므로 함수가 스택에 나타난 샘플 수로 대신합니다.
+    시간은 샘플 수 × 실제 샘플 간격입니다.
+
+    Args:
+        profile: 프로파일
+
+    Returns:
+        bytes: marshal로 직렬화된 pstats 통계
+    """
+    interval = profile['interval']
+    # {함수: [cc, nc, tt, ct, {호출자: [cc, nc, tt, ct]}]}
+    stats: Dict[FrameKey, list] = {}
+
+    for stack, count in profile['stacks'].items():
+        weight = count * interval
+        seen = set()
+        for depth, key in enumerate(stack):
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = [0, 0, 0.0, 0.0, {}]
+            is_leaf = depth == len(stack) - 1
+            if is_leaf:
+                entry[2] += weight
+            # 재귀 호출은 누적 시간을 한 번만 더함
+            if key not in seen:
+                seen.add(key)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += weight
+            if depth > 0:
+                edge = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                edge[0] += count
+                edge[1] += count
+                edge[2] += weight if is_leaf else 0.0
+                edge[3] += weight
+
+    return marshal.dumps({
+        key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+        for key, (cc, nc, tt, ct, callers) in stats.items()
+    })
+
+
+# 전역 프로파일러 인스턴스 (PROFILING=true일 때만 미들웨어로 등록됨)
+request_profiler = RequestProfiler(
+    sample_rate=config.PROFILING_SAMPLE_RATE,
+    interval=config.PROFILING_INTERVAL,
+    max_profiles=config.PROFILING_MAX_PROFILES,
+    directory=config.PROFILES_DIR
+)
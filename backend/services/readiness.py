@@ -0,0 +1,83 @@
+"""
+서버 준비 완료 신호 모듈
+
+run.py가 미리 바인딩한 포트와 준비 완료 시점을 외부(Electron)와
+같은 프로세스의 watcher에 알립니다.
+
+- stdout: `[READY] {"port": 8001, "pid": 1234}` 한 줄
+- 핸드셰이크 파일: DATA_DIR/backend_ready.json (같은 내용)
+- 프로세스 내부: wait_until_ready()로 대기 (폴링 없음)
+"""
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+from backend.config import config
+
+READY_PREFIX = "[READY]"
+HANDSHAKE_FILE = os.path.join(config.DATA_DIR, 'backend_ready.json')
+
+_ready_event = threading.Event()
+_ready_info: Dict = {}
+
+
+def publish_ready(port: int) -> Dict:
+    """
+    준비 완료 신호 발행
+
+    리스닝 소켓은 run.py에서 이미 열려 있으므로, 이 시점 이후의 연결은
+    이벤트 루프가 돌기 시작하는 즉시 처리됩니다.
+
+    Args:
+        port: 실제 리스닝 포트
+
+    Returns:
+        Dict: 발행한 정보 {'port', 'pid', 'ready_at'}
+    """
+    info = {'port': port, 'pid': os.getpid(), 'ready_at': time.time()}
+    _ready_info.clear()
+    _ready_info.update(info)
+
+    # 임시 파일에 쓴 뒤 교체하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+    # (여러 워커가 동시에 발행하므로 임시 파일은 프로세스별로 사용)
+    temp_path = f"{HANDSHAKE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(temp_path, HANDSHAKE_FILE)
+    except Exception as e:
+        print(f"Error writing {HANDSHAKE_FILE}: {e}")
+
+    print(f"{READY_PREFIX} {json.dumps({'port': port, 'pid': info['pid']})}")
+    sys.stdout.flush()
+    _ready_event.set()
+    return info
+
+
+def clear_ready():
+    """종료 시 핸드셰이크 파일 삭제 (이 프로세스가 쓴 경우에만)"""
+    _ready_event.clear()
+    try:
+        with open(HANDSHAKE_FILE, 'r', encoding='utf-8') as f:
+            owner = json.load(f).get('pid')
+        if owner == os.getpid():
+            os.remove(HANDSHAKE_FILE)
+    except (OSError, ValueError):
+        pass
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> Optional[Dict]:
+    """
+    같은 프로세스에서 준비 완료 신호를 기다림
+
+    Args:
+        timeout: 최대 대기 시간 (초, None이면 무한 대기)
+
+    Returns:
+        Optional[Dict]: 준비 정보, 시간 초과 시 None
+    """
+    if not _ready_event.wait(timeout):
+        return None
+    return dict(_ready_info)
@@ -0,0 +1,153 @@
+"""
+GET 응답 캐시 모듈
+
+저장소 세대(generation)가 바뀌지 않는 동안 같은 GET 요청의 직렬화된 응답 본문을 재사용하고,
+세대로부터 계산한 ETag로 If-None-Match 요청에 304를 돌려줍니다.
+
+ETag는 (캐시 키, 세대)만으로 계산하므로 304 응답은 데이터를 읽거나 직렬화하지 않습니다.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from backend.services import metrics
+
+# 브라우저가 매번 ETag로 재검증하도록 지정 (저장된 본문을 그대로 쓰지 않음)
+CACHE_CONTROL = "no-cache"
+
+
+class ResponseCache:
+    """
+    직렬화된 응답 본문 LRU 캐시
+
+    키는 경로와 쿼리 파라미터로 만든 문자열이며, 값은 (세대, ETag, 본문 바이트)입니다.
+    세대가 달라진 항목은 조회 시 미스로 처리되고 새 본문으로 교체됩니다.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        ResponseCache 초기화
+
+        Args:
+            max_entries: 보관할 최대 응답 수
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, generation: str) -> Optional[bytes]:
+        """
+        캐시된 본문 조회
+
+        Args:
+            key: 캐시 키
+            generation: 현재 저장소 세대
+
+        Returns:
+            Optional[bytes]: 같은 세대의 본문 또는 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key: str, generation: str, body: bytes):
+        """
+        본문 저장
+
+        Args:
+            key: 캐시 키
+            generation: 본문을 만든 시점의 저장소 세대
+            body: 직렬화된 응답 본문
+        """
+        with self._lock:
+            self._entries[key] = (generation, make_etag(key, generation), body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(key: str, generation: str) -> str:
+    """
+    캐시 키와 세대로 ETag 계산
+
+    Args:
+        key: 캐시 키
+        generation: 저장소 세대
+
+    Returns:
+        str: 따옴표로 감싼 ETag 값
+    """
+    digest = hashlib.blake2b(f"{key}\0{generation}".encode('utf-8'), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 ETag가 포함되어 있는지 확인 (약한 비교)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+# 전역 응답 캐시 인스턴스
+response_cache = ResponseCache()
+
+
+def cached_json_response(request: Request, name: str, generation: str,
+                         build: Callable[[], Any], adapter: TypeAdapter) -> Optional[Response]:
+    """
+    세대 기반 캐시를 거쳐 JSON 응답 생성
+
+    Args:
+        request: 현재 요청 (경로/쿼리로 캐시 키를 만들고 If-None-Match를 확인)
+        name: 메트릭에 기록할 엔드포인트 이름
+        generation: 응답이 의존하는 저장소 세대
+        build: 캐시 미스 시 응답 데이터를 만드는 함수 (None이면 응답하지 않음)
+        adapter: response_model과 같은 타입의 TypeAdapter (검증/직렬화용)
+
+    Returns:
+        Optional[Response]: 200/304 응답, build가 None을 반환하면 None (호출 측에서 404 처리)
+    """
+    key = request.url.path
+    if request.url.query:
+        key = f"{key}?{request.url.query}"
+    etag = make_etag(key, generation)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        metrics.RESPONSE_CACHE_REQUESTS.inc(endpoint=name, result='not_modified')
+        return Response(status_code=304, headers=headers)
+
+    body = response_cache.get(key, generation)
+    if body is not None:
+        metrics.RESPONSE_CACHE_REQUESTS.inc(endpoint=name, result='hit')
+    else:
+        data = build()
+        if data is None:
+            return None
+        # response_model과 동일하게 검증 후 직렬화 (스키마에 없는 필드 제외)
+        body = adapter.dump_json(adapter.validate_python(data))
+        response_cache.put(key, generation, body)
+        metrics.RESPONSE_CACHE_REQUESTS.inc(endpoint=name, result='miss')
+
+    return Response(content=body, media_type='application/json', headers=headers)
@@ -0,0 +1,109 @@
+"""
+시작 시간 측정 모듈
+
+프로세스 시작부터 첫 번째 정상 /health 응답까지의 단계별 소요 시간을 기록합니다.
+run.py에서 가장 먼저 import해야 측정 기준 시각이 정확합니다.
+
+STARTUP_TIMING=true 환경 변수를 설정하면 첫 /health 응답 시점에 단계별 시간을 출력합니다.
+"""
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# 측정 기준 시각 (이 모듈이 처음 import된 시점)
+_STARTED = time.perf_counter()
+_STARTED_WALL = time.time()
+
+_phases: List[Tuple[str, float]] = []
+_reported = False
+
+
+def _process_start_offset() -> Optional[float]:
+    """
+    프로세스 생성 시점부터 이 모듈 import까지 걸린 시간 (초)
+
+    인터프리터 초기화와 PyInstaller 압축 해제 시간이 포함됩니다.
+    Linux(/proc)에서만 측정 가능하며, 그 외 환경에서는 None을 반환합니다.
+    """
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        start_ticks = int(fields[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        boot_time = time.time() - uptime
+        process_start = boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+        return max(0.0, _STARTED_WALL - process_start)
+    except Exception:
+        return None
+
+
+def enabled() -> bool:
+    """시작 시간 출력 여부"""
+    return os.getenv("STARTUP_TIMING", "false").lower() == "true"
+
+
+def mark(phase: str):
+    """
+    단계 완료 시점 기록
+
+    Args:
+        phase: 단계 이름
+    """
+    _phases.append((phase, time.perf_counter() - _STARTED))
+
+
+def mark_once(phase: str) -> bool:
+    """
+    처음 한 번만 단계 완료 시점 기록
+
+    Args:
+        phase: 단계 이름
+
+    Returns:
+        bool: 이번 호출에서 기록했는지 여부
+    """
+    if any(name == phase for name, _ in _phases):
+        return False
+    mark(phase)
+    return True
+
+
+def phases() -> List[Dict[str, float]]:
+    """
+    단계별 소요 시간 목록
+
+    Returns:
+        List[Dict[str, float]]: [{'phase': 이름, 'seconds': 직전 단계 이후 소요 시간, 'elapsed': 누적 시간}]
+    """
+    result = []
+    base = _process_start_offset()
+    if base is not None:
+        result.append({'phase': 'process_to_python', 'seconds': base, 'elapsed': base})
+    else:
+        base = 0.0
+
+    last = 0.0
+    for name, at in _phases:
+        result.append({'phase': name, 'seconds': at - last, 'elapsed': base + at})
+        last = at
+    return result
+
+
+def report() -> str:
+    """단계별 소요 시간을 한 줄 문자열로 반환"""
+    items = phases()
+    parts = [f"{item['phase']}={item['seconds'] * 1000:.1f}ms" for item in items]
+    total = items[-1]['elapsed'] * 1000 if items else 0.0
+    return f"[STARTUP] total={total:.1f}ms " + ' '.join(parts)
+
+
+def report_once():
+    """STARTUP_TIMING이 활성화된 경우 단계별 시간을 한 번만 출력"""
+    global _reported
+    if _reported or not enabled():
+        return
+    _reported = True
+    print(report())
+    sys.stdout.flush()
@@ -0,0 +1,133 @@
+"""
+자동변환 텍스트 템플릿 모듈
+
+프롬프트 본문의 {date}, {time}, {clipboard}, {cursor} 플레이스홀더를
+본문을 불러올 때 한 번만 세그먼트 목록으로 컴파일하고,
+확장 시점에는 컴파일된 세그먼트를 채우기만 합니다.
+
+- {date}: 오늘 날짜 (YYYY-MM-DD)
+- {time}: 현재 시각 (HH:MM)
+- {clipboard}: 확장 직전 클립보드 내용
+- {cursor}: 붙여넣기 후 커서 위치 (첫 번째만 적용)
+
+{{date}}처럼 중괄호를 두 번 쓰면 플레이스홀더 대신 {date} 문자열 그대로 출력됩니다.
+그 외 중괄호는 모두 일반 문자로 취급하므로 기존 프롬프트의 JSON/코드 본문은 바뀌지 않습니다.
+"""
+import re
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+PLACEHOLDERS = ('date', 'time', 'clipboard', 'cursor')
+
+_PLACEHOLDER_PATTERN = re.compile(
+    r'\{\{(' + '|'.join(PLACEHOLDERS) + r')\}\}|\{(' + '|'.join(PLACEHOLDERS) + r')\}'
+)
+
+# 세그먼트 종류
+LITERAL = 0
+DATE = 1
+TIME = 2
+CLIPBOARD = 3
+CURSOR = 4
+
+_KINDS = {'date': DATE, 'time': TIME, 'clipboard': CLIPBOARD, 'cursor': CURSOR}
+
+
+class CompiledTemplate:
+    """
+    컴파일된 프롬프트 템플릿
+
+    플레이스홀더가 없는 본문은 is_static이 True이며 render가 원문을 그대로 반환합니다.
+    """
+    __slots__ = ('text', 'segments', 'is_static', 'uses_clipboard', 'uses_datetime')
+
+    def __init__(self, text: str, segments: List[Tuple[int, str]]):
+        self.text = text
+        self.segments = segments
+        self.is_static = all(kind == LITERAL for kind, _ in segments)
+        self.uses_clipboard = any(kind == CLIPBOARD for kind, _ in segments)
+        self.uses_datetime = any(kind in (DATE, TIME) for kind, _ in segments)
+
+    def render(self, clipboard: Optional[Callable[[], str]] = None,
+               now: Optional[datetime] = None) -> Tuple[str, int]:
+        """
+        템플릿 렌더링
+
+        Args:
+            clipboard: 현재 클립보드 내용을 반환하는 함수 ({clipboard} 사용 시에만 호출)
+            now: 기준 시각 (기본값: 현재 시각)
+
+        Returns:
+            Tuple[str, int]: (렌더링된 텍스트, 커서 뒤에 남는 문자 수)
+        """
+        if self.is_static:
+            return self.text, 0
+
+        if self.uses_datetime and now is None:
+            now = datetime.now()
+        clipboard_text = None
+
+        parts: List[str] = []
+        cursor_index = None
+        length = 0
+        for kind, value in self.segments:
+            if kind == LITERAL:
+                piece = value
+            elif kind == DATE:
+                piece = f"{now.year:04d}-{now.month:02d}-{now.day:02d}"
+            elif kind == TIME:
+                piece = f"{now.hour:02d}:{now.minute:02d}"
+            elif kind == CLIPBOARD:
+                if clipboard_text is None:
+                    clipboard_text = clipboard() if clipboard else ''
+                piece = clipboard_text
+            else:  # CURSOR
+                if cursor_index is None:
+                    cursor_index = length
+                continue
+            parts.append(piece)
+            length += len(piece)
+
+        rendered = ''.join(parts)
+        chars_after_cursor = length - cursor_index if cursor_index is not None else 0
+        return rendered, chars_after_cursor
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    프롬프트 본문을 템플릿으로 컴파일
+
+    Args:
+        text: 프롬프트 본문
+
+    Returns:
+        CompiledTemplate: 컴파일된 템플릿
+    """
+    segments: List[Tuple[int, str]] = []
+    literal: List[str] = []
+    position = 0
+
+    for match in _PLACEHOLDER_PATTERN.finditer(text):
+        literal.append(text[position:match.start()])
+        escaped, name = match.group(1), match.group(2)
+        if escaped:
+            literal.append('{' + escaped + '}')
+        else:
+            if literal:
+                joined = ''.join(literal)
+                if joined:
+                    segments.append((LITERAL, joined))
+                literal = []
+            segments.append((_KINDS[name], name))
+        position = match.end()
+
+    literal.append(text[position:])
+    joined = ''.join(literal)
+    if joined:
+        segments.append((LITERAL, joined))
+
+    template = CompiledTemplate(text, segments)
+    if template.is_static:
+        # 이스케이프만 있는 본문은 치환된 문자열을 그대로 사용
+        template.text = joined if segments else ''
+    return template
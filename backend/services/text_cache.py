@@ -0,0 +1,184 @@
+"""
+자동변환 텍스트 본문 캐시
+
+트리거가 확장될 때 필요한 프롬프트 본문을 지연 로드하여 보관하는 LRU 캐시입니다.
+전체 본문을 메모리에 올리지 않고, 바이트 크기 기준으로 오래된 항목부터 제거합니다.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class ReplacementTextCache:
+    """
+    프롬프트 본문 LRU 캐시
+
+    키는 프롬프트 ID이며, 값은 (버전, 본문) 쌍입니다.
+    버전(updated_at)이 달라지면 캐시된 본문은 무효화됩니다.
+    캐시 크기는 항목 수가 아니라 본문의 UTF-8 바이트 합계로 제한됩니다.
+    transform이 주어지면 본문을 로드할 때 한 번 변환(예: 템플릿 컴파일)한 결과를 보관합니다.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[str]], max_bytes: int = 1024 * 1024,
+                 transform: Optional[Callable[[str], Any]] = None):
+        """
+        ReplacementTextCache 초기화
+
+        Args:
+            loader: 프롬프트 ID로 본문을 가져오는 함수 (실패 시 None 반환)
+            max_bytes: 캐시에 보관할 본문의 최대 바이트 합계
+            transform: 로드한 본문을 캐시에 넣기 전에 적용할 변환 함수 (선택사항)
+        """
+        self.loader = loader
+        self.transform = transform
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, Any, int]]" = OrderedDict()
+        self._use_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self._entries
+
+    def get(self, prompt_id: str, version: str = "", load: bool = True) -> Optional[Any]:
+        """
+        본문 조회 (캐시에 없으면 loader로 로드)
+
+        Args:
+            prompt_id: 프롬프트 ID
+            version: 프롬프트 버전 (updated_at)
+            load: 캐시에 없을 때 로드 여부 (False면 None 반환, 호출자가 나중에 load()로 로드)
+
+        Returns:
+            Optional[Any]: 프롬프트 본문(transform 지정 시 변환 결과) 또는 None
+        """
+        with self._lock:
+            self._use_counts[prompt_id] = self._use_counts.get(prompt_id, 0) + 1
+            entry = self._entries.get(prompt_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(prompt_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        if not load:
+            return None
+        return self.load(prompt_id, version)
+
+    def load(self, prompt_id: str, version: str = "") -> Optional[Any]:
+        """
+        loader로 본문을 로드하여 캐시에 저장합니다. (사용 횟수/적중률은 집계하지 않음)
+
+        Args:
+            prompt_id: 프롬프트 ID
+            version: 프롬프트 버전 (updated_at)
+
+        Returns:
+            Optional[Any]: 프롬프트 본문(transform 지정 시 변환 결과) 또는 None
+        """
+        text = self.loader(prompt_id)
+        if text is None:
+            return None
+        return self.put(prompt_id, version, text)
+
+    def put(self, prompt_id: str, version: str, text: str) -> Any:
+        """
+        본문을 캐시에 저장하고 크기 제한을 넘으면 오래된 항목부터 제거합니다.
+
+        Args:
+            prompt_id: 프롬프트 ID
+            version: 프롬프트 버전 (updated_at)
+            text: 프롬프트 본문
+
+        Returns:
+            Any: 캐시에 보관된 값 (transform 지정 시 변환 결과)
+        """
+        value = self.transform(text) if self.transform else text
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self._discard(prompt_id)
+            # 캐시 전체보다 큰 본문은 보관하지 않음 (매번 로드)
+            if size > self.max_bytes:
+                return value
+            self._entries[prompt_id] = (version, value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+        return value
+
+    def invalidate(self, prompt_ids: Iterable[str]):
+        """
+        지정한 프롬프트의 캐시 항목을 제거합니다.
+
+        Args:
+            prompt_ids: 제거할 프롬프트 ID 목록
+        """
+        with self._lock:
+            for prompt_id in prompt_ids:
+                self._discard(prompt_id)
+
+    def retain(self, prompt_ids: Iterable[str]):
+        """
+        지정한 프롬프트 외의 캐시 항목과 사용 횟수를 제거합니다.
+
+        Args:
+            prompt_ids: 유지할 프롬프트 ID 목록
+        """
+        keep = set(prompt_ids)
+        with self._lock:
+            for prompt_id in [pid for pid in self._entries if pid not in keep]:
+                self._discard(prompt_id)
+            self._use_counts = {pid: n for pid, n in self._use_counts.items() if pid in keep}
+
+    def hot_ids(self, limit: int) -> List[str]:
+        """
+        사용 횟수가 많은 프롬프트 ID 목록을 반환합니다.
+
+        Args:
+            limit: 최대 개수
+
+        Returns:
+            List[str]: 사용 횟수 내림차순 프롬프트 ID 목록
+        """
+        with self._lock:
+            ranked = sorted(self._use_counts.items(), key=lambda item: item[1], reverse=True)
+        return [prompt_id for prompt_id, _ in ranked[:limit]]
+
+    def prefetch(self, items: Iterable[Tuple[str, str]]):
+        """
+        캐시에 없거나 버전이 다른 본문을 미리 로드합니다.
+
+        사용 횟수는 증가시키지 않습니다. items는 우선순위 순서이며, 앞쪽 본문을 밀어내지 않도록
+        캐시가 차면(다음 본문을 넣으려면 다른 항목을 제거해야 하면) 중단합니다.
+
+        Args:
+            items: (프롬프트 ID, 버전) 목록
+        """
+        for prompt_id, version in items:
+            with self._lock:
+                if self.current_bytes >= self.max_bytes:
+                    break
+                entry = self._entries.get(prompt_id)
+                if entry is not None and entry[0] == version:
+                    continue
+            text = self.loader(prompt_id)
+            if text is None:
+                continue
+            with self._lock:
+                entry = self._entries.get(prompt_id)
+                free = self.max_bytes - self.current_bytes + (entry[2] if entry else 0)
+            if len(text.encode('utf-8')) > free:
+                break
+            self.put(prompt_id, version, text)
+
+    def _discard(self, prompt_id: str):
+        """락을 보유한 상태에서 캐시 항목 하나를 제거합니다."""
+        entry = self._entries.pop(prompt_id, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
@@ -0,0 +1,274 @@
+"""
+경량 분산 추적 모듈
+
+자동변환 감지 서비스(키 입력 → 본문 로드 → 붙여넣기)부터 API 요청, 저장소 읽기/쓰기까지를
+하나의 trace로 묶어 로컬 JSONL 파일에 기록합니다.
+
+- 현재 span은 contextvars로 전달되므로 스레드 풀에서 실행되는 라우트 함수에도 이어집니다.
+- 프로세스 간(watcher → API)에는 W3C traceparent 헤더로 전달합니다.
+- span은 큐에 넣기만 하고, 백그라운드 스레드가 모아서 파일에 기록합니다.
+  큐가 가득 차면 span을 버리며(dropped 카운트) 호출 측을 막지 않습니다.
+- 파일이 TRACING_MAX_BYTES를 넘으면 traces.jsonl.1, .2 ... 로 순환합니다.
+  여러 프로세스(워커, watcher)가 같은 파일에 기록하므로 순환과 추가는 파일 잠금 안에서 합니다.
+
+TRACING=false이면 span()은 아무 일도 하지 않는 컨텍스트 매니저를 반환합니다.
+"""
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from backend.config import config
+from backend.services.file_lock import FileLock
+
+TRACEPARENT_HEADER = "traceparent"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("ppop_current_span", default=None)
+
+
+class Span:
+    """
+    추적 구간
+
+    start/end는 time.time() 기준 초이며, 종료 시 exporter 큐에 들어갑니다.
+    """
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start', 'end', 'attributes', 'status')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value):
+        """속성 추가"""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        """JSONL 한 줄로 기록할 딕셔너리"""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round((self.end - self.start) * 1000, 3),
+            'status': self.status,
+            'pid': os.getpid(),
+            'attributes': self.attributes,
+        }
+
+
+class _RemoteParent:
+    """traceparent 헤더로 전달받은 부모 span (기록하지 않음)"""
+    __slots__ = ('trace_id', 'span_id')
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class JsonlExporter:
+    """
+    비동기 JSONL span 기록기
+
+    span은 bounded 큐에 들어가고, 백그라운드 스레드가 flush_interval마다 모아서 기록합니다.
+    """
+
+    def __init__(self, file_path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3,
+                 queue_size: int = 10000, flush_interval: float = 1.0):
+        """
+        JsonlExporter 초기화
+
+        Args:
+            file_path: 기록할 JSONL 파일 경로
+            max_bytes: 파일 최대 크기 (넘으면 순환)
+            backup_count: 보관할 이전 파일 수
+            queue_size: 기록 대기 span 최대 수 (넘으면 버림)
+            flush_interval: 기록 주기 (초)
+        """
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file_lock = FileLock(f"{file_path}.lock")
+
+    def export(self, span: Span):
+        """
+        span 기록 요청 (막히지 않음)
+
+        Args:
+            span: 종료된 span
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """기록 스레드 시작"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """기록 스레드를 중지하고 남은 span을 기록합니다."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """큐에 쌓인 span을 모두 파일에 기록"""
+        spans: List[Span] = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not spans:
+            return
+
+        lines = ''.join(json.dumps(span.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n'
+                        for span in spans)
+        try:
+            with self._file_lock:
+                self._rotate_if_needed(len(lines.encode('utf-8')))
+                with open(self.file_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+        except Exception as e:
+            print(f"Error writing {self.file_path}: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def _rotate_if_needed(self, incoming: int):
+        """기록 후 최대 크기를 넘으면 traces.jsonl → .1 → .2 ... 순으로 밀어냄"""
+        try:
+            size = os.path.getsize(self.file_path)
+        except OSError:
+            return
+        if size + incoming <= self.max_bytes:
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.file_path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.file_path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.file_path, f"{self.file_path}.1")
+        else:
+            os.remove(self.file_path)
+
+
+# 전역 exporter 인스턴스 (API 서버와 watcher가 각각 자기 프로세스에서 사용)
+exporter = JsonlExporter(
+    config.TRACES_FILE,
+    max_bytes=config.TRACING_MAX_BYTES,
+    backup_count=config.TRACING_BACKUP_COUNT
+)
+
+
+def enabled() -> bool:
+    """추적 활성화 여부"""
+    return config.TRACING_ENABLED
+
+
+def current_span():
+    """현재 컨텍스트의 span (없으면 None)"""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, parent=None, **attributes) -> Iterator[Optional[Span]]:
+    """
+    span 구간 생성
+
+    현재 span(또는 parent)의 자식으로 생성하며, 부모가 없으면 새 trace를 시작합니다.
+    블록에서 예외가 발생하면 status를 error로 기록하고 예외는 그대로 전달합니다.
+
+    Args:
+        name: span 이름 (예: storage.read)
+        parent: 부모 span (기본값: 현재 컨텍스트의 span, extract() 결과도 가능)
+        attributes: span 속성
+
+    Yields:
+        Optional[Span]: 생성된 span (추적 비활성화 시 None)
+    """
+    if not config.TRACING_ENABLED:
+        yield None
+        return
+
+    if parent is None:
+        parent = _current_span.get()
+    if parent is not None:
+        new_span = Span(name, parent.trace_id, parent.span_id, attributes)
+    else:
+        new_span = Span(name, secrets.token_hex(16), None, attributes)
+
+    token = _current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.status = "error"
+        new_span.attributes['error'] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        new_span.end = time.time()
+        exporter.export(new_span)
+
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    현재 span을 traceparent 헤더로 추가
+
+    Args:
+        headers: 기존 헤더 (선택사항)
+
+    Returns:
+        Dict[str, str]: traceparent가 추가된 헤더 (현재 span이 없으면 그대로)
+    """
+    headers = dict(headers) if headers else {}
+    current = _current_span.get()
+    if current is not None:
+        headers[TRACEPARENT_HEADER] = f"00-{current.trace_id}-{current.span_id}-01"
+    return headers
+
+
+def extract(header: Optional[str]) -> Optional[_RemoteParent]:
+    """
+    traceparent 헤더에서 부모 span 정보 추출
+
+    Args:
+        header: traceparent 헤더 값 (00-<trace_id 32자>-<span_id 16자>-<flags>)
+
+    Returns:
+        Optional[_RemoteParent]: 부모 span 정보 (형식이 잘못되었으면 None)
+    """
+    if not header:
+        return None
+    parts = header.strip().split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return _RemoteParent(parts[1], parts[2])
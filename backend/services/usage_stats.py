@@ -0,0 +1,284 @@
+"""
+프롬프트 사용 통계 모듈
+
+자동변환 확장 횟수와 복사 횟수를 메모리에 집계하고,
+일정 주기 또는 종료 시점에 별도의 통계 파일로 한꺼번에 기록합니다.
+프롬프트 파일은 건드리지 않으며, 파일에는 증가분만 병합하므로
+여러 프로세스(API 서버 워커들, 독립 실행 watcher)가 같은 파일을 공유해도 집계가 유지됩니다.
+파일 병합(읽기-병합-쓰기)은 <통계 파일>.lock 파일 잠금으로 프로세스 간에 직렬화합니다.
+기록할 증가분이 없는 주기에도 파일의 수정 시각/크기가 바뀌었으면 다시 읽어
+다른 프로세스가 기록한 횟수를 순위에 반영합니다.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from backend.config import config
+from backend.services.file_lock import FileLock
+
+# 사용 종류별 인덱스 (파일에는 [autotext, copy, last_used] 배열로 저장)
+KINDS = ('autotext', 'copy')
+STATS_VERSION = 1
+
+
+class UsageStats:
+    """
+    프롬프트 사용 통계 집계기
+
+    전체 사용 횟수(autotext + copy) 내림차순 순위를 정렬된 리스트로 유지하여
+    기록할 때마다 O(log n) 탐색으로 순위를 갱신합니다.
+    """
+
+    def __init__(self, file_path: str, flush_interval: float = 30.0):
+        """
+        UsageStats 초기화
+
+        Args:
+            file_path: 통계 파일 경로
+            flush_interval: 파일 기록 주기 (초)
+        """
+        self.file_path = file_path
+        self.flush_interval = flush_interval
+        self._totals: Dict[str, List[float]] = {}   # {prompt_id: [autotext, copy, last_used]}
+        self._pending: Dict[str, List[float]] = {}  # 아직 파일에 기록하지 않은 증가분
+        self._removed: set = set()
+        self._ranking: List[Tuple[int, str]] = []   # (-전체 사용 횟수, prompt_id) 정렬 리스트
+        self.generation = 0                         # 순위가 바뀔 때마다 증가 (응답 캐시용)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._file_lock = FileLock(f"{file_path}.lock")
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loaded = False
+        self._signature: Optional[Tuple[int, int]] = None  # 마지막으로 읽거나 쓴 파일의 수정 시각/크기
+
+    # ============== 조회/기록 ==============
+
+    def record(self, prompt_id: str, kind: str = 'autotext', amount: int = 1):
+        """
+        사용 횟수 기록 (메모리에만 반영)
+
+        Args:
+            prompt_id: 프롬프트 ID
+            kind: 사용 종류 ('autotext' 또는 'copy')
+            amount: 증가량
+        """
+        index = KINDS.index(kind)
+        now = time.time()
+        self._ensure_loaded()
+        with self._lock:
+            self._removed.discard(prompt_id)
+            totals = self._totals.get(prompt_id)
+            if totals is None:
+                totals = [0, 0, 0]
+                self._totals[prompt_id] = totals
+            else:
+                self._ranking_remove(prompt_id, totals)
+            totals[index] += amount
+            totals[2] = now
+            self._ranking_insert(prompt_id, totals)
+
+            self.generation += 1
+
+            pending = self._pending.setdefault(prompt_id, [0, 0, 0])
+            pending[index] += amount
+            pending[2] = now
+
+    def remove(self, prompt_id: str):
+        """
+        프롬프트 통계 삭제 (다음 기록 시 파일에서도 제거)
+
+        Args:
+            prompt_id: 프롬프트 ID
+        """
+        self._ensure_loaded()
+        with self._lock:
+            totals = self._totals.pop(prompt_id, None)
+            if totals is not None:
+                self._ranking_remove(prompt_id, totals)
+                self.generation += 1
+            self._pending.pop(prompt_id, None)
+            self._removed.add(prompt_id)
+
+    def get(self, prompt_id: str) -> Dict[str, float]:
+        """
+        프롬프트 사용 통계 조회
+
+        Args:
+            prompt_id: 프롬프트 ID
+
+        Returns:
+            Dict[str, float]: {'autotext': n, 'copy': n, 'last_used': timestamp}
+        """
+        self._ensure_loaded()
+        with self._lock:
+            totals = self._totals.get(prompt_id, [0, 0, 0])
+            return {'autotext': totals[0], 'copy': totals[1], 'last_used': totals[2]}
+
+    def ranking(self, limit: Optional[int] = None) -> List[str]:
+        """
+        사용 횟수 내림차순 프롬프트 ID 목록
+
+        Args:
+            limit: 최대 개수 (선택사항)
+
+        Returns:
+            List[str]: 프롬프트 ID 목록 (사용 기록이 있는 프롬프트만)
+        """
+        self._ensure_loaded()
+        with self._lock:
+            ranked = self._ranking if limit is None else self._ranking[:limit]
+            return [prompt_id for _, prompt_id in ranked]
+
+    # ============== 파일 기록 ==============
+
+    def load(self):
+        """통계 파일을 읽어 메모리 집계를 초기화합니다."""
+        self._adopt(self._read_file())
+        self._loaded = True
+
+    def flush(self) -> bool:
+        """
+        메모리의 증가분을 통계 파일에 병합하여 기록합니다.
+
+        기록할 증가분이 없으면 파일이 바뀐 경우에만 다시 읽어 다른 프로세스의 기록을 반영합니다.
+
+        Returns:
+            bool: 성공 여부 (기록할 내용이 없으면 True)
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                removed, self._removed = self._removed, set()
+
+            if not pending and not removed:
+                if self._file_signature() != self._signature:
+                    self._adopt(self._read_file())
+                return True
+
+            # 다른 프로세스가 읽은 뒤 기록하기 전에 끼어들면 그 증가분이 사라지므로 프로세스 간 잠금
+            with self._file_lock:
+                data = self._read_file()
+                for prompt_id, delta in pending.items():
+                    self._merge(data, prompt_id, delta)
+                for prompt_id in removed:
+                    data.pop(prompt_id, None)
+                written = self._write_file(data)
+
+            if not written:
+                # 실패 시 증가분을 되돌려 다음 주기에 재시도
+                with self._lock:
+                    for prompt_id, delta in pending.items():
+                        self._merge(self._pending, prompt_id, delta)
+                    self._removed |= removed
+                return False
+
+            # 다른 프로세스의 기록까지 반영된 값으로 메모리 집계 갱신
+            self._adopt(data)
+            return True
+
+    def start(self):
+        """통계를 로드하고 주기적 기록 스레드를 시작합니다."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.load()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """주기적 기록 스레드를 중지하고 남은 증가분을 기록합니다."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self):
+        """flush_interval마다 증가분을 기록"""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing usage stats: {e}")
+
+    # ============== 내부 함수 ==============
+
+    def _ensure_loaded(self):
+        """처음 사용할 때 통계 파일을 로드"""
+        if not self._loaded:
+            self.load()
+
+    def _adopt(self, data: Dict[str, List[float]]):
+        """파일 내용에 아직 기록하지 않은 증가분/삭제를 더해 메모리 집계와 순위를 교체"""
+        with self._lock:
+            for prompt_id, delta in self._pending.items():
+                self._merge(data, prompt_id, delta)
+            for prompt_id in self._removed:
+                data.pop(prompt_id, None)
+            self._totals = data
+            self._rebuild_ranking()
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_file(self) -> Dict[str, List[float]]:
+        """통계 파일 읽기 (없거나 손상된 경우 빈 딕셔너리)"""
+        # 읽는 도중 바뀌면 다음 주기에 다시 읽도록 읽기 전 서명을 보관
+        self._signature = self._file_signature()
+        if self._signature is None:
+            return {}
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+            return {pid: list(values) for pid, values in content.get('prompts', {}).items()}
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+        except Exception as e:
+            print(f"Error reading {self.file_path}: {e}")
+            return {}
+
+    def _write_file(self, data: Dict[str, List[float]]) -> bool:
+        """통계 파일 쓰기 (임시 파일에 쓴 뒤 교체)"""
+        temp_path = f"{self.file_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': STATS_VERSION, 'prompts': data}, f, separators=(',', ':'))
+            os.replace(temp_path, self.file_path)
+            self._signature = self._file_signature()
+            return True
+        except Exception as e:
+            print(f"Error writing {self.file_path}: {e}")
+            return False
+
+    @staticmethod
+    def _merge(target: Dict[str, List[float]], prompt_id: str, delta: List[float]):
+        """증가분을 대상 딕셔너리에 더함"""
+        values = target.setdefault(prompt_id, [0, 0, 0])
+        values[0] += delta[0]
+        values[1] += delta[1]
+        values[2] = max(values[2], delta[2])
+
+    def _ranking_insert(self, prompt_id: str, totals: List[float]):
+        bisect.insort(self._ranking, (-(totals[0] + totals[1]), prompt_id))
+
+    def _ranking_remove(self, prompt_id: str, totals: List[float]):
+        key = (-(totals[0] + totals[1]), prompt_id)
+        index = bisect.bisect_left(self._ranking, key)
+        if index < len(self._ranking) and self._ranking[index] == key:
+            self._ranking.pop(index)
+
+    def _rebuild_ranking(self):
+        self._ranking = sorted((-(values[0] + values[1]), prompt_id)
+                               for prompt_id, values in self._totals.items())
+        self.generation += 1
+
+
+# 전역 사용 통계 인스턴스 (API 서버와 watcher가 공유)
+usage_stats = UsageStats(config.USAGE_STATS_FILE, flush_interval=config.USAGE_STATS_FLUSH_INTERVAL)
@@ -0,0 +1,179 @@
+"""
+watcher 선출 및 프로세스 간 갱신 알림 모듈
+
+여러 uvicorn 워커가 실행되어도 키보드 후킹 watcher는 한 프로세스에서만 실행해야 합니다
+(여러 개면 트리거 하나가 여러 번 확장됨).
+
+- 선출: DATA_DIR/watcher.lock 파일 잠금을 얻은 프로세스가 watcher를 실행합니다.
+  잠금은 프로세스가 종료되면 OS가 해제하므로 다른 워커가 이어받을 수 있습니다.
+- 알림: watcher 프로세스는 UpdateListener로 127.0.0.1의 임의 UDP 포트를 열고
+  DATA_DIR/watcher.json에 {port, pid}를 기록합니다. 프롬프트를 수정한 워커는
+  notify_update()로 그 포트에 데이터그램을 보내 자동변환 딕셔너리를 바로 갱신하게 합니다.
+
+알림은 최선 노력 방식입니다. 전송 실패(watcher 없음, 재시작 중)는 무시하며,
+watcher는 다음 갱신 때 변경 로그에서 놓친 변경을 함께 받습니다.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from typing import Callable, Optional, Tuple
+from backend.config import config
+from backend.services.file_lock import FileLock
+
+UPDATE_MESSAGE = b'update'
+
+# 알림을 받으면 이 시간 동안 이어지는 알림을 모아 한 번만 갱신 (초)
+COALESCE_SECONDS = 0.05
+# 알림이 계속 이어져도 이 시간이 지나면 갱신 (초)
+COALESCE_MAX_SECONDS = 0.5
+
+
+def _watcher_file() -> str:
+    return os.path.join(config.DATA_DIR, 'watcher.json')
+
+
+def watcher_lock() -> FileLock:
+    """
+    watcher 선출용 잠금 (acquire(blocking=False)에 성공한 프로세스가 watcher 실행)
+
+    Returns:
+        FileLock: DATA_DIR/watcher.lock 잠금
+    """
+    return FileLock(lambda: os.path.join(config.DATA_DIR, 'watcher.lock'))
+
+
+class UpdateListener:
+    """
+    다른 프로세스의 갱신 알림 수신기 (watcher 프로세스에서 실행)
+    """
+
+    def __init__(self, callback: Callable[[], None]):
+        """
+        UpdateListener 초기화
+
+        Args:
+            callback: 알림을 받았을 때 호출할 함수 (예: watcher.trigger_update)
+        """
+        self.callback = callback
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def port(self) -> Optional[int]:
+        return self._sock.getsockname()[1] if self._sock else None
+
+    def start(self):
+        """포트를 열고 watcher.json을 기록한 뒤 수신 스레드 시작"""
+        if self._running:
+            return
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.settimeout(0.5)  # stop() 확인 주기
+        self._running = True
+
+        info = {'port': self.port, 'pid': os.getpid()}
+        file_path = _watcher_file()
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(info, f)
+            os.replace(temp_path, file_path)
+        except Exception as e:
+            print(f"Error writing {file_path}: {e}")
+
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def _listen(self):
+        while self._running:
+            try:
+                data, _ = self._sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # stop()에서 소켓을 닫음
+            if data != UPDATE_MESSAGE:
+                continue
+
+            # 한 번의 수정 요청 묶음(예: 폴더 삭제로 여러 프롬프트 이동)은 한 번만 갱신
+            self._drain()
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"[WARN] watcher 갱신 알림 처리 실패: {e}")
+
+    def _drain(self):
+        """짧은 시간 동안 이어서 도착한 알림을 버림"""
+        deadline = time.monotonic() + COALESCE_MAX_SECONDS
+        self._sock.settimeout(COALESCE_SECONDS)
+        try:
+            while time.monotonic() < deadline:
+                self._sock.recvfrom(64)
+        except (socket.timeout, OSError):
+            pass
+        finally:
+            if self._running:
+                self._sock.settimeout(0.5)
+
+    def stop(self):
+        """수신 중지 및 watcher.json 삭제 (이 프로세스가 쓴 경우에만)"""
+        self._running = False
+        if self._sock:
+            self._sock.close()
+        if self._thread:
+            self._thread.join(timeout=1)
+        try:
+            with open(_watcher_file(), 'r', encoding='utf-8') as f:
+                owner = json.load(f).get('pid')
+            if owner == os.getpid():
+                os.remove(_watcher_file())
+        except (OSError, ValueError):
+            pass
+
+
+# 알림 전송용 소켓과 watcher.json 캐시 (파일 서명이 바뀐 경우에만 다시 읽음)
+_send_sock: Optional[socket.socket] = None
+_target: Tuple[Optional[Tuple[int, int]], Optional[int]] = (None, None)
+_send_lock = threading.Lock()
+
+
+def _watcher_port() -> Optional[int]:
+    global _target
+    file_path = _watcher_file()
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if _target[0] != signature:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                port = int(json.load(f)['port'])
+        except (OSError, ValueError, KeyError, TypeError):
+            port = None
+        _target = (signature, port)
+    return _target[1]
+
+
+def notify_update() -> bool:
+    """
+    watcher 프로세스에 자동변환 딕셔너리 갱신 알림 (같은 프로세스의 watcher 포함)
+
+    Returns:
+        bool: 전송 여부 (watcher가 없으면 False)
+    """
+    global _send_sock
+    with _send_lock:
+        port = _watcher_port()
+        if port is None:
+            return False
+        try:
+            if _send_sock is None:
+                _send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            _send_sock.sendto(UPDATE_MESSAGE, ('127.0.0.1', port))
+            return True
+        except OSError:
+            return False
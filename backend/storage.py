@@ -2,15 +2,113 @@
 JSON 파일 기반 데이터 저장소 모듈
 
 프롬프트와 폴더 데이터를 JSON 파일로 관리합니다.
+프롬프트는 폴더별 샤드 파일(DATA_DIR/prompts/folder-<id>.json, 폴더 없음은 unfiled.json)과
+샤드 목록을 담은 manifest.json으로 나누어 저장하므로, 수정 시 해당 폴더의 샤드만 다시 씁니다.
+파일 내용은 레코드 객체(backend.records)로 메모리에 유지하고,
+파일의 수정 시각/크기가 바뀐 경우(외부에서 수정)에만 다시 읽습니다.
+
+조회 함수는 레코드를 반환합니다. 레코드는 읽기 전용으로 다루며,
+수정 함수는 복사본을 고쳐 새 목록으로 교체합니다 (읽는 중인 목록/레코드는 바뀌지 않음).
+수정이 파일에 기록되면 변경 로그(backend.changelog)에 순번과 함께 남깁니다.
+프롬프트는 정렬/필터 조회와 ID 조회를 위한 인덱스(backend.indexes)도 수정 시 함께 갱신합니다.
+MARKDOWN_PROMPTS_DIR을 설정하면 그 디렉토리의 .md 파일(backend.markdown_source)도 읽기 전용 프롬프트로
+샤드와 함께 목록, 인덱스, 자동변환 딕셔너리에 포함합니다. 파일 변경은 변경 로그에 마지막으로 기록한
+상태(markdown_state.json)와 비교해 기록하고 watcher에 알립니다.
+폴더는 parent_id로 중첩되며, 하위 트리 조회/이동은 materialized path 인덱스(FolderTree)로 처리합니다.
+
+여러 워커 프로세스가 같은 DATA_DIR을 공유할 수 있습니다. 수정은 DATA_DIR/storage.lock 파일 잠금으로
+프로세스 간에도 직렬화하고, 다른 워커가 기록한 파일은 서명이 바뀌므로 다음 조회 때 다시 읽습니다.
 """
+import contextlib
+import functools
 import json
 import os
-from typing import List, Dict, Optional
+import threading
+import time
+from itertools import chain
+from typing import Callable, Generic, Iterable, List, Dict, Optional, Tuple, TypeVar, Union
 from datetime import datetime
+from backend.changelog import DELETE, UPSERT, changelog
 from backend.config import config
+from backend.indexes import FolderTree, PromptIndexes
+from backend.markdown_source import MARKDOWN_PART, MarkdownScan, MarkdownSource, is_markdown_id
+from backend.minhash import MinHashIndex
+from backend.suggest import SuggestIndex
+from backend.tfidf import TfidfIndex
+from backend.triggers import TriggerConflict, TriggerIndex
+from backend.records import (FolderRecord, PromptRecord, normalize_tags, now_timestamp, parse_timestamp,
+                             timestamp_sort_key)
+from backend.services import metrics, tracing, watcher_ipc
+from backend.services.file_lock import FileLock
+
+# 파일별 쓰기 세대 (이 프로세스에서 파일을 쓸 때마다 증가)
+_generations: Dict[str, int] = {}
+
+# 읽기-수정-쓰기 구간 직렬화 (라우트 함수는 스레드 풀에서 동시에 실행됨)
+_write_lock = threading.RLock()
+
+# 프로세스 간 직렬화 (여러 uvicorn 워커, 독립 실행 watcher)
+_file_lock = FileLock(lambda: os.path.join(config.DATA_DIR, 'storage.lock'))
+_lock_depth = 0
+
+
+@contextlib.contextmanager
+def _locked():
+    """
+    스레드 간(_write_lock)과 프로세스 간(storage.lock) 잠금을 함께 획득
+    
+    _write_lock과 같이 중첩해서 사용할 수 있으며, 파일 잠금은 가장 바깥에서만 획득/해제합니다.
+    """
+    global _lock_depth
+    with _write_lock:
+        if _lock_depth == 0:
+            _file_lock.acquire()
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0:
+                _file_lock.release()
+
 
+def _serialized(func):
+    """수정 함수를 _locked() 안에서 실행 (동시 수정 시 변경 내용 유실 방지)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _locked():
+            return func(*args, **kwargs)
+    return wrapper
 
-def _read_json_file(file_path: str) -> List[Dict]:
+
+def get_generation(*file_paths: str) -> str:
+    """
+    저장소 세대 조회
+    
+    이 프로세스의 쓰기 횟수와 파일의 수정 시각/크기를 합친 문자열입니다.
+    다른 프로세스나 사용자가 파일을 직접 수정한 경우에도 값이 바뀝니다.
+    응답 캐시와 ETag 계산에 사용됩니다.
+    
+    Args:
+        file_paths: 세대를 계산할 파일 경로 (기본값: 프롬프트 manifest와 모든 샤드)
+    
+    Returns:
+        str: 세대 문자열 (파일 내용이 바뀌면 다른 값)
+    """
+    parts = []
+    for file_path in file_paths or _prompt_shards.file_paths():
+        try:
+            stat = os.stat(file_path)
+            signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            signature = "missing"
+        parts.append(f"{_generations.get(file_path, 0)}:{signature}")
+    if not file_paths:
+        parts.append(_markdown_generation())
+    return '|'.join(parts)
+
+
+def _read_json_file(file_path: str) -> Union[List[Dict], Dict]:
     """
     JSON 파일 읽기
     
@@ -18,39 +116,78 @@ def _read_json_file(file_path: str) -> List[Dict]:
         file_path: JSON 파일 경로
     
     Returns:
-        List[Dict]: JSON 데이터 리스트
+        Union[List[Dict], Dict]: JSON 데이터 (파일이 없거나 읽을 수 없으면 빈 리스트)
     """
     if not os.path.exists(file_path):
         return []
     
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return []
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
-        return []
+    file_name = os.path.basename(file_path)
+    started = time.perf_counter()
+    with tracing.span('storage.read', file=file_name) as span:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            if span:
+                span.set_attribute('error', 'JSONDecodeError')
+            return []
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            if span:
+                span.status = 'error'
+            return []
+        finally:
+            metrics.STORAGE_OPERATION_SECONDS.observe(
+                time.perf_counter() - started, operation='read', file=file_name)
 
 
-def _write_json_file(file_path: str, data: List[Dict]) -> bool:
+def _write_json_file(file_path: str, data: Union[List[Dict], Dict]) -> bool:
     """
     JSON 파일 쓰기
     
     Args:
         file_path: JSON 파일 경로
-        data: 저장할 데이터 리스트
+        data: 저장할 데이터
     
     Returns:
         bool: 성공 여부
     """
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error writing {file_path}: {e}")
-        return False
+    file_name = os.path.basename(file_path)
+    started = time.perf_counter()
+    with tracing.span('storage.write', file=file_name, records=len(data)) as span:
+        try:
+            # 임시 파일에 쓴 뒤 교체하여 동시에 읽는 쪽이 잘린 파일을 보지 않도록 함
+            temp_path = f"{file_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            _replace_file(temp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Error writing {file_path}: {e}")
+            if span:
+                span.status = 'error'
+            return False
+        finally:
+            # 실패한 쓰기도 파일을 일부 바꿨을 수 있으므로 항상 세대 증가
+            _generations[file_path] = _generations.get(file_path, 0) + 1
+            metrics.STORAGE_OPERATION_SECONDS.observe(
+                time.perf_counter() - started, operation='write', file=file_name)
+
+
+def _replace_file(source: str, target: str, attempts: int = 5):
+    """
+    파일 교체 (os.replace)
+    
+    Windows에서는 다른 스레드가 대상 파일을 읽는 중이면 PermissionError가 발생하므로 잠시 후 재시도합니다.
+    """
+    for attempt in range(attempts):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.01)
 
 
 def _generate_id() -> str:
@@ -63,31 +200,706 @@ def _generate_id() -> str:
     return str(int(datetime.now().timestamp() * 1000000))
 
 
+R = TypeVar('R', PromptRecord, FolderRecord)
+
+
+def _file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """파일 수정 시각/크기 (없으면 None)"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _RecordTable(Generic[R]):
+    """
+    JSON 파일 하나를 레코드 목록으로 메모리에 유지하는 테이블
+    
+    load()는 파일 서명이 마지막으로 읽거나 쓴 시점과 같으면 메모리의 목록을 그대로 반환합니다.
+    """
+    
+    def __init__(self, file_path_getter: Callable[[], str], from_dict: Callable[[Dict], R]):
+        # config 경로는 테스트/벤치마크에서 바뀔 수 있으므로 호출 시점에 조회
+        self._file_path = file_path_getter
+        self._from_dict = from_dict
+        self._records: List[R] = []
+        self._signature: Optional[Tuple[int, int]] = None
+        self._loaded_path: Optional[str] = None
+    
+    def load(self) -> List[R]:
+        """
+        레코드 목록 조회 (반환된 목록은 수정하지 않음)
+        
+        Returns:
+            List[R]: 레코드 목록
+        """
+        file_path = self._file_path()
+        signature = _file_signature(file_path)
+        if signature is None or signature != self._signature or file_path != self._loaded_path:
+            if self._signature is not None and file_path == self._loaded_path:
+                _check_external_change(file_path)
+            records = [self._from_dict(item) for item in _read_json_file(file_path)]
+            self._records, self._signature, self._loaded_path = records, signature, file_path
+        return self._records
+    
+    def save(self, records: List[R]) -> bool:
+        """
+        레코드 목록을 파일에 기록하고 메모리의 목록을 교체
+        
+        Args:
+            records: 새 레코드 목록
+        
+        Returns:
+            bool: 성공 여부 (실패하면 다음 조회 시 파일을 다시 읽음)
+        """
+        file_path = self._file_path()
+        if _write_json_file(file_path, [record.to_dict() for record in records]):
+            self._records, self._signature, self._loaded_path = records, _file_signature(file_path), file_path
+            changelog.note_write(file_path, self._signature)
+            return True
+        self._signature = None
+        return False
+
+
+def _check_external_change(file_path: str):
+    """
+    메모리에 올린 뒤 바뀐 파일이 외부에서 수정된 것이면 변경 로그에 재설정 기록
+    
+    다른 워커의 수정은 변경 로그에 파일 서명이 함께 기록되므로 재설정하지 않습니다.
+    기록 중인 워커가 로그를 남기기 전에 확인하지 않도록 잠금 안에서 비교합니다.
+    """
+    with _locked():
+        if not changelog.is_logged_signature(file_path, _file_signature(file_path)):
+            # 개별 변경을 알 수 없으므로 클라이언트 재동기화 표시
+            changelog.reset()
+
+
+def _creation_order(prompt: PromptRecord) -> Tuple[int, str]:
+    """생성 순서 정렬 키 (ID는 생성 시각 기반 숫자 문자열)"""
+    prompt_id = prompt.id or ''
+    return len(prompt_id), prompt_id
+
+
+def shard_name(folder_id: Optional[int]) -> str:
+    """
+    폴더의 샤드 이름
+    
+    Args:
+        folder_id: 폴더 ID (None이면 폴더 없음)
+    
+    Returns:
+        str: 샤드 이름 (folder-<id> 또는 unfiled)
+    """
+    return 'unfiled' if folder_id is None else f"folder-{folder_id}"
+
+
+def _shard_path(folder_id: Optional[int]) -> str:
+    return os.path.join(config.PROMPTS_DIR, f"{shard_name(folder_id)}.json")
+
+
+class _PromptShards:
+    """
+    폴더별 프롬프트 샤드 모음
+    
+    manifest.json에 샤드 목록({샤드 이름: {'folder_id': ID}})을 기록하며,
+    manifest는 샤드가 추가/삭제될 때만 다시 씁니다.
+    각 샤드의 레코드는 생성 순서로 유지하고, 전체 목록은 샤드를 합쳐 생성 순서로 정렬한 결과를
+    샤드 목록이 바뀔 때까지 재사용합니다.
+    읽기 전용 소스의 레코드는 전체 목록과 인덱스에만 포함하며 샤드로 기록하지 않습니다.
+    """
+    
+    def __init__(self, read_only: Callable[[], List[PromptRecord]]):
+        self.indexes = PromptIndexes()
+        # 읽기 전용 소스의 레코드 목록 (Markdown 디렉토리, 바뀐 것이 없으면 같은 목록 객체)
+        self.read_only = read_only
+        self._tables: Dict[Optional[int], _RecordTable[PromptRecord]] = {}
+        self._folder_ids: List[Optional[int]] = []
+        self._manifest_signature: Optional[Tuple[int, int]] = None
+        self._manifest_path: Optional[str] = None
+        self._merged: List[PromptRecord] = []
+        self._merged_parts: List[List[PromptRecord]] = []
+    
+    def folder_ids(self) -> List[Optional[int]]:
+        """
+        샤드가 있는 폴더 ID 목록 (manifest가 바뀐 경우에만 다시 읽음)
+        
+        Returns:
+            List[Optional[int]]: 폴더 ID 목록 (None은 폴더 없음)
+        """
+        manifest_path = config.PROMPTS_MANIFEST_FILE
+        signature = _file_signature(manifest_path)
+        if signature is None or signature != self._manifest_signature or manifest_path != self._manifest_path:
+            manifest = _read_json_file(manifest_path)
+            shards = manifest.get('shards', {}) if isinstance(manifest, dict) else {}
+            self._folder_ids = [entry.get('folder_id') for entry in shards.values()]
+            self._manifest_signature, self._manifest_path = signature, manifest_path
+        return self._folder_ids
+    
+    def file_paths(self) -> List[str]:
+        """manifest와 모든 샤드 파일 경로 (세대 계산용)"""
+        return [config.PROMPTS_MANIFEST_FILE] + [_shard_path(folder_id) for folder_id in self.folder_ids()]
+    
+    def _table(self, folder_id: Optional[int]) -> _RecordTable[PromptRecord]:
+        table = self._tables.get(folder_id)
+        if table is None:
+            table = self._tables[folder_id] = _RecordTable(lambda: _shard_path(folder_id), PromptRecord.from_dict)
+        return table
+    
+    def load(self, folder_id: Optional[int]) -> List[PromptRecord]:
+        """
+        샤드 하나의 레코드 목록 (반환된 목록은 수정하지 않음)
+        
+        Args:
+            folder_id: 폴더 ID (None이면 폴더 없음)
+        
+        Returns:
+            List[PromptRecord]: 생성 순서의 레코드 목록 (샤드가 없으면 빈 목록)
+        """
+        if folder_id not in self.folder_ids():
+            return []
+        return self._table(folder_id).load()
+    
+    def load_all(self) -> List[PromptRecord]:
+        """
+        모든 샤드와 읽기 전용 소스의 레코드를 생성 순서로 합친 목록 (반환된 목록은 수정하지 않음)
+        
+        Returns:
+            List[PromptRecord]: 레코드 목록
+        """
+        parts = [self.load(folder_id) for folder_id in self.folder_ids()] + [self.read_only()]
+        # 샤드 목록은 저장/다시 읽기 시 교체되므로 모두 같은 객체면 이전 결과를 그대로 사용
+        if len(parts) != len(self._merged_parts) or any(a is not b for a, b in zip(parts, self._merged_parts)):
+            self._merged = sorted(chain.from_iterable(parts), key=_creation_order)
+            self._merged_parts = parts
+        return self._merged
+    
+    def synced_indexes(self) -> PromptIndexes:
+        """
+        현재 샤드 내용과 맞춘 인덱스 (다시 읽은 샤드가 있으면 그 샤드만 반영)
+        
+        Returns:
+            PromptIndexes: 인덱스
+        """
+        parts = {folder_id: self.load(folder_id) for folder_id in self.folder_ids()}
+        parts[MARKDOWN_PART] = self.read_only()
+        self.indexes.sync(parts)
+        return self.indexes
+    
+    def find(self, prompt_id: str) -> Tuple[Optional[int], int, Optional[PromptRecord]]:
+        """
+        ID로 레코드 위치 조회 (ID 인덱스로 레코드를 찾은 뒤 해당 샤드에서만 위치 확인)
+        
+        Returns:
+            Tuple[Optional[int], int, Optional[PromptRecord]]: (샤드 폴더 ID, 샤드 내 위치, 레코드), 없으면 (None, -1, None)
+        """
+        prompt = self.synced_indexes().get(prompt_id)
+        if prompt is None:
+            return None, -1, None
+        # 레코드는 folder_id의 샤드에 있음 (외부에서 잘못 옮긴 경우에만 전체 샤드 확인)
+        for folder_id in [prompt.folder_id] + [f for f in self.folder_ids() if f != prompt.folder_id]:
+            for i, candidate in enumerate(self.load(folder_id)):
+                if candidate is prompt:
+                    return folder_id, i, prompt
+        return None, -1, None
+    
+    def save(self, folder_id: Optional[int], records: List[PromptRecord],
+             upserted: Optional[List[PromptRecord]] = None, deleted: Tuple[str, ...] = ()) -> bool:
+        """
+        샤드 하나를 기록 (처음 만드는 샤드면 manifest에도 추가)
+        
+        Args:
+            folder_id: 폴더 ID (None이면 폴더 없음)
+            records: 생성 순서의 레코드 목록
+            upserted: 이 샤드에 추가/수정된 레코드 (지정하면 인덱스를 바뀐 레코드만 갱신,
+                None이면 다음 조회 때 샤드 전체를 비교)
+            deleted: 이 샤드에서 삭제된 프롬프트 ID
+        
+        Returns:
+            bool: 성공 여부
+        """
+        os.makedirs(config.PROMPTS_DIR, exist_ok=True)
+        if not self._table(folder_id).save(records):
+            return False
+        if upserted is not None:
+            self.indexes.apply(folder_id, records, upserted, deleted)
+        folder_ids = self.folder_ids()
+        if folder_id not in folder_ids:
+            return self._write_manifest(folder_ids + [folder_id])
+        return True
+    
+    def remove(self, folder_id: Optional[int]) -> bool:
+        """
+        샤드 삭제 (manifest에서 먼저 제거한 뒤 파일 삭제)
+        
+        Args:
+            folder_id: 폴더 ID
+        
+        Returns:
+            bool: 성공 여부
+        """
+        folder_ids = self.folder_ids()
+        if folder_id not in folder_ids:
+            return True
+        if not self._write_manifest([f for f in folder_ids if f != folder_id]):
+            return False
+        self._tables.pop(folder_id, None)
+        _remove_file(_shard_path(folder_id))
+        return True
+    
+    def replace_all(self, records: List[PromptRecord]) -> bool:
+        """
+        모든 샤드를 다시 기록 (마이그레이션용, 레코드가 없는 샤드는 삭제)
+        
+        Args:
+            records: 전체 레코드 목록
+        
+        Returns:
+            bool: 성공 여부
+        """
+        groups: Dict[Optional[int], List[PromptRecord]] = {None: []}
+        for record in sorted(records, key=_creation_order):
+            groups.setdefault(record.folder_id, []).append(record)
+        
+        stale = [folder_id for folder_id in self.folder_ids() if folder_id not in groups]
+        os.makedirs(config.PROMPTS_DIR, exist_ok=True)
+        for folder_id, group in groups.items():
+            if not self._table(folder_id).save(group):
+                return False
+        if not self._write_manifest(list(groups)):
+            return False
+        for folder_id in stale:
+            self._tables.pop(folder_id, None)
+            _remove_file(_shard_path(folder_id))
+        return True
+    
+    def _write_manifest(self, folder_ids: List[Optional[int]]) -> bool:
+        manifest = {
+            'shards': {shard_name(folder_id): {'folder_id': folder_id} for folder_id in folder_ids}
+        }
+        if not _write_json_file(config.PROMPTS_MANIFEST_FILE, manifest):
+            self._manifest_signature = None
+            return False
+        self._folder_ids = list(folder_ids)
+        self._manifest_signature = _file_signature(config.PROMPTS_MANIFEST_FILE)
+        self._manifest_path = config.PROMPTS_MANIFEST_FILE
+        changelog.note_write(config.PROMPTS_MANIFEST_FILE, self._manifest_signature)
+        return True
+
+
+def _remove_file(file_path: str):
+    """데이터 파일 삭제 (삭제도 변경 로그에 서명 None으로 기록)"""
+    try:
+        os.remove(file_path)
+    except OSError as e:
+        print(f"Error removing {file_path}: {e}")
+    changelog.note_write(file_path, _file_signature(file_path))
+
+
+_prompt_shards = _PromptShards(lambda: _markdown_records())
+_folders: "_RecordTable[FolderRecord]" = _RecordTable(lambda: config.FOLDERS_FILE, FolderRecord.from_dict)
+_markdown = MarkdownSource(lambda: config.MARKDOWN_PROMPTS_DIR, config.MARKDOWN_RESCAN_INTERVAL,
+                           config.MARKDOWN_PARSE_WORKERS)
+_folder_tree = FolderTree()
+_minhash = MinHashIndex(lambda: config.MINHASH_CACHE_FILE)
+_prompt_shards.indexes.register(_minhash)
+_tfidf = TfidfIndex()
+_prompt_shards.indexes.register(_tfidf)
+_suggest = SuggestIndex()
+_prompt_shards.indexes.register(_suggest)
+_triggers = TriggerIndex()
+_prompt_shards.indexes.register(_triggers)
+
+
+def _markdown_records(force: bool = False) -> List[PromptRecord]:
+    """
+    Markdown 디렉토리의 읽기 전용 프롬프트 (재확인 주기마다 바뀐 파일만 다시 읽음)
+    
+    파일이 추가/수정/삭제되어 변경 로그에 새로 기록했으면 watcher에 자동변환 딕셔너리 갱신을 알립니다.
+    
+    Args:
+        force: 재확인 주기와 관계없이 디렉토리를 다시 훑음
+    """
+    scan = _markdown.load(_folders.load(), force)
+    if (scan.full or scan.upserted or scan.deleted) and _log_markdown_changes(scan):
+        watcher_ipc.notify_update()
+    return scan.records
+
+
+def _log_markdown_changes(scan: MarkdownScan) -> bool:
+    """
+    Markdown 변경을 변경 로그에 기록 (markdown_state.json에 마지막으로 기록한 지문과 비교)
+    
+    상태 파일은 워커와 재시작 사이에 공유되므로, 여러 워커가 같은 변경을 발견해도 seq는 하나만 부여되고
+    프로세스의 첫 조회(full)에서는 서버가 꺼져 있던 동안 추가/수정/삭제된 파일도 기록됩니다.
+    다른 워커가 더 최근 수정 시각의 내용을 이미 기록했으면 덮어쓰지 않습니다.
+    디렉토리 설정이 바뀌었거나 상태 파일이 없으면 개별 변경을 알 수 없으므로 재설정을 기록합니다.
+    
+    Args:
+        scan: MarkdownSource.load() 결과
+    
+    Returns:
+        bool: 새로 기록한 변경이 있는지
+    """
+    directory = config.MARKDOWN_PROMPTS_DIR
+    with _locked():
+        state = _read_json_file(config.MARKDOWN_STATE_FILE)
+        if not isinstance(state, dict):
+            if not directory:
+                return False
+            state = {}
+        
+        if state.get('directory') != directory:
+            changelog.reset()
+            _write_json_file(config.MARKDOWN_STATE_FILE,
+                             {'directory': directory, 'prompts': _markdown.fingerprints()})
+            return True
+        
+        logged: Dict[str, List] = state.get('prompts', {})
+        recorded = False
+        for prompt_id, fingerprint in _markdown.fingerprints(record.id for record in scan.upserted).items():
+            previous = logged.get(prompt_id)
+            if previous is not None and (previous[:2] == list(fingerprint[:2]) or previous[2] > fingerprint[2]):
+                continue
+            logged[prompt_id] = list(fingerprint)
+            changelog.record('prompt', prompt_id, UPSERT)
+            recorded = True
+        
+        deleted = list(scan.deleted)
+        if scan.full:
+            current = {record.id for record in scan.records}
+            deleted += [prompt_id for prompt_id in logged if prompt_id not in current]
+        for prompt_id in deleted:
+            if logged.pop(prompt_id, None) is not None:
+                changelog.record('prompt', prompt_id, DELETE)
+                recorded = True
+        
+        if recorded:
+            _write_json_file(config.MARKDOWN_STATE_FILE, {'directory': directory, 'prompts': logged})
+        return recorded
+
+
+def refresh_markdown(force: bool = False) -> List[PromptRecord]:
+    """
+    Markdown 디렉토리 다시 확인 (바뀐 파일을 변경 로그에 기록하고 watcher에 알림)
+    
+    다른 조회 함수도 재확인 주기마다 확인하지만, 요청이 없어도 파일 변경이 반영되도록
+    watcher 프로세스가 주기적으로, /api/changes가 변경 조회 전에 호출합니다.
+    
+    Args:
+        force: 재확인 주기와 관계없이 디렉토리를 다시 훑음 (다른 워커가 기록한 변경의 최신 내용이 필요할 때)
+    
+    Returns:
+        List[PromptRecord]: Markdown 프롬프트 목록
+    """
+    return _markdown_records(force)
+
+
+def _markdown_generation() -> str:
+    """Markdown 디렉토리 세대 (재확인 주기가 지났으면 먼저 다시 확인)"""
+    _markdown_records()
+    return f"md:{_markdown.version}"
+
+
+def _check_writable(prompt_id: str):
+    """
+    수정 가능한 프롬프트인지 확인
+    
+    Raises:
+        ValueError: Markdown 디렉토리의 읽기 전용 프롬프트인 경우
+    """
+    if is_markdown_id(prompt_id):
+        raise ValueError("Markdown 파일의 프롬프트는 읽기 전용입니다. 파일을 직접 수정하세요.")
+
+
+def _synced_folder_tree() -> FolderTree:
+    """현재 folders.json 내용과 맞춘 폴더 트리 인덱스"""
+    _folder_tree.sync(_folders.load())
+    return _folder_tree
+
+
+def _prompt_folder_ids(folder_id: int, include_subfolders: bool) -> List[int]:
+    """프롬프트를 조회할 폴더 ID 목록 (include_subfolders면 하위 트리 전체)"""
+    if not include_subfolders:
+        return [folder_id]
+    return _synced_folder_tree().subtree_ids(folder_id) or [folder_id]
+
+
 # ============== 프롬프트 관련 함수 ==============
 
-def get_prompts(folder_id: Optional[int] = None) -> List[Dict]:
+def get_prompts_generation(folder_id: Optional[int] = None, include_subfolders: bool = False) -> str:
+    """
+    프롬프트 목록 세대 조회
+    
+    폴더를 지정하면 manifest와 해당 폴더(include_subfolders면 하위 트리) 샤드만 확인하므로
+    다른 폴더의 프롬프트가 바뀌어도 값이 바뀌지 않습니다.
+    
+    Args:
+        folder_id: 폴더 ID (None이면 전체)
+        include_subfolders: 하위 폴더 포함 여부 (폴더 트리가 바뀌어도 값이 바뀜)
+    
+    Returns:
+        str: 세대 문자열
+    """
+    if folder_id is None:
+        return get_generation()
+    if not include_subfolders:
+        generation = get_generation(config.PROMPTS_MANIFEST_FILE, _shard_path(folder_id))
+    else:
+        generation = get_generation(config.FOLDERS_FILE, config.PROMPTS_MANIFEST_FILE,
+                                    *[_shard_path(f) for f in _prompt_folder_ids(folder_id, True)])
+    return f"{generation}|{_markdown_generation()}"
+
+
+@_serialized
+def replace_all_prompts(prompts: List[Dict]) -> bool:
+    """
+    전체 프롬프트를 샤드 파일로 다시 기록 (마이그레이션/초기화용)
+    
+    Args:
+        prompts: JSON 형식의 프롬프트 목록
+    
+    Returns:
+        bool: 성공 여부
+    """
+    if not _prompt_shards.replace_all([PromptRecord.from_dict(prompt) for prompt in prompts]):
+        return False
+    # 개별 변경을 기록하지 않으므로 기존 클라이언트는 재동기화
+    changelog.reset()
+    return True
+
+
+def get_prompts_by_ids(prompt_ids) -> Dict[str, PromptRecord]:
+    """
+    여러 ID의 프롬프트를 한 번에 조회
+    
+    Args:
+        prompt_ids: 프롬프트 ID 목록
+    
+    Returns:
+        Dict[str, PromptRecord]: {ID: 레코드} (없는 ID는 제외)
+    """
+    wanted = set(prompt_ids)
+    if not wanted:
+        return {}
+    indexes = _prompt_shards.synced_indexes()
+    prompts = {}
+    for prompt_id in wanted:
+        prompt = indexes.get(prompt_id)
+        if prompt is not None:
+            prompts[prompt_id] = prompt
+    return prompts
+
+
+def get_prompts(folder_id: Optional[int] = None, include_subfolders: bool = False) -> List[PromptRecord]:
     """
     프롬프트 목록 조회
     
     Args:
         folder_id: 폴더 ID로 필터링 (선택사항)
+        include_subfolders: 하위 폴더의 프롬프트도 포함 (folder_id를 지정한 경우)
     
     Returns:
-        List[Dict]: 프롬프트 목록
+        List[PromptRecord]: 프롬프트 목록 (하위 폴더를 포함하거나 Markdown 프롬프트가 있으면 생성 순서)
     """
-    prompts = _read_json_file(config.PROMPTS_FILE)
+    if folder_id is not None:
+        folder_ids = _prompt_folder_ids(folder_id, include_subfolders)
+        markdown = _markdown_in_folders(folder_ids)
+        if len(folder_ids) == 1 and not markdown:
+            return list(_prompt_shards.load(folder_ids[0]))
+        parts = [_prompt_shards.load(f) for f in folder_ids] + [markdown]
+        return sorted(chain.from_iterable(parts), key=_creation_order)
     
-    # 기존 데이터의 type 필드 제거 (하위 호환성)
-    for prompt in prompts:
-        prompt.pop('type', None)
+    return list(_prompt_shards.load_all())
+
+
+def _markdown_in_folders(folder_ids: List[int]) -> List[PromptRecord]:
+    """폴더 목록에 속한 Markdown 프롬프트"""
+    records = _markdown_records()
+    if not records:
+        return []
+    wanted = set(folder_ids)
+    return [record for record in records if record.folder_id in wanted]
+
+
+def query_prompts(sort: Optional[str] = None, descending: bool = False,
+                  folder_id: Optional[int] = None, has_autotext: Optional[bool] = None,
+                  updated_since: Optional[str] = None, title_prefix: Optional[str] = None,
+                  offset: int = 0, limit: Optional[int] = None,
+                  include_subfolders: bool = False, tags_all: Iterable[str] = (),
+                  tags_any: Iterable[str] = (), tags_none: Iterable[str] = ()) -> List[PromptRecord]:
+    """
+    정렬/필터 조건으로 프롬프트 조회
     
-    if folder_id is not None:
-        prompts = [p for p in prompts if p.get('folder_id') == folder_id]
+    정렬 기준을 지정하면 정렬 인덱스에서 필요한 페이지만 읽습니다.
+    지정하지 않으면 저장 순서(생성 순서) 목록에 필터를 적용합니다.
+    태그 조건은 태그 비트맵 연산으로 후보를 구하므로 전체 목록을 순회하지 않습니다.
     
-    return prompts
+    Args:
+        sort: 정렬 기준 ('created_at', 'updated_at', 'title', None이면 저장 순서)
+        descending: 내림차순 여부 (sort를 지정한 경우)
+        folder_id: 폴더 ID로 필터링 (선택사항)
+        has_autotext: 자동변환 텍스트 유무로 필터링 (선택사항)
+        updated_since: 이 시각(ISO 문자열) 이후 수정된 것만 (선택사항)
+        title_prefix: 제목 접두사, 대소문자 무시 (선택사항)
+        offset: 건너뛸 개수
+        limit: 최대 개수 (None이면 전부)
+        include_subfolders: folder_id의 하위 폴더도 포함
+        tags_all: 모두 있어야 하는 태그
+        tags_any: 하나 이상 있어야 하는 태그
+        tags_none: 없어야 하는 태그
+    
+    Returns:
+        List[PromptRecord]: 프롬프트 목록
+    
+    Raises:
+        ValueError: updated_since가 시각 형식이 아닌 경우
+    """
+    since = parse_timestamp(updated_since) if updated_since else None
+    
+    tags_all, tags_any, tags_none = normalize_tags(tags_all), normalize_tags(tags_any), normalize_tags(tags_none)
+    folder_ids = None if folder_id is None else set(_prompt_folder_ids(folder_id, include_subfolders))
+    
+    if sort is not None:
+        return _prompt_shards.synced_indexes().query(
+            sort, descending, folder_ids=folder_ids, has_autotext=has_autotext,
+            updated_since=since, title_prefix=title_prefix, offset=offset, limit=limit,
+            tags_all=tags_all, tags_any=tags_any, tags_none=tags_none)
+    
+    if tags_all or tags_any or tags_none:
+        prompts = [
+            prompt for prompt in _prompt_shards.synced_indexes().tagged(tags_all, tags_any, tags_none)
+            if folder_ids is None or prompt.folder_id in folder_ids
+        ]
+        prompts.sort(key=_creation_order)
+    else:
+        prompts = get_prompts(folder_id=folder_id, include_subfolders=include_subfolders)
+    if has_autotext is not None or since is not None or title_prefix:
+        prompts = [
+            prompt for prompt in prompts
+            if (has_autotext is None or bool(prompt.autotext) == has_autotext)
+            and (since is None or timestamp_sort_key(prompt.updated) >= since)
+            and (not title_prefix or (prompt.title or '').casefold().startswith(title_prefix.casefold()))
+        ]
+    return prompts[offset:None if limit is None else offset + limit]
 
 
-def get_prompt_by_id(prompt_id: str) -> Optional[Dict]:
+def get_tag_counts() -> Dict[str, int]:
+    """
+    태그별 프롬프트 수 조회 (인덱스가 갱신 시 함께 유지하는 값)
+    
+    Returns:
+        Dict[str, int]: {태그: 프롬프트 수}
+    """
+    return _prompt_shards.synced_indexes().tag_counts()
+
+
+def find_similar_prompts(prompt_id: str, threshold: float = 0.5,
+                         limit: Optional[int] = None) -> Optional[List[Tuple[PromptRecord, float]]]:
+    """
+    본문이 비슷한 프롬프트 조회 (MinHash 추정 Jaccard 유사도)
+    
+    Args:
+        prompt_id: 기준 프롬프트 ID
+        threshold: 최소 유사도 (0~1)
+        limit: 최대 개수 (None이면 전부)
+    
+    Returns:
+        Optional[List[Tuple[PromptRecord, float]]]: 유사도 높은 순 (레코드, 유사도), 프롬프트가 없으면 None
+    """
+    indexes = _prompt_shards.synced_indexes()
+    similar = _minhash.similar(prompt_id, threshold, limit)
+    if similar is None:
+        return None
+    result = []
+    for other_id, score in similar:
+        prompt = indexes.get(other_id)
+        if prompt is not None:
+            result.append((prompt, score))
+    return result
+
+
+def find_duplicate_groups(threshold: float = 0.8) -> List[Tuple[List[PromptRecord], float]]:
+    """
+    중복에 가까운 프롬프트 묶음 조회 (정리 보고서용)
+    
+    Args:
+        threshold: 묶음으로 연결할 최소 유사도 (0~1)
+    
+    Returns:
+        List[Tuple[List[PromptRecord], float]]: (묶음의 레코드, 묶음 안 최저 유사도), 큰 묶음 먼저
+    """
+    indexes = _prompt_shards.synced_indexes()
+    groups = []
+    for prompt_ids, score in _minhash.duplicate_groups(threshold):
+        prompts = [indexes.get(prompt_id) for prompt_id in prompt_ids]
+        prompts = [prompt for prompt in prompts if prompt is not None]
+        if len(prompts) > 1:
+            groups.append((prompts, score))
+    return groups
+
+
+def find_related_prompts(title: str, text: str, exclude_id: Optional[str] = None,
+                         limit: int = 10) -> List[Tuple[PromptRecord, float]]:
+    """
+    제목/본문과 관련된 프롬프트 조회 (문자 n-gram TF-IDF 코사인 유사도)
+    
+    Args:
+        title: 제목 (편집 중인 저장 전 내용도 가능)
+        text: 본문
+        exclude_id: 결과에서 뺄 프롬프트 ID (편집 중인 프롬프트)
+        limit: 최대 개수
+    
+    Returns:
+        List[Tuple[PromptRecord, float]]: 유사도 높은 순 (레코드, 유사도)
+    """
+    indexes = _prompt_shards.synced_indexes()
+    result = []
+    for prompt_id, score in _tfidf.related(title, text, exclude_id, limit):
+        prompt = indexes.get(prompt_id)
+        if prompt is not None:
+            result.append((prompt, score))
+    return result
+
+
+def find_related_to_prompt(prompt_id: str, limit: int = 10) -> Optional[List[Tuple[PromptRecord, float]]]:
+    """
+    저장된 프롬프트와 관련된 프롬프트 조회
+    
+    Args:
+        prompt_id: 기준 프롬프트 ID
+        limit: 최대 개수
+    
+    Returns:
+        Optional[List[Tuple[PromptRecord, float]]]: 유사도 높은 순 (레코드, 유사도), 프롬프트가 없으면 None
+    """
+    prompt = _prompt_shards.synced_indexes().get(prompt_id)
+    if prompt is None:
+        return None
+    return find_related_prompts(prompt.title, prompt.text, prompt_id, limit)
+
+
+def suggest_prompts(query: str, limit: int = 10) -> List[Tuple[PromptRecord, int, bool]]:
+    """
+    입력 중인 검색어로 프롬프트 제안 (제목 단어/자동변환 텍스트 접두사, 오타 허용)
+    
+    Args:
+        query: 검색어 (공백으로 나눈 모든 단어가 맞아야 함)
+        limit: 최대 개수
+    
+    Returns:
+        List[Tuple[PromptRecord, int, bool]]: 순위순 (레코드, 편집 거리, 자동변환 텍스트로 찾았는지)
+    """
+    indexes = _prompt_shards.synced_indexes()
+    result = []
+    for prompt_id, distance, by_trigger in _suggest.suggest(query, limit):
+        prompt = indexes.get(prompt_id)
+        if prompt is not None:
+            result.append((prompt, distance, by_trigger))
+    return result
+
+
+def get_prompt_by_id(prompt_id: str) -> Optional[PromptRecord]:
     """
     ID로 프롬프트 조회
     
@@ -95,21 +907,62 @@ def get_prompt_by_id(prompt_id: str) -> Optional[Dict]:
         prompt_id: 프롬프트 ID
     
     Returns:
-        Optional[Dict]: 프롬프트 데이터 또는 None
+        Optional[PromptRecord]: 프롬프트 레코드 또는 None
     """
-    prompts = _read_json_file(config.PROMPTS_FILE)
+    return _prompt_shards.synced_indexes().get(prompt_id)
+
+
+def get_prompt_text(prompt_id: str) -> Optional[str]:
+    """
+    ID로 프롬프트 본문 조회 (API 서버 안에서 실행되는 자동변환 watcher의 본문 로더)
     
-    for prompt in prompts:
-        if prompt.get('id') == prompt_id:
-            # 기존 데이터의 type 필드 제거 (하위 호환성)
-            prompt.pop('type', None)
-            return prompt
+    Args:
+        prompt_id: 프롬프트 ID
     
-    return None
+    Returns:
+        Optional[str]: 프롬프트 본문 또는 None
+    """
+    prompt = get_prompt_by_id(prompt_id)
+    return prompt.text if prompt is not None else None
 
 
+def _check_autotext_unused(autotext: str, prompt_id: Optional[str] = None):
+    """
+    자동변환 텍스트 중복 체크 (트리거 인덱스 조회)
+    
+    Args:
+        autotext: 확인할 자동변환 텍스트
+        prompt_id: 수정 중인 프롬프트 ID (자기 자신은 중복으로 보지 않음)
+    
+    Raises:
+        ValueError: 다른 프롬프트가 이미 사용 중인 경우
+    """
+    _prompt_shards.synced_indexes()
+    if _triggers.owners(autotext) - {prompt_id}:
+        raise ValueError(f"자동변환 텍스트 '{autotext}'는 이미 사용 중입니다.")
+
+
+def find_trigger_conflicts(trigger: Optional[str] = None) -> List[TriggerConflict]:
+    """
+    자동변환 트리거 충돌 조회
+    
+    한 트리거가 다른 트리거 안에 들어 있으면 감지 서비스의 가장 긴 매칭 우선 규칙 때문에
+    긴 트리거가 확장되지 않거나(shadow) 짧은 트리거 대신 긴 트리거가 확장됩니다(suffix).
+    
+    Args:
+        trigger: 이 트리거가 관련된 충돌만 (None이면 전체)
+    
+    Returns:
+        List[TriggerConflict]: duplicate → shadow → suffix 순
+    """
+    _prompt_shards.synced_indexes()
+    return _triggers.conflicts(trigger)
+
+
+@_serialized
 def create_prompt(title: str, text: str, 
-                 autotext: Optional[str] = None, folder_id: Optional[int] = None) -> Dict:
+                 autotext: Optional[str] = None, folder_id: Optional[int] = None,
+                 tags: Iterable[str] = ()) -> PromptRecord:
     """
     프롬프트 생성
     
@@ -118,43 +971,28 @@ def create_prompt(title: str, text: str,
         text: 프롬프트 내용
         autotext: 자동변환 텍스트 (선택사항)
         folder_id: 폴더 ID (선택사항)
+        tags: 태그 목록 (선택사항)
     
     Returns:
-        Dict: 생성된 프롬프트 데이터
+        PromptRecord: 생성된 프롬프트 레코드
     """
-    prompts = _read_json_file(config.PROMPTS_FILE)
-    
-    # 자동변환 텍스트 중복 체크
     if autotext:
-        for p in prompts:
-            if p.get('autotext') == autotext:
-                raise ValueError(f"자동변환 텍스트 '{autotext}'는 이미 사용 중입니다.")
-    
-    prompt_id = _generate_id()
-    now = datetime.now().isoformat()
-    
-    new_prompt = {
-        'id': prompt_id,
-        'title': title,
-        'text': text,
-        'folder_id': folder_id,
-        'created_at': now,
-        'updated_at': now
-    }
+        _check_autotext_unused(autotext)
     
-    if autotext:
-        new_prompt['autotext'] = autotext
+    now = now_timestamp()
+    new_prompt = PromptRecord(_generate_id(), title, text, folder_id, autotext, now, now, tags=tags)
     
-    prompts.append(new_prompt)
-    _write_json_file(config.PROMPTS_FILE, prompts)
+    if _prompt_shards.save(folder_id, _prompt_shards.load(folder_id) + [new_prompt], upserted=[new_prompt]):
+        changelog.record('prompt', new_prompt.id, UPSERT)
     
     return new_prompt
 
 
+@_serialized
 def update_prompt(prompt_id: str, title: Optional[str] = None, 
                  text: Optional[str] = None,
                  autotext: Optional[str] = None, folder_id: Optional[int] = None,
-                 remove_autotext: bool = False) -> Optional[Dict]:
+                 remove_autotext: bool = False, tags: Optional[Iterable[str]] = None) -> Optional[PromptRecord]:
     """
     프롬프트 수정
     
@@ -165,39 +1003,56 @@ def update_prompt(prompt_id: str, title: Optional[str] = None,
         autotext: 자동변환 텍스트 (선택사항)
         folder_id: 폴더 ID (선택사항)
         remove_autotext: 자동변환 텍스트 제거 여부
+        tags: 새 태그 목록 (선택사항, 빈 목록이면 모든 태그 제거)
     
     Returns:
-        Optional[Dict]: 수정된 프롬프트 데이터 또는 None
-    """
-    prompts = _read_json_file(config.PROMPTS_FILE)
+        Optional[PromptRecord]: 수정된 프롬프트 레코드 또는 None
     
-    # 자동변환 텍스트 중복 체크
+    Raises:
+        ValueError: 자동변환 텍스트가 중복되거나 읽기 전용 프롬프트인 경우
+    """
+    _check_writable(prompt_id)
     if autotext:
-        for p in prompts:
-            if p.get('id') != prompt_id and p.get('autotext') == autotext:
-                raise ValueError(f"자동변환 텍스트 '{autotext}'는 이미 사용 중입니다.")
-    
-    for i, prompt in enumerate(prompts):
-        if prompt.get('id') == prompt_id:
-            if title is not None:
-                prompt['title'] = title
-            if text is not None:
-                prompt['text'] = text
-            if folder_id is not None:
-                prompt['folder_id'] = folder_id
-            if autotext is not None:
-                prompt['autotext'] = autotext
-            if remove_autotext and 'autotext' in prompt:
-                del prompt['autotext']
-            
-            prompt['updated_at'] = datetime.now().isoformat()
-            
-            _write_json_file(config.PROMPTS_FILE, prompts)
-            return prompt
+        _check_autotext_unused(autotext, prompt_id)
     
-    return None
+    shard_folder_id, index, current = _prompt_shards.find(prompt_id)
+    if current is None:
+        return None
+    
+    prompt = current.copy()
+    if title is not None:
+        prompt.title = title
+    if text is not None:
+        prompt.text = text
+    if folder_id is not None:
+        prompt.folder_id = folder_id
+    if autotext is not None:
+        prompt.autotext = autotext
+    if remove_autotext:
+        prompt.autotext = None
+    if tags is not None:
+        prompt.tags = normalize_tags(tags)
+    
+    prompt.updated = now_timestamp()
+    
+    source = _prompt_shards.load(shard_folder_id)
+    if prompt.folder_id == shard_folder_id:
+        updated = list(source)
+        updated[index] = prompt
+        saved = _prompt_shards.save(shard_folder_id, updated, upserted=[prompt])
+    else:
+        # 폴더 이동: 대상 샤드에 생성 순서대로 넣은 뒤 원래 샤드에서 제거 (두 샤드만 기록)
+        target = sorted(_prompt_shards.load(prompt.folder_id) + [prompt], key=_creation_order)
+        saved = _prompt_shards.save(prompt.folder_id, target, upserted=[prompt])
+        if saved:
+            _prompt_shards.save(shard_folder_id, source[:index] + source[index + 1:], upserted=[])
+    
+    if saved:
+        changelog.record('prompt', prompt.id, UPSERT)
+    return prompt
 
 
+@_serialized
 def delete_prompt(prompt_id: str) -> bool:
     """
     프롬프트 삭제
@@ -207,16 +1062,20 @@ def delete_prompt(prompt_id: str) -> bool:
     
     Returns:
         bool: 삭제 성공 여부
-    """
-    prompts = _read_json_file(config.PROMPTS_FILE)
     
-    for i, prompt in enumerate(prompts):
-        if prompt.get('id') == prompt_id:
-            prompts.pop(i)
-            _write_json_file(config.PROMPTS_FILE, prompts)
-            return True
+    Raises:
+        ValueError: 읽기 전용 프롬프트인 경우
+    """
+    _check_writable(prompt_id)
+    shard_folder_id, index, prompt = _prompt_shards.find(prompt_id)
+    if prompt is None:
+        return False
     
-    return False
+    prompts = _prompt_shards.load(shard_folder_id)
+    if _prompt_shards.save(shard_folder_id, prompts[:index] + prompts[index + 1:],
+                           upserted=[], deleted=(prompt_id,)):
+        changelog.record('prompt', prompt_id, DELETE)
+    return True
 
 
 def get_autotext_dict() -> Dict[str, str]:
@@ -226,30 +1085,64 @@ def get_autotext_dict() -> Dict[str, str]:
     Returns:
         Dict[str, str]: {autotext: text} 형식의 딕셔너리
     """
-    prompts = _read_json_file(config.PROMPTS_FILE)
+    return {prompt.autotext: prompt.text for prompt in _prompt_shards.load_all() if prompt.autotext}
+
+
+def get_autotext_triggers() -> Dict[str, Dict[str, str]]:
+    """
+    자동변환 트리거 목록 조회 (본문 제외)
     
-    result = {}
-    for prompt in prompts:
-        autotext = prompt.get('autotext')
-        if autotext:
-            result[autotext] = prompt.get('text', '')
+    자동변환 감지 서비스가 트리거 집합만 메모리에 유지하고
+    본문은 확장 시점에 지연 로드할 수 있도록 프롬프트 ID와 버전만 반환합니다.
     
-    return result
+    Returns:
+        Dict[str, Dict[str, str]]: {autotext: {'prompt_id': id, 'updated_at': 수정 시각}} 형식의 딕셔너리
+    """
+    return {
+        prompt.autotext: {'prompt_id': prompt.id, 'updated_at': prompt.updated_at}
+        for prompt in _prompt_shards.load_all() if prompt.autotext
+    }
 
 
 # ============== 폴더 관련 함수 ==============
 
-def get_folders() -> List[Dict]:
+def get_folders() -> List[FolderRecord]:
     """
     폴더 목록 조회
     
     Returns:
-        List[Dict]: 폴더 목록
+        List[FolderRecord]: 폴더 목록
+    """
+    return list(_folders.load())
+
+
+def get_folder_stats() -> Dict[Optional[int], Dict[str, int]]:
+    """
+    폴더별 프롬프트 집계 조회 (인덱스가 프롬프트 수정 시 함께 유지하는 값)
+    
+    Returns:
+        Dict[Optional[int], Dict[str, int]]: {폴더 ID(None은 폴더 없음): {'prompt_count', 'autotext_count', 'text_bytes'}}
+            프롬프트가 없는 폴더는 포함하지 않음
+    """
+    return _prompt_shards.synced_indexes().folder_stats()
+
+
+def get_folders_generation(with_stats: bool = False) -> str:
+    """
+    폴더 목록 세대 조회
+    
+    Args:
+        with_stats: 집계 포함 여부 (프롬프트가 바뀌어도 값이 바뀜)
+    
+    Returns:
+        str: 세대 문자열
     """
-    return _read_json_file(config.FOLDERS_FILE)
+    if not with_stats:
+        return get_generation(config.FOLDERS_FILE)
+    return f"{get_generation(config.FOLDERS_FILE)}|{get_generation()}"
 
 
-def get_folder_by_id(folder_id: int) -> Optional[Dict]:
+def get_folder_by_id(folder_id: int) -> Optional[FolderRecord]:
     """
     ID로 폴더 조회
     
@@ -257,50 +1150,122 @@ def get_folder_by_id(folder_id: int) -> Optional[Dict]:
         folder_id: 폴더 ID
     
     Returns:
-        Optional[Dict]: 폴더 데이터 또는 None
+        Optional[FolderRecord]: 폴더 레코드 또는 None
     """
-    folders = _read_json_file(config.FOLDERS_FILE)
-    
-    for folder in folders:
-        if folder.get('id') == folder_id:
+    for folder in _folders.load():
+        if folder.id == folder_id:
             return folder
     
     return None
 
 
-def create_folder(name: str) -> Dict:
+def get_subfolder_ids(folder_id: int) -> List[int]:
+    """
+    하위 트리의 폴더 ID 조회 (자기 자신 포함)
+    
+    Args:
+        folder_id: 폴더 ID
+    
+    Returns:
+        List[int]: 폴더 ID 목록 (없는 폴더면 빈 목록)
+    """
+    return _synced_folder_tree().subtree_ids(folder_id)
+
+
+def get_folder_path(folder_id: int) -> List[int]:
+    """
+    폴더 경로 조회
+    
+    Args:
+        folder_id: 폴더 ID
+    
+    Returns:
+        List[int]: 최상위 폴더부터 자기 자신까지의 ID (없는 폴더면 빈 목록)
+    """
+    return list(_synced_folder_tree().path(folder_id) or ())
+
+
+def count_subtree_prompts(folder_id: int) -> int:
+    """
+    하위 트리 전체의 프롬프트 수 (샤드 길이와 폴더에 속한 Markdown 프롬프트 수의 합)
+    
+    Args:
+        folder_id: 폴더 ID
+    
+    Returns:
+        int: 프롬프트 수
+    """
+    folder_ids = get_subfolder_ids(folder_id)
+    return sum(len(_prompt_shards.load(f)) for f in folder_ids) + len(_markdown_in_folders(folder_ids))
+
+
+def _next_folder_id() -> int:
+    """
+    다음 폴더 ID (저장된 카운터를 증가시켜 기록, 잠금 안에서 호출)
+    
+    카운터가 없거나 외부에서 추가한 폴더보다 작으면 트리 인덱스의 최대 ID 다음부터 사용합니다.
+    삭제된 폴더의 ID는 다시 쓰지 않습니다 (샤드 파일 이름과 변경 로그가 폴더 ID를 사용).
+    """
+    counters = _read_json_file(config.COUNTERS_FILE)
+    if not isinstance(counters, dict):
+        counters = {}
+    last = counters.get('folder_id')
+    folder_id = max(last if isinstance(last, int) else 0, _synced_folder_tree().max_id) + 1
+    counters['folder_id'] = folder_id
+    # 폴더보다 먼저 기록 (중간에 실패해도 ID가 건너뛰어질 뿐 중복되지 않음)
+    if not _write_json_file(config.COUNTERS_FILE, counters):
+        raise OSError(f"{config.COUNTERS_FILE}에 폴더 ID 카운터를 기록하지 못했습니다.")
+    return folder_id
+
+
+def _check_parent(parent_id: Optional[int]):
+    """부모 폴더 존재 확인"""
+    if parent_id is not None and _synced_folder_tree().path(parent_id) is None:
+        raise ValueError(f"상위 폴더 ID {parent_id}를 찾을 수 없습니다.")
+
+
+def _save_folders(folders: List[FolderRecord], upserted: Iterable[FolderRecord] = (),
+                  deleted: Iterable[int] = ()) -> bool:
+    """folders.json 기록 후 폴더 트리 인덱스에 바뀐 폴더만 반영"""
+    _synced_folder_tree()
+    if not _folders.save(folders):
+        return False
+    _folder_tree.apply(folders, upserted, deleted)
+    return True
+
+
+@_serialized
+def create_folder(name: str, parent_id: Optional[int] = None) -> FolderRecord:
     """
     폴더 생성
     
     Args:
         name: 폴더 이름
+        parent_id: 상위 폴더 ID (None이면 최상위)
     
     Returns:
-        Dict: 생성된 폴더 데이터
+        FolderRecord: 생성된 폴더 레코드
+    
+    Raises:
+        ValueError: 상위 폴더가 없는 경우
     """
-    folders = _read_json_file(config.FOLDERS_FILE)
+    _check_parent(parent_id)
+    folders = _folders.load()
     
-    # ID는 정수로 자동 증가
-    folder_id = 1
-    if folders:
-        folder_id = max(f.get('id', 0) for f in folders) + 1
+    # ID는 저장된 카운터에서 증가 (전체 폴더의 최대값을 찾지 않음)
+    folder_id = _next_folder_id()
     
-    now = datetime.now().isoformat()
+    now = now_timestamp()
+    new_folder = FolderRecord(folder_id, name, now, now, parent_id=parent_id)
     
-    new_folder = {
-        'id': folder_id,
-        'name': name,
-        'created_at': now,
-        'updated_at': now
-    }
-    
-    folders.append(new_folder)
-    _write_json_file(config.FOLDERS_FILE, folders)
+    if _save_folders(folders + [new_folder], upserted=[new_folder]):
+        changelog.record('folder', folder_id, UPSERT)
     
     return new_folder
 
 
-def update_folder(folder_id: int, name: str) -> Optional[Dict]:
+@_serialized
+def update_folder(folder_id: int, name: str) -> Optional[FolderRecord]:
     """
     폴더 수정
     
@@ -309,46 +1274,111 @@ def update_folder(folder_id: int, name: str) -> Optional[Dict]:
         name: 폴더 이름
     
     Returns:
-        Optional[Dict]: 수정된 폴더 데이터 또는 None
+        Optional[FolderRecord]: 수정된 폴더 레코드 또는 None
     """
-    folders = _read_json_file(config.FOLDERS_FILE)
+    folders = _folders.load()
     
-    for i, folder in enumerate(folders):
-        if folder.get('id') == folder_id:
-            folder['name'] = name
-            folder['updated_at'] = datetime.now().isoformat()
+    for i, current in enumerate(folders):
+        if current.id == folder_id:
+            folder = current.copy()
+            folder.name = name
+            folder.updated = now_timestamp()
             
-            _write_json_file(config.FOLDERS_FILE, folders)
+            updated = list(folders)
+            updated[i] = folder
+            if _save_folders(updated, upserted=[folder]):
+                changelog.record('folder', folder_id, UPSERT)
             return folder
     
     return None
 
 
+@_serialized
+def move_folder(folder_id: int, parent_id: Optional[int]) -> Optional[FolderRecord]:
+    """
+    폴더를 하위 트리째 다른 폴더 아래로 이동
+    
+    폴더 레코드 하나의 parent_id만 바뀌며, 하위 폴더의 경로는 트리 인덱스에서 함께 갱신됩니다.
+    프롬프트는 폴더 ID별 샤드에 그대로 남습니다.
+    
+    Args:
+        folder_id: 폴더 ID
+        parent_id: 새 상위 폴더 ID (None이면 최상위)
+    
+    Returns:
+        Optional[FolderRecord]: 이동된 폴더 레코드 또는 None (폴더가 없는 경우)
+    
+    Raises:
+        ValueError: 상위 폴더가 없거나, 자기 자신 또는 하위 폴더 아래로 옮기려는 경우
+    """
+    folders = _folders.load()
+    
+    for i, current in enumerate(folders):
+        if current.id == folder_id:
+            _check_parent(parent_id)
+            if parent_id is not None and _synced_folder_tree().is_within(parent_id, folder_id):
+                raise ValueError(f"폴더 ID {folder_id}를 자기 자신 또는 하위 폴더 아래로 옮길 수 없습니다.")
+            if current.parent_id == parent_id:
+                return current
+            
+            folder = current.copy()
+            folder.parent_id = parent_id
+            folder.updated = now_timestamp()
+            
+            updated = list(folders)
+            updated[i] = folder
+            if _save_folders(updated, upserted=[folder]):
+                changelog.record('folder', folder_id, UPSERT)
+            return folder
+    
+    return None
+
+
+@_serialized
 def delete_folder(folder_id: int) -> bool:
     """
     폴더 삭제
     
+    하위 폴더는 삭제한 폴더의 상위 폴더로 옮기고,
+    폴더에 속한 프롬프트는 폴더 없음으로 옮깁니다.
+    
     Args:
         folder_id: 폴더 ID
     
     Returns:
         bool: 삭제 성공 여부
     """
-    folders = _read_json_file(config.FOLDERS_FILE)
+    folders = _folders.load()
     
     for i, folder in enumerate(folders):
-        if folder.get('id') == folder_id:
-            folders.pop(i)
-            _write_json_file(config.FOLDERS_FILE, folders)
+        if folder.id == folder_id:
+            now = now_timestamp()
+            remaining = []
+            children = []
+            for other in folders[:i] + folders[i + 1:]:
+                if other.parent_id == folder_id:
+                    other = other.copy()
+                    other.parent_id = folder.parent_id
+                    other.updated = now
+                    children.append(other)
+                remaining.append(other)
+            if _save_folders(remaining, upserted=children, deleted=(folder_id,)):
+                changelog.record('folder', folder_id, DELETE)
+                for child in children:
+                    changelog.record('folder', child.id, UPSERT)
             
-            # 폴더에 속한 프롬프트의 folder_id 제거
-            prompts = _read_json_file(config.PROMPTS_FILE)
-            for prompt in prompts:
-                if prompt.get('folder_id') == folder_id:
-                    prompt['folder_id'] = None
-            _write_json_file(config.PROMPTS_FILE, prompts)
+            # 폴더에 속한 프롬프트를 폴더 없음 샤드로 옮기고 폴더 샤드 삭제
+            moved = []
+            for prompt in _prompt_shards.load(folder_id):
+                prompt = prompt.copy()
+                prompt.folder_id = None
+                moved.append(prompt)
+            unfiled = sorted(_prompt_shards.load(None) + moved, key=_creation_order)
+            if not moved or _prompt_shards.save(None, unfiled, upserted=moved):
+                _prompt_shards.remove(folder_id)
+                for prompt in moved:
+                    changelog.record('prompt', prompt.id, UPSERT)
             
             return True
     
     return False
-
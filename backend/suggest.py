@@ -0,0 +1,346 @@
+"""
+입력 중 검색(자동완성) 인덱스 모듈
+
+프롬프트 제목의 단어와 자동변환 텍스트(트리거)를 토큰으로 색인해, 입력 중인 검색어의 각 단어를
+토큰의 앞부분과 비교합니다. 오타는 편집 거리 1까지 허용하고, TWO_EDITS_LENGTH자 이상인 단어는
+앞 FUZZY_PREFIX_LENGTH자 안의 오타 1개에 더해 뒤쪽 오타까지 합쳐 2까지 허용합니다.
+
+- 접두사 검색: 중복 없는 토큰의 정렬 목록에서 bisect로 접두사 범위를 구함
+  (문자별 노드를 두는 트라이와 같은 범위 조회를 노드 객체 없이 수행)
+- 오타 검색(symmetric delete): 토큰 앞부분(FUZZY_PREFIX_LENGTH자까지의 각 길이)과 거기서 한 글자를 지운 문자열의
+  해시를 정렬 배열에 두고, 검색어에서 한 글자를 지운 문자열의 해시로 찾은 뒤 실제 편집 거리로 확인
+  (한 글자 삭제끼리 비교하므로 치환, 삽입, 삭제, 인접 문자 뒤바뀜을 모두 찾음)
+- 새 토큰의 오타 항목은 작은 dict에 두었다가 일정 크기가 되면 정렬 배열에 병합
+
+인덱스는 PromptIndexes에 등록되어 제목/트리거가 바뀐 프롬프트만 다시 색인합니다.
+처음 만들 때는 레코드만 보관하고 첫 조회 때 계산합니다.
+"""
+import bisect
+import itertools
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from backend.indexes import RecordIndex
+from backend.records import PromptRecord
+
+# 오타 검색을 하는 최소 단어 길이
+MIN_FUZZY_LENGTH = 4
+# 오타 색인에 넣는 토큰 앞부분의 최대 길이 (더 긴 검색어는 앞부분으로 후보를 찾고 전체로 확인)
+FUZZY_PREFIX_LENGTH = 7
+# 이 길이 이상인 단어는 편집 거리 2까지 허용
+TWO_EDITS_LENGTH = 8
+
+# 토큰 종류 (비트)
+TITLE = 1
+TRIGGER = 2
+
+# 결과 수의 몇 배까지 후보를 모은 뒤 순위를 매길지, 후보를 찾다 멈출 프롬프트 수
+_OVERSAMPLE = 4
+_MAX_SCANNED = 5000
+# 오타 항목 delta가 이만큼(또는 정렬 배열의 1/16) 쌓이면 정렬 배열에 병합
+_MERGE_THRESHOLD = 2048
+
+_WORD = re.compile(r'\w+')
+_MAX_CHAR = chr(0x10FFFF)
+
+# 프롬프트별 색인 내용: (토큰과 종류, 정렬용 제목)
+Entry = Tuple[Tuple[Tuple[str, int], ...], str]
+
+
+def record_tokens(record: PromptRecord) -> Tuple[Tuple[str, int], ...]:
+    """
+    레코드의 토큰 (제목 단어, 트리거 전체), 소문자 기준
+
+    Args:
+        record: 프롬프트 레코드
+
+    Returns:
+        Tuple[Tuple[str, int], ...]: (토큰, 종류 비트) 목록
+    """
+    kinds: Dict[str, int] = {}
+    for word in _WORD.findall((record.title or '').casefold()):
+        kinds[word] = kinds.get(word, 0) | TITLE
+    if record.autotext:
+        trigger = record.autotext.casefold()
+        kinds[trigger] = kinds.get(trigger, 0) | TRIGGER
+    return tuple(kinds.items())
+
+
+def _deletes(text: str) -> Iterator[str]:
+    """한 글자를 지운 문자열"""
+    for i in range(len(text)):
+        yield text[:i] + text[i + 1:]
+
+
+def _variants(token: str) -> Set[str]:
+    """토큰의 오타 색인 문자열 (MIN_FUZZY_LENGTH~FUZZY_PREFIX_LENGTH자 앞부분과 그 한 글자 삭제)"""
+    # 한 글자 짧은 토큰은 검색어에서 한 글자를 지운 문자열과 같은지만 확인
+    variants = {token} if len(token) == MIN_FUZZY_LENGTH - 1 else set()
+    for length in range(MIN_FUZZY_LENGTH, min(len(token), FUZZY_PREFIX_LENGTH) + 1):
+        prefix = token[:length]
+        variants.add(prefix)
+        variants.update(_deletes(prefix))
+    return variants
+
+
+def prefix_distance(word: str, token: str, limit: int) -> Optional[int]:
+    """
+    단어와 토큰 앞부분 사이의 최소 편집 거리 (인접 문자 뒤바뀜은 1로 계산)
+
+    Args:
+        word: 검색어 단어
+        token: 토큰
+        limit: 허용 거리
+
+    Returns:
+        Optional[int]: 거리 (limit 초과면 None)
+    """
+    token = token[:len(word) + limit]
+    before, previous = None, list(range(len(token) + 1))
+    for i, char in enumerate(word, 1):
+        current = [i]
+        for j, other in enumerate(token, 1):
+            cost = previous[j - 1] + (char != other)
+            if (before is not None and j > 1 and char == token[j - 2] and word[i - 2] == other
+                    and before[j - 2] + 1 < cost):
+                cost = before[j - 2] + 1
+            current.append(min(previous[j] + 1, current[j - 1] + 1, cost))
+        if min(current) > limit:
+            return None
+        before, previous = previous, current
+    distance = min(previous)
+    return distance if distance <= limit else None
+
+
+def allowed_edits(word: str) -> int:
+    """단어 길이별 허용 편집 거리"""
+    if len(word) < MIN_FUZZY_LENGTH:
+        return 0
+    return 2 if len(word) >= TWO_EDITS_LENGTH else 1
+
+
+class SuggestIndex(RecordIndex):
+    """
+    제목 단어/트리거 토큰의 접두사·오타 검색 인덱스
+
+    토큰 번호는 재사용하지 않으며, 삭제된 토큰의 오타 항목은 병합 전까지 남아 있다가 조회 시 걸러집니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # 첫 조회 전까지 보관하는 레코드 (None이면 인덱스가 만들어진 상태)
+        self._pending: Optional[Dict[str, PromptRecord]] = {}
+        self._reset()
+
+    def _reset(self):
+        self._entries: Dict[str, Entry] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}  # {토큰: {프롬프트 ID: 종류 비트}}
+        self._sorted: List[str] = []
+        self._token_ids: Dict[str, int] = {}
+        self._tokens: List[Optional[str]] = []
+        self._variant_hashes = np.zeros(0, dtype=np.int64)
+        self._variant_tokens = np.zeros(0, dtype=np.int32)
+        self._delta: Dict[int, List[int]] = {}
+        self._delta_size = 0
+
+    # ============== RecordIndex ==============
+
+    def put(self, record: PromptRecord, previous: Optional[PromptRecord]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[record.id] = record
+                return
+            entry = (record_tokens(record), (record.title or '').casefold())
+            current = self._entries.get(record.id)
+            if current == entry:
+                return
+            if current is not None:
+                self._remove(record.id, current)
+            self._entries[record.id] = entry
+            for token, kind in entry[0]:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    bisect.insort(self._sorted, token)
+                    self._add_variants(token)
+                postings[record.id] = kind
+
+    def discard(self, record: PromptRecord):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.pop(record.id, None)
+                return
+            current = self._entries.pop(record.id, None)
+            if current is not None:
+                self._remove(record.id, current)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        with self._lock:
+            self._pending = {record.id: record for record in records}
+
+    # ============== 만들기/갱신 ==============
+
+    def _remove(self, prompt_id: str, entry: Entry):
+        for token, _ in entry[0]:
+            postings = self._postings[token]
+            postings.pop(prompt_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._sorted[bisect.bisect_left(self._sorted, token)]
+                self._tokens[self._token_ids.pop(token)] = None
+
+    def _add_variants(self, token: str):
+        token_id = len(self._tokens)
+        self._tokens.append(token)
+        self._token_ids[token] = token_id
+        for variant in _variants(token):
+            self._delta.setdefault(hash(variant), []).append(token_id)
+            self._delta_size += 1
+
+    def _ensure(self):
+        """보관 중인 레코드로 인덱스 만들기, 오타 항목 delta가 커졌으면 병합"""
+        if self._pending is not None:
+            records = list(self._pending.values())
+            self._pending = None
+            self._reset()
+            for record in records:
+                entry = (record_tokens(record), (record.title or '').casefold())
+                self._entries[record.id] = entry
+                for token, kind in entry[0]:
+                    self._postings.setdefault(token, {})[record.id] = kind
+            self._sorted = sorted(self._postings)
+            for token in self._sorted:
+                self._add_variants(token)
+            self._merge()
+        elif self._delta_size > max(_MERGE_THRESHOLD, len(self._variant_hashes) >> 4):
+            self._merge()
+
+    def _merge(self):
+        """delta와 기존 정렬 배열을 합쳐 다시 정렬 (삭제된 토큰의 항목은 제외)"""
+        alive = np.array([token is not None for token in self._tokens], dtype=bool)
+        keep = alive[self._variant_tokens]
+        hashes = [self._variant_hashes[keep]]
+        tokens = [self._variant_tokens[keep]]
+        if self._delta:
+            counts = [len(token_ids) for token_ids in self._delta.values()]
+            hashes.append(np.repeat(np.fromiter(self._delta, dtype=np.int64, count=len(self._delta)), counts))
+            tokens.append(np.fromiter((t for token_ids in self._delta.values() for t in token_ids),
+                                      dtype=np.int32, count=sum(counts)))
+        hashes, tokens = np.concatenate(hashes), np.concatenate(tokens)
+        order = np.argsort(hashes, kind='stable')
+        self._variant_hashes, self._variant_tokens = hashes[order], tokens[order]
+        self._delta = {}
+        self._delta_size = 0
+
+    # ============== 조회 ==============
+
+    def _fuzzy_tokens(self, word: str) -> Dict[str, int]:
+        """단어와 앞부분이 편집 거리 1 이상 허용 거리 이하인 토큰 {토큰: 거리}"""
+        limit = allowed_edits(word)
+        if not limit:
+            return {}
+        prefix = word[:FUZZY_PREFIX_LENGTH]
+        hashes = np.array([hash(prefix)] + [hash(variant) for variant in set(_deletes(prefix))], dtype=np.int64)
+        starts = np.searchsorted(self._variant_hashes, hashes, side='left')
+        stops = np.searchsorted(self._variant_hashes, hashes, side='right')
+        token_ids = set()
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            token_ids.update(self._variant_tokens[start:stop].tolist())
+        for value in hashes.tolist():
+            token_ids.update(self._delta.get(value, ()))
+
+        found = {}
+        for token_id in token_ids:
+            token = self._tokens[token_id]
+            if token is None or token.startswith(word):
+                continue
+            distance = prefix_distance(word, token, limit)
+            if distance is not None:
+                found[token] = distance
+        return found
+
+    def _prefix_range(self, word: str) -> Tuple[int, int]:
+        """word로 시작하는 토큰의 정렬 목록 범위"""
+        return (bisect.bisect_left(self._sorted, word),
+                bisect.bisect_left(self._sorted, word + _MAX_CHAR))
+
+    def _matching_postings(self, prefix_range: Tuple[int, int], fuzzy: Dict[str, int], bound: int) -> int:
+        """단어에 맞는 토큰의 게시 목록 길이 합 (bound를 넘으면 더 세지 않음)"""
+        total = 0
+        tokens = (self._sorted[position] for position in range(*prefix_range))
+        for token in itertools.chain(tokens, fuzzy):
+            total += len(self._postings[token])
+            if total > bound:
+                break
+        return total
+
+    @staticmethod
+    def _word_distance(entry: Entry, word: str, fuzzy: Dict[str, int]) -> Optional[int]:
+        """프롬프트 토큰 중 단어와 가장 가까운 거리 (맞는 토큰이 없으면 None)"""
+        best = None
+        for token, _ in entry[0]:
+            distance = 0 if token.startswith(word) else fuzzy.get(token)
+            if distance is not None and (best is None or distance < best):
+                best = distance
+        return best
+
+    def suggest(self, query: str, limit: int = 10) -> List[Tuple[str, int, bool]]:
+        """
+        입력 중인 검색어로 프롬프트 찾기
+
+        공백으로 나눈 모든 단어가 프롬프트의 어떤 토큰의 앞부분과 (허용 거리 안에서) 맞아야 합니다.
+        맞는 프롬프트가 가장 적은 단어로 후보를 찾고 나머지 단어는 후보의 토큰으로 확인합니다.
+
+        Args:
+            query: 검색어
+            limit: 최대 개수
+
+        Returns:
+            List[Tuple[str, int, bool]]: (프롬프트 ID, 편집 거리 합, 트리거로 찾았는지) 순위순
+                (거리 → 트리거 우선 → 토큰 전체 일치 우선 → 짧은 제목 → 제목 순)
+        """
+        words = query.casefold().split()
+        if not words:
+            return []
+        with self._lock:
+            self._ensure()
+            fuzzy = [self._fuzzy_tokens(word) for word in words]
+            ranges = [self._prefix_range(word) for word in words]
+            driver, best = 0, None
+            for i in range(len(words)):
+                count = self._matching_postings(ranges[i], fuzzy[i], _MAX_SCANNED if best is None else best)
+                if best is None or count < best:
+                    driver, best = i, count
+            word = words[driver]
+            # 접두사 토큰(정렬 순이라 단어와 같은 토큰이 먼저) → 오타 토큰(거리순) 차례로, 후보가 충분하면 중단
+            candidates = itertools.chain(
+                ((self._sorted[position], 0) for position in range(*ranges[driver])),
+                sorted(fuzzy[driver].items(), key=lambda item: (item[1], item[0])))
+
+            ranked = {}
+            scanned = 0
+            for token, distance in candidates:
+                for prompt_id, kind in self._postings[token].items():
+                    scanned += 1
+                    if prompt_id in ranked:
+                        continue
+                    entry = self._entries[prompt_id]
+                    total = distance
+                    for other, (other_word, other_fuzzy) in enumerate(zip(words, fuzzy)):
+                        if other == driver:
+                            continue
+                        other_distance = self._word_distance(entry, other_word, other_fuzzy)
+                        if other_distance is None:
+                            total = None
+                            break
+                        total += other_distance
+                    if total is None:
+                        continue
+                    ranked[prompt_id] = (total, not kind & TRIGGER, token != word, len(entry[1]), entry[1],
+                                         prompt_id)
+                if len(ranked) >= limit * _OVERSAMPLE or scanned >= _MAX_SCANNED:
+                    break
+
+            top = sorted(ranked.values())[:limit]
+            return [(item[5], item[0], not item[1]) for item in top]
@@ -172,10 +172,53 @@ if prompt1_id:
 # 10. 자동변환 텍스트 딕셔너리 조회
 test_endpoint("GET", "/api/autotexts/dict", description="자동변환 텍스트 딕셔너리 조회")
 
+# 10-1. 자동변환 트리거 충돌 (@testapi를 포함하는 트리거는 shadow 경고)
+shadow_response = test_endpoint(
+    "POST",
+    "/api/prompts/",
+    data={"title": "충돌 테스트", "text": "충돌 테스트 내용", "autotext": "@testapix"},
+    expected_status=201,
+    description="다른 트리거를 포함하는 자동변환 텍스트로 생성 (warnings 확인)"
+)
+test_endpoint("GET", "/api/autotexts/conflicts", description="자동변환 트리거 충돌 보고서")
+if shadow_response and shadow_response.status_code == 201:
+    test_endpoint("DELETE", f"/api/prompts/{shadow_response.json()['id']}", expected_status=204,
+                  description="충돌 테스트 프롬프트 삭제")
+
 # 11. 폴더별 프롬프트 조회
 if folder_id:
     test_endpoint("GET", f"/api/prompts?folder_id={folder_id}", description="폴더별 프롬프트 조회")
 
+# 11-1. 정렬/필터 조회
+test_endpoint("GET", "/api/prompts?sort=title&limit=2", description="제목순 프롬프트 조회 (첫 페이지)")
+test_endpoint("GET", "/api/prompts?sort=updated_at&order=desc&has_autotext=true",
+              description="최근 수정순 프롬프트 조회 (자동변환 텍스트 있는 것만)")
+test_endpoint("GET", "/api/prompts?title_prefix=테스트", description="제목 접두사로 프롬프트 조회")
+test_endpoint("GET", "/api/prompts?updated_since=invalid", expected_status=400,
+              description="잘못된 updated_since (400)")
+
+# 11-2. 태그
+if prompt1_id:
+    test_endpoint("PUT", f"/api/prompts/{prompt1_id}", data={"tags": ["업무", "요약"]}, description="프롬프트 태그 설정")
+test_endpoint("GET", "/api/prompts?tag=업무&exclude_tag=번역", description="태그 조건으로 프롬프트 조회")
+test_endpoint("GET", "/api/prompts/tags", description="태그별 프롬프트 수 조회")
+
+# 11-3. 유사 프롬프트
+if prompt1_id:
+    test_endpoint("GET", f"/api/prompts/{prompt1_id}/similar?threshold=0.3", description="본문이 비슷한 프롬프트 조회")
+test_endpoint("GET", "/api/prompts/duplicates?threshold=0.8", description="중복에 가까운 프롬프트 묶음 조회")
+test_endpoint("GET", "/api/prompts/없는-ID/similar", expected_status=404, description="없는 프롬프트의 유사 프롬프트 (404)")
+
+# 11-4. 관련 프롬프트
+if prompt1_id:
+    test_endpoint("GET", f"/api/prompts/{prompt1_id}/related?limit=5", description="저장된 프롬프트의 관련 프롬프트 조회")
+test_endpoint("POST", "/api/prompts/related", data={"title": "테스트", "text": "테스트 프롬프트 내용", "limit": 5},
+              description="편집 중인 내용의 관련 프롬프트 조회")
+
+# 11-5. 입력 중 검색 (접두사/오타 허용)
+test_endpoint("GET", "/api/prompts/suggest?q=테스", description="제목 접두사로 검색어 제안")
+test_endpoint("GET", "/api/prompts/suggest?q=@tsetapi", description="오타가 있는 자동변환 텍스트로 검색어 제안")
+
 # 12. 폴더 수정
 if folder_id:
     test_endpoint(
@@ -185,6 +228,30 @@ if folder_id:
         description="폴더 수정"
     )
 
+# 12-0. 폴더별 집계
+test_endpoint("GET", "/api/folders/?with_stats=true", description="폴더 목록 조회 (프롬프트 수/본문 크기 포함)")
+
+# 12-1. 하위 폴더 생성/하위 트리 조회/이동
+subfolder_id = None
+if folder_id:
+    subfolder_response = test_endpoint(
+        "POST",
+        "/api/folders",
+        data={"name": "하위 폴더", "parent_id": folder_id},
+        expected_status=201,
+        description="하위 폴더 생성"
+    )
+    if subfolder_response and subfolder_response.status_code == 201:
+        subfolder_id = subfolder_response.json().get("id")
+    test_endpoint("GET", f"/api/folders/{folder_id}/subtree", description="폴더 하위 트리 조회")
+    test_endpoint("GET", f"/api/prompts?folder_id={folder_id}&include_subfolders=true",
+                  description="하위 폴더 포함 프롬프트 조회")
+    if subfolder_id:
+        test_endpoint("POST", f"/api/folders/{folder_id}/move", data={"parent_id": subfolder_id},
+                      expected_status=400, description="하위 폴더 아래로 이동 (400)")
+        test_endpoint("POST", f"/api/folders/{subfolder_id}/move", data={"parent_id": None},
+                      description="하위 폴더를 최상위로 이동")
+
 # 13. 프롬프트 삭제
 if prompt1_id:
     test_endpoint("DELETE", f"/api/prompts/{prompt1_id}", expected_status=204, description="프롬프트 삭제")
@@ -199,6 +266,9 @@ if prompt3_id:
 if folder_id:
     test_endpoint("DELETE", f"/api/folders/{folder_id}", expected_status=204, description="폴더 삭제")
 
+if subfolder_id:
+    test_endpoint("DELETE", f"/api/folders/{subfolder_id}", expected_status=204, description="하위 폴더 삭제")
+
 print(f"\n{'='*80}")
 print("✅ 모든 테스트 완료")
 print(f"{'='*80}")
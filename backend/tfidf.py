@@ -0,0 +1,345 @@
+"""
+TF-IDF 관련 프롬프트 인덱스 모듈
+
+프롬프트 제목과 본문을 문자 3-gram으로 나눠(띄어쓰기가 불규칙한 한국어도 비교 가능)
+해시로 고정 크기(2^DIM_BITS) 특징 공간에 넣고, TF-IDF 가중치 벡터의 코사인 유사도로 관련 프롬프트를 찾습니다.
+
+- 기본 구간: 특징별 (행, 횟수) 목록을 특징 순서로 이어 붙인 배열과 특징별 시작 위치(ptr)
+  (CSC 희소 행렬 형식). 조회 벡터의 특징 구간만 모아 np.bincount로 행별 내적을 한 번에 계산
+- 변경 구간: 기본 구간을 만든 뒤 추가/수정된 행의 벡터 (조회 시 따로 계산, 일정 크기가 되면 기본 구간에 병합)
+- 문서 빈도(df)는 수정마다 갱신하고, IDF와 행별 벡터 크기는 병합할 때 다시 계산
+- 절반 넘는 프롬프트에 나오는 특징(공백, 조사, 흔한 단어 조각)은 가중치 0 (조회 비용과 잡음 감소)
+
+인덱스는 PromptIndexes에 등록되어 프롬프트 수정 시 바뀐 프롬프트의 벡터만 다시 계산합니다.
+처음 만들 때는 레코드만 보관하고 첫 조회 때 계산합니다.
+"""
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from backend.indexes import RecordIndex
+from backend.minhash import iter_shingle_hashes, normalize_text
+from backend.records import PromptRecord
+
+# n-gram 길이 (문자 수)
+NGRAM = 3
+# 특징 공간 크기 (해시 충돌로 서로 다른 n-gram이 같은 특징이 될 수 있음)
+DIM_BITS = 20
+DIM = 1 << DIM_BITS
+# 이 비율보다 많은 프롬프트에 나오는 특징은 제외 (프롬프트가 _MAX_DF_MIN_DOCS개 이상일 때)
+MAX_DF_RATIO = 0.5
+_MAX_DF_MIN_DOCS = 100
+
+# 변경 구간 행이 이만큼(또는 전체의 _MERGE_RATIO) 쌓이면 기본 구간에 병합
+_MERGE_MIN_ROWS = 1024
+_MERGE_RATIO = 0.02
+# 벡터 크기를 계산할 때 한 번에 처리할 항목 수 (임시 배열 크기 제한)
+_CHUNK_ENTRIES = 1 << 22
+
+_FEATURE_SHIFT = np.uint64(64 - DIM_BITS)
+# 횟수별 TF 가중치 (1 + log 횟수, 횟수는 255에서 자름)
+_TF = np.concatenate([[0.0], 1.0 + np.log(np.arange(1, 256))]).astype(np.float32)
+
+Vector = Tuple[np.ndarray, np.ndarray]
+
+
+def document_text(title: str, text: str) -> str:
+    """벡터로 만들 문서 (제목 + 본문, 앞뒤 공백은 단어 경계 n-gram용)"""
+    normalized = normalize_text(f"{title} {text}")
+    return f" {normalized} " if normalized else ''
+
+
+def _iter_vectors(documents: List[str]) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    여러 문서의 n-gram 횟수 벡터를 묶음 단위로 계산
+
+    (특징, 문서 번호)를 정수 하나로 묶은 키를 정렬하고, 같은 키의 개수를 횟수로 사용합니다.
+
+    Args:
+        documents: document_text() 결과 목록
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (문서 번호, 특징, 횟수), 묶음 안에서 특징 → 문서 번호 순
+    """
+    for owners, hashes in iter_shingle_hashes(documents, NGRAM):
+        keys = (hashes >> _FEATURE_SHIFT).astype(np.int64) << 32 | owners
+        keys.sort()
+        starts = np.empty(len(keys), dtype=bool)
+        starts[0] = True
+        np.not_equal(keys[1:], keys[:-1], out=starts[1:])
+        starts = np.flatnonzero(starts)
+        counts = np.minimum(np.diff(starts, append=len(keys)), 255).astype(np.uint8)
+        keys = keys[starts]
+        # 하위 32비트는 문서 번호 (2^31 미만)
+        yield keys.astype(np.int32), (keys >> 32).astype(np.int32), counts
+
+
+def _vectorize(document: str) -> Vector:
+    """문서 하나의 (특징, 횟수) 벡터 (특징 순)"""
+    for _, features, counts in _iter_vectors([document]):
+        return features, counts
+    return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint8)
+
+
+def _runs(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """정렬된 배열에서 같은 값 구간의 (시작 위치, 길이)"""
+    starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+    return starts, np.diff(starts, append=len(values))
+
+
+class TfidfIndex(RecordIndex):
+    """
+    프롬프트 TF-IDF 벡터 인덱스
+
+    행 번호로 프롬프트를 구분하고, 삭제된 행은 다음 추가 때 재사용합니다.
+    기본 구간에 남은 수정/삭제된 행의 항목은 병합 전까지 _in_base로 걸러 냅니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # 첫 조회 전까지 보관하는 레코드 (None이면 인덱스가 만들어진 상태)
+        self._pending: Optional[Dict[str, PromptRecord]] = {}
+        self._reset(0)
+
+    def _reset(self, capacity: int):
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._in_base = np.zeros(capacity, dtype=bool)  # 기본 구간의 항목이 현재 내용인 행
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._df = np.zeros(DIM, dtype=np.int32)
+        self._count = 0
+        self._idf = np.zeros(DIM, dtype=np.float32)
+        self._ptr = np.zeros(DIM + 1, dtype=np.int64)
+        self._post_rows = np.zeros(0, dtype=np.int32)
+        self._post_counts = np.zeros(0, dtype=np.uint8)
+        self._delta: Dict[int, Vector] = {}
+        # 조회용으로 이어 붙인 변경 구간 (행 번호, 항목별 변경 구간 위치, 특징, 가중치, 행별 크기)
+        self._delta_arrays: Optional[Tuple[np.ndarray, ...]] = None
+        # 변경 구간 조회용 특징 공간 배열 (조회 중에만 값이 있음)
+        self._query = np.zeros(DIM, dtype=np.float32)
+
+    # ============== RecordIndex ==============
+
+    def put(self, record: PromptRecord, previous: Optional[PromptRecord]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[record.id] = record
+                return
+            row = self._rows.get(record.id)
+            if row is not None:
+                if previous is not None and previous.title == record.title and previous.text == record.text:
+                    return
+                self._remove_row(row, previous or record)
+            else:
+                if not self._free:
+                    self._grow()
+                row = self._free.pop()
+                self._rows[record.id] = row
+                self._ids[row] = record.id
+            features, counts = _vectorize(document_text(record.title, record.text))
+            self._df[features] += 1
+            self._count += 1
+            self._alive[row] = True
+            self._delta[row] = (features, counts)
+            self._delta_arrays = None
+
+    def discard(self, record: PromptRecord):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.pop(record.id, None)
+                return
+            row = self._rows.pop(record.id, None)
+            if row is None:
+                return
+            self._remove_row(row, record)
+            self._ids[row] = None
+            self._free.append(row)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        with self._lock:
+            self._pending = {record.id: record for record in records}
+
+    # ============== 만들기/갱신 ==============
+
+    def _remove_row(self, row: int, record: PromptRecord):
+        """행의 현재 벡터를 문서 빈도에서 빼고 비활성화 (벡터는 변경 구간에 있거나 레코드에서 다시 계산)"""
+        if not self._alive[row]:
+            return
+        vector = self._delta.pop(row, None)
+        if vector is None:
+            vector = _vectorize(document_text(record.title, record.text))
+        self._df[vector[0]] -= 1
+        self._count -= 1
+        self._alive[row] = False
+        self._in_base[row] = False
+        self._delta_arrays = None
+
+    def _grow(self):
+        old = len(self._ids)
+        capacity = max(16, old * 2)
+        self._ids.extend([None] * (capacity - old))
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - old, dtype=bool)])
+        self._in_base = np.concatenate([self._in_base, np.zeros(capacity - old, dtype=bool)])
+        self._norms = np.concatenate([self._norms, np.zeros(capacity - old, dtype=np.float32)])
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+    def _ensure(self):
+        """보관 중인 레코드로 인덱스 만들기, 변경 구간이 커졌으면 병합"""
+        if self._pending is not None:
+            self._build(list(self._pending.values()))
+        elif len(self._delta) > max(_MERGE_MIN_ROWS, self._count * _MERGE_RATIO):
+            self._merge()
+
+    def _build(self, records: List[PromptRecord]):
+        self._pending = None
+        count = len(records)
+        self._reset(max(16, count))
+        self._ids[:count] = [record.id for record in records]
+        self._rows = {record.id: row for row, record in enumerate(records)}
+        self._free = list(range(len(self._ids) - 1, count - 1, -1))
+
+        # 묶음별 벡터로 문서 빈도를 구한 뒤, 특징별 위치에 행 순서대로 채움 (계수 정렬)
+        batches = list(_iter_vectors([document_text(record.title, record.text) for record in records]))
+        for _, features, _ in batches:
+            self._df += np.bincount(features, minlength=DIM).astype(np.int32)
+        self._ptr[1:] = np.cumsum(self._df)
+        self._post_rows = np.empty(self._ptr[-1], dtype=np.int32)
+        self._post_counts = np.empty(self._ptr[-1], dtype=np.uint8)
+        cursor = self._ptr[:-1].copy()
+        for owners, features, counts in batches:
+            starts, lengths = _runs(features)
+            positions = cursor[features] + np.arange(len(features)) - np.repeat(starts, lengths)
+            self._post_rows[positions] = owners
+            self._post_counts[positions] = counts
+            cursor[features[starts]] += lengths
+        del batches
+
+        self._count = count
+        self._alive[:count] = True
+        self._in_base[:count] = True
+        self._refresh_weights()
+
+    def _merge(self):
+        """수정/삭제된 행의 항목을 빼고 변경 구간 항목을 특징별 위치에 끼워 넣은 뒤 가중치 다시 계산"""
+        removed = np.flatnonzero(~self._in_base[self._post_rows])
+        ptr = self._ptr - np.searchsorted(removed, self._ptr)
+        post_rows = np.delete(self._post_rows, removed)
+        post_counts = np.delete(self._post_counts, removed)
+
+        if self._delta:
+            rows = np.fromiter(self._delta, dtype=np.int32, count=len(self._delta))
+            features = np.concatenate([vector[0] for vector in self._delta.values()])
+            counts = np.concatenate([vector[1] for vector in self._delta.values()])
+            entry_rows = np.repeat(rows, [len(vector[0]) for vector in self._delta.values()])
+            order = np.argsort(features, kind='stable')
+            features, counts, entry_rows = features[order], counts[order], entry_rows[order]
+            # 같은 특징의 기존 항목 뒤에 삽입
+            positions = ptr[features + 1]
+            post_rows = np.insert(post_rows, positions, entry_rows)
+            post_counts = np.insert(post_counts, positions, counts)
+            ptr[1:] += np.cumsum(np.bincount(features, minlength=DIM))
+            self._in_base[rows] = True
+
+        self._ptr, self._post_rows, self._post_counts = ptr, post_rows, post_counts
+        self._delta = {}
+        self._delta_arrays = None
+        self._refresh_weights()
+
+    def _refresh_weights(self):
+        """현재 문서 빈도로 IDF와 기본 구간 행별 벡터 크기 계산"""
+        idf = np.log((1.0 + self._count) / (1.0 + self._df)) + 1.0
+        if self._count >= _MAX_DF_MIN_DOCS:
+            idf[self._df > self._count * MAX_DF_RATIO] = 0.0
+        self._idf = idf.astype(np.float32)
+
+        # 항목이 _CHUNK_ENTRIES개 정도인 특징 범위씩 계산
+        squares = np.zeros(len(self._ids))
+        bounds = np.unique(np.append(np.searchsorted(self._ptr, np.arange(0, self._ptr[-1], _CHUNK_ENTRIES)), DIM))
+        for low, high in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            start, stop = self._ptr[low], self._ptr[high]
+            idf = np.repeat(self._idf[low:high], np.diff(self._ptr[low:high + 1]))
+            weights = _TF[self._post_counts[start:stop]] * idf
+            squares += np.bincount(self._post_rows[start:stop], weights * weights, minlength=len(squares))
+        self._norms = np.sqrt(squares).astype(np.float32)
+
+    def _delta_vectors(self) -> Tuple[np.ndarray, ...]:
+        """변경 구간을 이어 붙인 배열 (다음 변경 전까지 재사용)"""
+        if self._delta_arrays is None:
+            rows = np.fromiter(self._delta, dtype=np.int64, count=len(self._delta))
+            lengths = [len(vector[0]) for vector in self._delta.values()]
+            slots = np.repeat(np.arange(len(rows)), lengths)
+            features = np.concatenate([vector[0] for vector in self._delta.values()] or [np.zeros(0, np.int32)])
+            counts = np.concatenate([vector[1] for vector in self._delta.values()] or [np.zeros(0, np.uint8)])
+            weights = _TF[counts] * self._idf[features]
+            norms = np.sqrt(np.bincount(slots, weights * weights, minlength=len(rows)))
+            self._delta_arrays = (rows, slots, features, weights, norms)
+        return self._delta_arrays
+
+    # ============== 조회 ==============
+
+    def _scores(self, features: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        모든 행과 조회 벡터의 코사인 유사도
+
+        Args:
+            features: 조회 벡터의 특징
+            weights: 특징별 가중치 (크기 1로 정규화된 상태)
+
+        Returns:
+            np.ndarray: 행별 유사도 (비활성 행은 0)
+        """
+        # 기본 구간: 조회 특징의 구간만 이어 붙여서 행별로 더함
+        starts = self._ptr[features]
+        stops = self._ptr[features + 1]
+        sections = [slice(start, stop) for start, stop in zip(starts.tolist(), stops.tolist())]
+        rows = np.concatenate([self._post_rows[section] for section in sections])
+        counts = np.concatenate([self._post_counts[section] for section in sections])
+        contributions = _TF[counts] * np.repeat(weights * self._idf[features], stops - starts)
+        scores = np.bincount(rows, contributions, minlength=len(self._ids))
+        np.divide(scores, self._norms, out=scores, where=self._norms > 0)
+        scores[~self._in_base] = 0.0
+
+        # 변경 구간: 조회 벡터를 특징 공간 배열에 펼쳐 놓고 항목별로 곱함
+        if self._delta:
+            rows, slots, delta_features, delta_weights, norms = self._delta_vectors()
+            self._query[features] = weights
+            dots = np.bincount(slots, delta_weights * self._query[delta_features], minlength=len(rows))
+            self._query[features] = 0.0
+            scores[rows] = np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+        return scores
+
+    def related(self, title: str, text: str, exclude_id: Optional[str] = None,
+                limit: int = 10, min_score: float = 0.05) -> List[Tuple[str, float]]:
+        """
+        제목/본문과 관련된 프롬프트 조회 (TF-IDF 코사인 유사도)
+
+        Args:
+            title: 제목 (저장 전 편집 중인 내용도 가능)
+            text: 본문
+            exclude_id: 결과에서 뺄 프롬프트 ID (편집 중인 프롬프트)
+            limit: 최대 개수
+            min_score: 최소 유사도 (0~1)
+
+        Returns:
+            List[Tuple[str, float]]: 유사도 높은 순 (ID, 유사도)
+        """
+        features, counts = _vectorize(document_text(title, text))
+        with self._lock:
+            self._ensure()
+            weights = _TF[counts] * self._idf[features]
+            used = weights > 0
+            features, weights = features[used], weights[used]
+            norm = np.sqrt(np.dot(weights, weights))
+            if norm == 0 or self._count == 0:
+                return []
+            scores = self._scores(features, weights / norm)
+            exclude_row = self._rows.get(exclude_id) if exclude_id is not None else None
+            if exclude_row is not None:
+                scores[exclude_row] = 0.0
+
+            limit = min(limit, len(scores))
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[scores[top] >= max(min_score, 1e-9)]
+            top = top[np.lexsort((top, -scores[top]))]
+            return [(self._ids[row], float(min(scores[row], 1.0))) for row in top]
@@ -0,0 +1,239 @@
+"""
+자동변환 트리거 충돌 인덱스 모듈
+
+자동변환 감지 서비스(AutoTextWatcher.on_key)는 글자를 입력할 때마다 입력 버퍼 끝과 맞는 가장 긴 트리거를
+바로 확장합니다. 그래서 한 트리거가 다른 트리거 안에 들어 있으면 다음과 같이 충돌합니다.
+
+- shadow: 짧은 트리거가 긴 트리거의 끝 이전에 나타남 → 긴 트리거를 입력하는 도중 짧은 트리거가 먼저 확장되어
+  긴 트리거는 확장될 수 없음 (예: '@f'와 '@front')
+- suffix: 짧은 트리거가 긴 트리거의 끝에만 나타남 → 긴 트리거는 정상 확장되지만, 입력한 내용이 긴 트리거로
+  끝나면 짧은 트리거 대신 긴 트리거가 확장됨 (예: '@f'와 'ref@f')
+- duplicate: 같은 트리거를 여러 프롬프트가 사용 (어느 본문으로 확장될지 정해지지 않음)
+
+트리거 T 하나를 확인하는 비용:
+
+- T 안에 들어 있는 트리거: T를 한 글자씩 입력한다고 보고 각 위치에서 감지 서비스처럼 트리거 길이별로
+  버퍼 끝을 조회 (T 길이 × 서로 다른 트리거 길이 수)
+- T를 포함하는 트리거: 모든 트리거의 모든 접미사를 정렬한 목록(접미사 트라이를 펼친 것과 같은 순서)에서
+  T로 시작하는 범위를 bisect로 조회 (T 길이 × log 접미사 수 + 결과 수)
+
+충돌 쌍은 트리거가 추가/삭제될 때 해당 트리거의 쌍만 갱신합니다.
+처음 만들 때는 레코드만 보관하고 첫 조회 때 계산합니다.
+"""
+import bisect
+import itertools
+import threading
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from backend.indexes import RecordIndex
+from backend.records import PromptRecord
+
+SHADOW = 'shadow'
+SUFFIX = 'suffix'
+DUPLICATE = 'duplicate'
+
+# 보고서 정렬 순서 (심각한 것 먼저)
+_KIND_ORDER = {DUPLICATE: 0, SHADOW: 1, SUFFIX: 2}
+
+# (짧은 트리거, 포함하는 트리거)
+Pair = Tuple[str, str]
+
+
+class TriggerConflict(NamedTuple):
+    """트리거 충돌 (trigger가 container 안에 들어 있음, duplicate이면 둘이 같음)"""
+    kind: str
+    trigger: str
+    prompt_id: str
+    container: str
+    container_prompt_id: str
+
+
+class TriggerIndex(RecordIndex):
+    """트리거별 프롬프트, 트리거 접미사 정렬 목록, 충돌 쌍 인덱스"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # 첫 조회 전까지 보관하는 레코드 (None이면 인덱스가 만들어진 상태)
+        self._pending: Optional[Dict[str, PromptRecord]] = {}
+        self._reset()
+
+    def _reset(self):
+        self._by_prompt: Dict[str, str] = {}
+        self._owners: Dict[str, Set[str]] = {}
+        self._lengths: Dict[int, int] = {}  # {트리거 길이: 트리거 수}
+        self._descending: List[int] = []
+        self._suffixes: List[Tuple[str, str]] = []  # (접미사, 트리거) 정렬 목록
+        self._pairs: Dict[Pair, str] = {}
+        self._pairs_by_trigger: Dict[str, Set[Pair]] = {}
+
+    # ============== RecordIndex ==============
+
+    def put(self, record: PromptRecord, previous: Optional[PromptRecord]):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[record.id] = record
+                return
+            trigger = record.autotext or None
+            current = self._by_prompt.get(record.id)
+            if current == trigger:
+                return
+            if current is not None:
+                self._remove_owner(record.id, current)
+            if trigger is not None:
+                self._by_prompt[record.id] = trigger
+                owners = self._owners.get(trigger)
+                if owners is None:
+                    self._owners[trigger] = {record.id}
+                    self._add_trigger(trigger)
+                else:
+                    owners.add(record.id)
+
+    def discard(self, record: PromptRecord):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.pop(record.id, None)
+                return
+            current = self._by_prompt.get(record.id)
+            if current is not None:
+                self._remove_owner(record.id, current)
+
+    def rebuild(self, records: Iterable[PromptRecord]):
+        with self._lock:
+            self._pending = {record.id: record for record in records}
+
+    # ============== 만들기/갱신 ==============
+
+    def _ensure(self):
+        """보관 중인 레코드로 인덱스 만들기"""
+        if self._pending is None:
+            return
+        records = list(self._pending.values())
+        self._pending = None
+        self._reset()
+        for record in records:
+            if record.autotext:
+                self._by_prompt[record.id] = record.autotext
+                self._owners.setdefault(record.autotext, set()).add(record.id)
+        for trigger in self._owners:
+            self._lengths[len(trigger)] = self._lengths.get(len(trigger), 0) + 1
+        self._descending = sorted(self._lengths, reverse=True)
+        self._suffixes = sorted((trigger[i:], trigger) for trigger in self._owners for i in range(len(trigger)))
+        # 모든 쌍은 포함하는 트리거 쪽에서 한 번씩 찾아짐
+        for trigger in self._owners:
+            for pair, kind in self._contained(trigger):
+                self._link(pair, kind)
+
+    def _remove_owner(self, prompt_id: str, trigger: str):
+        del self._by_prompt[prompt_id]
+        owners = self._owners[trigger]
+        owners.discard(prompt_id)
+        if not owners:
+            del self._owners[trigger]
+            self._remove_trigger(trigger)
+
+    def _add_trigger(self, trigger: str):
+        count = self._lengths.get(len(trigger), 0)
+        self._lengths[len(trigger)] = count + 1
+        if not count:
+            self._descending = sorted(self._lengths, reverse=True)
+        for i in range(len(trigger)):
+            bisect.insort(self._suffixes, (trigger[i:], trigger))
+        for pair, kind in itertools.chain(self._contained(trigger), self._containers(trigger)):
+            self._link(pair, kind)
+
+    def _remove_trigger(self, trigger: str):
+        count = self._lengths.pop(len(trigger))
+        if count > 1:
+            self._lengths[len(trigger)] = count - 1
+        else:
+            self._descending = sorted(self._lengths, reverse=True)
+        for i in range(len(trigger)):
+            del self._suffixes[bisect.bisect_left(self._suffixes, (trigger[i:], trigger))]
+        for pair in self._pairs_by_trigger.pop(trigger, ()):
+            del self._pairs[pair]
+            other = pair[1] if pair[0] == trigger else pair[0]
+            pairs = self._pairs_by_trigger[other]
+            pairs.discard(pair)
+            if not pairs:
+                del self._pairs_by_trigger[other]
+
+    def _link(self, pair: Pair, kind: str):
+        self._pairs[pair] = kind
+        for trigger in pair:
+            self._pairs_by_trigger.setdefault(trigger, set()).add(pair)
+
+    def _contained(self, container: str) -> Iterator[Tuple[Pair, str]]:
+        """container 안에 들어 있는 다른 트리거 (container를 한 글자씩 입력할 때 버퍼 끝과 맞는 트리거)"""
+        kinds: Dict[str, str] = {}
+        for end in range(1, len(container) + 1):
+            for length in self._descending:
+                if length > end:
+                    continue
+                trigger = container[end - length:end]
+                if trigger != container and trigger in self._owners:
+                    if end < len(container):
+                        kinds[trigger] = SHADOW
+                    else:
+                        kinds.setdefault(trigger, SUFFIX)
+        return (((trigger, container), kind) for trigger, kind in kinds.items())
+
+    def _containers(self, trigger: str) -> Iterator[Tuple[Pair, str]]:
+        """trigger를 포함하는 다른 트리거 (trigger로 시작하는 접미사의 범위)"""
+        kinds: Dict[str, str] = {}
+        position = bisect.bisect_left(self._suffixes, (trigger,))
+        while position < len(self._suffixes):
+            suffix, container = self._suffixes[position]
+            if not suffix.startswith(trigger):
+                break
+            if container != trigger:
+                if len(suffix) > len(trigger):
+                    kinds[container] = SHADOW
+                else:
+                    kinds.setdefault(container, SUFFIX)
+            position += 1
+        return (((trigger, container), kind) for container, kind in kinds.items())
+
+    # ============== 조회 ==============
+
+    def owners(self, trigger: str) -> Set[str]:
+        """
+        트리거를 쓰는 프롬프트 ID
+
+        Args:
+            trigger: 트리거
+
+        Returns:
+            Set[str]: 프롬프트 ID 집합 (없으면 빈 집합)
+        """
+        with self._lock:
+            self._ensure()
+            return set(self._owners.get(trigger, ()))
+
+    def conflicts(self, trigger: Optional[str] = None) -> List[TriggerConflict]:
+        """
+        트리거 충돌 조회
+
+        Args:
+            trigger: 이 트리거가 관련된 충돌만 (None이면 전체)
+
+        Returns:
+            List[TriggerConflict]: duplicate → shadow → suffix, 트리거 순
+        """
+        with self._lock:
+            self._ensure()
+            if trigger is None:
+                pairs = list(self._pairs.items())
+                duplicates = [t for t, owners in self._owners.items() if len(owners) > 1]
+            else:
+                pairs = [(pair, self._pairs[pair]) for pair in self._pairs_by_trigger.get(trigger, ())]
+                duplicates = [trigger] if len(self._owners.get(trigger, ())) > 1 else []
+
+            result = []
+            for duplicate in duplicates:
+                for first, second in itertools.combinations(sorted(self._owners[duplicate]), 2):
+                    result.append(TriggerConflict(DUPLICATE, duplicate, first, duplicate, second))
+            for (inner, container), kind in pairs:
+                for prompt_id in sorted(self._owners[inner]):
+                    for container_prompt_id in sorted(self._owners[container]):
+                        result.append(TriggerConflict(kind, inner, prompt_id, container, container_prompt_id))
+            result.sort(key=lambda conflict: (_KIND_ORDER[conflict.kind],) + conflict[1:])
+            return result
@@ -14,6 +14,8 @@ let backendProcess;
 let tray = null;
 let isQuitting = false;
 let backendPort = 8000; // 기본 포트, 동적으로 업데이트됨
+let backendReady = null; // 백엔드 준비 완료 Promise ("[READY]" 줄을 받으면 resolve)
+let resolveBackendReady = null;
 let ipcHandlersRegistered = false; // IPC 핸들러 중복 등록 방지 플래그
 
 // 자동 업데이트 설정
@@ -125,6 +127,12 @@ function startBackend() {
         killBackendProcess();
     }
     
+    // 백엔드가 stdout으로 "[READY] {...}" 줄을 출력하면 resolve
+    backendReady = new Promise((resolve) => {
+        resolveBackendReady = resolve;
+    });
+    let stdoutBuffer = '';
+    
     if (isDev) {
         // 개발 모드: Python 백엔드 실행
         // 가상환경이 있으면 우선 사용, 없으면 시스템 Python 사용
@@ -165,7 +173,26 @@ function startBackend() {
         const output = data.toString();
         console.log(`Backend: ${output}`);
         
-        // 포트 정보 파싱
+        // 준비 완료 신호 파싱 (data 이벤트가 줄 중간에서 끊길 수 있으므로 줄 단위로 처리)
+        // 예: '[READY] {"port": 8001, "pid": 1234}'
+        stdoutBuffer += output;
+        const lines = stdoutBuffer.split(/\r?\n/);
+        stdoutBuffer = lines.pop();
+        for (const line of lines) {
+            const readyMatch = line.match(/^\[READY\]\s*(\{.*\})/);
+            if (readyMatch) {
+                try {
+                    const info = JSON.parse(readyMatch[1]);
+                    backendPort = info.port;
+                    console.log(`백엔드 준비 완료: 포트 ${backendPort}`);
+                    resolveBackendReady(backendPort);
+                } catch (error) {
+                    console.error('준비 완료 신호 파싱 실패:', error);
+                }
+            }
+        }
+        
+        // 포트 정보 파싱 (준비 완료 신호 이전에 포트를 먼저 알 수 있음)
         // 예: "Address: http://127.0.0.1:8001"
         const portMatch = output.match(/Address:\s*http:\/\/[^:]+:(\d+)/);
         if (portMatch) {
@@ -445,8 +472,14 @@ function setupIpcHandlers() {
         return app.getVersion();
     });
     
-    // 백엔드 포트 가져오기
-    ipcMain.handle('get-backend-port', () => {
+    // 백엔드 포트 가져오기 (백엔드 준비 완료 신호를 기다린 후 반환, 최대 10초)
+    ipcMain.handle('get-backend-port', async () => {
+        if (backendReady) {
+            await Promise.race([
+                backendReady,
+                new Promise((resolve) => setTimeout(resolve, 10000))
+            ]);
+        }
         return backendPort;
     });
 }
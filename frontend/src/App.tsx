@@ -21,6 +21,19 @@ interface FolderType {
   name: string;
 }
 
+// 저장한 자동변환 텍스트가 다른 트리거와 겹치면 안내 (감지 서비스는 입력 끝과 맞는 가장 긴 트리거를 바로 변환)
+function warnTriggerConflicts(warnings: api.AutoTextConflict[]) {
+  for (const conflict of warnings) {
+    if (conflict.kind === 'shadow') {
+      toast.warning(`'${conflict.container}'를 입력하는 도중 '${conflict.trigger}'가 먼저 변환됩니다.`);
+    } else if (conflict.kind === 'suffix') {
+      toast.warning(`'${conflict.container}'로 끝나는 입력에서는 '${conflict.trigger}' 대신 '${conflict.container}'가 변환됩니다.`);
+    } else {
+      toast.warning(`'${conflict.trigger}'를 다른 프롬프트도 사용합니다.`);
+    }
+  }
+}
+
 export default function App() {
   const [selectedPromptId, setSelectedPromptId] = useState<string | undefined>();
   const [currentView, setCurrentView] = useState<'welcome' | 'editor' | 'info'>('welcome');
@@ -132,6 +145,7 @@ export default function App() {
           p.id === selectedPromptId ? updated : p
         ));
         toast.success("수정 완료");
+        warnTriggerConflicts(updated.warnings);
       } else {
         // 새 프롬프트 생성
         console.log('[DEBUG] 새 프롬프트 생성 요청:', {
@@ -160,6 +174,7 @@ export default function App() {
         setSelectedPromptId(created.id);
         setCurrentView('editor');
         toast.success("저장 완료");
+        warnTriggerConflicts(created.warnings);
       }
     } catch (error: any) {
       console.error('[ERROR] 프롬프트 저장 실패:', error);
@@ -288,6 +303,7 @@ export default function App() {
           folders={folders}
           onSave={handleSavePrompt}
           onExit={handleBackToWelcome}
+          onOpenPrompt={handleSelectPrompt}
         />
       );
     }
@@ -4,6 +4,7 @@ import { Textarea } from "./ui/textarea";
 import { Button } from "./ui/button";
 import { Label } from "./ui/label";
 import { Save, X } from "lucide-react";
+import { getRelatedPrompts, RelatedPrompt } from "../services/api";
 import {
   Select,
   SelectContent,
@@ -40,13 +41,19 @@ interface PromptEditorProps {
     folder_id?: number | null;
   }) => void;
   onExit?: () => void;
+  onOpenPrompt?: (id: string) => void;
 }
 
-export function PromptEditor({ promptData, folders, onSave, onExit }: PromptEditorProps) {
+// 관련 프롬프트 조회 지연 (입력이 멈춘 뒤 조회)
+const RELATED_DEBOUNCE_MS = 400;
+const RELATED_LIMIT = 5;
+
+export function PromptEditor({ promptId, promptData, folders, onSave, onExit, onOpenPrompt }: PromptEditorProps) {
   const [title, setTitle] = useState("");
   const [text, setText] = useState("");
   const [folderId, setFolderId] = useState<number | "none">("none");
   const [autoTextInput, setAutoTextInput] = useState("");
+  const [related, setRelated] = useState<RelatedPrompt[]>([]);
 
   // 선택된 프롬프트 데이터를 로드
   useEffect(() => {
@@ -65,6 +72,26 @@ export function PromptEditor({ promptData, folders, onSave, onExit }: PromptEdit
     }
   }, [promptData]);
 
+  // 편집 중인 제목/본문과 관련된 프롬프트 조회 (로컬 백엔드의 TF-IDF 인덱스)
+  useEffect(() => {
+    if (!text.trim()) {
+      setRelated([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      getRelatedPrompts({ title, text, exclude_id: promptId, limit: RELATED_LIMIT })
+        .then((result) => {
+          if (!cancelled) setRelated(result);
+        })
+        .catch((error) => console.error('관련 프롬프트 조회 실패:', error));
+    }, RELATED_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [title, text, promptId]);
+
   const handleSave = () => {
     if (!title.trim() || !text.trim()) {
       alert("프롬프트 이름과 내용을 입력해주세요.");
@@ -156,6 +183,27 @@ export function PromptEditor({ promptData, folders, onSave, onExit }: PromptEdit
             트리거를 입력하면 다른 앱에서 해당 텍스트 입력 시 프롬프트 전체가 자동 완성됩니다
           </p>
         </div>
+
+        {/* Related Prompts */}
+        {related.length > 0 && (
+          <div className="space-y-2">
+            <Label>관련 프롬프트</Label>
+            <ul className="space-y-1">
+              {related.map((prompt) => (
+                <li key={prompt.id}>
+                  <button
+                    type="button"
+                    onClick={() => onOpenPrompt?.(prompt.id)}
+                    className="w-full flex items-center justify-between rounded px-2 py-1 text-sm text-left hover:bg-accent"
+                  >
+                    <span className="truncate">{prompt.title}</span>
+                    <span className="ml-2 text-xs text-muted-foreground">{Math.round(prompt.score * 100)}%</span>
+                  </button>
+                </li>
+              ))}
+            </ul>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -74,6 +74,19 @@ export interface Prompt {
   created_at: string;
   updated_at: string;
   autotexts: AutoText[];
+  tags: string[];
+}
+
+export interface AutoTextConflict {
+  kind: 'shadow' | 'suffix' | 'duplicate';
+  trigger: string;  // 다른 트리거 안에 들어 있는 트리거
+  prompt_id: string;
+  container: string;  // trigger를 포함하는 트리거
+  container_prompt_id: string;
+}
+
+export interface PromptWriteResult extends Prompt {
+  warnings: AutoTextConflict[];  // 저장한 자동변환 텍스트가 관련된 트리거 충돌
 }
 
 export interface PromptCreate {
@@ -81,6 +94,7 @@ export interface PromptCreate {
   text: string;
   autotext?: string;
   folder_id?: number | null;
+  tags?: string[];
 }
 
 export interface PromptUpdate {
@@ -89,32 +103,113 @@ export interface PromptUpdate {
   autotext?: string;
   folder_id?: number | null;
   remove_autotext?: boolean;
+  tags?: string[];
+}
+
+export interface TagCount {
+  tag: string;
+  count: number;
+}
+
+export interface PromptSummary {
+  id: string;
+  title: string;
+  folder_id: number | null;
+}
+
+export interface SimilarPrompt extends PromptSummary {
+  similarity: number;  // 본문의 추정 Jaccard 유사도 (0~1)
+}
+
+export interface RelatedPrompt extends PromptSummary {
+  score: number;  // 제목/본문 TF-IDF 코사인 유사도 (0~1)
+}
+
+export interface RelatedQuery {
+  title?: string;
+  text: string;
+  exclude_id?: string;  // 편집 중인 프롬프트 (결과에서 제외)
+  limit?: number;
+}
+
+export interface PromptSuggestion extends PromptSummary {
+  autotext: string | null;
+  distance: number;  // 검색어와의 편집 거리 합 (0이면 오타 없음)
+  match: 'title' | 'autotext';
+}
+
+export interface DuplicateGroup {
+  prompts: PromptSummary[];
+  similarity: number;  // 묶음 안에서 연결된 쌍의 최저 유사도
 }
 
 export interface Folder {
   id: number;
   name: string;
+  parent_id?: number | null;
   created_at: string;
   updated_at: string;
+  // getFolders(true)로 조회한 경우에만 포함
+  prompt_count?: number;
+  autotext_count?: number;
+  text_bytes?: number;
 }
 
 export interface FolderCreate {
   name: string;
+  parent_id?: number | null;
+}
+
+export interface FolderSubtree {
+  id: number;
+  path: number[];
+  folder_ids: number[];
+  prompt_count: number;
 }
 
 export interface FolderUpdate {
   name: string;
 }
 
+export interface Changes {
+  seq: number;
+  resync_required: boolean;
+  prompts: Prompt[];
+  folders: Folder[];
+  deleted_prompts: string[];
+  deleted_folders: number[];
+}
+
+export interface PromptQuery {
+  include_subfolders?: boolean;
+  sort?: 'usage' | 'created_at' | 'updated_at' | 'title';
+  order?: 'asc' | 'desc';
+  has_autotext?: boolean;
+  updated_since?: string;
+  title_prefix?: string;
+  tag?: string[];
+  any_tag?: string[];
+  exclude_tag?: string[];
+  offset?: number;
+  limit?: number;
+}
+
 // ============== 프롬프트 API ==============
 
 /**
- * 프롬프트 목록 조회
+ * 프롬프트 목록 조회 (query로 서버 정렬/필터/페이지 지정)
  */
-export async function getPrompts(folderId?: number, type?: string): Promise<Prompt[]> {
+export async function getPrompts(folderId?: number, type?: string, query: PromptQuery = {}): Promise<Prompt[]> {
   const params = new URLSearchParams();
   if (folderId !== undefined) params.append('folder_id', folderId.toString());
   if (type) params.append('type', type);
+  for (const [key, value] of Object.entries(query)) {
+    if (Array.isArray(value)) {
+      value.forEach((item) => params.append(key, item));
+    } else if (value !== undefined && value !== '') {
+      params.append(key, String(value));
+    }
+  }
   
   const url = `${getApiBaseUrl()}/api/prompts/${params.toString() ? '?' + params.toString() : ''}`;
   const response = await fetchWithPortRetry(url);
@@ -126,6 +221,80 @@ export async function getPrompts(folderId?: number, type?: string): Promise<Prom
   return response.json();
 }
 
+/**
+ * 태그별 프롬프트 수 조회 (많은 순)
+ */
+export async function getTagCounts(): Promise<TagCount[]> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/tags`);
+  
+  if (!response.ok) {
+    throw new Error(`태그 목록 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * 본문이 비슷한 프롬프트 조회 (유사도 높은 순)
+ */
+export async function getSimilarPrompts(id: string, threshold = 0.5, limit = 10): Promise<SimilarPrompt[]> {
+  const params = new URLSearchParams({ threshold: String(threshold), limit: String(limit) });
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/${id}/similar?${params.toString()}`);
+  
+  if (!response.ok) {
+    throw new Error(`유사 프롬프트 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * 편집 중인 제목/본문과 관련된 프롬프트 조회 (저장 전 내용도 가능)
+ */
+export async function getRelatedPrompts(query: RelatedQuery): Promise<RelatedPrompt[]> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/related`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(query),
+  });
+  
+  if (!response.ok) {
+    throw new Error(`관련 프롬프트 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * 입력 중인 검색어로 프롬프트 제안 (제목 단어/자동변환 텍스트 접두사, 오타 허용)
+ */
+export async function suggestPrompts(q: string, limit = 10): Promise<PromptSuggestion[]> {
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/suggest?${params.toString()}`);
+  
+  if (!response.ok) {
+    throw new Error(`검색어 제안 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * 중복에 가까운 프롬프트 묶음 조회 (라이브러리 정리 보고서)
+ */
+export async function getDuplicatePrompts(threshold = 0.8): Promise<DuplicateGroup[]> {
+  const params = new URLSearchParams({ threshold: String(threshold) });
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/duplicates?${params.toString()}`);
+  
+  if (!response.ok) {
+    throw new Error(`중복 프롬프트 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
 /**
  * 특정 프롬프트 조회
  */
@@ -142,7 +311,7 @@ export async function getPrompt(id: string): Promise<Prompt> {
 /**
  * 프롬프트 생성
  */
-export async function createPrompt(data: PromptCreate): Promise<Prompt> {
+export async function createPrompt(data: PromptCreate): Promise<PromptWriteResult> {
   const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/`, {
     method: 'POST',
     headers: {
@@ -162,7 +331,7 @@ export async function createPrompt(data: PromptCreate): Promise<Prompt> {
 /**
  * 프롬프트 수정
  */
-export async function updatePrompt(id: string, data: PromptUpdate): Promise<Prompt> {
+export async function updatePrompt(id: string, data: PromptUpdate): Promise<PromptWriteResult> {
   const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/${id}`, {
     method: 'PUT',
     headers: {
@@ -193,13 +362,28 @@ export async function deletePrompt(id: string): Promise<void> {
   }
 }
 
+/**
+ * 프롬프트 복사 기록 (사용 통계)
+ */
+export async function recordPromptCopy(id: string): Promise<void> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/prompts/${id}/copy`, {
+    method: 'POST',
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || '프롬프트 복사 기록 실패');
+  }
+}
+
 // ============== 폴더 API ==============
 
 /**
- * 폴더 목록 조회
+ * 폴더 목록 조회 (withStats면 폴더별 프롬프트 수/자동변환 텍스트 수/본문 바이트 포함)
  */
-export async function getFolders(): Promise<Folder[]> {
-  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/folders/`);
+export async function getFolders(withStats = false): Promise<Folder[]> {
+  const query = withStats ? '?with_stats=true' : '';
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/folders/${query}`);
   
   if (!response.ok) {
     throw new Error(`폴더 목록 조회 실패: ${response.statusText}`);
@@ -262,7 +446,40 @@ export async function updateFolder(id: number, data: FolderUpdate): Promise<Fold
 }
 
 /**
- * 폴더 삭제
+ * 폴더를 하위 트리째 이동 (parentId가 null이면 최상위로)
+ */
+export async function moveFolder(id: number, parentId: number | null): Promise<Folder> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/folders/${id}/move`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ parent_id: parentId }),
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || '폴더 이동 실패');
+  }
+  
+  return response.json();
+}
+
+/**
+ * 폴더 하위 트리 조회 (경로, 하위 폴더 ID, 프롬프트 수)
+ */
+export async function getFolderSubtree(id: number): Promise<FolderSubtree> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/folders/${id}/subtree`);
+  
+  if (!response.ok) {
+    throw new Error(`폴더 하위 트리 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+/**
+ * 폴더 삭제 (하위 폴더는 상위 폴더로 이동)
  */
 export async function deleteFolder(id: number): Promise<void> {
   const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/folders/${id}`, {
@@ -275,3 +492,35 @@ export async function deleteFolder(id: number): Promise<void> {
   }
 }
 
+// ============== 자동변환 텍스트 API ==============
+
+/**
+ * 자동변환 트리거 충돌 보고서 (다른 트리거 안에 들어 있는 트리거)
+ */
+export async function getAutoTextConflicts(): Promise<AutoTextConflict[]> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/autotexts/conflicts`);
+  
+  if (!response.ok) {
+    throw new Error(`트리거 충돌 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
+// ============== 변경 사항 API ==============
+
+/**
+ * 변경 사항 조회 (since 이후 바뀐 프롬프트/폴더와 삭제된 ID)
+ *
+ * 기준 seq는 목록 조회 응답의 X-Change-Seq 헤더 또는 이전 조회 결과의 seq입니다.
+ * resync_required가 true이면 전체 목록을 다시 조회해야 합니다.
+ */
+export async function getChanges(since: number): Promise<Changes> {
+  const response = await fetchWithPortRetry(`${getApiBaseUrl()}/api/changes?since=${since}`);
+  
+  if (!response.ok) {
+    throw new Error(`변경 사항 조회 실패: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
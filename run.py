@@ -3,6 +3,7 @@ Uvicorn 서버 실행 모듈
 
 개발 환경과 프로덕션 환경에 맞게 서버를 실행합니다.
 """
+import multiprocessing
 import os
 import sys
 import socket
@@ -29,49 +30,88 @@ if sys.platform == 'win32':
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# 시작 시간 측정 기준 시각을 가능한 한 이르게 잡기 위해 가장 먼저 import
+from backend.services import startup_timing
+
 import uvicorn
 from backend.config import config
 
+startup_timing.mark("run_imports")
+
 
-def is_port_available(host: str, port: int) -> bool:
+def bind_listen_socket(host: str, start_port: int = 8000, max_port: int = 8010) -> socket.socket:
     """
-    포트가 사용 가능한지 확인합니다.
+    사용 가능한 포트에 리스닝 소켓을 바로 바인딩합니다.
+    
+    포트를 확인한 뒤 나중에 바인딩하면 그 사이에 다른 프로세스가 포트를 가져갈 수 있으므로,
+    확인과 바인딩을 한 번에 처리하고 바인딩된 소켓을 uvicorn에 그대로 넘깁니다.
     
     Args:
         host: 호스트 주소
-        port: 확인할 포트 번호
+        start_port: 시작 포트 번호 (기본값: 8000)
+        max_port: 최대 포트 번호 (기본값: 8010)
     
     Returns:
-        bool: 포트가 사용 가능하면 True, 사용 중이면 False
+        socket.socket: 리스닝 중인 소켓 (범위 내 포트가 모두 사용 중이면 OS가 할당한 포트)
     """
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1)
-            result = s.connect_ex((host, port))
-            return result != 0  # 0이면 연결 성공 (포트 사용 중)
-    except Exception:
-        return False
+    for port in list(range(start_port, max_port + 1)) + [0]:
+        # proto를 IPPROTO_TCP로 지정해야 asyncio가 수락한 연결에 TCP_NODELAY를 설정함
+        # (proto=0이면 Nagle 알고리즘 때문에 keep-alive 응답이 ~40ms씩 지연됨)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        if sys.platform == 'win32':
+            # Windows의 SO_REUSEADDR은 사용 중인 포트도 가로채므로 배타적 바인딩 사용
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # TIME_WAIT 상태의 이전 연결 때문에 재시작 시 바인딩이 실패하지 않도록 함
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+            sock.listen(2048)
+            return sock
+        except OSError:
+            sock.close()
+    raise OSError(f"{host}에 바인딩할 수 있는 포트가 없습니다.")
 
 
-def find_available_port(host: str, start_port: int = 8000, max_port: int = 8010) -> int:
+def parse_workers(argv) -> int:
     """
-    사용 가능한 포트를 찾습니다.
+    --workers N (또는 --workers=N) 인자 파싱
     
     Args:
-        host: 호스트 주소
-        start_port: 시작 포트 번호 (기본값: 8000)
-        max_port: 최대 포트 번호 (기본값: 8010)
+        argv: 커맨드 인자 목록
     
     Returns:
-        int: 사용 가능한 포트 번호, 없으면 start_port 반환
+        int: 워커 수 (인자가 없으면 config.WORKERS)
     """
-    for port in range(start_port, max_port + 1):
-        if is_port_available(host, port):
-            return port
+    for i, arg in enumerate(argv):
+        if arg == "--workers" and i + 1 < len(argv):
+            return max(1, int(argv[i + 1]))
+        if arg.startswith("--workers="):
+            return max(1, int(arg.split("=", 1)[1]))
+    return max(1, config.WORKERS)
+
+
+def run_workers(sock: socket.socket, workers: int):
+    """
+    미리 바인딩한 소켓을 여러 워커 프로세스가 함께 수락하도록 실행
     
-    # 사용 가능한 포트를 찾지 못한 경우 기본 포트 반환
-    # (uvicorn이 자체적으로 에러를 발생시킬 것임)
-    return start_port
+    저장소 수정은 파일 잠금으로 프로세스 간에 직렬화되고,
+    키보드 watcher는 워커 중 하나만 실행합니다 (backend.services.watcher_ipc).
+    
+    Args:
+        sock: 리스닝 소켓
+        workers: 워커 프로세스 수
+    """
+    from uvicorn.supervisors import Multiprocess
+    
+    uvicorn_config = uvicorn.Config("backend.main:app", log_level="info", workers=workers)
+    try:
+        # requirements.txt의 uvicorn 0.32: 워커에서 실행할 함수를 직접 넘김
+        supervisor = Multiprocess(uvicorn_config, target=uvicorn.Server(uvicorn_config).run, sockets=[sock])
+    except TypeError:
+        # 이후 버전: 워커 프로세스를 supervisor가 직접 만들고 관리(죽은 워커 재시작)
+        supervisor = Multiprocess(uvicorn_config, sockets=[sock])
+    supervisor.run()
 
 
 def run_server():
@@ -85,6 +125,7 @@ def run_server():
     커맨드 인자로도 지정 가능:
     - python run.py dev
     - python run.py prod
+    - python run.py prod --workers 4 (워커 프로세스 수, 환경 변수 BACKEND_WORKERS)
     """
     # 커맨드 인자로 환경 지정
     if len(sys.argv) > 1:
@@ -97,41 +138,52 @@ def run_server():
     # 현재 환경 출력
     env = os.getenv("ENV", "development")
     
-    # 포트 사용 가능 여부 확인 및 자동 포트 찾기
+    # 포트를 찾는 즉시 바인딩 (확인과 바인딩 사이의 경쟁 조건 제거)
     host = config.HOST
     preferred_port = config.PORT
     
-    if not is_port_available(host, preferred_port):
-        print(f"⚠️  포트 {preferred_port}이(가) 이미 사용 중입니다. 사용 가능한 포트를 찾는 중...")
-        available_port = find_available_port(host, preferred_port, 8010)
-        
-        if available_port != preferred_port:
-            print(f"✅ 포트 {available_port}을(를) 사용합니다.")
-            # 환경 변수로 포트 설정 (다른 모듈에서 사용 가능하도록)
-            os.environ["BACKEND_PORT"] = str(available_port)
-            actual_port = available_port
-        else:
-            print(f"⚠️  포트 {preferred_port}-8010 범위에서 사용 가능한 포트를 찾지 못했습니다.")
-            print(f"   포트 {preferred_port}을(를) 사용하려고 시도합니다...")
-            actual_port = preferred_port
-    else:
-        actual_port = preferred_port
-        os.environ["BACKEND_PORT"] = str(actual_port)
+    sock = bind_listen_socket(host, preferred_port, max(preferred_port, 8010))
+    actual_port = sock.getsockname()[1]
+    if actual_port != preferred_port:
+        print(f"⚠️  포트 {preferred_port}이(가) 이미 사용 중입니다. 포트 {actual_port}을(를) 사용합니다.")
+    # 환경 변수로 포트 설정 (다른 모듈에서 사용 가능하도록)
+    os.environ["BACKEND_PORT"] = str(actual_port)
+    startup_timing.mark("socket_bound")
     
     print(f"Starting server in {env} environment...")
     print(f"Address: http://{host}:{actual_port}")
     print(f"Auto reload: {'Enabled' if config.RELOAD else 'Disabled'}")
+    workers = 1 if config.RELOAD else parse_workers(sys.argv[1:])
+    if workers > 1:
+        print(f"Workers: {workers}")
+    sys.stdout.flush()
+    
+    if config.RELOAD:
+        # reload 모드는 감시 프로세스가 직접 바인딩하므로 포트 번호만 넘김
+        sock.close()
+        uvicorn.run(
+            "backend.main:app",
+            host=host,
+            port=actual_port,
+            reload=True,
+            log_level="info"
+        )
+        return
+    
+    if workers > 1:
+        run_workers(sock, workers)
+        return
     
-    # uvicorn 서버 실행
-    uvicorn.run(
+    # 미리 바인딩한 소켓으로 uvicorn 서버 실행
+    server = uvicorn.Server(uvicorn.Config(
         "backend.main:app",
-        host=host,
-        port=actual_port,
-        reload=config.RELOAD,
         log_level="info"
-    )
+    ))
+    server.run(sockets=[sock])
 
 
 if __name__ == "__main__":
+    # PyInstaller 빌드에서 워커 프로세스(spawn)가 다시 서버를 시작하지 않도록 함
+    multiprocessing.freeze_support()
     run_server()
 